@@ -12,18 +12,19 @@ Performance optimizations:
 - Django ORM aggregations (Count, Avg, StdDev)
 - Caching results for 5 minutes
 - Single query with prefetch_related
+- Score statistics and class average from merged score sketches
 """
 
-from statistics import StatisticsError, median, mode
 from typing import Any, Dict, List, Optional
 from django.contrib.auth import get_user_model
 from django.db.models import (
-    Avg, Count, Max, Min, Q, StdDev, Sum, Case, When, Value, IntegerField, F, Exists, OuterRef
+    Max, Min, Q, StdDev, Sum, Case, When, Value, IntegerField, F, Exists, OuterRef
 )
 from django.core.cache import cache
 from django.utils import timezone
 
 from assignments.models import Assignment, AssignmentSubmission
+from reports.services.score_sketches import ScoreSketchService
 
 User = get_user_model()
 
@@ -104,16 +105,11 @@ class GradeDistributionAnalytics:
         Returns:
             Dict with mean, median, mode, std_dev, min, max, Q1, Q2, Q3
         """
-        # Get all graded submissions with scores
-        submissions = AssignmentSubmission.objects.filter(
-            assignment=self.assignment,
-            status=AssignmentSubmission.Status.GRADED,
-            score__isnull=False
-        ).values_list("score", flat=True)
+        # Graded scores come from the assignment's score sketch
+        sketch = ScoreSketchService.merged(assignment_ids=[self.assignment.id], graded=True)
+        n = sketch.count
 
-        scores = list(submissions)
-
-        if not scores:
+        if not n:
             return {
                 "mean": None,
                 "median": None,
@@ -129,46 +125,33 @@ class GradeDistributionAnalytics:
 
         # Calculate statistics
         stats = {
-            "mean": round(sum(scores) / len(scores), 2),
-            "median": round(median(scores), 2),
+            "mean": round(sketch.mean(), 2),
+            "median": round(sketch.median(), 2),
+            "mode": sketch.mode(),
             "std_dev": None,
-            "min": min(scores),
-            "max": max(scores),
+            "min": sketch.min(),
+            "max": sketch.max(),
             "q1": None,
             "q2": None,
             "q3": None,
-            "sample_size": len(scores),
+            "sample_size": n,
         }
 
-        # Try to calculate mode (may not exist or be multiple values)
-        try:
-            stats["mode"] = round(mode(scores), 2)
-        except StatisticsError:
-            stats["mode"] = None
-
         # Calculate standard deviation if we have enough data
-        if len(scores) > 1:
+        if n > 1:
             # Use sample standard deviation
-            mean = stats["mean"]
-            variance = sum((x - mean) ** 2 for x in scores) / (len(scores) - 1)
-            stats["std_dev"] = round(variance ** 0.5, 2)
+            stats["std_dev"] = round(sketch.std_dev(), 2)
 
         # Calculate quartiles
-        sorted_scores = sorted(scores)
-        n = len(sorted_scores)
-
         if n >= 4:
             # Q1: 25th percentile
-            q1_index = int(n * 0.25)
-            stats["q1"] = round(sorted_scores[q1_index], 2)
+            stats["q1"] = round(sketch.value_at(int(n * 0.25)), 2)
 
             # Q2: 50th percentile (median)
-            q2_index = int(n * 0.5)
-            stats["q2"] = round(sorted_scores[q2_index], 2)
+            stats["q2"] = round(sketch.value_at(int(n * 0.5)), 2)
 
             # Q3: 75th percentile
-            q3_index = int(n * 0.75)
-            stats["q3"] = round(sorted_scores[q3_index], 2)
+            stats["q3"] = round(sketch.value_at(int(n * 0.75)), 2)
 
         return stats
 
@@ -285,17 +268,10 @@ class GradeDistributionAnalytics:
             Dict with assignment average, class average, and difference
         """
         # Get average score for this assignment
-        assignment_stats = AssignmentSubmission.objects.filter(
-            assignment=self.assignment,
-            status=AssignmentSubmission.Status.GRADED,
-            score__isnull=False
-        ).aggregate(
-            avg_score=Avg("score"),
-            count=Count("id")
-        )
+        assignment_sketch = ScoreSketchService.merged(assignment_ids=[self.assignment.id], graded=True)
 
-        assignment_avg = assignment_stats.get("avg_score")
-        assignment_count = assignment_stats.get("count", 0)
+        assignment_avg = assignment_sketch.mean()
+        assignment_count = assignment_sketch.count
 
         if assignment_avg is None:
             return {
@@ -309,15 +285,9 @@ class GradeDistributionAnalytics:
         assignment_avg = round(assignment_avg, 2)
 
         # Get class average (all assignments by the same teacher)
-        class_stats = AssignmentSubmission.objects.filter(
-            assignment__author=self.assignment.author,
-            status=AssignmentSubmission.Status.GRADED,
-            score__isnull=False
-        ).aggregate(
-            avg_score=Avg("score")
-        )
-
-        class_avg = class_stats.get("avg_score")
+        class_avg = ScoreSketchService.merged(
+            teacher_id=self.assignment.author_id, graded=True
+        ).mean()
 
         if class_avg is None:
             return {
@@ -4,8 +4,12 @@ T_ASSIGN_013: Assignment signals module.
 Provides signal handlers for:
 - Cache invalidation on submission/grade changes
 - Cache invalidation on peer review changes
+- Realtime dashboard counters on submission/assignment changes
+- Score sketch updates on submission/grade changes
 """
 
 from .cache_invalidation import register_peer_review_signals
+from . import dashboard  # noqa: F401
+from . import score_sketches  # noqa: F401
 
 __all__ = ['register_peer_review_signals']
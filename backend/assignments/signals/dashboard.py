@@ -0,0 +1,86 @@
+"""
+T_REPORT_011: Dashboard counter signals.
+
+Keeps the realtime dashboard counters (reports.services.dashboard_counters)
+in step with submissions and assignments:
+- pre_save AssignmentSubmission remembers the stored status/score
+- post_save/post_delete AssignmentSubmission apply the state transition
+- post_save(created)/post_delete Assignment adjust total assignments
+
+Counter updates are best-effort; the periodic reconcile task corrects drift.
+"""
+
+import logging
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.dispatch import receiver
+
+from assignments.models import Assignment, AssignmentSubmission
+
+logger = logging.getLogger(__name__)
+
+
+def get_dashboard_event_service():
+    try:
+        from reports.services.realtime import DashboardEventService
+
+        return DashboardEventService
+    except ImportError:
+        return None
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def remember_submission_state(sender, instance, **kwargs):
+    """
+    Store the (status, score) currently in the database for post_save.
+
+    Read by the dashboard counter and score sketch handlers.
+    """
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = (
+            AssignmentSubmission.objects.filter(pk=instance.pk)
+            .values_list("status", "score")
+            .first()
+        )
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def update_dashboard_counters_on_submission_save(sender, instance, created, **kwargs):
+    """Apply the submission's state transition to the dashboard counters."""
+    DashboardEventService = get_dashboard_event_service()
+    if not DashboardEventService:
+        return
+
+    previous = None if created else getattr(instance, "_previous_state", None)
+    if not created and previous is None:
+        # Saved without pre_save state (e.g. raw save); reconcile covers it
+        return
+
+    DashboardEventService.record_submission_change(instance, previous, created)
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def update_dashboard_counters_on_submission_delete(sender, instance, **kwargs):
+    """Remove a deleted submission from the dashboard counters."""
+    DashboardEventService = get_dashboard_event_service()
+    if DashboardEventService:
+        DashboardEventService.record_submission_deleted(instance)
+
+
+@receiver(post_save, sender=Assignment)
+def update_dashboard_counters_on_assignment_create(sender, instance, created, **kwargs):
+    """Count a new assignment."""
+    if not created:
+        return
+
+    DashboardEventService = get_dashboard_event_service()
+    if DashboardEventService:
+        DashboardEventService.record_assignment_change(instance, 1)
+
+
+@receiver(post_delete, sender=Assignment)
+def update_dashboard_counters_on_assignment_delete(sender, instance, **kwargs):
+    """Uncount a deleted assignment."""
+    DashboardEventService = get_dashboard_event_service()
+    if DashboardEventService:
+        DashboardEventService.record_assignment_change(instance, -1)
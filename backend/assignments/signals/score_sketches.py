@@ -0,0 +1,41 @@
+"""
+Score sketch signals.
+
+Moves submissions between the score histogram buckets of their
+assignment's sketch (reports.services.score_sketches) when they are
+created, graded, re-scored or deleted. The stored (status, score) is
+captured by dashboard.remember_submission_state in pre_save.
+"""
+
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from assignments.models import AssignmentSubmission
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def update_score_sketch_on_submission_save(sender, instance, created, **kwargs):
+    """Apply a new or changed score to the assignment's score sketch."""
+    from reports.services.score_sketches import ScoreSketchService
+
+    previous = None if created else getattr(instance, "_previous_state", None)
+    if not created and previous is None:
+        # Saved without pre_save state (e.g. raw save); nightly rebuild covers it
+        return
+
+    ScoreSketchService.apply_submission_change(
+        instance.assignment_id, previous, (instance.status, instance.score)
+    )
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def update_score_sketch_on_submission_delete(sender, instance, **kwargs):
+    """Remove a deleted submission's score from the assignment's score sketch."""
+    from reports.services.score_sketches import ScoreSketchService
+
+    ScoreSketchService.apply_submission_change(
+        instance.assignment_id, (instance.status, instance.score), None
+    )
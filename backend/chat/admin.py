@@ -49,14 +49,14 @@ class MessageAdmin(admin.ModelAdmin):
 
 @admin.register(ChatParticipant)
 class ChatParticipantAdmin(admin.ModelAdmin):
-    list_display = ["id", "room", "user", "joined_at", "last_read_at", "is_muted"]
+    list_display = ["id", "room", "user", "joined_at", "last_read_at", "unread_count", "is_muted"]
     list_filter = ["is_muted", "joined_at"]
     search_fields = ["room__id", "user__username", "user__email"]
-    readonly_fields = ["joined_at", "id"]
+    readonly_fields = ["joined_at", "id", "unread_count"]
     date_hierarchy = "joined_at"
 
     fieldsets = (
         ("Связь", {"fields": ("id", "room", "user")}),
-        ("Статус", {"fields": ("is_muted",)}),
+        ("Статус", {"fields": ("is_muted", "unread_count")}),
         ("Временные метки", {"fields": ("joined_at", "last_read_at")}),
     )
@@ -5,8 +5,9 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from chat.models import ChatRoom, Message, ChatParticipant
+from chat.models import Message, ChatParticipant
 from chat.services.chat_service import ChatService
+from chat import write_behind
 
 User = get_user_model()
 logger = logging.getLogger("chat.websocket")
@@ -24,6 +25,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
     - message_edit: {"type": "message_edit", "message_id": 123, "content": "new text"}
     - typing: {"type": "typing", "is_typing": true}
     - read: {"type": "read"} - отметить как прочитанное
+
+    Комната и запись участника загружаются один раз в connect() и живут
+    всё время соединения. Изменения членства и деактивация комнаты
+    приходят через channel layer (participant_removed, room_deactivated).
     """
 
     async def connect(self):
@@ -45,7 +50,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
-        has_access = await self._check_access()
+        self.chat_room = None
+        self.participant = None
+
+        has_access = await self._load_membership()
         if not has_access:
             logger.warning(f"User {self.user.id} denied access to chat {self.room_id}")
             await self.close()
@@ -68,6 +76,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         """Отключение от WebSocket"""
+        if write_behind.is_enabled():
+            await write_behind.flush_room(int(self.room_id))
+
         if hasattr(self, "room_group_name"):
             await self.channel_layer.group_send(
                 self.room_group_name,
@@ -128,6 +139,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.send_error("Message is too long (max 10000 chars)")
             return
 
+        if write_behind.is_enabled():
+            await self._enqueue_message(content)
+            return
+
         message = await self._create_message(content)
 
         if not message:
@@ -147,6 +162,30 @@ class ChatConsumer(AsyncWebsocketConsumer):
             },
         )
 
+    async def _enqueue_message(self, content):
+        """Write-behind: разослать сразу с временным id, записать в БД пакетом"""
+        if self.chat_room is None:
+            await self.send_error("Failed to create message")
+            return
+
+        provisional_id = write_behind.get_buffer(int(self.room_id)).enqueue(
+            self.chat_room, self.user, content, message_type="text"
+        )
+
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": "chat_message",
+                "message_id": provisional_id,
+                "sender_id": self.user.id,
+                "sender_name": self.user.get_full_name() or self.user.username,
+                "content": content,
+                "created_at": timezone.now().isoformat(),
+                "is_edited": False,
+                "is_provisional": True,
+            },
+        )
+
     async def _handle_message_delete(self, data):
         """Обработка удаления сообщения (soft delete)"""
         message_id = data.get("message_id")
@@ -228,6 +267,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
             },
         )
 
+    async def participant_removed(self, event):
+        """Инвалидация: участник удалён из чата"""
+        if event["user_id"] != self.user.id:
+            return
+
+        logger.info(f"User {self.user.id} removed from chat {self.room_id}, closing socket")
+        self.chat_room = None
+        self.participant = None
+        await self.close()
+
+    async def room_deactivated(self, event):
+        """Инвалидация: чат деактивирован"""
+        logger.info(f"Chat {self.room_id} deactivated, closing socket for user {self.user.id}")
+        self.chat_room = None
+        self.participant = None
+        await self.close()
+
     async def chat_message(self, event):
         """Broadcast нового сообщения"""
         await self.send(
@@ -241,11 +297,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
                         "content": event["content"],
                         "created_at": event["created_at"],
                         "is_edited": event["is_edited"],
+                        "is_provisional": event.get("is_provisional", False),
                     },
                 }
             )
         )
 
+    async def message_persisted(self, event):
+        """Broadcast: сообщения из write-behind буфера записаны в БД"""
+        await self.send(
+            text_data=json.dumps({"type": "message_persisted", "data": {"ids": event["ids"]}})
+        )
+
+    async def message_failed(self, event):
+        """Broadcast: сообщения из write-behind буфера не удалось записать"""
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "message_failed",
+                    "data": {"provisional_ids": event["provisional_ids"]},
+                }
+            )
+        )
+
     async def message_deleted(self, event):
         """Broadcast удаления сообщения"""
         await self.send(
@@ -314,21 +388,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
 
     @database_sync_to_async
-    def _check_access(self):
-        """Проверить доступ к чату"""
-        try:
-            chat = ChatRoom.objects.get(id=self.room_id, is_active=True)
-            return ChatService.can_access_chat(self.user, chat)
-        except ChatRoom.DoesNotExist:
+    def _load_membership(self):
+        """Загрузить комнату и участника (один запрос), проверить доступ"""
+        participant = (
+            ChatParticipant.objects.select_related("room")
+            .filter(room_id=self.room_id, room__is_active=True, user=self.user)
+            .first()
+        )
+        if participant is None:
             return False
 
+        self.participant = participant
+        self.chat_room = participant.room
+        return True
+
     @database_sync_to_async
     def _create_message(self, content):
         """Создать сообщение в БД"""
+        if self.chat_room is None:
+            return None
+
         try:
-            chat = ChatRoom.objects.get(id=self.room_id, is_active=True)
             message = ChatService.create_message(
-                self.user, chat, content, message_type="text"
+                self.user, self.chat_room, content, message_type="text"
             )
             return {
                 "id": message.id,
@@ -380,9 +462,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def _mark_as_read(self):
         """Отметить сообщения как прочитанные"""
+        if self.chat_room is None:
+            return False
+
         try:
-            chat = ChatRoom.objects.get(id=self.room_id, is_active=True)
-            ChatService.mark_messages_as_read(self.user, chat)
+            ChatService.mark_messages_as_read(
+                self.user, self.chat_room, participant=self.participant
+            )
             return True
         except Exception as e:
             logger.error(f"Failed to mark as read: {e}")
@@ -0,0 +1,30 @@
+"""
+Management command to backfill ChatRoom.direct_key.
+
+Assigns the canonical '<min_user_id>:<max_user_id>' key to active chats
+with exactly two participants that do not have one yet.
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.services.chat_service import ChatService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Backfill direct chat keys for existing two-person chats."""
+
+    help = "Populate ChatRoom.direct_key for existing direct chats"
+
+    def handle(self, *args, **options):
+        """Execute backfill."""
+        try:
+            updated = ChatService.backfill_direct_keys()
+        except Exception as e:
+            logger.exception(f"Direct chat key backfill failed: {e}")
+            raise CommandError(f"Direct chat key backfill failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled direct_key for {updated} chats"))
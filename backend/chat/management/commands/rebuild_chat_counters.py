@@ -0,0 +1,47 @@
+"""
+Management command to rebuild denormalized chat counters.
+
+Recomputes ChatParticipant.unread_count and ChatRoom.last_message from
+the Message table. Use it after bulk imports or to fix counter drift.
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.services.chat_service import ChatService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Rebuild unread counters and last-message pointers for chat rooms."""
+
+    help = "Rebuild ChatParticipant.unread_count and ChatRoom.last_message"
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            "--room",
+            type=int,
+            action="append",
+            dest="room_ids",
+            help="Rebuild only the given chat room (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        """Execute counter rebuild."""
+        room_ids = options.get("room_ids")
+
+        try:
+            stats = ChatService.rebuild_counters(room_ids=room_ids)
+        except Exception as e:
+            logger.exception(f"Chat counter rebuild failed: {e}")
+            raise CommandError(f"Chat counter rebuild failed: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt chat counters: {stats['participants']} participants, "
+                f"{stats['rooms']} rooms"
+            )
+        )
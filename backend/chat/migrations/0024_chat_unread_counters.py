@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    """Заполнить unread_count и last_message для существующих чатов."""
+    ChatRoom = apps.get_model("chat", "ChatRoom")
+    ChatParticipant = apps.get_model("chat", "ChatParticipant")
+    Message = apps.get_model("chat", "Message")
+
+    ChatParticipant.objects.filter(last_read_at__isnull=True).update(
+        unread_count=Coalesce(
+            Subquery(
+                Message.objects.filter(room=OuterRef("room"), is_deleted=False)
+                .exclude(sender=OuterRef("user"))
+                .order_by()
+                .values("room")
+                .annotate(total=Count("id"))
+                .values("total")[:1],
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+    )
+    ChatParticipant.objects.filter(last_read_at__isnull=False).update(
+        unread_count=Coalesce(
+            Subquery(
+                Message.objects.filter(
+                    room=OuterRef("room"),
+                    is_deleted=False,
+                    created_at__gt=OuterRef("last_read_at"),
+                )
+                .exclude(sender=OuterRef("user"))
+                .order_by()
+                .values("room")
+                .annotate(total=Count("id"))
+                .values("total")[:1],
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+    )
+    ChatRoom.objects.update(
+        last_message=Subquery(
+            Message.objects.filter(room=OuterRef("pk"), is_deleted=False)
+            .order_by("-created_at", "-id")
+            .values("id")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chat", "0023_fix_message_sender_cascade"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatparticipant",
+            name="unread_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Непрочитанные сообщения"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatroom",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chat.message",
+                verbose_name="Последнее сообщение",
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
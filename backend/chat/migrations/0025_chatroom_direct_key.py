@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+def backfill_direct_keys(apps, schema_editor):
+    """Проставить direct_key активным чатам ровно с двумя участниками."""
+    ChatRoom = apps.get_model("chat", "ChatRoom")
+    ChatParticipant = apps.get_model("chat", "ChatParticipant")
+
+    members = {}
+    for room_id, user_id in (
+        ChatParticipant.objects.filter(room__is_active=True)
+        .order_by("room_id")
+        .values_list("room_id", "user_id")
+    ):
+        members.setdefault(room_id, []).append(user_id)
+
+    seen = set()
+    for room_id, user_ids in sorted(members.items()):
+        if len(user_ids) != 2:
+            continue
+        low, high = sorted(user_ids)
+        key = f"{low}:{high}"
+        # При дубликатах ключ получает самый старый чат
+        if key in seen:
+            continue
+        seen.add(key)
+        ChatRoom.objects.filter(id=room_id).update(direct_key=key)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chat", "0024_chat_unread_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatroom",
+            name="direct_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Упорядоченная пара ID участников '<min>:<max>' для direct чатов",
+                max_length=64,
+                null=True,
+                unique=True,
+                verbose_name="Ключ direct чата",
+            ),
+        ),
+        migrations.RunPython(backfill_direct_keys, migrations.RunPython.noop),
+    ]
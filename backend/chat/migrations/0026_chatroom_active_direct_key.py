@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chat", "0025_chatroom_direct_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chatroom",
+            name="direct_key",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Упорядоченная пара ID участников '<min>:<max>' для direct чатов",
+                max_length=64,
+                null=True,
+                verbose_name="Ключ direct чата",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="chatroom",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("direct_key",),
+                name="uniq_chat_room_active_direct_key",
+            ),
+        ),
+    ]
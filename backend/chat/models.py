@@ -6,6 +6,22 @@ class ChatRoom(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, verbose_name="Активен")
+    last_message = models.ForeignKey(
+        "Message",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Последнее сообщение",
+    )
+    direct_key = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Ключ direct чата",
+        help_text="Упорядоченная пара ID участников '<min>:<max>' для direct чатов",
+    )
 
     class Meta:
         verbose_name = "Чат-комната"
@@ -15,10 +31,25 @@ class ChatRoom(models.Model):
             models.Index(fields=["-updated_at"], name="idx_chat_room_updated"),
             models.Index(fields=["is_active"], name="idx_chat_room_active"),
         ]
+        constraints = [
+            # Ключ уникален только среди активных чатов: деактивированный
+            # любым путём (API, админка) чат не мешает создать новый
+            models.UniqueConstraint(
+                fields=["direct_key"],
+                condition=models.Q(is_active=True),
+                name="uniq_chat_room_active_direct_key",
+            ),
+        ]
 
     def __str__(self):
         return f"Chat {self.id}"
 
+    @staticmethod
+    def make_direct_key(user1_id: int, user2_id: int) -> str:
+        """Build canonical direct chat key (order-independent)."""
+        low, high = sorted([user1_id, user2_id])
+        return f"{low}:{high}"
+
     def is_direct_chat(self) -> bool:
         """Check if chat is direct (exactly 2 participants)."""
         return self.participants.count() == 2
@@ -34,6 +65,9 @@ class ChatParticipant(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     last_read_at = models.DateTimeField(null=True, blank=True)
     is_muted = models.BooleanField(default=False, verbose_name="Заглушен")
+    unread_count = models.PositiveIntegerField(
+        default=0, verbose_name="Непрочитанные сообщения"
+    )
 
     class Meta:
         verbose_name = "Участник чата"
@@ -1,7 +1,8 @@
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from django.core.cache import cache
+from django.db.models import Q
 
 if TYPE_CHECKING:
     from accounts.models import User
@@ -9,6 +10,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 PERMISSION_CACHE_TTL = 60
+CONTACTS_CACHE_TTL = 300
 
 
 def _get_permission_cache_key(user1_id: int, user2_id: int) -> str:
@@ -28,6 +30,120 @@ def invalidate_permission_cache(user1_id: int, user2_id: int) -> None:
     logger.debug(f"[cache_invalidation] Deleted permission cache: {cache_key}")
 
 
+def _get_contacts_cache_key(user_id: int) -> str:
+    """Build cache key for the contacts list of a user."""
+    return f"chat_contacts:{user_id}"
+
+
+def get_cached_contacts(user_id: int):
+    """Return the cached contacts list of a user, or None on miss."""
+    return cache.get(_get_contacts_cache_key(user_id))
+
+
+def set_cached_contacts(user_id: int, contacts: list) -> None:
+    """Cache the contacts list of a user."""
+    cache.set(_get_contacts_cache_key(user_id), contacts, timeout=CONTACTS_CACHE_TTL)
+
+
+def invalidate_contacts_cache(user_ids: Iterable[int]) -> None:
+    """
+    Invalidate cached contacts lists for the given users.
+    Called when enrollment, tutor/parent assignment or direct chats change.
+    """
+    keys = [_get_contacts_cache_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        cache.delete_many(keys)
+        logger.debug(f"[cache_invalidation] Deleted contacts cache: {keys}")
+
+
+def get_chat_contacts(user: "User"):
+    """
+    Set-based version of can_initiate_chat: all users `user` can chat with.
+
+    Builds one User query where every rule of the permission matrix is an
+    `id IN (subquery)` condition, instead of calling can_initiate_chat for
+    every user in the system.
+
+    Args:
+        user: User requesting contacts
+
+    Returns:
+        QuerySet of active users (excluding `user`)
+    """
+    from accounts.models import User, StudentProfile
+    from materials.models import SubjectEnrollment
+
+    if not user.is_active:
+        return User.objects.none()
+
+    active_users = User.objects.filter(is_active=True).exclude(id=user.id)
+
+    if user.role == "admin":
+        return active_users
+
+    active_enrollments = SubjectEnrollment.objects.filter(
+        status=SubjectEnrollment.Status.ACTIVE
+    )
+    rules = Q(role="admin")
+
+    if user.role == "student":
+        rules |= Q(
+            role="teacher",
+            id__in=active_enrollments.filter(student=user).values("teacher_id"),
+        )
+        rules |= Q(
+            role="tutor",
+            id__in=StudentProfile.objects.filter(
+                user=user, tutor__is_active=True
+            ).values("tutor_id"),
+        )
+
+    elif user.role == "teacher":
+        teacher_students = active_enrollments.filter(teacher=user).values("student_id")
+        rules |= Q(role="student", id__in=teacher_students)
+        rules |= Q(
+            role="parent",
+            id__in=StudentProfile.objects.filter(
+                user_id__in=teacher_students, parent__is_active=True
+            ).values("parent_id"),
+        )
+        rules |= Q(
+            role="tutor",
+            id__in=StudentProfile.objects.filter(
+                user_id__in=teacher_students, tutor__is_active=True
+            ).values("tutor_id"),
+        )
+
+    elif user.role == "tutor":
+        tutor_profiles = StudentProfile.objects.filter(tutor=user)
+        rules |= Q(role="student", id__in=tutor_profiles.values("user_id"))
+        rules |= Q(
+            role="teacher",
+            id__in=active_enrollments.filter(
+                student_id__in=tutor_profiles.values("user_id")
+            ).values("teacher_id"),
+        )
+        rules |= Q(
+            role="parent",
+            id__in=tutor_profiles.filter(parent__is_active=True).values("parent_id"),
+        )
+
+    elif user.role == "parent":
+        parent_children = StudentProfile.objects.filter(parent=user)
+        rules |= Q(
+            role="teacher",
+            id__in=active_enrollments.filter(
+                student_id__in=parent_children.values("user_id")
+            ).values("teacher_id"),
+        )
+        rules |= Q(
+            role="tutor",
+            id__in=parent_children.filter(tutor__is_active=True).values("tutor_id"),
+        )
+
+    return active_users.filter(rules)
+
+
 def can_initiate_chat(user1: "User", user2: "User") -> bool:
     """
     Check if user1 can initiate a chat with user2.
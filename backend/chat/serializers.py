@@ -149,11 +149,20 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Использует аннотацию last_message_content из ChatService.get_user_chats()"""
-        if hasattr(obj, "last_message_content") and obj.last_message_content:
+        if hasattr(obj, "last_message_content"):
+            if not obj.last_message_content:
+                return None
             return {
                 "content": obj.last_message_content[:100],
                 "created_at": getattr(obj, "last_message_time", None),
             }
+
+        last_message = obj.last_message
+        if last_message and not last_message.is_deleted:
+            return {
+                "content": last_message.content[:100],
+                "created_at": last_message.created_at,
+            }
         return None
 
     def get_unread_count(self, obj):
@@ -176,23 +185,7 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
             if not participant:
                 participant = obj.participants.get(user=request.user)
 
-            last_read = participant.last_read_at
-
-            if not last_read:
-                return (
-                    obj.messages.filter(is_deleted=False)
-                    .exclude(sender=request.user)
-                    .count()
-                )
-
-            return (
-                obj.messages.filter(
-                    is_deleted=False,
-                    created_at__gt=last_read,
-                )
-                .exclude(sender=request.user)
-                .count()
-            )
+            return participant.unread_count
         except ChatParticipant.DoesNotExist:
             return 0
 
@@ -1,7 +1,18 @@
 import logging
 from typing import Optional
 
-from django.db.models import Q, Prefetch, Count, F, Max, QuerySet
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Q,
+    Prefetch,
+    Count,
+    F,
+    Max,
+    QuerySet,
+    IntegerField,
+    OuterRef,
+    Subquery,
+)
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.cache import cache
@@ -9,16 +20,36 @@ from django.contrib.auth import get_user_model
 from rest_framework.exceptions import PermissionDenied
 
 from ..models import ChatRoom, ChatParticipant, Message
-from ..permissions import can_initiate_chat, invalidate_permission_cache
+from ..permissions import (
+    can_initiate_chat,
+    invalidate_permission_cache,
+    get_chat_contacts,
+    get_cached_contacts,
+    set_cached_contacts,
+    invalidate_contacts_cache,
+)
 
 User = get_user_model()
 logger = logging.getLogger("chat")
 
 
+def _message_window_cache_key(room_id: int) -> str:
+    return f"chat_messages_window:{room_id}"
+
+
+def _serialize_messages(messages) -> list:
+    from ..serializers import MessageSerializer
+
+    return MessageSerializer(messages, many=True).data
+
+
 class ChatService:
     """Сервис для управления чатами и сообщениями"""
 
     PERMISSION_CACHE_TTL = 60
+    MESSAGE_WINDOW_SIZE = 50
+    MESSAGE_WINDOW_CACHE_TTL = 300
+    MESSAGE_WINDOW_LOCK_TTL = 5
 
     @staticmethod
     def get_user_chats(user, page=1, page_size=20) -> QuerySet:
@@ -32,20 +63,17 @@ class ChatService:
 
         Returns:
             QuerySet чатов с аннотациями и сортировкой по последнему сообщению
+
+        unread_count и последнее сообщение читаются из денормализованных
+        полей ChatParticipant.unread_count и ChatRoom.last_message,
+        поэтому запрос не содержит агрегаций.
         """
         chats = (
             ChatRoom.objects.filter(participants__user=user, is_active=True)
             .annotate(
-                unread_count=Count(
-                    "messages",
-                    filter=Q(
-                        messages__is_deleted=False,
-                        messages__created_at__gt=Coalesce(
-                            F("participants__last_read_at"), timezone.now()
-                        ),
-                    )
-                    & ~Q(messages__sender=user),
-                )
+                unread_count=F("participants__unread_count"),
+                last_message_content=F("last_message__content"),
+                last_message_time=F("last_message__created_at"),
             )
             .prefetch_related(
                 Prefetch(
@@ -54,15 +82,8 @@ class ChatService:
                         user=user
                     ),
                 ),
-                Prefetch(
-                    "messages",
-                    queryset=Message.objects.filter(is_deleted=False).order_by(
-                        "-created_at"
-                    )[:1],
-                ),
             )
             .order_by("-updated_at")
-            .distinct()
         )
 
         return chats
@@ -101,22 +122,25 @@ class ChatService:
                 f"User {user1.id} cannot initiate chat with {user2.id}"
             )
 
-        existing_chat = (
-            ChatRoom.objects.filter(
-                participants__user__in=[user1, user2], is_active=True
-            )
-            .annotate(participant_count=Count("participants"))
-            .filter(participant_count=2)
-            .distinct()
-            .first()
-        )
+        direct_key = ChatRoom.make_direct_key(user1.id, user2.id)
+
+        existing_chat = ChatRoom.objects.filter(
+            direct_key=direct_key, is_active=True
+        ).first()
 
         if existing_chat:
             return existing_chat
 
-        chat_room = ChatRoom.objects.create()
-        ChatParticipant.objects.create(room=chat_room, user=user1)
-        ChatParticipant.objects.create(room=chat_room, user=user2)
+        try:
+            with transaction.atomic():
+                chat_room = ChatRoom.objects.create(direct_key=direct_key)
+                ChatParticipant.objects.create(room=chat_room, user=user1)
+                ChatParticipant.objects.create(room=chat_room, user=user2)
+        except IntegrityError:
+            # Параллельный запрос уже создал чат для этой пары
+            return ChatRoom.objects.get(direct_key=direct_key, is_active=True)
+
+        invalidate_contacts_cache([user1.id, user2.id])
 
         logger.info(
             f"Created new direct chat {chat_room.id} between {user1.id} and {user2.id}"
@@ -124,21 +148,85 @@ class ChatService:
         return chat_room
 
     @staticmethod
-    def mark_messages_as_read(user, chat_room) -> None:
+    def get_direct_chat_partners(user) -> dict:
+        """
+        Получить всех собеседников пользователя по direct чатам одним запросом.
+
+        Args:
+            user: User instance
+
+        Returns:
+            dict {user_id собеседника: id чата}
+        """
+        rows = ChatRoom.objects.filter(
+            participants__user=user, is_active=True, direct_key__isnull=False
+        ).values_list("id", "direct_key")
+
+        partners = {}
+        for room_id, direct_key in rows:
+            low, high = (int(part) for part in direct_key.split(":"))
+            partners[high if low == user.id else low] = room_id
+        return partners
+
+    @staticmethod
+    def get_contacts(user) -> list:
+        """
+        Получить список доступных контактов с информацией о существующих чатах.
+
+        Результат кэшируется и инвалидируется сигналами зачислений/профилей.
+
+        Args:
+            user: User instance
+
+        Returns:
+            список dict (id, full_name, role, has_existing_chat, chat_id),
+            отсортированный по имени
+        """
+        contacts = get_cached_contacts(user.id)
+        if contacts is not None:
+            return contacts
+
+        partners = ChatService.get_direct_chat_partners(user)
+
+        contacts = []
+        for contact in get_chat_contacts(user).values(
+            "id", "username", "first_name", "last_name", "role"
+        ):
+            chat_id = partners.get(contact["id"])
+            contacts.append(
+                {
+                    "id": contact["id"],
+                    "full_name": f"{contact['first_name']} {contact['last_name']}".strip()
+                    or contact["username"],
+                    "role": contact["role"] or "unknown",
+                    "has_existing_chat": chat_id is not None,
+                    "chat_id": chat_id,
+                }
+            )
+
+        contacts.sort(key=lambda x: x["full_name"])
+        set_cached_contacts(user.id, contacts)
+        return contacts
+
+    @staticmethod
+    def mark_messages_as_read(user, chat_room, participant=None) -> None:
         """
         Отметить все сообщения как прочитанные.
 
         Args:
             user: User instance
             chat_room: ChatRoom instance
+            participant: уже загруженный ChatParticipant (пропускает поиск)
 
-        Updates ChatParticipant.last_read_at = now()
+        Updates ChatParticipant.last_read_at = now(), unread_count = 0
         """
-        participant, created = ChatParticipant.objects.get_or_create(
-            room=chat_room, user=user
-        )
+        if participant is None:
+            participant, created = ChatParticipant.objects.get_or_create(
+                room=chat_room, user=user
+            )
         participant.last_read_at = timezone.now()
-        participant.save(update_fields=["last_read_at"])
+        participant.unread_count = 0
+        participant.save(update_fields=["last_read_at", "unread_count"])
 
         logger.info(
             f"Marked messages as read for user {user.id} in chat {chat_room.id}"
@@ -156,26 +244,11 @@ class ChatService:
         Returns:
             количество непрочитанных сообщений
         """
-        try:
-            participant = ChatParticipant.objects.get(room=chat_room, user=user)
-        except ChatParticipant.DoesNotExist:
-            return 0
-
-        if not participant.last_read_at:
-            return (
-                Message.objects.filter(room=chat_room, is_deleted=False)
-                .exclude(sender=user)
-                .count()
-            )
-
         return (
-            Message.objects.filter(
-                room=chat_room,
-                is_deleted=False,
-                created_at__gt=participant.last_read_at,
-            )
-            .exclude(sender=user)
-            .count()
+            ChatParticipant.objects.filter(room=chat_room, user=user)
+            .values_list("unread_count", flat=True)
+            .first()
+            or 0
         )
 
     @staticmethod
@@ -183,7 +256,11 @@ class ChatService:
         chat_room, limit: int = 50, before_id: Optional[int] = None
     ) -> QuerySet:
         """
-        Получить сообщения чата с cursor-based pagination.
+        Получить сообщения чата с keyset pagination по (created_at, id).
+
+        Курсор before_id раскрывается подзапросом в том же SQL-запросе,
+        сообщения с одинаковым created_at упорядочиваются по id, поэтому
+        на границе страниц ничего не теряется и не дублируется.
 
         Args:
             chat_room: ChatRoom instance
@@ -191,23 +268,165 @@ class ChatService:
             before_id: ID сообщения (возвращать сообщения ПЕРЕД этим)
 
         Returns:
-            QuerySet сообщений, отсортированных по created_at DESC
+            QuerySet сообщений, отсортированных по (created_at, id) DESC
         """
         queryset = (
             Message.objects.filter(room=chat_room, is_deleted=False)
             .select_related("sender")
-            .order_by("-created_at")
+            .order_by("-created_at", "-id")
         )
 
         if before_id:
-            try:
-                before_message = Message.objects.get(id=before_id)
-                queryset = queryset.filter(created_at__lt=before_message.created_at)
-            except Message.DoesNotExist:
-                pass
+            cursor_created_at = Subquery(
+                Message.objects.filter(id=before_id, room=chat_room).values(
+                    "created_at"
+                )[:1]
+            )
+            queryset = queryset.filter(
+                Q(created_at__lt=cursor_created_at)
+                | Q(created_at=cursor_created_at, id__lt=before_id)
+            )
 
         return queryset[:limit]
 
+    @staticmethod
+    def get_recent_messages(chat_room, limit: int = 50) -> dict:
+        """
+        Получить первую страницу сообщений из кэша окна последних сообщений.
+
+        Окно хранит MESSAGE_WINDOW_SIZE сериализованных сообщений и общее
+        количество; создание, редактирование и удаление правят его на месте.
+        Если после удалений в окне осталось меньше сообщений, чем нужно
+        странице, оно перестраивается из БД.
+
+        Args:
+            chat_room: ChatRoom instance
+            limit: количество сообщений (не больше MESSAGE_WINDOW_SIZE)
+
+        Returns:
+            dict {"count": всего сообщений, "results": сообщения от старых к новым}
+        """
+        cache_key = _message_window_cache_key(chat_room.id)
+        window = cache.get(cache_key)
+
+        if window is None or len(window["results"]) < min(limit, window["count"]):
+            messages = list(
+                ChatService.get_chat_messages(
+                    chat_room, limit=ChatService.MESSAGE_WINDOW_SIZE
+                )
+            )
+            messages.reverse()
+            window = {
+                "count": chat_room.messages.filter(is_deleted=False).count(),
+                "results": _serialize_messages(messages),
+            }
+            cache.set(cache_key, window, timeout=ChatService.MESSAGE_WINDOW_CACHE_TTL)
+
+        results = list(window["results"])
+        return {"count": window["count"], "results": results[-limit:] if limit else []}
+
+    @staticmethod
+    def invalidate_message_window(room_id: int) -> None:
+        """
+        Удалить кэш окна последних сообщений после коммита транзакции.
+
+        Только для структурных изменений, которые нельзя применить к окну
+        на месте; обычные правки идут через add/replace/remove_*_message_window.
+
+        Args:
+            room_id: ID чата
+        """
+        transaction.on_commit(lambda: cache.delete(_message_window_cache_key(room_id)))
+
+    @staticmethod
+    def _update_message_window(room_id: int, update) -> None:
+        """
+        Применить update(window) к закэшированному окну после коммита.
+
+        Окно меняется под коротким локом в кэше. Если лок занят, окно
+        удаляется, а держатель лока видит метку stale и удаляет окно после
+        своей записи, так что конкурирующие правки не теряются.
+
+        Args:
+            room_id: ID чата
+            update: функция, изменяющая dict окна на месте
+        """
+        cache_key = _message_window_cache_key(room_id)
+        lock_key = f"{cache_key}:lock"
+        stale_key = f"{cache_key}:stale"
+
+        def apply():
+            if not cache.add(lock_key, 1, ChatService.MESSAGE_WINDOW_LOCK_TTL):
+                cache.set(stale_key, 1, ChatService.MESSAGE_WINDOW_LOCK_TTL)
+                cache.delete(cache_key)
+                return
+            try:
+                window = cache.get(cache_key)
+                if window is None:
+                    return
+                update(window)
+                window["results"] = window["results"][-ChatService.MESSAGE_WINDOW_SIZE:]
+                cache.set(cache_key, window, timeout=ChatService.MESSAGE_WINDOW_CACHE_TTL)
+                if cache.get(stale_key):
+                    cache.delete_many([cache_key, stale_key])
+            finally:
+                cache.delete(lock_key)
+
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def add_to_message_window(room_id: int, messages: list) -> None:
+        """
+        Дописать новые сообщения в конец окна и обрезать его до размера.
+
+        Args:
+            room_id: ID чата
+            messages: созданные Message в порядке создания
+        """
+
+        def update(window):
+            window["results"] = list(window["results"]) + list(
+                _serialize_messages(messages)
+            )
+            window["count"] += len(messages)
+
+        ChatService._update_message_window(room_id, update)
+
+    @staticmethod
+    def replace_in_message_window(message: Message) -> None:
+        """
+        Заменить отредактированное сообщение в окне, если оно там есть.
+
+        Args:
+            message: Message instance
+        """
+
+        def update(window):
+            serialized = _serialize_messages([message])[0]
+            window["results"] = [
+                serialized if item["id"] == message.id else item
+                for item in window["results"]
+            ]
+
+        ChatService._update_message_window(message.room_id, update)
+
+    @staticmethod
+    def remove_from_message_window(message: Message) -> None:
+        """
+        Убрать удалённое сообщение из окна и уменьшить общее количество.
+
+        Args:
+            message: Message instance
+        """
+
+        def update(window):
+            window["results"] = [
+                item for item in window["results"] if item["id"] != message.id
+            ]
+            window["count"] = max(window["count"] - 1, 0)
+
+        ChatService._update_message_window(message.room_id, update)
+
     @staticmethod
     def create_message(
         user, chat_room, content: str, message_type: str = "text"
@@ -224,18 +443,81 @@ class ChatService:
         Returns:
             Message instance
         """
-        message = Message.objects.create(
-            room=chat_room, sender=user, content=content, message_type=message_type
-        )
+        with transaction.atomic():
+            message = Message.objects.create(
+                room=chat_room, sender=user, content=content, message_type=message_type
+            )
+
+            ChatParticipant.objects.filter(room=chat_room).exclude(user=user).update(
+                unread_count=F("unread_count") + 1
+            )
 
-        chat_room.updated_at = timezone.now()
-        chat_room.save(update_fields=["updated_at"])
+            chat_room.last_message = message
+            chat_room.updated_at = timezone.now()
+            chat_room.save(update_fields=["updated_at", "last_message"])
+
+            ChatService.add_to_message_window(chat_room.id, [message])
 
         logger.info(
             f"Created message {message.id} in chat {chat_room.id} by user {user.id}"
         )
         return message
 
+    @staticmethod
+    def create_messages_bulk(chat_room, entries: list) -> list:
+        """
+        Создать пакет сообщений одним bulk_create.
+
+        Порядок сообщений сохраняется: id выдаются в порядке entries,
+        updated_at комнаты обновляется один раз на пакет.
+
+        Args:
+            chat_room: ChatRoom instance
+            entries: список dict с ключами sender, content, message_type
+
+        Returns:
+            список созданных Message в порядке entries
+        """
+        if not entries:
+            return []
+
+        with transaction.atomic():
+            messages = Message.objects.bulk_create(
+                [
+                    Message(
+                        room=chat_room,
+                        sender=entry["sender"],
+                        content=entry["content"],
+                        message_type=entry.get("message_type", "text"),
+                    )
+                    for entry in entries
+                ]
+            )
+
+            sent_by_user = {}
+            for message in messages:
+                sent_by_user[message.sender_id] = sent_by_user.get(message.sender_id, 0) + 1
+
+            total = len(messages)
+            participants = ChatParticipant.objects.filter(room=chat_room)
+            participants.exclude(user_id__in=sent_by_user.keys()).update(
+                unread_count=F("unread_count") + total
+            )
+            for sender_id, sent in sent_by_user.items():
+                if sent < total:
+                    participants.filter(user_id=sender_id).update(
+                        unread_count=F("unread_count") + (total - sent)
+                    )
+
+            chat_room.last_message = messages[-1]
+            chat_room.updated_at = timezone.now()
+            chat_room.save(update_fields=["updated_at", "last_message"])
+
+            ChatService.add_to_message_window(chat_room.id, messages)
+
+        logger.info(f"Created {total} messages in chat {chat_room.id} (batched)")
+        return messages
+
     @staticmethod
     def update_message(user, message: Message) -> Message:
         """
@@ -256,6 +538,7 @@ class ChatService:
 
         message.is_edited = True
         message.save(update_fields=["content", "is_edited", "updated_at"])
+        ChatService.replace_in_message_window(message)
 
         logger.info(f"Edited message {message.id} by user {user.id}")
         return message
@@ -278,13 +561,133 @@ class ChatService:
         if message.sender_id != user.id and not user.is_staff:
             raise PermissionDenied("Only author or admin can delete message")
 
-        message.is_deleted = True
-        message.deleted_at = timezone.now()
-        message.save(update_fields=["is_deleted", "deleted_at"])
+        if message.is_deleted:
+            return message
+
+        with transaction.atomic():
+            message.is_deleted = True
+            message.deleted_at = timezone.now()
+            message.save(update_fields=["is_deleted", "deleted_at"])
+
+            # Сообщение было непрочитанным для тех, кто читал чат до его создания
+            ChatParticipant.objects.filter(
+                Q(last_read_at__isnull=True) | Q(last_read_at__lt=message.created_at),
+                room_id=message.room_id,
+                unread_count__gt=0,
+            ).exclude(user_id=message.sender_id).update(
+                unread_count=F("unread_count") - 1
+            )
+
+            last_message_id = (
+                Message.objects.filter(room_id=message.room_id, is_deleted=False)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            ChatRoom.objects.filter(
+                id=message.room_id, last_message_id=message.id
+            ).update(last_message_id=last_message_id)
+
+            ChatService.remove_from_message_window(message)
 
         logger.info(f"Deleted message {message.id} by user {user.id}")
         return message
 
+    @staticmethod
+    def backfill_direct_keys() -> int:
+        """
+        Проставить direct_key активным чатам ровно с двумя участниками.
+
+        Если у пары несколько таких чатов, ключ получает самый старый.
+
+        Returns:
+            количество обновлённых чатов
+        """
+        members = {}
+        for room_id, user_id in (
+            ChatParticipant.objects.filter(
+                room__is_active=True, room__direct_key__isnull=True
+            )
+            .order_by("room_id")
+            .values_list("room_id", "user_id")
+        ):
+            members.setdefault(room_id, []).append(user_id)
+
+        taken = set(
+            ChatRoom.objects.filter(
+                is_active=True, direct_key__isnull=False
+            ).values_list("direct_key", flat=True)
+        )
+
+        updated = 0
+        for room_id, user_ids in sorted(members.items()):
+            if len(user_ids) != 2:
+                continue
+            direct_key = ChatRoom.make_direct_key(*user_ids)
+            if direct_key in taken:
+                continue
+            taken.add(direct_key)
+            updated += ChatRoom.objects.filter(id=room_id).update(direct_key=direct_key)
+
+        logger.info(f"Backfilled direct_key for {updated} chats")
+        return updated
+
+    @staticmethod
+    def rebuild_counters(room_ids: Optional[list] = None) -> dict:
+        """
+        Пересчитать денормализованные счётчики чатов с нуля.
+
+        Args:
+            room_ids: ID чатов для пересчёта (None = все чаты)
+
+        Returns:
+            dict с количеством обновлённых участников и чатов
+        """
+        participants = ChatParticipant.objects.all()
+        rooms = ChatRoom.objects.all()
+        if room_ids is not None:
+            participants = participants.filter(room_id__in=room_ids)
+            rooms = rooms.filter(id__in=room_ids)
+
+        def unread_subquery(**filters):
+            return Coalesce(
+                Subquery(
+                    Message.objects.filter(
+                        room=OuterRef("room"), is_deleted=False, **filters
+                    )
+                    .exclude(sender=OuterRef("user"))
+                    .order_by()
+                    .values("room")
+                    .annotate(total=Count("id"))
+                    .values("total")[:1],
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+
+        with transaction.atomic():
+            updated_participants = participants.filter(
+                last_read_at__isnull=True
+            ).update(unread_count=unread_subquery())
+            updated_participants += participants.filter(
+                last_read_at__isnull=False
+            ).update(
+                unread_count=unread_subquery(created_at__gt=OuterRef("last_read_at"))
+            )
+            updated_rooms = rooms.update(
+                last_message=Subquery(
+                    Message.objects.filter(room=OuterRef("pk"), is_deleted=False)
+                    .order_by("-created_at", "-id")
+                    .values("id")[:1]
+                )
+            )
+
+        logger.info(
+            f"Rebuilt chat counters: participants={updated_participants}, "
+            f"rooms={updated_rooms}"
+        )
+        return {"participants": updated_participants, "rooms": updated_rooms}
+
     @staticmethod
     def invalidate_permission_cache(user1_id: int, user2_id: int) -> None:
         """
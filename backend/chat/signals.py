@@ -4,7 +4,10 @@ from datetime import datetime
 from weakref import WeakSet
 from typing import Any
 
-from django.db.models.signals import post_save, post_delete
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
 logger = logging.getLogger("chat.websocket")
@@ -39,6 +42,33 @@ async def shutdown_all_connections():
     failed = sum(1 for r in results if isinstance(r, Exception))
     logger.info(f"Graceful shutdown completed: total={len(active_consumers)}, failed={failed}")
 
+    from chat.write_behind import flush_all
+
+    await flush_all()
+
+
+def _invalidate_contacts_around_student(student_id: int, *user_ids: int) -> None:
+    """
+    Invalidate contacts lists of everyone whose chat matrix depends on the student:
+    the student, their tutor and parent, their teachers and the given users.
+    Lists of former tutors/parents expire by CONTACTS_CACHE_TTL.
+    """
+    from accounts.models import StudentProfile
+    from chat.permissions import invalidate_contacts_cache
+    from materials.models import SubjectEnrollment
+
+    affected = {student_id, *user_ids}
+    for tutor_id, parent_id in StudentProfile.objects.filter(
+        user_id=student_id
+    ).values_list("tutor_id", "parent_id"):
+        affected.update([tutor_id, parent_id])
+    affected.update(
+        SubjectEnrollment.objects.filter(
+            student_id=student_id, status=SubjectEnrollment.Status.ACTIVE
+        ).values_list("teacher_id", flat=True)
+    )
+    invalidate_contacts_cache(affected)
+
 
 @receiver(post_save, sender="materials.SubjectEnrollment")
 def on_subject_enrollment_change(sender, instance, created, **kwargs):
@@ -60,6 +90,7 @@ def on_subject_enrollment_change(sender, instance, created, **kwargs):
         teacher_id = instance.teacher.id
 
         invalidate_permission_cache(student_user_id, teacher_id)
+        _invalidate_contacts_around_student(student_user_id, teacher_id)
         logger.debug(
             f"[T007_cache_invalidation] SubjectEnrollment changed: "
             f"student={student_user_id}, teacher={teacher_id}, status={instance.status}"
@@ -83,6 +114,7 @@ def on_subject_enrollment_delete(sender, instance, **kwargs):
         teacher_id = instance.teacher.id
 
         invalidate_permission_cache(student_user_id, teacher_id)
+        _invalidate_contacts_around_student(student_user_id, teacher_id)
         logger.debug(
             f"[T007_cache_invalidation] SubjectEnrollment deleted: "
             f"student={student_user_id}, teacher={teacher_id}"
@@ -109,6 +141,8 @@ def on_student_profile_change(sender, instance, created, **kwargs):
     try:
         student_user_id = instance.user.id
 
+        _invalidate_contacts_around_student(student_user_id)
+
         if instance.tutor:
             tutor_id = instance.tutor.id
             invalidate_permission_cache(student_user_id, tutor_id)
@@ -126,3 +160,135 @@ def on_student_profile_change(sender, instance, created, **kwargs):
             )
     except Exception as e:
         logger.error(f"[T007_cache_invalidation] Error in on_student_profile_change: {e}")
+
+
+def _send_room_event(room_id: int, event: dict) -> None:
+    """Send an invalidation event to the room group after the transaction commits."""
+
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(f"chat_{room_id}", event)
+        except Exception as e:
+            logger.error(f"Failed to send {event['type']} to chat {room_id}: {e}")
+
+    transaction.on_commit(send)
+
+
+@receiver(post_delete, sender="chat.ChatParticipant")
+def on_chat_participant_delete(sender, instance, **kwargs):
+    """
+    Notify open ChatConsumer sockets that a participant left the room.
+
+    Consumers cache membership for the life of the socket, so the removed
+    user's socket closes itself on this event.
+    """
+    _send_room_event(
+        instance.room_id,
+        {"type": "participant_removed", "user_id": instance.user_id},
+    )
+
+
+def _remember_previous(instance, model, fields, update_fields) -> None:
+    """
+    Store the saved values of `fields` on instance._previous_values.
+
+    Nothing is stored for new rows or for saves whose update_fields
+    cannot touch `fields`.
+    """
+    instance._previous_values = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    instance._previous_values = (
+        model._default_manager.filter(pk=instance.pk).values(*fields).first()
+    )
+
+
+def _pop_changed(instance, fields) -> dict:
+    """Return {field: previous value} for fields changed by this save."""
+    previous = getattr(instance, "_previous_values", None)
+    instance._previous_values = None
+    if not previous:
+        return {}
+    return {
+        field: previous[field]
+        for field in fields
+        if previous[field] != getattr(instance, field)
+    }
+
+
+@receiver(pre_save, sender="chat.ChatRoom")
+def remember_chat_room_state(sender, instance, update_fields=None, **kwargs):
+    """Capture is_active before save so post_save can tell a real change."""
+    _remember_previous(instance, sender, ("is_active",), update_fields)
+
+
+@receiver(post_save, sender="chat.ChatRoom")
+def on_chat_room_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    React to a room being deactivated or reactivated.
+
+    Contacts lists of both direct chat participants carry has_existing_chat /
+    chat_id, so they are invalidated on any is_active change. Open
+    ChatConsumer sockets are notified when the room is deactivated.
+
+    Skips saves that cannot change is_active (e.g. updated_at bumps on new messages).
+    """
+    if created or not _pop_changed(instance, ("is_active",)):
+        return
+
+    if instance.direct_key:
+        from chat.permissions import invalidate_contacts_cache
+
+        invalidate_contacts_cache(int(part) for part in instance.direct_key.split(":"))
+
+    if not instance.is_active:
+        _send_room_event(instance.id, {"type": "room_deactivated"})
+
+
+USER_CONTACT_FIELDS = ("is_active", "role")
+
+
+@receiver(pre_save, sender="accounts.User")
+def remember_user_contact_state(sender, instance, update_fields=None, **kwargs):
+    """Capture is_active and role before save (skips e.g. last_login updates)."""
+    _remember_previous(instance, sender, USER_CONTACT_FIELDS, update_fields)
+
+
+@receiver(post_save, sender="accounts.User")
+def on_user_contact_state_change(sender, instance, created, **kwargs):
+    """
+    Invalidate contacts lists affected by a change of is_active or role.
+
+    The contact matrix is symmetric, so the lists that include the user are
+    exactly the user's own contacts. They are collected for both the previous
+    and the current role with the user treated as active; an admin's contacts
+    are all active users.
+    """
+    from copy import copy
+
+    from chat.permissions import get_chat_contacts, invalidate_contacts_cache
+
+    changed = _pop_changed(instance, USER_CONTACT_FIELDS)
+    if created or not changed:
+        return
+
+    try:
+        affected = {instance.id}
+        for role in {changed.get("role", instance.role), instance.role}:
+            probe = copy(instance)
+            probe.is_active = True
+            probe.role = role
+            affected.update(get_chat_contacts(probe).values_list("id", flat=True))
+
+        invalidate_contacts_cache(affected)
+        logger.debug(
+            f"[cache_invalidation] User {instance.id} changed {sorted(changed)}: "
+            f"invalidated {len(affected)} contacts lists"
+        )
+    except Exception as e:
+        logger.error(f"[cache_invalidation] Error in on_user_contact_state_change: {e}")
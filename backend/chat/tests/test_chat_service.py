@@ -1,11 +1,15 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied
 
 from chat.models import ChatRoom, ChatParticipant, Message
 from chat.services.chat_service import ChatService
-from chat.permissions import can_initiate_chat
+from chat.permissions import can_initiate_chat, get_chat_contacts
+from accounts.models import StudentProfile
+from materials.factories import SubjectEnrollmentFactory
+from materials.models import SubjectEnrollment
 
 User = get_user_model()
 
@@ -15,6 +19,7 @@ class ChatServiceTestCase(TestCase):
 
     def setUp(self):
         """Создать тестовые данные"""
+        cache.clear()
         self.student1 = User.objects.create_user(
             username='student1', password='pass', role='student', is_active=True
         )
@@ -137,6 +142,105 @@ class ChatServiceTestCase(TestCase):
         messages = ChatService.get_chat_messages(chat, limit=2)
         self.assertEqual(len(messages), 2)
 
+    def test_get_chat_messages_keyset_with_equal_timestamps(self):
+        """Сообщения с одинаковым created_at не теряются между страницами"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+
+        created = [
+            ChatService.create_message(self.student1, chat, f"Message {i}", "text")
+            for i in range(4)
+        ]
+        Message.objects.filter(room=chat).update(created_at=timezone.now())
+
+        first_page = list(ChatService.get_chat_messages(chat, limit=2))
+        second_page = list(
+            ChatService.get_chat_messages(chat, limit=2, before_id=first_page[-1].id)
+        )
+
+        self.assertEqual(
+            [m.id for m in first_page + second_page],
+            [m.id for m in reversed(created)],
+        )
+
+    def test_get_recent_messages_window_invalidated_on_create(self):
+        """Кэш окна последних сообщений обновляется после нового сообщения"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+
+        ChatService.create_message(self.student1, chat, "First", "text")
+        self.assertEqual(ChatService.get_recent_messages(chat)["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatService.create_message(self.student1, chat, "Second", "text")
+
+        window = ChatService.get_recent_messages(chat, limit=1)
+        self.assertEqual(window["count"], 2)
+        self.assertEqual([m["content"] for m in window["results"]], ["Second"])
+
+    def test_message_window_updated_in_place(self):
+        """Создание, правка и удаление меняют окно в кэше, не сбрасывая его"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        first = ChatService.create_message(self.student1, chat, "First", "text")
+        ChatService.get_recent_messages(chat)
+        window_key = f"chat_messages_window:{chat.id}"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = ChatService.create_message(self.student1, chat, "Second", "text")
+        with self.captureOnCommitCallbacks(execute=True):
+            first.content = "First edited"
+            ChatService.update_message(self.student1, first)
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatService.delete_message(self.student1, second)
+
+        window = cache.get(window_key)
+        self.assertEqual(window["count"], 1)
+        self.assertEqual([m["content"] for m in window["results"]], ["First edited"])
+        self.assertTrue(window["results"][0]["is_edited"])
+
+    def test_message_window_trimmed_to_size(self):
+        """Окно не растёт больше MESSAGE_WINDOW_SIZE"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        ChatService.get_recent_messages(chat)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatService.create_messages_bulk(
+                chat,
+                [
+                    {"sender": self.student1, "content": f"Message {i}"}
+                    for i in range(ChatService.MESSAGE_WINDOW_SIZE + 2)
+                ],
+            )
+
+        window = cache.get(f"chat_messages_window:{chat.id}")
+        self.assertEqual(window["count"], ChatService.MESSAGE_WINDOW_SIZE + 2)
+        self.assertEqual(len(window["results"]), ChatService.MESSAGE_WINDOW_SIZE)
+        self.assertEqual(
+            window["results"][-1]["content"],
+            f"Message {ChatService.MESSAGE_WINDOW_SIZE + 1}",
+        )
+
+    def test_message_window_refilled_after_deletes(self):
+        """Окно, поредевшее после удалений, перестраивается из БД"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        size = ChatService.MESSAGE_WINDOW_SIZE
+        messages = ChatService.create_messages_bulk(
+            chat, [{"sender": self.student1, "content": f"m{i}"} for i in range(size + 1)]
+        )
+        ChatService.get_recent_messages(chat)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatService.delete_message(self.student1, messages[-1])
+
+        window = ChatService.get_recent_messages(chat, limit=size)
+        self.assertEqual(window["count"], size)
+        self.assertEqual(
+            [m["content"] for m in window["results"]], [f"m{i}" for i in range(size)]
+        )
+
     def test_get_chat_messages_excludes_deleted(self):
         """Удаленные сообщения не возвращаются"""
         chat = ChatRoom.objects.create()
@@ -246,6 +350,74 @@ class ChatServiceTestCase(TestCase):
         # Просто проверим что queryset имеет аннотации
         self.assertEqual(chats.count(), 1)
 
+    def test_get_user_chats_uses_counters(self):
+        """Список чатов берёт unread_count и последнее сообщение из счётчиков"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        ChatParticipant.objects.create(room=chat, user=self.student2)
+
+        ChatService.create_message(self.student2, chat, "First", "text")
+        last = ChatService.create_message(self.student2, chat, "Second", "text")
+
+        room = ChatService.get_user_chats(self.student1).get()
+        self.assertEqual(room.unread_count, 2)
+        self.assertEqual(room.last_message_content, "Second")
+        self.assertEqual(room.last_message_time, last.created_at)
+
+    def test_delete_message_updates_counters(self):
+        """Удаление непрочитанного сообщения уменьшает счётчик и сдвигает last_message"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        ChatParticipant.objects.create(room=chat, user=self.student2)
+
+        first = ChatService.create_message(self.student2, chat, "First", "text")
+        second = ChatService.create_message(self.student2, chat, "Second", "text")
+
+        ChatService.delete_message(self.student2, second)
+        ChatService.delete_message(self.student2, second)
+
+        chat.refresh_from_db()
+        self.assertEqual(ChatService.get_unread_count(self.student1, chat), 1)
+        self.assertEqual(chat.last_message_id, first.id)
+
+    def test_create_messages_bulk(self):
+        """Пакетная запись сохраняет порядок и обновляет счётчики"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        ChatParticipant.objects.create(room=chat, user=self.student2)
+
+        messages = ChatService.create_messages_bulk(
+            chat,
+            [
+                {"sender": self.student1, "content": "One"},
+                {"sender": self.student2, "content": "Two"},
+                {"sender": self.student2, "content": "Three"},
+            ],
+        )
+
+        self.assertEqual([m.content for m in messages], ["One", "Two", "Three"])
+        self.assertEqual(sorted(m.id for m in messages), [m.id for m in messages])
+
+        chat.refresh_from_db()
+        self.assertEqual(chat.last_message_id, messages[-1].id)
+        self.assertEqual(ChatService.get_unread_count(self.student1, chat), 2)
+        self.assertEqual(ChatService.get_unread_count(self.student2, chat), 1)
+
+    def test_rebuild_counters(self):
+        """Пересчёт счётчиков исправляет расхождения"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.student1)
+        ChatParticipant.objects.create(room=chat, user=self.student2)
+
+        message = Message.objects.create(room=chat, sender=self.student2, content="Raw")
+
+        ChatService.rebuild_counters(room_ids=[chat.id])
+
+        chat.refresh_from_db()
+        self.assertEqual(ChatService.get_unread_count(self.student1, chat), 1)
+        self.assertEqual(ChatService.get_unread_count(self.student2, chat), 0)
+        self.assertEqual(chat.last_message_id, message.id)
+
     def test_is_direct_chat(self):
         """Проверка является ли чат direct"""
         chat = ChatRoom.objects.create()
@@ -295,6 +467,38 @@ class ChatServiceDirectChatTestCase(TestCase):
 
         self.assertEqual(chat1.id, chat2.id)
 
+    def test_get_or_create_direct_chat_ignores_other_pairs(self):
+        """Чат двух людей, где есть только один из пары, не считается существующим"""
+        other_chat = ChatService.get_or_create_direct_chat(self.admin, self.teacher)
+
+        chat = ChatService.get_or_create_direct_chat(self.admin, self.student)
+
+        self.assertNotEqual(chat.id, other_chat.id)
+        self.assertEqual(chat.direct_key, ChatRoom.make_direct_key(self.student.id, self.admin.id))
+
+    def test_get_or_create_direct_chat_after_deactivation(self):
+        """Чат, деактивированный в обход API, не мешает создать новый"""
+        old_chat = ChatService.get_or_create_direct_chat(self.admin, self.student)
+        old_chat.is_active = False
+        old_chat.save()
+
+        chat = ChatService.get_or_create_direct_chat(self.admin, self.student)
+
+        self.assertNotEqual(chat.id, old_chat.id)
+        self.assertTrue(chat.is_active)
+        self.assertEqual(chat.direct_key, old_chat.direct_key)
+
+    def test_backfill_direct_keys(self):
+        """Backfill проставляет ключ существующим чатам из двух участников"""
+        chat = ChatRoom.objects.create()
+        ChatParticipant.objects.create(room=chat, user=self.admin)
+        ChatParticipant.objects.create(room=chat, user=self.student)
+
+        self.assertEqual(ChatService.backfill_direct_keys(), 1)
+
+        chat.refresh_from_db()
+        self.assertEqual(ChatService.get_or_create_direct_chat(self.student, self.admin).id, chat.id)
+
     def test_get_or_create_direct_chat_fails_without_permission(self):
         """Без прав не может создать чат"""
         student2 = User.objects.create_user(
@@ -305,6 +509,171 @@ class ChatServiceDirectChatTestCase(TestCase):
             ChatService.get_or_create_direct_chat(self.student, student2)
 
 
+class ChatContactsTestCase(TestCase):
+    """Тесты для набора доступных контактов"""
+
+    def setUp(self):
+        """Создать тестовые данные"""
+        self.student1 = User.objects.create_user(
+            username='student1', password='pass', role='student', is_active=True
+        )
+        self.student2 = User.objects.create_user(
+            username='student2', password='pass', role='student', is_active=True
+        )
+        self.admin = User.objects.create_user(
+            username='admin', password='pass', role='admin', is_active=True, is_staff=True
+        )
+
+    def test_contacts_match_can_initiate_chat(self):
+        """Набор контактов совпадает с попарной проверкой can_initiate_chat"""
+        for user in (self.student1, self.student2, self.admin):
+            expected = {
+                other.id
+                for other in User.objects.exclude(id=user.id)
+                if can_initiate_chat(user, other)
+            }
+            actual = set(get_chat_contacts(user).values_list("id", flat=True))
+            self.assertEqual(actual, expected)
+
+    def test_get_contacts_marks_existing_chat(self):
+        """Контакт с существующим direct чатом содержит chat_id"""
+        chat = ChatService.get_or_create_direct_chat(self.admin, self.student1)
+
+        contacts = {c["id"]: c for c in ChatService.get_contacts(self.student1)}
+
+        self.assertEqual(set(contacts), {self.admin.id})
+        self.assertTrue(contacts[self.admin.id]["has_existing_chat"])
+        self.assertEqual(contacts[self.admin.id]["chat_id"], chat.id)
+
+
+class ChatContactsCacheInvalidationTestCase(TestCase):
+    """Кэш контактов сбрасывается при смене is_active чата и пользователя"""
+
+    def setUp(self):
+        """Создать тестовые данные"""
+        cache.clear()
+        self.student = User.objects.create_user(
+            username='student', password='pass', role='student', is_active=True
+        )
+        self.admin = User.objects.create_user(
+            username='admin', password='pass', role='admin', is_active=True, is_staff=True
+        )
+
+    def test_deactivating_direct_chat_invalidates_both_participants(self):
+        chat = ChatService.get_or_create_direct_chat(self.admin, self.student)
+        ChatService.get_contacts(self.student)
+        ChatService.get_contacts(self.admin)
+
+        chat.is_active = False
+        chat.save(update_fields=["is_active"])
+
+        contacts = {c["id"]: c for c in ChatService.get_contacts(self.student)}
+        self.assertFalse(contacts[self.admin.id]["has_existing_chat"])
+        admin_contacts = {c["id"]: c for c in ChatService.get_contacts(self.admin)}
+        self.assertIsNone(admin_contacts[self.student.id]["chat_id"])
+
+    def test_user_deactivation_invalidates_contacts(self):
+        self.assertEqual(
+            [c["id"] for c in ChatService.get_contacts(self.student)], [self.admin.id]
+        )
+
+        self.admin.is_active = False
+        self.admin.save()
+
+        self.assertEqual(ChatService.get_contacts(self.student), [])
+
+    def test_role_change_invalidates_contacts(self):
+        teacher = User.objects.create_user(
+            username='teacher', password='pass', role='teacher', is_active=True
+        )
+        SubjectEnrollmentFactory(
+            student=self.student, teacher=teacher, status=SubjectEnrollment.Status.ACTIVE
+        )
+        self.assertIn(teacher.id, {c["id"] for c in ChatService.get_contacts(self.student)})
+
+        teacher.role = 'tutor'
+        teacher.save(update_fields=["role"])
+
+        self.assertNotIn(
+            teacher.id, {c["id"] for c in ChatService.get_contacts(self.student)}
+        )
+
+
+class ChatContactsEquivalenceTestCase(TestCase):
+    """get_chat_contacts совпадает с попарной матрицей can_initiate_chat"""
+
+    def setUp(self):
+        """Граф связей: активные и неактивные зачисления, тьюторы, родители"""
+        cache.clear()
+
+        def create(username, role, is_active=True):
+            return User.objects.create_user(
+                username=username, password='pass', role=role, is_active=is_active
+            )
+
+        self.teacher1 = create('teacher1', 'teacher')
+        self.teacher2 = create('teacher2', 'teacher')
+        self.teacher_inactive = create('teacher_inactive', 'teacher', is_active=False)
+        self.tutor1 = create('tutor1', 'tutor')
+        self.tutor2 = create('tutor2', 'tutor')
+        self.tutor_inactive = create('tutor_inactive', 'tutor', is_active=False)
+        self.parent1 = create('parent1', 'parent')
+        self.parent2 = create('parent2', 'parent')
+        self.parent_inactive = create('parent_inactive', 'parent', is_active=False)
+        self.admin = create('admin', 'admin')
+
+        students = [create(f'student{n}', 'student') for n in range(1, 6)]
+        links = [
+            # (студент, тьютор, родитель)
+            (students[0], self.tutor1, self.parent1),
+            (students[1], self.tutor1, self.parent2),
+            (students[2], self.tutor_inactive, self.parent1),
+            (students[3], self.tutor2, self.parent_inactive),
+            (students[4], None, None),
+        ]
+        for student, tutor, parent in links:
+            StudentProfile.objects.update_or_create(
+                user=student, defaults={'tutor': tutor, 'parent': parent}
+            )
+
+        enrollments = [
+            (students[0], self.teacher1, SubjectEnrollment.Status.ACTIVE),
+            (students[1], self.teacher2, SubjectEnrollment.Status.COMPLETED),
+            (students[2], self.teacher2, SubjectEnrollment.Status.ACTIVE),
+            (students[3], self.teacher1, SubjectEnrollment.Status.DROPPED),
+            (students[3], self.teacher2, SubjectEnrollment.Status.ACTIVE),
+            (students[4], self.teacher_inactive, SubjectEnrollment.Status.ACTIVE),
+        ]
+        for student, teacher, status in enrollments:
+            SubjectEnrollmentFactory(student=student, teacher=teacher, status=status)
+
+    def assert_matches_matrix(self, *users):
+        for user in users:
+            expected = {
+                other.id
+                for other in User.objects.exclude(id=user.id)
+                if can_initiate_chat(user, other)
+            }
+            actual = set(get_chat_contacts(user).values_list("id", flat=True))
+            self.assertEqual(actual, expected, f"contacts differ for {user.username}")
+
+    def test_teacher_contacts(self):
+        self.assert_matches_matrix(self.teacher1, self.teacher2)
+
+    def test_tutor_contacts(self):
+        self.assert_matches_matrix(self.tutor1, self.tutor2)
+
+    def test_parent_contacts(self):
+        self.assert_matches_matrix(self.parent1, self.parent2)
+
+    def test_teacher_contacts_follow_enrollment_status(self):
+        """Завершённое зачисление убирает студента, тьютора и родителя"""
+        self.assertEqual(
+            set(get_chat_contacts(self.teacher2).values_list("username", flat=True)),
+            {'admin', 'student3', 'student4', 'parent1', 'tutor2'},
+        )
+
+
 class ChatPermissionCacheTestCase(TestCase):
     """Тесты для кэширования прав доступа"""
 
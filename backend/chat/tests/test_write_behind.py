@@ -0,0 +1,165 @@
+"""
+Тесты write-behind буфера сообщений чата
+
+Проверяется, что RoomWriteBuffer:
+1. Сбрасывает пакет при достижении batch_size и по таймеру flush_interval
+2. Сопоставляет временные tmp- id реальным в порядке поступления,
+   а пакеты одной комнаты получают id строго по порядку
+3. Сбрасывается при отключении сокета (ChatConsumer.disconnect)
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from channels.db import database_sync_to_async
+
+from accounts.factories import UserFactory
+from chat import write_behind
+from chat.consumers import ChatConsumer
+from chat.models import ChatParticipant, ChatRoom, Message
+
+
+@pytest.fixture(autouse=True)
+def buffers():
+    write_behind._buffers.clear()
+    yield write_behind._buffers
+    for buffer in write_behind._buffers.values():
+        if buffer._timer is not None:
+            buffer._timer.cancel()
+    write_behind._buffers.clear()
+
+
+@pytest.fixture
+def write_behind_settings(settings):
+    settings.CHAT_WRITE_BEHIND = {
+        "ENABLED": True,
+        "BATCH_SIZE": 3,
+        "FLUSH_INTERVAL_MS": 50,
+    }
+    return settings.CHAT_WRITE_BEHIND
+
+
+@pytest.fixture
+def room():
+    chat_room = ChatRoom.objects.create()
+    users = [UserFactory(), UserFactory()]
+    for user in users:
+        ChatParticipant.objects.create(room=chat_room, user=user)
+    return chat_room, users
+
+
+@pytest.fixture
+def group_events():
+    """Перехват событий, отправляемых буфером в группу комнаты."""
+    events = []
+    received = asyncio.Event()
+
+    async def group_send(self, event):
+        events.append(event)
+        received.set()
+
+    with patch.object(write_behind.RoomWriteBuffer, "_group_send", group_send):
+        yield events, received
+
+
+@database_sync_to_async
+def persisted(chat_room):
+    return list(
+        Message.objects.filter(room=chat_room).order_by("id").values_list("id", "content")
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+class TestRoomWriteBuffer:
+    async def test_flushes_when_batch_is_full(self, write_behind_settings, room, group_events):
+        chat_room, (alice, bob) = room
+        events, received = group_events
+        buffer = write_behind.get_buffer(chat_room.id)
+        buffer.flush_interval = 60
+
+        buffer.enqueue(chat_room, alice, "1")
+        buffer.enqueue(chat_room, bob, "2")
+        await asyncio.sleep(0)
+        assert not received.is_set()
+
+        buffer.enqueue(chat_room, alice, "3")
+        await asyncio.wait_for(received.wait(), timeout=5)
+
+        assert [content for _, content in await persisted(chat_room)] == ["1", "2", "3"]
+        assert events[0]["type"] == "message_persisted"
+        assert chat_room.id not in write_behind._buffers
+        buffer._timer.cancel()
+
+    async def test_flushes_after_interval(self, write_behind_settings, room, group_events):
+        chat_room, (alice, _) = room
+        events, received = group_events
+        buffer = write_behind.get_buffer(chat_room.id)
+
+        provisional_id = buffer.enqueue(chat_room, alice, "hello")
+        assert await persisted(chat_room) == []
+
+        await asyncio.wait_for(received.wait(), timeout=5)
+
+        [(message_id, _)] = await persisted(chat_room)
+        assert events == [{"type": "message_persisted", "ids": {provisional_id: message_id}}]
+
+    async def test_provisional_ids_map_to_persisted_ids_in_order(
+        self, write_behind_settings, room, group_events
+    ):
+        chat_room, (alice, bob) = room
+        events, _ = group_events
+        buffer = write_behind.get_buffer(chat_room.id)
+        buffer.batch_size = 100
+
+        first = [buffer.enqueue(chat_room, sender, content)
+                 for sender, content in [(alice, "a1"), (bob, "b1")]]
+        first_flush = asyncio.ensure_future(buffer.flush())
+        await asyncio.sleep(0)
+        # Первый пакет ещё пишется под локом, второй копится следом
+        second = [buffer.enqueue(chat_room, sender, content)
+                  for sender, content in [(bob, "b2"), (alice, "a2")]]
+        await asyncio.gather(first_flush, buffer.flush())
+
+        assert all(provisional_id.startswith("tmp-") for provisional_id in first + second)
+        assert [list(event["ids"]) for event in events] == [first, second]
+
+        mapping = {**events[0]["ids"], **events[1]["ids"]}
+        rows = await persisted(chat_room)
+        assert [content for _, content in rows] == ["a1", "b1", "b2", "a2"]
+        assert [mapping[provisional_id] for provisional_id in first + second] == [
+            message_id for message_id, _ in rows
+        ]
+
+    async def test_failed_write_reports_provisional_ids(
+        self, write_behind_settings, room, group_events
+    ):
+        chat_room, (alice, _) = room
+        events, _ = group_events
+        buffer = write_behind.get_buffer(chat_room.id)
+        provisional_id = buffer.enqueue(chat_room, alice, "lost")
+
+        with patch.object(
+            write_behind.ChatService, "create_messages_bulk", side_effect=RuntimeError("db down")
+        ):
+            await buffer.flush()
+
+        assert events == [{"type": "message_failed", "provisional_ids": [provisional_id]}]
+
+    async def test_consumer_disconnect_flushes_room(
+        self, write_behind_settings, room, group_events
+    ):
+        chat_room, (alice, _) = room
+        buffer = write_behind.get_buffer(chat_room.id)
+        buffer.flush_interval = 60
+        buffer.enqueue(chat_room, alice, "bye")
+
+        consumer = ChatConsumer()
+        consumer.room_id = str(chat_room.id)
+        consumer.user = alice
+        consumer.channel_layer = AsyncMock()
+        await consumer.disconnect(1000)
+
+        assert [content for _, content in await persisted(chat_room)] == ["bye"]
+        buffer._timer.cancel()
@@ -4,7 +4,6 @@ from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count
 from django.contrib.auth import get_user_model
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
@@ -134,7 +133,8 @@ class ChatDetailDeleteView(APIView):
         """
         chat = self.get_chat_or_404(pk, request.user)
 
-        # Мягкое удаление
+        # Мягкое удаление; direct_key уникален только среди активных чатов,
+        # поэтому пара сможет создать новый чат
         chat.is_active = False
         chat.save(update_fields=["is_active"])
 
@@ -178,6 +178,10 @@ class MessageListCreateView(APIView):
         limit = int(request.query_params.get("limit", 50))
         before_id = request.query_params.get("before_id")
 
+        # Первая страница отдаётся из кэша окна последних сообщений
+        if not before_id and limit <= ChatService.MESSAGE_WINDOW_SIZE:
+            return Response(ChatService.get_recent_messages(chat, limit=limit))
+
         messages = ChatService.get_chat_messages(chat, limit=limit, before_id=before_id)
 
         # Отсортировать по created_at (старые первыми)
@@ -351,36 +355,7 @@ class ContactsListView(APIView):
         """
         user = request.user
 
-        # Получить всех пользователей кроме текущего
-        all_users = User.objects.exclude(id=user.id)
-
-        contacts = []
-
-        for contact in all_users:
-            # Проверить можно ли инициировать чат
-            if can_initiate_chat(user, contact):
-                # Проверить есть ли existing чат
-                existing_chat = (
-                    ChatRoom.objects.filter(
-                        participants__user__in=[user, contact],
-                        is_active=True,
-                    )
-                    .annotate(participant_count=Count("participants"))
-                    .filter(participant_count=2)
-                    .first()
-                )
-
-                contact_data = {
-                    "id": contact.id,
-                    "full_name": contact.get_full_name() or contact.username,
-                    "role": getattr(contact, "role", "unknown"),
-                    "has_existing_chat": existing_chat is not None,
-                    "chat_id": existing_chat.id if existing_chat else None,
-                }
-                contacts.append(contact_data)
-
-        # Сортировать по имени
-        contacts.sort(key=lambda x: x["full_name"])
+        contacts = ChatService.get_contacts(user)
 
         logger = logging.getLogger("chat")
         logger.info(
@@ -0,0 +1,152 @@
+"""
+Write-behind буфер сообщений чата.
+
+Сообщения рассылаются в группу сразу с временным id (tmp-...), а в БД
+записываются пакетами через ChatService.create_messages_bulk. Буфер один
+на комнату в пределах процесса, поэтому пакет собирает сообщения всех
+участников комнаты, подключённых к этому воркеру.
+
+Гарантии порядка: пакеты одной комнаты записываются строго
+последовательно (asyncio.Lock), внутри пакета порядок совпадает с
+порядком поступления, поэтому id в БД растут в порядке отправки.
+После записи в группу уходит message_persisted с соответствием
+временных id реальным, при ошибке - message_failed.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from chat.services.chat_service import ChatService
+
+logger = logging.getLogger("chat.websocket")
+
+
+def is_enabled() -> bool:
+    """Включён ли write-behind режим (settings.CHAT_WRITE_BEHIND)."""
+    return getattr(settings, "CHAT_WRITE_BEHIND", {}).get("ENABLED", False)
+
+
+class RoomWriteBuffer:
+    """Буфер несохранённых сообщений одной комнаты."""
+
+    def __init__(self, room_id: int, batch_size: int, flush_interval: float):
+        self.room_id = room_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.chat_room = None
+        self.pending: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    def enqueue(self, chat_room, sender, content: str, message_type: str = "text") -> str:
+        """
+        Поставить сообщение в очередь на запись.
+
+        Синхронный метод: между вызовом и возвратом нет точек переключения,
+        поэтому порядок вызовов enqueue равен порядку записи.
+
+        Returns:
+            временный id сообщения
+        """
+        provisional_id = f"tmp-{uuid.uuid4().hex}"
+        self.chat_room = chat_room
+        self.pending.append(
+            {
+                "provisional_id": provisional_id,
+                "sender": sender,
+                "content": content,
+                "message_type": message_type,
+            }
+        )
+
+        if len(self.pending) >= self.batch_size:
+            asyncio.ensure_future(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.ensure_future(self._delayed_flush())
+
+        return provisional_id
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Записать все накопленные сообщения одним пакетом."""
+        async with self._lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return
+
+            provisional_ids = [entry["provisional_id"] for entry in batch]
+            try:
+                messages = await database_sync_to_async(ChatService.create_messages_bulk)(
+                    self.chat_room, batch
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to persist {len(batch)} messages for chat {self.room_id}: {e}"
+                )
+                await self._group_send(
+                    {"type": "message_failed", "provisional_ids": provisional_ids}
+                )
+                return
+
+            await self._group_send(
+                {
+                    "type": "message_persisted",
+                    "ids": {
+                        provisional_id: message.id
+                        for provisional_id, message in zip(provisional_ids, messages)
+                    },
+                }
+            )
+
+        if not self.pending and not self._lock.locked():
+            _buffers.pop(self.room_id, None)
+
+    async def _group_send(self, event: dict) -> None:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            await channel_layer.group_send(f"chat_{self.room_id}", event)
+        except Exception as e:
+            logger.error(f"Failed to send {event['type']} to chat {self.room_id}: {e}")
+
+
+_buffers: Dict[int, RoomWriteBuffer] = {}
+
+
+def get_buffer(room_id: int) -> RoomWriteBuffer:
+    """Получить (или создать) буфер комнаты в текущем процессе."""
+    buffer = _buffers.get(room_id)
+    if buffer is None:
+        config = settings.CHAT_WRITE_BEHIND
+        buffer = RoomWriteBuffer(
+            room_id,
+            batch_size=config["BATCH_SIZE"],
+            flush_interval=config["FLUSH_INTERVAL_MS"] / 1000,
+        )
+        _buffers[room_id] = buffer
+    return buffer
+
+
+async def flush_room(room_id: int) -> None:
+    """Сбросить буфер комнаты (вызывается при отключении сокета)."""
+    buffer = _buffers.get(room_id)
+    if buffer is not None:
+        await buffer.flush()
+
+
+async def flush_all() -> None:
+    """Сбросить буферы всех комнат (graceful shutdown)."""
+    await asyncio.gather(
+        *(buffer.flush() for buffer in list(_buffers.values())),
+        return_exceptions=True,
+    )
@@ -234,6 +234,20 @@ DJANGO_NOTIFICATIONS_SENT_TOTAL = Counter(
     registry=PROMETHEUS_REGISTRY
 )
 
+DJANGO_EMAIL_SEND_LATENCY_SECONDS = Histogram(
+    'django_email_send_latency_seconds',
+    'Per-message send latency of queued notification emails',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=PROMETHEUS_REGISTRY
+)
+
+DJANGO_SCHEDULED_NOTIFICATION_LAG_SECONDS = Histogram(
+    'django_scheduled_notification_lag_seconds',
+    'Delay between scheduled_at and actual send of scheduled notifications',
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0),
+    registry=PROMETHEUS_REGISTRY
+)
+
 # =============================================================================
 # Performance Metrics
 # =============================================================================
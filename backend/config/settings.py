@@ -791,6 +791,22 @@ CACHE_TIMEOUTS = {
     "progress_stats": 300,  # 5 minutes
 }
 
+# L1 (in-process) analytics cache budget for reports.cache.MultiLevelCache
+# Бюджет задаётся в байтах на namespace (префикс ключа до первого ':')
+# INVALIDATION_BUS: рассылка инвалидаций L1 между процессами через Redis pub/sub;
+# с ней L1 может жить дольше (TTL), т.к. устаревшие записи удаляются сразу
+REPORTS_CACHE_L1_BUS = USE_REDIS_CACHE and os.getenv("REPORTS_CACHE_L1_BUS", "True").lower() == "true"
+REPORTS_CACHE_L1 = {
+    "INVALIDATION_BUS": REPORTS_CACHE_L1_BUS,
+    "TTL": int(os.getenv("REPORTS_CACHE_L1_TTL", "300" if REPORTS_CACHE_L1_BUS else "60")),
+    "DEFAULT_MAX_BYTES": int(os.getenv("REPORTS_CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024))),
+    "NAMESPACE_MAX_BYTES": {
+        "analytics": 64 * 1024 * 1024,
+        "dashboard": 16 * 1024 * 1024,
+        "report": 32 * 1024 * 1024,
+    },
+}
+
 # Rate limiting settings
 # Comprehensive API rate limiting with tiered limits and sliding window algorithm
 RATE_LIMITING = {
@@ -964,6 +980,21 @@ WEBSOCKET_CONFIG = {
     "RECONNECT_MAX_DELAY": _parse_int_env("WEBSOCKET_RECONNECT_MAX_DELAY", 32000, min_val=1000, max_val=300000),
 }
 
+# Chat write-behind: сообщения сразу рассылаются в группу с временным id,
+# а в БД записываются пакетами (bulk_create) раз в FLUSH_INTERVAL_MS
+# или при накоплении BATCH_SIZE сообщений. По умолчанию выключено.
+CHAT_WRITE_BEHIND = {
+    "ENABLED": os.getenv("CHAT_WRITE_BEHIND_ENABLED", "False").lower() == "true",
+    "BATCH_SIZE": _parse_int_env("CHAT_WRITE_BEHIND_BATCH_SIZE", 50, min_val=1, max_val=1000),
+    "FLUSH_INTERVAL_MS": _parse_int_env("CHAT_WRITE_BEHIND_FLUSH_INTERVAL_MS", 200, min_val=10, max_val=5000),
+}
+
+# Графики отчетов рендерятся в пуле процессов (matplotlib держит GIL);
+# 0 - рендер в текущем процессе (так же в тестах)
+CHART_RENDER_WORKERS = 0 if environment == "test" else _parse_int_env(
+    "CHART_RENDER_WORKERS", 2, min_val=0, max_val=16
+)
+
 # WebSocket settings - environment-aware
 WEBSOCKET_URL = env_config.get_websocket_url()
 WEBSOCKET_AUTHENTICATION_TIMEOUT = WEBSOCKET_CONFIG["AUTH_TIMEOUT"]  # Derived from config
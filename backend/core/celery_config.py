@@ -79,12 +79,30 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(minute=0),  # Every hour
     },
 
-    # Refresh materialized views daily at 2:00 AM
-    'refresh-materialized-views': {
-        'task': 'reports.tasks.refresh_materialized_views',
+    # Recompute warehouse summary rows changed since the last run
+    'refresh-warehouse-summaries': {
+        'task': 'reports.tasks.refresh_warehouse_summaries',
+        'schedule': crontab(minute='*/5'),
+    },
+
+    # Overwrite realtime dashboard counters with database totals
+    'reconcile-dashboard-counters': {
+        'task': 'reports.tasks.reconcile_dashboard_counters',
+        'schedule': crontab(minute='*/10'),
+    },
+
+    # Full warehouse summary rebuild daily at 2:00 AM (fallback)
+    'rebuild-warehouse-summaries': {
+        'task': 'reports.tasks.rebuild_warehouse_summaries',
         'schedule': crontab(hour=2, minute=0),
     },
 
+    # Full score sketch rebuild daily at 2:30 AM (fallback)
+    'rebuild-score-sketches': {
+        'task': 'reports.tasks.rebuild_score_sketches',
+        'schedule': crontab(hour=2, minute=30),
+    },
+
     # Warm analytics cache daily at 7:00 AM before business hours
     'warm-analytics-cache': {
         'task': 'reports.tasks.warm_analytics_cache',
@@ -3,13 +3,19 @@ Batch Push Notification Service.
 
 Handles batch delivery of push notifications to multiple users with rate limiting
 and delivery tracking.
+
+Each batch loads device tokens and phone numbers with one query, sends
+through a single provider bulk call and writes its delivery logs with one
+bulk_create. The global rate limit is a token bucket shared through the
+cache (atomic on Redis via a Lua script).
 """
 
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict
+import threading
 import time
 
 from django.conf import settings
@@ -25,6 +31,99 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+# Refill the bucket for the elapsed time, then take ARGV[4] tokens if
+# enough are left. Returns 1 if taken, 0 otherwise.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+
+local allowed = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return allowed
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all workers through the cache.
+
+    Holds up to `capacity` tokens and refills `refill_rate` tokens per
+    second. On Redis the refill-and-take step runs as one Lua script, so
+    concurrent workers cannot spend the same tokens. Other cache backends
+    (locmem in development and tests) are per-process, where a lock gives
+    the same guarantee.
+    """
+
+    def __init__(self, key: str, capacity: float, refill_rate: float):
+        """
+        Args:
+            key: Cache key of the bucket state
+            capacity: Maximum tokens (burst size)
+            refill_rate: Tokens added per second
+        """
+        self.key = key
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _redis():
+        """Raw redis-py client behind django-redis, or None for other backends."""
+        client = getattr(cache, 'client', None)
+        if client is None or not hasattr(client, 'get_client'):
+            return None
+        return client.get_client(write=True)
+
+    def take(self, tokens: float = 1) -> bool:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            True if the tokens were taken, False if not enough are left
+        """
+        now = time.time()
+
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                return bool(redis_client.eval(
+                    TOKEN_BUCKET_SCRIPT, 1, self.key,
+                    self.capacity, self.refill_rate, now, tokens
+                ))
+            except Exception as e:
+                # Fail open: a broken limiter must not stop notifications
+                logger.error(f"Token bucket {self.key} unavailable: {e}")
+                return True
+
+        with self._lock:
+            level, updated_at = cache.get(self.key) or (self.capacity, now)
+            level = min(self.capacity, level + max(0.0, now - updated_at) * self.refill_rate)
+
+            allowed = level >= tokens
+            if allowed:
+                level -= tokens
+
+            cache.set(self.key, (level, now), int(self.capacity / self.refill_rate) + 1)
+            return allowed
+
+
 class BatchPushNotificationService:
     """
     Service for batch delivery of push notifications.
@@ -60,6 +159,11 @@ class BatchPushNotificationService:
             'BATCH_PUSH_NOTIFICATION_RATE_LIMIT',
             self.DEFAULT_RATE_LIMIT_PER_MINUTE
         )
+        self.rate_limiter = TokenBucket(
+            'batch_push_notifications_bucket',
+            capacity=self.rate_limit,
+            refill_rate=self.rate_limit / 60
+        )
 
     def send_to_users(
         self,
@@ -296,7 +400,7 @@ class BatchPushNotificationService:
         priority: str,
         track_delivery: bool
     ) -> Dict[str, Any]:
-        """Send notification to a batch of users."""
+        """Send notification to a batch of users with one provider bulk call."""
         result = {
             'total_devices': 0,
             'devices_sent': 0,
@@ -305,108 +409,112 @@ class BatchPushNotificationService:
             'errors': []
         }
 
+        send_results = self.push_service.send_to_users_batch(
+            notification,
+            users,
+            device_types
+        )
+
+        tracked = []
         for user in users:
-            try:
-                # Send to user
-                send_result = self.push_service.send_to_user(
-                    notification,
-                    user,
-                    device_types
-                )
+            send_result = send_results.get(user.id)
+            if send_result is None:
+                result['errors'].append(f"User {user.id}: no send result")
+                result['devices_failed'] += 1
+                continue
 
-                if send_result.get('status') == 'sent':
-                    result['devices_sent'] += send_result.get('sent_count', 1)
-                else:
-                    result['devices_failed'] += send_result.get('failed_count', 0)
+            if send_result.get('status') == 'sent':
+                result['devices_sent'] += send_result.get('sent_count', 1)
+            else:
+                result['devices_failed'] += send_result.get('failed_count', 0)
 
-                result['total_devices'] += send_result.get('total_devices', 0)
+            result['total_devices'] += send_result.get('total_devices', 0)
 
-                # Track delivery if requested
-                if track_delivery and send_result.get('status') != 'skipped':
-                    logs_created = self._create_delivery_logs(
-                        notification,
-                        user,
-                        send_result
-                    )
-                    result['delivery_logs'] += logs_created
+            if track_delivery and send_result.get('status') != 'skipped':
+                tracked.append((user, send_result))
 
-            except Exception as e:
-                logger.error(f"Error sending to user {user.id}: {e}")
-                result['errors'].append(f"User {user.id}: {str(e)}")
-                result['devices_failed'] += 1
+        if tracked:
+            result['delivery_logs'] = self._create_delivery_logs(notification, tracked)
 
         return result
 
     def _create_delivery_logs(
         self,
         notification: Notification,
-        user: User,
-        send_result: Dict[str, Any]
+        send_results: List[Tuple[User, Dict[str, Any]]]
     ) -> int:
-        """Create PushDeliveryLog records for tracking."""
-        created_count = 0
+        """
+        Create PushDeliveryLog records for a batch with one bulk_create.
 
-        try:
-            status_map = {
-                'sent': PushDeliveryLog.DeliveryStatus.SENT,
-                'partial': PushDeliveryLog.DeliveryStatus.PARTIAL,
-                'failed': PushDeliveryLog.DeliveryStatus.FAILED,
-                'skipped': PushDeliveryLog.DeliveryStatus.SKIPPED,
-            }
+        Logs are written in their final state (delivered/failed) instead
+        of being created and then updated by mark_delivered/mark_failed.
+
+        Args:
+            notification: Notification that was sent
+            send_results: (user, send_to_user-shaped result) pairs
 
+        Returns:
+            Number of logs created
+        """
+        status_map = {
+            'sent': PushDeliveryLog.DeliveryStatus.SENT,
+            'partial': PushDeliveryLog.DeliveryStatus.PARTIAL,
+            'failed': PushDeliveryLog.DeliveryStatus.FAILED,
+            'skipped': PushDeliveryLog.DeliveryStatus.SKIPPED,
+        }
+        payload_size = len(json.dumps({
+            'title': notification.title,
+            'message': notification.message,
+        }))
+        now = timezone.now()
+
+        logs = []
+        for user, send_result in send_results:
             status = status_map.get(
                 send_result.get('status'),
                 PushDeliveryLog.DeliveryStatus.PENDING
             )
-
-            # Create log entry
-            log = PushDeliveryLog.objects.create(
+            log = PushDeliveryLog(
                 notification=notification,
                 user=user,
                 status=status,
-                success=(status == PushDeliveryLog.DeliveryStatus.SENT),
-                payload_size=len(json.dumps({
-                    'title': notification.title,
-                    'message': notification.message,
-                }))
+                payload_size=payload_size
             )
 
-            created_count += 1
-
-            # If sent, mark as delivered
+            # Same final state as mark_delivered / mark_failed
             if status == PushDeliveryLog.DeliveryStatus.SENT:
-                log.mark_delivered()
-
-            # If failed, mark as failed
+                log.status = PushDeliveryLog.DeliveryStatus.DELIVERED
+                log.success = True
+                log.delivered_at = now
+                log.fcm_message_id = send_result.get('provider_message_id') or ''
             elif status == PushDeliveryLog.DeliveryStatus.FAILED:
-                error_msg = send_result.get('error', 'Unknown error')
-                log.mark_failed(error_msg)
+                log.error_message = send_result.get('error', 'Unknown error')
+                if log.attempt_number < log.max_attempts:
+                    log.retry_at = now + timedelta(minutes=5 * log.attempt_number)
 
-            return created_count
+            logs.append(log)
 
+        try:
+            PushDeliveryLog.objects.bulk_create(logs, batch_size=self.batch_size)
+            return len(logs)
         except Exception as e:
             logger.error(f"Error creating delivery logs: {e}")
-            return created_count
+            return 0
 
     def _check_batch_rate_limit(self, user_count: int) -> bool:
         """
         Check if batch is within rate limit.
 
+        Takes one token per user from the shared token bucket
+        (rate_limit per minute, bursts up to rate_limit).
+
         Args:
             user_count: Number of users in batch
 
         Returns:
             True if within limit, False otherwise
         """
-        cache_key = 'batch_push_notifications_sent'
-        current_count = cache.get(cache_key, 0)
-
-        if current_count + user_count > self.rate_limit:
-            return False
-
-        # Increment counter and set expiration to 1 minute
-        cache.set(cache_key, current_count + user_count, 60)
-        return True
+        return self.rate_limiter.take(user_count)
 
 
 # Singleton instance
@@ -8,7 +8,7 @@ Uses factory pattern for provider selection.
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -57,6 +57,27 @@ class AbstractSMSProvider(ABC):
         """
         pass
 
+    def send_bulk_sms(self, messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Send many SMS messages in one call.
+
+        Sends one by one by default; providers with a bulk API override it.
+
+        Args:
+            messages: List of (phone_number, message) pairs
+
+        Returns:
+            One result per message, in order: the send_sms result, or
+            {'status': 'failed', 'error': str} if that message failed
+        """
+        results = []
+        for phone_number, message in messages:
+            try:
+                results.append(self.send_sms(phone_number, message))
+            except SMSProviderError as e:
+                results.append({'status': 'failed', 'error': str(e)})
+        return results
+
 
 class TwilioSMSProvider(AbstractSMSProvider):
     """
@@ -128,51 +149,76 @@ class TwilioSMSProvider(AbstractSMSProvider):
 
         return normalized
 
-    def send_sms(self, phone_number: str, message: str) -> Dict[str, Any]:
+    def _get_client(self):
         """
-        Send SMS via Twilio.
-
-        Args:
-            phone_number: Recipient phone number
-            message: Message text
-
-        Returns:
-            Dictionary with send status
+        Create a Twilio REST client.
 
         Raises:
-            SMSProviderError: If send fails
+            SMSProviderError: If Twilio is not configured or installed
         """
         if not self.account_sid or not self.auth_token:
             raise SMSProviderError("Twilio not configured")
 
-        if not self.validate_phone(phone_number):
-            raise SMSProviderError(f"Invalid phone number: {phone_number}")
-
         try:
             from twilio.rest import Client
+        except ImportError:
+            raise SMSProviderError("Twilio library not installed")
 
-            client = Client(self.account_sid, self.auth_token)
-            normalized_phone = self._normalize_phone(phone_number)
+        return Client(self.account_sid, self.auth_token)
+
+    def _create_message(self, client, phone_number: str, message: str) -> Dict[str, Any]:
+        """Send one SMS with an existing client."""
+        if not self.validate_phone(phone_number):
+            raise SMSProviderError(f"Invalid phone number: {phone_number}")
 
+        try:
             message_obj = client.messages.create(
                 body=message,
                 from_=self.from_number,
-                to=normalized_phone
+                to=self._normalize_phone(phone_number)
             )
-
-            return {
-                'status': 'sent',
-                'message_id': message_obj.sid,
-                'provider': 'twilio',
-            }
-
-        except ImportError:
-            raise SMSProviderError("Twilio library not installed")
         except Exception as e:
             error_msg = str(e)
             self.logger.error(f"Twilio send failed: {error_msg}")
             raise SMSProviderError(f"Send failed: {error_msg}")
 
+        return {
+            'status': 'sent',
+            'message_id': message_obj.sid,
+            'provider': 'twilio',
+        }
+
+    def send_sms(self, phone_number: str, message: str) -> Dict[str, Any]:
+        """
+        Send SMS via Twilio.
+
+        Args:
+            phone_number: Recipient phone number
+            message: Message text
+
+        Returns:
+            Dictionary with send status
+
+        Raises:
+            SMSProviderError: If send fails
+        """
+        return self._create_message(self._get_client(), phone_number, message)
+
+    def send_bulk_sms(self, messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Send many SMS over one Twilio client (one HTTP session)."""
+        try:
+            client = self._get_client()
+        except SMSProviderError as e:
+            return [{'status': 'failed', 'error': str(e)} for _ in messages]
+
+        results = []
+        for phone_number, message in messages:
+            try:
+                results.append(self._create_message(client, phone_number, message))
+            except SMSProviderError as e:
+                results.append({'status': 'failed', 'error': str(e)})
+        return results
+
 
 class MessageBirdSMSProvider(AbstractSMSProvider):
     """
@@ -302,6 +348,32 @@ class SMSChannel(AbstractChannel):
         phone = getattr(recipient, 'phone_number', None)
         return phone
 
+    def get_recipient_phones(self, recipients: List[User]) -> Dict[int, Optional[str]]:
+        """
+        Get phone numbers for many recipients with one query.
+
+        Same rules as _get_recipient_phone: a verified UserPhoneNumber
+        first, the user's phone_number attribute as fallback.
+
+        Args:
+            recipients: Users to get phones for
+
+        Returns:
+            Dictionary mapping user id to phone number or None
+        """
+        from notifications.channels.models import UserPhoneNumber
+
+        verified = dict(
+            UserPhoneNumber.objects.filter(
+                user__in=[recipient.id for recipient in recipients],
+                status=UserPhoneNumber.VerificationStatus.VERIFIED,
+            ).values_list('user_id', 'phone_number')
+        )
+        return {
+            recipient.id: verified.get(recipient.id) or getattr(recipient, 'phone_number', None)
+            for recipient in recipients
+        }
+
     def _truncate_sms(self, message: str) -> str:
         """
         Truncate SMS to 160 characters if needed.
@@ -396,3 +468,67 @@ class SMSChannel(AbstractChannel):
             error_msg = str(e)
             self.log_delivery(notification, recipient, 'failed', error_msg)
             raise ChannelDeliveryError(f"Unexpected error: {error_msg}")
+
+    def send_bulk(self, notification: Any, recipients: List[User]) -> Dict[int, Dict[str, Any]]:
+        """
+        Send SMS notification to many recipients with one provider call.
+
+        Unlike send(), failures do not raise: every recipient gets its own
+        result ('sent' with provider_message_id, 'failed' with error or
+        'skipped' with reason).
+
+        Args:
+            notification: Notification object to send
+            recipients: Users to send to
+
+        Returns:
+            Dictionary mapping user id to delivery result
+        """
+        if not self.provider:
+            return {
+                recipient.id: {'status': 'skipped', 'reason': 'Provider not configured'}
+                for recipient in recipients
+            }
+
+        results: Dict[int, Dict[str, Any]] = {}
+        phones = self.get_recipient_phones(recipients)
+        outgoing = []
+
+        for recipient in recipients:
+            phone_number = phones.get(recipient.id)
+            if not phone_number or not self.provider.validate_phone(phone_number):
+                results[recipient.id] = {'status': 'skipped', 'reason': 'No phone number'}
+                continue
+            outgoing.append(
+                (recipient, phone_number, self._format_sms_message(notification, recipient))
+            )
+
+        if outgoing:
+            try:
+                provider_results = self.provider.send_bulk_sms(
+                    [(phone_number, message) for _, phone_number, message in outgoing]
+                )
+            except Exception as e:
+                self.logger.error(f"SMS bulk send failed: {e}")
+                provider_results = [{'status': 'failed', 'error': str(e)}] * len(outgoing)
+
+            for (recipient, _, message), sent in zip(outgoing, provider_results):
+                if sent.get('status') == 'sent':
+                    results[recipient.id] = {
+                        'status': 'sent',
+                        'message_length': len(message),
+                        'provider': sent.get('provider', self.provider_name),
+                        'provider_message_id': sent.get('message_id'),
+                    }
+                else:
+                    results[recipient.id] = {
+                        'status': 'failed',
+                        'error': sent.get('error', 'Unknown error'),
+                    }
+
+        sent_count = sum(1 for result in results.values() if result['status'] == 'sent')
+        self.logger.info(
+            f"SMS bulk send for notification {getattr(notification, 'id', None)}: "
+            f"{sent_count}/{len(recipients)} sent"
+        )
+        return results
@@ -0,0 +1,275 @@
+"""
+Email queue worker.
+
+Processes NotificationQueue email entries in batches:
+- claims pending entries atomically (SELECT ... FOR UPDATE SKIP LOCKED,
+  pending -> processing), so overlapping runs never send an entry twice
+- renders them with templates compiled once per (template, language)
+- sends the whole batch over one SMTP connection
+- records per-message latency and batch throughput
+
+Claims older than CLAIM_TIMEOUT (worker crashed mid-batch) are returned to
+pending at the start of the next run.
+
+Usage:
+    from notifications.email_queue import EmailQueueWorker
+
+    stats = EmailQueueWorker().process(batch_size=200)
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone, translation
+
+from .email_service import EmailDeliveryStatus, EmailNotificationService
+from .models import Notification, NotificationQueue
+
+logger = logging.getLogger(__name__)
+
+
+class EmailQueueWorker:
+    """Claims and sends batches of queued notification emails."""
+
+    # Claimed entries not finished within this time go back to pending
+    CLAIM_TIMEOUT = timedelta(minutes=15)
+
+    def __init__(self, email_service: Optional[EmailNotificationService] = None):
+        self.email_service = email_service or EmailNotificationService()
+        self._templates: Dict[Tuple[str, str], Any] = {}
+
+    def claim(self, limit: int) -> List[int]:
+        """
+        Atomically claim pending email entries.
+
+        Args:
+            limit: Maximum number of entries to claim
+
+        Returns:
+            IDs of claimed entries, oldest first
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            entry_ids = list(
+                NotificationQueue.objects.select_for_update(skip_locked=True)
+                .filter(channel='email', status=EmailDeliveryStatus.PENDING)
+                .exclude(scheduled_at__gt=now)
+                .order_by('created_at')
+                .values_list('id', flat=True)[:limit]
+            )
+            if entry_ids:
+                NotificationQueue.objects.filter(id__in=entry_ids).update(
+                    status=EmailDeliveryStatus.PROCESSING,
+                    claimed_at=now,
+                )
+        return entry_ids
+
+    def release_stale_claims(self) -> int:
+        """
+        Return entries claimed longer than CLAIM_TIMEOUT ago to pending.
+
+        Returns:
+            Number of entries released
+        """
+        released = NotificationQueue.objects.filter(
+            channel='email',
+            status=EmailDeliveryStatus.PROCESSING,
+            claimed_at__lt=timezone.now() - self.CLAIM_TIMEOUT
+        ).update(status=EmailDeliveryStatus.PENDING, claimed_at=None)
+
+        if released:
+            logger.warning(f"Released {released} stale email queue claims")
+        return released
+
+    def process(self, batch_size: int) -> Dict[str, Any]:
+        """
+        Claim, render and send one batch of queued emails.
+
+        Args:
+            batch_size: Maximum number of entries to send
+
+        Returns:
+            Dict with claimed/sent/failed/cancelled/released counts,
+            duration and throughput of the send, and per-message latency
+            statistics in seconds
+        """
+        stats = {
+            'claimed': 0,
+            'sent': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'released': self.release_stale_claims(),
+            'duration': 0.0,
+            'throughput': 0.0,
+            'latency_avg': 0.0,
+            'latency_max': 0.0,
+        }
+
+        entry_ids = self.claim(batch_size)
+        if not entry_ids:
+            return stats
+        stats['claimed'] = len(entry_ids)
+
+        entries = list(
+            NotificationQueue.objects.filter(id__in=entry_ids)
+            .select_related('notification__recipient__notification_settings')
+        )
+
+        cancelled: List[int] = []
+        failed: List[Tuple[NotificationQueue, str]] = []
+        outgoing: List[Tuple[NotificationQueue, Dict[str, Any]]] = []
+
+        for entry in entries:
+            notification = entry.notification
+            recipient = notification.recipient
+
+            # Skip if user has disabled email notifications
+            settings_obj = getattr(recipient, 'notification_settings', None)
+            if settings_obj and not settings_obj.email_notifications:
+                cancelled.append(entry.id)
+                continue
+
+            try:
+                subject, html_content = self._render(notification)
+            except Exception as e:
+                logger.error(
+                    f"Failed to render email for notification {notification.id}: {str(e)}"
+                )
+                failed.append((entry, f"Template error: {str(e)}"))
+                continue
+
+            outgoing.append((entry, {
+                'to_email': recipient.email,
+                'subject': subject,
+                'html_content': html_content,
+                'notification_id': notification.id,
+                'tags': {'notification_type': notification.type},
+            }))
+
+        started = time.monotonic()
+        results = self.email_service.send_messages([message for _, message in outgoing])
+        duration = time.monotonic() - started
+
+        sent: List[NotificationQueue] = []
+        for (entry, _), result in zip(outgoing, results):
+            if result['success']:
+                sent.append(entry)
+            else:
+                failed.append((entry, result['error']))
+
+        self._save_results(sent, failed, cancelled)
+
+        latencies = [result['latency'] for result in results]
+        _observe_email_metrics(latencies, len(sent), len(failed))
+
+        stats.update({
+            'sent': len(sent),
+            'failed': len(failed),
+            'cancelled': len(cancelled),
+            'duration': duration,
+            'throughput': len(sent) / duration if duration > 0 else 0.0,
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_max': max(latencies, default=0.0),
+        })
+        logger.info(
+            f"Email queue batch: {stats['sent']} sent, {stats['failed']} failed, "
+            f"{stats['cancelled']} cancelled in {duration:.2f}s "
+            f"({stats['throughput']:.1f} msg/s, latency avg {stats['latency_avg'] * 1000:.0f}ms)"
+        )
+        return stats
+
+    # Private methods
+
+    def _render(self, notification: Notification) -> Tuple[str, str]:
+        """Render subject and HTML body of a notification email."""
+        data = notification.data or {}
+        template_name = (
+            data.get('email_template') or f"notifications/{notification.type}.html"
+        )
+        subject = data.get('email_subject') or EmailNotificationService._get_default_subject(
+            notification.type
+        )
+
+        recipient = notification.recipient
+        html_content = self._get_template(template_name).render({
+            'recipient': recipient,
+            'recipient_name': recipient.get_full_name() or recipient.username,
+            'recipient_email': recipient.email,
+            **data,
+            **(data.get('email_context') or {}),
+            'notification_id': notification.id,
+            'notification_type': notification.type,
+            'title': notification.title,
+            'message': notification.message,
+        })
+        return subject, html_content
+
+    def _get_template(self, template_name: str):
+        """Load and compile a template once per (template, language)."""
+        key = (template_name, translation.get_language() or '')
+        if key not in self._templates:
+            self._templates[key] = get_template(template_name)
+        return self._templates[key]
+
+    def _save_results(
+        self,
+        sent: List[NotificationQueue],
+        failed: List[Tuple[NotificationQueue, str]],
+        cancelled: List[int]
+    ) -> None:
+        """Write the outcome of a batch with set-based updates."""
+        now = timezone.now()
+
+        with transaction.atomic():
+            if sent:
+                NotificationQueue.objects.filter(id__in=[entry.id for entry in sent]).update(
+                    status=EmailDeliveryStatus.SENT,
+                    processed_at=now,
+                    claimed_at=None,
+                )
+                Notification.objects.filter(
+                    id__in=[entry.notification_id for entry in sent]
+                ).update(is_sent=True, sent_at=now)
+
+            if cancelled:
+                NotificationQueue.objects.filter(id__in=cancelled).update(
+                    status=EmailDeliveryStatus.CANCELLED,
+                    processed_at=now,
+                    claimed_at=None,
+                )
+
+            if failed:
+                for entry, error in failed:
+                    entry.attempts += 1
+                    entry.error_message = error
+                    entry.claimed_at = None
+                    entry.status = (
+                        EmailDeliveryStatus.FAILED
+                        if entry.attempts >= entry.max_attempts
+                        else EmailDeliveryStatus.RETRY
+                    )
+                NotificationQueue.objects.bulk_update(
+                    [entry for entry, _ in failed],
+                    ['attempts', 'error_message', 'claimed_at', 'status'],
+                )
+
+
+def _observe_email_metrics(latencies: List[float], sent: int, failed: int) -> None:
+    """Record email latency and delivery counts in Prometheus if available."""
+    try:
+        from config.prometheus_settings import (
+            DJANGO_EMAIL_SEND_LATENCY_SECONDS,
+            DJANGO_NOTIFICATIONS_SENT_TOTAL,
+        )
+    except ImportError:
+        return
+
+    for latency in latencies:
+        DJANGO_EMAIL_SEND_LATENCY_SECONDS.observe(latency)
+    if sent:
+        DJANGO_NOTIFICATIONS_SENT_TOTAL.labels(channel='email', status='sent').inc(sent)
+    if failed:
+        DJANGO_NOTIFICATIONS_SENT_TOTAL.labels(channel='email', status='failed').inc(failed)
@@ -3,10 +3,11 @@ Email notification service with SMTP support, template integration, and delivery
 Supports async sending via Celery with retry logic.
 """
 import logging
+import time
 from typing import Dict, Optional, List, Any
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
@@ -24,6 +25,7 @@ class EmailDeliveryStatus:
     FAILED = 'failed'
     BOUNCED = 'bounced'
     RETRY = 'retry'
+    CANCELLED = 'cancelled'
 
 
 class EmailNotificationService:
@@ -82,29 +84,19 @@ class EmailNotificationService:
             bool: True if email sent successfully, False otherwise
         """
         try:
-            # Create multipart message with plain text and HTML alternatives
-            email_message = EmailMultiAlternatives(
+            email_message = self._build_message(
+                to_email=to_email,
                 subject=subject,
-                body=plain_text or self._strip_html(html_content),
-                from_email=self.default_from_email,
-                to=[to_email],
-                cc=cc or [],
-                bcc=bcc or []
+                html_content=html_content,
+                plain_text=plain_text,
+                cc=cc,
+                bcc=bcc,
+                tags=tags,
+                notification_id=notification_id
             )
 
-            # Attach HTML version
-            email_message.attach_alternative(html_content, "text/html")
-
-            # Add custom headers for tracking
-            if notification_id:
-                email_message['X-Notification-ID'] = str(notification_id)
-            if tags:
-                email_message['X-Email-Tags'] = ','.join(
-                    f"{k}:{v}" for k, v in tags.items()
-                )
-
             # Send email
-            result = email_message.send(fail_silently=False)
+            email_message.send(fail_silently=False)
 
             logger.info(
                 f"Email sent successfully to {to_email} "
@@ -206,6 +198,8 @@ class EmailNotificationService:
         """
         Send email to multiple recipients (batch sending).
 
+        All messages go over one SMTP connection (see send_messages).
+
         Args:
             recipients: List of User objects to send to
             subject: Email subject
@@ -216,34 +210,86 @@ class EmailNotificationService:
         Returns:
             Dict with 'sent' and 'failed' counts
         """
-        results = {'sent': 0, 'failed': 0}
+        messages = []
 
         for recipient in recipients:
-            try:
-                # Skip if email notifications disabled for user
-                if filter_settings:
-                    settings_obj = getattr(recipient, 'notification_settings', None)
-                    if settings_obj and not settings_obj.email_notifications:
-                        continue
-
-                success = self.send_email(
-                    to_email=recipient.email,
-                    subject=subject,
-                    html_content=html_content,
-                    plain_text=plain_text,
-                    tags={'batch': 'true'}
-                )
+            # Skip if email notifications disabled for user
+            if filter_settings:
+                settings_obj = getattr(recipient, 'notification_settings', None)
+                if settings_obj and not settings_obj.email_notifications:
+                    continue
+
+            messages.append({
+                'to_email': recipient.email,
+                'subject': subject,
+                'html_content': html_content,
+                'plain_text': plain_text,
+                'tags': {'batch': 'true'},
+            })
+
+        sent = sum(1 for result in self.send_messages(messages) if result['success'])
+        return {'sent': sent, 'failed': len(messages) - sent}
+
+    def send_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many emails over one persistent SMTP connection.
 
-                if success:
-                    results['sent'] += 1
-                else:
-                    results['failed'] += 1
+        The connection is opened once for the whole list instead of once
+        per message; after a failed message it is reopened so the rest of
+        the batch can still go out.
 
-            except Exception as e:
-                logger.error(
-                    f"Error sending to {recipient.email}: {str(e)}"
-                )
-                results['failed'] += 1
+        Args:
+            messages: Dicts with send_email keyword arguments
+                      (to_email, subject, html_content and optionally
+                      plain_text, tags, notification_id)
+
+        Returns:
+            One result per message, in order:
+            {'success': bool, 'latency': float seconds, 'error': str}
+        """
+        results = []
+        if not messages:
+            return results
+
+        connection = get_connection(backend=self.email_backend, fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error(f"Failed to open email connection: {str(e)}", exc_info=True)
+            return [{'success': False, 'latency': 0.0, 'error': str(e)} for _ in messages]
+
+        try:
+            for message in messages:
+                started = time.monotonic()
+                try:
+                    email_message = self._build_message(connection=connection, **message)
+                    email_message.send(fail_silently=False)
+                    results.append({
+                        'success': True,
+                        'latency': time.monotonic() - started,
+                        'error': '',
+                    })
+                except Exception as e:
+                    logger.error(
+                        f"Failed to send email to {message.get('to_email')}: {str(e)} "
+                        f"(notification_id={message.get('notification_id')})"
+                    )
+                    results.append({
+                        'success': False,
+                        'latency': time.monotonic() - started,
+                        'error': str(e),
+                    })
+                    # The SMTP session may be broken after an error
+                    try:
+                        connection.close()
+                        connection.open()
+                    except Exception:
+                        pass
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
 
         return results
 
@@ -322,6 +368,42 @@ class EmailNotificationService:
         except User.DoesNotExist:
             logger.warning(f"User not found for bounced email: {email}")
 
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        plain_text: Optional[str] = None,
+        cc: Optional[List[str]] = None,
+        bcc: Optional[List[str]] = None,
+        tags: Optional[Dict[str, str]] = None,
+        notification_id: Optional[int] = None,
+        connection=None
+    ) -> EmailMultiAlternatives:
+        """Build a multipart email with HTML and plain text alternatives."""
+        email_message = EmailMultiAlternatives(
+            subject=subject,
+            body=plain_text or self._strip_html(html_content),
+            from_email=self.default_from_email,
+            to=[to_email],
+            cc=cc or [],
+            bcc=bcc or [],
+            connection=connection
+        )
+
+        # Attach HTML version
+        email_message.attach_alternative(html_content, "text/html")
+
+        # Add custom headers for tracking
+        if notification_id:
+            email_message.extra_headers['X-Notification-ID'] = str(notification_id)
+        if tags:
+            email_message.extra_headers['X-Email-Tags'] = ','.join(
+                f"{k}:{v}" for k, v in tags.items()
+            )
+
+        return email_message
+
     @staticmethod
     def _strip_html(html_content: str) -> str:
         """
@@ -237,54 +237,23 @@ def send_batch_notification_emails(
 def process_email_queue(batch_size: int = 50) -> Dict[str, Any]:
     """
     Process pending emails in the queue.
-    Queries for pending queue entries and sends them.
+    Claims pending queue entries atomically and sends them in this task
+    over one SMTP connection (see EmailQueueWorker).
 
     Args:
         batch_size: Number of emails to process in one task
 
     Returns:
-        Dict with processing statistics
+        Dict with processing statistics, throughput and latency
     """
-    from .models import NotificationQueue
+    from .email_queue import EmailQueueWorker
 
     try:
-        # Get pending queue entries
-        pending_entries = NotificationQueue.objects.filter(
-            channel='email',
-            status=EmailDeliveryStatus.PENDING
-        ).select_related('notification').order_by('created_at')[:batch_size]
-
-        processed_count = 0
-        failed_count = 0
-
-        for queue_entry in pending_entries:
-            try:
-                # Queue email task
-                send_notification_email.delay(
-                    queue_entry.notification.id
-                )
-                processed_count += 1
-
-                logger.info(
-                    f"Queued email for queue entry {queue_entry.id} "
-                    f"(notification {queue_entry.notification.id})"
-                )
-            except Exception as e:
-                failed_count += 1
-                queue_entry.error_message = str(e)
-                queue_entry.save()
-                logger.error(
-                    f"Error processing queue entry {queue_entry.id}: {str(e)}"
-                )
-
-        logger.info(
-            f"Email queue processing complete: "
-            f"{processed_count} queued, {failed_count} errors"
-        )
+        stats = EmailQueueWorker().process(batch_size)
 
         return {
-            'processed': processed_count,
-            'failed': failed_count,
+            'processed': stats['sent'],
+            **stats,
             'timestamp': timezone.now().isoformat()
         }
 
@@ -305,6 +274,8 @@ def retry_failed_emails(max_retries: int = 3) -> Dict[str, Any]:
     """
     Retry emails that failed to send.
 
+    Returns retryable entries to pending; process_email_queue sends them.
+
     Args:
         max_retries: Maximum retry attempts per email
 
@@ -315,30 +286,18 @@ def retry_failed_emails(max_retries: int = 3) -> Dict[str, Any]:
 
     try:
         # Get failed entries that haven't exceeded max retries
-        failed_entries = NotificationQueue.objects.filter(
-            channel='email',
-            status=EmailDeliveryStatus.RETRY,
-            attempts__lt=max_retries
-        ).select_related('notification').order_by('created_at')[:50]
-
-        retried_count = 0
-
-        for queue_entry in failed_entries:
-            try:
-                # Re-queue for sending
-                send_notification_email.delay(
-                    queue_entry.notification.id
-                )
-                queue_entry.status = EmailDeliveryStatus.PENDING
-                queue_entry.save()
-                retried_count += 1
+        entry_ids = list(
+            NotificationQueue.objects.filter(
+                channel='email',
+                status=EmailDeliveryStatus.RETRY,
+                attempts__lt=max_retries
+            ).order_by('created_at').values_list('id', flat=True)[:50]
+        )
 
-                logger.info(
-                    f"Retrying email for queue entry {queue_entry.id} "
-                    f"(attempt {queue_entry.attempts})"
-                )
-            except Exception as e:
-                logger.error(f"Error retrying queue entry {queue_entry.id}: {str(e)}")
+        retried_count = NotificationQueue.objects.filter(
+            id__in=entry_ids,
+            status=EmailDeliveryStatus.RETRY
+        ).update(status=EmailDeliveryStatus.PENDING)
 
         logger.info(f"Retried {retried_count} failed emails")
 
@@ -12,6 +12,7 @@ from django.utils import timezone
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import Notification, NotificationSettings
+from .notification_service import group_send_many
 from .serializers import NotificationSerializer
 
 User = get_user_model()
@@ -23,6 +24,31 @@ class InAppNotificationService:
     Сервис управления in-app уведомлениями с доставкой через WebSocket
     """
 
+    # Поле NotificationSettings, разрешающее тип уведомления
+    # (остальные типы проверяют system_notifications)
+    SETTINGS_FIELDS = {
+        Notification.Type.ASSIGNMENT_NEW: 'assignment_notifications',
+        Notification.Type.ASSIGNMENT_DUE: 'assignment_notifications',
+        Notification.Type.ASSIGNMENT_GRADED: 'assignment_notifications',
+        Notification.Type.MATERIAL_NEW: 'material_notifications',
+        Notification.Type.MESSAGE_NEW: 'message_notifications',
+        Notification.Type.REPORT_READY: 'report_notifications',
+        Notification.Type.PAYMENT_SUCCESS: 'payment_notifications',
+        Notification.Type.PAYMENT_FAILED: 'payment_notifications',
+        Notification.Type.PAYMENT_PROCESSED: 'payment_notifications',
+        Notification.Type.INVOICE_SENT: 'invoice_notifications',
+        Notification.Type.INVOICE_PAID: 'invoice_notifications',
+        Notification.Type.INVOICE_OVERDUE: 'invoice_notifications',
+        Notification.Type.INVOICE_VIEWED: 'invoice_notifications',
+    }
+    DEFAULT_SETTINGS_FIELD = 'system_notifications'
+
+    # Размер пакета для bulk_create
+    BATCH_SIZE = 1000
+
+    # Сколько group_send отправляется одновременно
+    WEBSOCKET_BATCH_SIZE = 100
+
     @staticmethod
     def create_notification(
         recipient: User,
@@ -108,6 +134,9 @@ class InAppNotificationService:
         """
         Создать уведомления для нескольких пользователей
 
+        Настройки всех получателей читаются одним запросом, уведомления
+        создаются через bulk_create, WebSocket-события отправляются пакетом.
+
         Args:
             recipients: Список получателей
             title: Заголовок уведомления
@@ -122,18 +151,15 @@ class InAppNotificationService:
             Список ID созданных уведомлений
         """
         try:
-            notifications = []
-            notification_ids = []
-
-            for recipient in recipients:
-                try:
-                    # Проверяем настройки
-                    if not InAppNotificationService._should_send_notification(
-                        recipient, notification_type
-                    ):
-                        continue
-
-                    notification = Notification.objects.create(
+            recipients = list(recipients)
+            allowed = InAppNotificationService._load_settings(
+                recipients, notification_type
+            )
+
+            now = timezone.now()
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
                         recipient=recipient,
                         title=title,
                         message=message,
@@ -143,27 +169,24 @@ class InAppNotificationService:
                         related_object_id=related_object_id,
                         data=data or {},
                         is_sent=True,
-                        sent_at=timezone.now()
-                    )
-
-                    notifications.append(notification)
-                    notification_ids.append(notification.id)
-
-                except Exception as e:
-                    logger.error(
-                        f'Error creating notification for recipient={recipient.id}: {str(e)}'
+                        sent_at=now
                     )
+                    for recipient in recipients
+                    if allowed.get(recipient.id, True)
+                ],
+                batch_size=InAppNotificationService.BATCH_SIZE
+            )
 
-            # Отправляем все через WebSocket
-            for notification in notifications:
-                InAppNotificationService._send_via_websocket(notification)
+            # Отправляем все через WebSocket одним пакетом
+            InAppNotificationService._send_bulk_via_websocket(notifications)
 
             logger.info(
                 f'Bulk notifications created: count={len(notifications)}, '
+                f'skipped={len(recipients) - len(notifications)}, '
                 f'type={notification_type}'
             )
 
-            return notification_ids
+            return [notification.id for notification in notifications]
 
         except Exception as e:
             logger.error(f'Error in create_bulk_notifications: {str(e)}')
@@ -449,41 +472,109 @@ class InAppNotificationService:
             # (в приложении уведомления всегда включены)
 
             # Проверяем настройки по типам
-            if notification_type == Notification.Type.ASSIGNMENT_NEW:
-                return settings.assignment_notifications
-            elif notification_type == Notification.Type.ASSIGNMENT_DUE:
-                return settings.assignment_notifications
-            elif notification_type == Notification.Type.ASSIGNMENT_GRADED:
-                return settings.assignment_notifications
-            elif notification_type == Notification.Type.MATERIAL_NEW:
-                return settings.material_notifications
-            elif notification_type == Notification.Type.MESSAGE_NEW:
-                return settings.message_notifications
-            elif notification_type == Notification.Type.REPORT_READY:
-                return settings.report_notifications
-            elif notification_type == Notification.Type.PAYMENT_SUCCESS:
-                return settings.payment_notifications
-            elif notification_type == Notification.Type.PAYMENT_FAILED:
-                return settings.payment_notifications
-            elif notification_type == Notification.Type.PAYMENT_PROCESSED:
-                return settings.payment_notifications
-            elif notification_type == Notification.Type.INVOICE_SENT:
-                return settings.invoice_notifications
-            elif notification_type == Notification.Type.INVOICE_PAID:
-                return settings.invoice_notifications
-            elif notification_type == Notification.Type.INVOICE_OVERDUE:
-                return settings.invoice_notifications
-            elif notification_type == Notification.Type.INVOICE_VIEWED:
-                return settings.invoice_notifications
-
-            # Системные уведомления проверяют системные настройки
-            return settings.system_notifications
+            return getattr(
+                settings,
+                InAppNotificationService._settings_field(notification_type)
+            )
 
         except Exception as e:
             logger.error(f'Error checking notification settings: {str(e)}')
             # По умолчанию отправляем, если не удается проверить
             return True
 
+    @staticmethod
+    def _settings_field(notification_type: str) -> str:
+        """Поле NotificationSettings, разрешающее тип уведомления"""
+        return InAppNotificationService.SETTINGS_FIELDS.get(
+            notification_type, InAppNotificationService.DEFAULT_SETTINGS_FIELD
+        )
+
+    @staticmethod
+    def _load_settings(
+        recipients: List[User],
+        notification_type: str
+    ) -> Dict[int, bool]:
+        """
+        Загрузить разрешение типа уведомления для всех получателей одним запросом
+
+        Отсутствующие настройки создаются со значениями по умолчанию
+        (как get_or_create в _should_send_notification).
+
+        Args:
+            recipients: Список получателей
+            notification_type: Тип уведомления
+
+        Returns:
+            {user_id: разрешено ли уведомление}
+        """
+        field = InAppNotificationService._settings_field(notification_type)
+        user_ids = [recipient.id for recipient in recipients]
+
+        try:
+            allowed = dict(
+                NotificationSettings.objects.filter(user_id__in=user_ids)
+                .values_list('user_id', field)
+            )
+
+            missing = [user_id for user_id in user_ids if user_id not in allowed]
+            if missing:
+                NotificationSettings.objects.bulk_create(
+                    [NotificationSettings(user_id=user_id) for user_id in missing],
+                    batch_size=InAppNotificationService.BATCH_SIZE,
+                    ignore_conflicts=True
+                )
+                default = NotificationSettings._meta.get_field(field).default
+                allowed.update((user_id, default) for user_id in missing)
+
+            return allowed
+
+        except Exception as e:
+            logger.error(f'Error loading notification settings: {str(e)}')
+            # По умолчанию отправляем, если не удается проверить
+            return {}
+
+    @staticmethod
+    def _send_bulk_via_websocket(notifications: List[Notification]) -> None:
+        """
+        Отправить уведомления через WebSocket одним пакетом
+
+        Уведомления сериализуются одним проходом и рассылаются через
+        group_send_many пачками по WEBSOCKET_BATCH_SIZE вместо блокирующего
+        вызова на каждое уведомление.
+
+        Args:
+            notifications: Созданные уведомления (с заполненным recipient)
+        """
+        if not notifications:
+            return
+
+        try:
+            payloads = NotificationSerializer(notifications, many=True).data
+            failed = group_send_many(
+                get_channel_layer(),
+                [
+                    (
+                        f'notifications_user_{payload["recipient"]}',
+                        {
+                            'type': 'user_notification',
+                            'notification': payload
+                        }
+                    )
+                    for payload in payloads
+                ],
+                batch_size=InAppNotificationService.WEBSOCKET_BATCH_SIZE,
+            )
+
+            logger.info(
+                f'Bulk notifications sent via WebSocket: '
+                f'count={len(notifications) - failed}, failed={failed}'
+            )
+
+        except Exception as e:
+            logger.error(
+                f'Error sending bulk notifications via WebSocket: {str(e)}'
+            )
+
     @staticmethod
     def _send_via_websocket(notification: Notification) -> None:
         """
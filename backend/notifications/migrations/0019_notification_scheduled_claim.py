@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0018_alter_devicetoken_token_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="scheduled_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Ожидает отправки"),
+                    ("processing", "Отправляется"),
+                    ("sent", "Отправлено"),
+                    ("cancelled", "Отменено"),
+                ],
+                default="pending",
+                max_length=20,
+                verbose_name="Статус расписания",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="scheduled_claimed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Взято на отправку"
+            ),
+        ),
+    ]
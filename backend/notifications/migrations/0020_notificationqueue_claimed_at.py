@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0019_notification_scheduled_claim"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationqueue",
+            name="claimed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Взято в обработку"
+            ),
+        ),
+    ]
@@ -105,6 +105,7 @@ class Notification(models.Model):
         max_length=20,
         choices=[
             ("pending", "Ожидает отправки"),
+            ("processing", "Отправляется"),
             ("sent", "Отправлено"),
             ("cancelled", "Отменено"),
         ],
@@ -112,6 +113,11 @@ class Notification(models.Model):
         verbose_name="Статус расписания",
     )
 
+    # Когда диспетчер забрал уведомление на отправку (статус processing)
+    scheduled_claimed_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="Взято на отправку"
+    )
+
     class Meta:
         verbose_name = "Уведомление"
         verbose_name_plural = "Уведомления"
@@ -300,6 +306,8 @@ class NotificationQueue(models.Model):
     error_message = models.TextField(blank=True, verbose_name="Сообщение об ошибке")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Когда обработчик очереди забрал запись (статус processing)
+    claimed_at = models.DateTimeField(blank=True, null=True, verbose_name="Взято в обработку")
     processed_at = models.DateTimeField(blank=True, null=True, verbose_name="Обработано")
 
     class Meta:
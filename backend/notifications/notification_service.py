@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
@@ -15,6 +16,44 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+def group_send_many(
+    channel_layer,
+    messages: List[Tuple[str, Dict[str, Any]]],
+    batch_size: int = 100,
+) -> int:
+    """
+    Разослать сообщения в группы channel layer одним вызовом async_to_sync.
+
+    group_send выполняются конкурентно пачками по batch_size, ошибка
+    отдельной отправки не прерывает остальные.
+
+    Args:
+        channel_layer: channel layer (None - ничего не отправляется)
+        messages: пары (имя группы, сообщение)
+        batch_size: сколько group_send выполняется одновременно
+
+    Returns:
+        количество неудачных отправок
+    """
+    if not channel_layer or not messages:
+        return 0
+
+    async def send_all():
+        failed = 0
+        for start in range(0, len(messages), batch_size):
+            results = await asyncio.gather(
+                *[
+                    channel_layer.group_send(group_name, message)
+                    for group_name, message in messages[start:start + batch_size]
+                ],
+                return_exceptions=True
+            )
+            failed += sum(1 for result in results if isinstance(result, Exception))
+        return failed
+
+    return async_to_sync(send_all)()
+
+
 class NotificationService:
     """
     Универсальный сервис уведомлений:
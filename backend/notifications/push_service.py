@@ -163,6 +163,76 @@ class PushNotificationService:
 
         return results
 
+    def send_to_users_batch(
+        self,
+        notification: Notification,
+        users: List[User],
+        device_types: Optional[List[str]] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Send a notification to a batch of users with batched I/O.
+
+        Device tokens and phone numbers are loaded with one query each and
+        all messages go through a single provider bulk call, instead of
+        the per-user queries and sends of send_to_user.
+
+        Args:
+            notification: Notification object to send
+            users: Users in the batch
+            device_types: Optional list of device types to target
+
+        Returns:
+            Dictionary mapping user id to a send_to_user-shaped result;
+            sent results carry 'provider_message_id', failed ones 'error'
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+        allowed = []
+
+        for user in users:
+            if self._check_rate_limit(user):
+                allowed.append(user)
+            else:
+                logger.warning(f"Rate limit exceeded for user {user.id} push notifications")
+                results[user.id] = {
+                    "status": "skipped",
+                    "reason": "Rate limit exceeded",
+                    "total_devices": 0,
+                }
+
+        if not allowed:
+            return results
+
+        try:
+            tokens_by_user = self._get_device_tokens_by_user(allowed, device_types)
+
+            recipients = []
+            for user in allowed:
+                if tokens_by_user.get(user.id):
+                    recipients.append(user)
+                else:
+                    results[user.id] = {
+                        "status": "skipped",
+                        "reason": "No device tokens",
+                        "total_devices": 0,
+                    }
+
+            sms_results = self.sms_channel.send_bulk(notification, recipients) if recipients else {}
+
+        except Exception as e:
+            logger.error(f"Error sending push batch of {len(allowed)} users: {e}")
+            for user in allowed:
+                results.setdefault(
+                    user.id, {"status": "failed", "error": str(e), "total_devices": 0}
+                )
+            return results
+
+        for user in recipients:
+            results[user.id] = self._device_result(
+                sms_results.get(user.id, {"status": "failed", "error": "No SMS result"})
+            )
+
+        return results
+
     def register_device_token(
         self, user: User, token: str, device_type: str, device_name: str = ""
     ) -> Tuple[DeviceToken, bool]:
@@ -345,6 +415,49 @@ class PushNotificationService:
 
         return list(query.values_list("id", "token", "device_type"))
 
+    def _get_device_tokens_by_user(
+        self, users: List[User], device_types: Optional[List[str]] = None
+    ) -> Dict[int, List[Tuple[int, str, str]]]:
+        """Get active device tokens for many users with one query."""
+        query = DeviceToken.objects.filter(user__in=[user.id for user in users], is_active=True)
+
+        if device_types:
+            query = query.filter(device_type__in=device_types)
+
+        tokens_by_user = defaultdict(list)
+        for user_id, token_id, token, device_type in query.values_list(
+            "user_id", "id", "token", "device_type"
+        ):
+            tokens_by_user[user_id].append((token_id, token, device_type))
+        return tokens_by_user
+
+    def _device_result(self, sms_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an SMSChannel.send_bulk result to the send_to_user shape."""
+        result = {
+            "status": "sent",
+            "total_devices": 1,
+            "sent_count": 0,
+            "failed_count": 0,
+            "devices": {"sms": {"sent": 0, "failed": 0}},
+        }
+
+        status = sms_result.get("status")
+        if status == "sent":
+            result["sent_count"] = 1
+            result["devices"]["sms"]["sent"] = 1
+            result["provider_message_id"] = sms_result.get("provider_message_id")
+        elif status == "skipped":
+            result["status"] = "skipped"
+            result["total_devices"] = 0
+            result["reason"] = sms_result.get("reason")
+        else:
+            result["status"] = "failed"
+            result["failed_count"] = 1
+            result["devices"]["sms"]["failed"] = 1
+            result["error"] = sms_result.get("error", "Unknown error")
+
+        return result
+
     def _send_to_devices(
         self, notification: Notification, user: User, device_tokens: List[Tuple[int, str, str]]
     ) -> Dict[str, Any]:
@@ -405,14 +518,18 @@ class PushNotificationService:
             True if within limit, False otherwise
         """
         cache_key = f"push_notifications_sent_{user.id}"
-        current_count = cache.get(cache_key, 0)
 
-        if current_count >= self.rate_limit:
-            return False
+        # add + incr are atomic, so concurrent workers cannot both pass
+        # on the same count; add only starts the 1 minute window
+        cache.add(cache_key, 0, 60)
+        try:
+            current_count = cache.incr(cache_key)
+        except ValueError:
+            # Window expired between add and incr
+            cache.set(cache_key, 1, 60)
+            current_count = 1
 
-        # Increment counter and set expiration to 1 minute
-        cache.set(cache_key, current_count + 1, 60)
-        return True
+        return current_count <= self.rate_limit
 
 
 # Singleton instance
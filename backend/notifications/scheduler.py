@@ -1,17 +1,23 @@
 """
 Notification scheduling service for Celery integration.
 Handles creation, cancellation, and processing of scheduled notifications.
+
+Due notifications are dispatched by claiming: claim_due_notifications moves
+a chunk of pending rows to 'processing' under SELECT ... FOR UPDATE SKIP
+LOCKED, so overlapping dispatcher runs never pick the same row, and
+send_scheduled_batch delivers a claimed chunk and marks it sent, touching
+only rows that still carry the claim stamp it was given.
 """
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db import transaction
 
 from .models import Notification
-from .notification_service import NotificationService
+from .notification_service import NotificationService, group_send_many
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -22,6 +28,11 @@ class NotificationScheduler:
     Service for scheduling and managing delayed notifications.
     """
 
+    # Claimed rows not sent within this time go back to pending
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+    # Concurrent WebSocket sends per gather
+    WEBSOCKET_BATCH_SIZE = 100
+
     def __init__(self):
         self.service = NotificationService()
 
@@ -156,6 +167,133 @@ class NotificationScheduler:
             scheduled_status='pending'
         ).select_related('recipient').order_by('scheduled_at')
 
+    def claim_due_notifications(self, limit: int) -> Tuple[List[int], datetime]:
+        """
+        Atomically claim a chunk of due notifications for sending.
+
+        Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED and moved to
+        'processing' in the same transaction, so concurrent dispatchers
+        claim disjoint chunks and a row is never dispatched twice.
+
+        Args:
+            limit: Maximum number of notifications to claim
+
+        Returns:
+            Tuple of claimed IDs (oldest scheduled_at first) and the claim
+            stamp written to scheduled_claimed_at; pass both to
+            send_scheduled_batch
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            claimed_ids = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(scheduled_at__lte=now, scheduled_status='pending')
+                .order_by('scheduled_at')
+                .values_list('id', flat=True)[:limit]
+            )
+            if claimed_ids:
+                Notification.objects.filter(id__in=claimed_ids).update(
+                    scheduled_status='processing',
+                    scheduled_claimed_at=now,
+                )
+        return claimed_ids, now
+
+    def release_claims(self, notification_ids: List[int]) -> int:
+        """
+        Return claimed but unsent notifications to pending.
+
+        Args:
+            notification_ids: IDs of claimed notifications
+
+        Returns:
+            Number of notifications released
+        """
+        return Notification.objects.filter(
+            id__in=notification_ids,
+            scheduled_status='processing'
+        ).update(scheduled_status='pending', scheduled_claimed_at=None)
+
+    def release_stale_claims(self) -> int:
+        """
+        Return notifications claimed longer than CLAIM_TIMEOUT ago to pending.
+
+        Covers batches lost with a crashed worker or dropped by the broker.
+
+        Returns:
+            Number of notifications released
+        """
+        cutoff = timezone.now() - self.CLAIM_TIMEOUT
+        released = Notification.objects.filter(
+            scheduled_status='processing',
+            scheduled_claimed_at__lt=cutoff
+        ).update(scheduled_status='pending', scheduled_claimed_at=None)
+
+        if released:
+            logger.warning(f"Released {released} stale scheduled notification claims")
+        return released
+
+    def send_scheduled_batch(
+        self,
+        notification_ids: List[int],
+        claimed_at: datetime
+    ) -> Dict[str, Any]:
+        """
+        Send a claimed chunk of scheduled notifications.
+
+        Only rows still in 'processing' under this claim are sent: if the
+        claim went stale and the rows were released and claimed again, the
+        newer claim owns them and this batch skips them. WebSocket events go
+        out concurrently and the chunk is marked sent with one UPDATE.
+
+        Args:
+            notification_ids: IDs returned by claim_due_notifications
+            claimed_at: Claim stamp returned by claim_due_notifications
+
+        Returns:
+            Dict with 'sent' count and scheduling lag statistics in seconds
+            ('lag_avg', 'lag_max')
+        """
+        notifications = list(
+            Notification.objects.filter(
+                id__in=notification_ids,
+                scheduled_status='processing',
+                scheduled_claimed_at=claimed_at
+            )
+        )
+        if not notifications:
+            return {'sent': 0, 'lag_avg': 0.0, 'lag_max': 0.0}
+
+        self._ws_send_many(notifications)
+
+        now = timezone.now()
+        Notification.objects.filter(
+            id__in=[notification.id for notification in notifications],
+            scheduled_status='processing',
+            scheduled_claimed_at=claimed_at
+        ).update(
+            is_sent=True,
+            sent_at=now,
+            scheduled_status='sent',
+            scheduled_claimed_at=None,
+        )
+
+        lags = [
+            max((now - notification.scheduled_at).total_seconds(), 0.0)
+            for notification in notifications
+        ]
+        _observe_lag(lags)
+
+        stats = {
+            'sent': len(notifications),
+            'lag_avg': sum(lags) / len(lags),
+            'lag_max': max(lags),
+        }
+        logger.info(
+            f"Sent {stats['sent']} scheduled notifications, "
+            f"lag avg {stats['lag_avg']:.1f}s max {stats['lag_max']:.1f}s"
+        )
+        return stats
+
     def send_scheduled_notification(self, notification_id: int) -> bool:
         """
         Send a scheduled notification and update its status.
@@ -180,18 +318,7 @@ class NotificationScheduler:
                 return False
 
             # Send the notification via WebSocket
-            payload = {
-                'id': notification.id,
-                'type': notification.type,
-                'title': notification.title,
-                'message': notification.message,
-                'priority': notification.priority,
-                'related_object_type': notification.related_object_type,
-                'related_object_id': notification.related_object_id,
-                'data': notification.data,
-                'created_at': notification.created_at.isoformat(),
-            }
-            self.service._ws_send(notification.recipient.id, payload)
+            self.service._ws_send(notification.recipient_id, self._ws_payload(notification))
 
             # Update notification status
             notification.is_sent = True
@@ -271,3 +398,49 @@ class NotificationScheduler:
         except Notification.DoesNotExist:
             logger.warning(f"Notification {notification_id} not found")
             return False
+
+    # Private methods
+
+    @staticmethod
+    def _ws_payload(notification: Notification) -> Dict[str, Any]:
+        """WebSocket payload of a scheduled notification."""
+        return {
+            'id': notification.id,
+            'type': notification.type,
+            'title': notification.title,
+            'message': notification.message,
+            'priority': notification.priority,
+            'related_object_type': notification.related_object_type,
+            'related_object_id': notification.related_object_id,
+            'data': notification.data,
+            'created_at': notification.created_at.isoformat(),
+        }
+
+    def _ws_send_many(self, notifications: List[Notification]) -> None:
+        """Send WebSocket events for many notifications in one async_to_sync call."""
+        messages = [
+            (
+                f"notifications_{notification.recipient_id}",
+                {'type': 'notification', 'data': self._ws_payload(notification)},
+            )
+            for notification in notifications
+        ]
+        try:
+            failed = group_send_many(
+                self.service.channel_layer, messages, batch_size=self.WEBSOCKET_BATCH_SIZE
+            )
+            if failed:
+                logger.error(f"WS send failed for {failed} scheduled notifications")
+        except Exception as e:
+            logger.error(f"WS batch send failed: {e}")
+
+
+def _observe_lag(lags: List[float]) -> None:
+    """Record scheduling lag in the Prometheus histogram if available."""
+    try:
+        from config.prometheus_settings import DJANGO_SCHEDULED_NOTIFICATION_LAG_SECONDS
+    except ImportError:
+        return
+
+    for lag in lags:
+        DJANGO_SCHEDULED_NOTIFICATION_LAG_SECONDS.observe(lag)
@@ -452,11 +452,11 @@ def send_broadcast_async(self, broadcast_id: int, only_failed: bool = False) ->
         service = TelegramBroadcastService()
         result = service.send_broadcast(broadcast, broadcast.message)
 
-        # Обновить прогресс
+        # Обновить прогресс (итоги по всей рассылке, а не за этот запуск)
         BroadcastService.update_progress(
             broadcast_id,
-            result.get('sent', broadcast.sent_count),
-            result.get('failed', broadcast.failed_count)
+            result.get('total_sent', broadcast.sent_count),
+            result.get('total_failed', broadcast.failed_count)
         )
 
         logger.info(
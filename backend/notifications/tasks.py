@@ -125,16 +125,63 @@ def send_notification_task(self, notification_id: int):
         raise self.retry(exc=exc, countdown=retry_delay)
 
 
+@shared_task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    name='notifications.tasks.send_scheduled_batch_task'
+)
+def send_scheduled_batch_task(self, notification_ids, claimed_at):
+    """
+    Send a chunk of claimed scheduled notifications.
+
+    Enqueued by process_scheduled_notifications with IDs it has already
+    moved to 'processing'. On error the task retries; if retries run out,
+    the chunk is returned to pending by release_stale_claims. Rows released
+    and claimed again by a later run no longer match claimed_at and are
+    left to that run.
+
+    Args:
+        notification_ids: IDs of claimed notifications
+        claimed_at: Claim stamp (ISO 8601) from claim_due_notifications
+
+    Returns:
+        Dict with sent count and scheduling lag statistics
+    """
+    from datetime import datetime
+    from .scheduler import NotificationScheduler
+    try:
+        return NotificationScheduler().send_scheduled_batch(
+            notification_ids, datetime.fromisoformat(claimed_at)
+        )
+
+    except Exception as exc:
+        logger.error(
+            f"Error in send_scheduled_batch_task for {len(notification_ids)} "
+            f"notifications: {exc}"
+        )
+        raise self.retry(exc=exc)
+
+
+# Notifications claimed per batched send task
+SCHEDULED_DISPATCH_CHUNK_SIZE = 500
+# Upper bound of chunks dispatched by one run; the rest waits for the next minute
+SCHEDULED_DISPATCH_MAX_CHUNKS = 200
+
+
 @shared_task(
     name='notifications.tasks.process_scheduled_notifications'
 )
 def process_scheduled_notifications():
     """
-    Process all pending scheduled notifications that are due to be sent.
+    Dispatch pending scheduled notifications that are due to be sent.
 
     This task should be run every minute via Celery Beat.
-    It queries for notifications with scheduled_at <= now and scheduled_status=pending,
-    then enqueues send_notification_task for each one.
+    It claims due notifications in chunks (pending -> processing under
+    SELECT ... FOR UPDATE SKIP LOCKED) and enqueues one
+    send_scheduled_batch_task per chunk, so overlapping runs never enqueue
+    the same notification twice. Claims older than
+    NotificationScheduler.CLAIM_TIMEOUT are released back to pending first.
 
     Returns:
         Dict with processing statistics
@@ -143,33 +190,41 @@ def process_scheduled_notifications():
     from .scheduler import NotificationScheduler
     try:
         scheduler = NotificationScheduler()
-        pending_notifications = scheduler.get_pending_notifications()
+        released = scheduler.release_stale_claims()
 
         processed_count = 0
         failed_count = 0
+        batches = 0
+
+        for _ in range(SCHEDULED_DISPATCH_MAX_CHUNKS):
+            notification_ids, claimed_at = scheduler.claim_due_notifications(
+                SCHEDULED_DISPATCH_CHUNK_SIZE
+            )
+            if not notification_ids:
+                break
 
-        for notification in pending_notifications:
             try:
-                # Enqueue the send task
-                send_notification_task.delay(notification.id)
-                processed_count += 1
-                logger.info(
-                    f"Enqueued notification {notification.id} for delivery"
-                )
+                send_scheduled_batch_task.delay(notification_ids, claimed_at.isoformat())
+                processed_count += len(notification_ids)
+                batches += 1
             except Exception as e:
-                failed_count += 1
+                failed_count += len(notification_ids)
+                scheduler.release_claims(notification_ids)
                 logger.error(
-                    f"Error enqueueing notification {notification.id}: {e}"
+                    f"Error enqueueing {len(notification_ids)} scheduled notifications: {e}"
                 )
+                break
 
         logger.info(
-            f"Processed scheduled notifications: {processed_count} sent, "
-            f"{failed_count} failed"
+            f"Processed scheduled notifications: {processed_count} enqueued "
+            f"in {batches} batches, {failed_count} failed, {released} released"
         )
 
         return {
             'processed': processed_count,
             'failed': failed_count,
+            'batches': batches,
+            'released': released,
             'timestamp': timezone.now().isoformat(),
         }
 
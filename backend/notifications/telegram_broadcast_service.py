@@ -1,6 +1,7 @@
+import asyncio
 import logging
 import os
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import httpx
 from django.utils import timezone
 from .models import Broadcast, BroadcastRecipient
@@ -8,9 +9,71 @@ from .models import Broadcast, BroadcastRecipient
 logger = logging.getLogger(__name__)
 
 
+class TelegramRateLimiter:
+    """
+    Темп отправки с учетом лимитов Telegram Bot API
+
+    - глобально не больше rate сообщений в секунду;
+    - в один чат не чаще раза в per_chat_interval секунд;
+    - после ответа 429 все отправки ждут retry_after.
+    """
+
+    def __init__(self, rate: float, per_chat_interval: float):
+        self.interval = 1.0 / rate
+        self.per_chat_interval = per_chat_interval
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._chat_next_slot: Dict[int, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, chat_id: int) -> None:
+        """Дождаться слота для отправки в чат"""
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._lock:
+                now = loop.time()
+                start = max(
+                    now,
+                    self._next_slot,
+                    self._paused_until,
+                    self._chat_next_slot.get(chat_id, 0.0),
+                )
+                self._next_slot = start + self.interval
+                self._chat_next_slot[chat_id] = start + self.per_chat_interval
+
+            if start > now:
+                await asyncio.sleep(start - now)
+
+            # Пауза по 429 могла начаться, пока мы ждали
+            if loop.time() >= self._paused_until:
+                return
+
+    def pause(self, seconds: float) -> None:
+        """Остановить все отправки на seconds (ответ 429 с retry_after)"""
+        until = asyncio.get_running_loop().time() + seconds
+        self._paused_until = max(self._paused_until, until)
+
+
 class TelegramBroadcastService:
     """Сервис для отправки рассылок через Telegram"""
 
+    # Глобальный лимит Telegram ~30 сообщений/сек, оставляем запас
+    GLOBAL_RATE = 25
+
+    # Не больше одного сообщения в секунду в один чат
+    PER_CHAT_INTERVAL = 1.0
+
+    # Одновременных запросов к Bot API
+    MAX_CONCURRENCY = 20
+
+    # Получателей на пакет (и на один bulk_update)
+    BATCH_SIZE = 500
+
+    # Повторов после 429
+    MAX_RETRIES = 3
+
+    REQUEST_TIMEOUT = 10
+
     def __init__(self):
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         if self.bot_token:
@@ -20,65 +83,155 @@ class TelegramBroadcastService:
 
     def send_broadcast(self, broadcast: Broadcast, message: str) -> dict:
         """
-        Отправить рассылку всем получателям
+        Отправить рассылку всем получателям, которым она еще не отправлена
+
+        Получатели обрабатываются пакетами по BATCH_SIZE в порядке id:
+        пакет отправляется конкурентно через общий httpx.AsyncClient, статусы
+        записываются одним bulk_update. Прерванная рассылка при повторном
+        вызове продолжается с первого неотправленного получателя.
 
         Args:
             broadcast: Объект Broadcast
             message: Текст сообщения
 
         Returns:
-            {'sent': int, 'failed': int, 'errors': []}
+            {'sent': int, 'failed': int, 'total_sent': int, 'total_failed': int,
+             'cancelled': bool}
+            (sent/failed - за этот вызов, total_* - по всей рассылке;
+            при отмене статус рассылки не меняется)
         """
         if not self.bot_token:
             logger.warning("TELEGRAM_BOT_TOKEN не установлен")
             return {'sent': 0, 'failed': 0, 'errors': ['Bot token not configured']}
 
-        recipients = BroadcastRecipient.objects.filter(broadcast=broadcast).select_related('recipient')
+        pending = (
+            BroadcastRecipient.objects.filter(broadcast=broadcast, telegram_sent=False)
+            .select_related(
+                'recipient',
+                'recipient__student_profile',
+                'recipient__teacher_profile',
+                'recipient__tutor_profile',
+                'recipient__parent_profile',
+            )
+            .order_by('id')
+        )
+
         sent_count = 0
         failed_count = 0
-        errors = []
+        last_id = 0
+        cancelled = False
 
-        for recipient_record in recipients:
-            user = recipient_record.recipient
+        while True:
+            batch = list(pending.filter(id__gt=last_id)[:self.BATCH_SIZE])
+            if not batch:
+                break
+            last_id = batch[-1].id
 
-            # Получить telegram_id в зависимости от роли
-            telegram_id = self._get_user_telegram_id(user)
+            if Broadcast.objects.filter(id=broadcast.id, status=Broadcast.Status.CANCELLED).exists():
+                logger.info(f"Broadcast #{broadcast.id} cancelled, stopping at recipient {batch[0].id}")
+                cancelled = True
+                break
 
-            if not telegram_id:
-                failed_count += 1
-                error_msg = 'Telegram ID not found'
-                recipient_record.telegram_error = error_msg
-                recipient_record.save()
-                logger.debug(f"User {user.id} ({user.role}): {error_msg}")
-                continue
+            sent, failed = self._send_batch(batch, message)
+            sent_count += sent
+            failed_count += failed
 
-            # Отправить сообщение
-            message_id = self._send_message(telegram_id, message)
+        # Обновить статистику Broadcast по всем получателям
+        total_sent = BroadcastRecipient.objects.filter(broadcast=broadcast, telegram_sent=True).count()
+        total_failed = BroadcastRecipient.objects.filter(
+            broadcast=broadcast, telegram_sent=False, telegram_error__isnull=False
+        ).count()
+
+        # Обновляем только нужные поля: объект в памяти может быть устаревшим
+        # (например, рассылку отменили во время отправки)
+        fields = {'sent_count': total_sent, 'failed_count': total_failed}
+        if not cancelled:
+            fields.update(status=Broadcast.Status.SENT, sent_at=timezone.now())
+        Broadcast.objects.filter(id=broadcast.id).update(**fields)
+        for field, value in fields.items():
+            setattr(broadcast, field, value)
+        if cancelled:
+            broadcast.status = Broadcast.Status.CANCELLED
+
+        logger.info(
+            f"Broadcast #{broadcast.id} {'cancelled' if cancelled else 'completed'}: "
+            f"sent={sent_count}, failed={failed_count} "
+            f"(total sent={total_sent}, failed={total_failed})"
+        )
+
+        return {
+            'sent': sent_count,
+            'failed': failed_count,
+            'total_sent': total_sent,
+            'total_failed': total_failed,
+            'cancelled': cancelled,
+        }
+
+    def _send_batch(self, batch: List[BroadcastRecipient], message: str) -> Tuple[int, int]:
+        """
+        Отправить пакет получателей и сохранить статусы одним bulk_update
 
+        Returns:
+            (sent, failed)
+        """
+        deliverable = []
+        for recipient_record in batch:
+            telegram_id = self._get_user_telegram_id(recipient_record.recipient)
+            if telegram_id:
+                deliverable.append((recipient_record, telegram_id))
+            else:
+                recipient_record.telegram_error = 'Telegram ID not found'
+                logger.debug(
+                    f"User {recipient_record.recipient_id} ({recipient_record.recipient.role}): "
+                    f"Telegram ID not found"
+                )
+
+        results = asyncio.run(
+            self._send_all([telegram_id for _, telegram_id in deliverable], message)
+        ) if deliverable else []
+
+        now = timezone.now()
+        for (recipient_record, telegram_id), (message_id, error) in zip(deliverable, results):
             if message_id:
-                sent_count += 1
                 recipient_record.telegram_sent = True
                 recipient_record.telegram_message_id = message_id
-                recipient_record.sent_at = timezone.now()
-                recipient_record.save()
-                logger.info(f"Message sent to user {user.id} (telegram_id={telegram_id}): message_id={message_id}")
+                recipient_record.telegram_error = None
+                recipient_record.sent_at = now
             else:
-                failed_count += 1
-                error_msg = 'Failed to send via Telegram API'
-                recipient_record.telegram_error = error_msg
-                recipient_record.save()
-                logger.error(f"Failed to send message to user {user.id} (telegram_id={telegram_id})")
+                recipient_record.telegram_error = error
+                logger.error(
+                    f"Failed to send message to user {recipient_record.recipient_id} "
+                    f"(telegram_id={telegram_id}): {error}"
+                )
+
+        BroadcastRecipient.objects.bulk_update(
+            batch, ['telegram_sent', 'telegram_message_id', 'telegram_error', 'sent_at']
+        )
+
+        sent = sum(1 for record in batch if record.telegram_sent)
+        return sent, len(batch) - sent
+
+    async def _send_all(self, chat_ids: List[int], message: str) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Отправить сообщение в чаты конкурентно с учетом лимитов
+
+        Returns:
+            [(message_id, error)] в порядке chat_ids
+        """
+        limiter = TelegramRateLimiter(self.GLOBAL_RATE, self.PER_CHAT_INTERVAL)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        limits = httpx.Limits(
+            max_connections=self.MAX_CONCURRENCY,
+            max_keepalive_connections=self.MAX_CONCURRENCY,
+        )
 
-        # Обновить статистику Broadcast
-        broadcast.sent_count = sent_count
-        broadcast.failed_count = failed_count
-        broadcast.status = Broadcast.Status.SENT
-        broadcast.sent_at = timezone.now()
-        broadcast.save()
+        async with httpx.AsyncClient(timeout=self.REQUEST_TIMEOUT, limits=limits) as client:
 
-        logger.info(f"Broadcast #{broadcast.id} completed: sent={sent_count}, failed={failed_count}")
+            async def send(chat_id: int):
+                async with semaphore:
+                    return await self._send_message(client, limiter, chat_id, message)
 
-        return {'sent': sent_count, 'failed': failed_count}
+            return await asyncio.gather(*[send(chat_id) for chat_id in chat_ids])
 
     def _get_user_telegram_id(self, user) -> Optional[int]:
         """
@@ -115,38 +268,61 @@ class TelegramBroadcastService:
 
         return None
 
-    def _send_message(self, chat_id: int, message: str) -> Optional[str]:
+    async def _send_message(
+        self,
+        client: httpx.AsyncClient,
+        limiter: TelegramRateLimiter,
+        chat_id: int,
+        message: str
+    ) -> Tuple[Optional[str], Optional[str]]:
         """
         Отправить одно сообщение в Telegram
 
         Args:
+            client: Общий httpx.AsyncClient
+            limiter: Общий TelegramRateLimiter
             chat_id: Telegram chat ID
             message: Текст сообщения
 
         Returns:
-            message_id если успешно, None если ошибка
+            (message_id, None) если успешно, (None, ошибка) если нет
         """
-        try:
-            response = httpx.post(
-                f"{self.api_url}/sendMessage",
-                json={
-                    'chat_id': chat_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+        for attempt in range(self.MAX_RETRIES + 1):
+            await limiter.wait(chat_id)
+            try:
+                response = await client.post(
+                    f"{self.api_url}/sendMessage",
+                    json={
+                        'chat_id': chat_id,
+                        'text': message,
+                        'parse_mode': 'HTML'
+                    }
+                )
+            except httpx.TimeoutException:
+                logger.error(f"Timeout while sending message to chat_id={chat_id}")
+                return None, 'Timeout while sending via Telegram API'
+            except Exception as e:
+                logger.error(f"Failed to send Telegram message to chat_id={chat_id}: {e}")
+                return None, 'Failed to send via Telegram API'
+
+            if response.status_code == 429:
+                try:
+                    retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                except ValueError:
+                    retry_after = 1
+                logger.warning(
+                    f"Telegram rate limit for chat_id={chat_id}, retry after {retry_after}s "
+                    f"(attempt {attempt + 1})"
+                )
+                limiter.pause(retry_after)
+                continue
 
             if response.status_code == 200:
                 data = response.json()
                 if data.get('ok'):
-                    return str(data['result']['message_id'])
+                    return str(data['result']['message_id']), None
 
             logger.error(f"Telegram API error: {response.status_code} - {response.text}")
-            return None
-        except httpx.TimeoutException:
-            logger.error(f"Timeout while sending message to chat_id={chat_id}")
-            return None
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message to chat_id={chat_id}: {e}")
-            return None
+            return None, 'Failed to send via Telegram API'
+
+        return None, 'Rate limited by Telegram API'
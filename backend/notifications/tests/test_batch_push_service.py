@@ -0,0 +1,111 @@
+"""
+Batch push delivery tests
+
+Tests verify that BatchPushNotificationService:
+1. Sends each batch through one provider bulk call
+2. Writes delivery logs in their final state with one bulk_create
+3. Uses a fixed number of queries regardless of batch size
+4. Limits batches with a token bucket that refills over time
+"""
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import UserFactory
+from notifications.batch_push_service import BatchPushNotificationService, TokenBucket
+from notifications.channels.models import DeviceToken, UserPhoneNumber
+from notifications.channels.sms import TwilioSMSProvider
+from notifications.factories import NotificationFactory
+from notifications.models import PushDeliveryLog
+
+
+@pytest.fixture
+def service():
+    cache.clear()
+    service = BatchPushNotificationService()
+    service.batch_delay = 0
+    return service
+
+
+@pytest.fixture
+def provider():
+    """Mock provider bulk API: every phone ending in 0 fails."""
+    def send_bulk_sms(messages):
+        return [
+            {"status": "failed", "error": "Undeliverable"}
+            if phone.endswith("0")
+            else {"status": "sent", "message_id": f"SM{phone[-4:]}", "provider": "twilio"}
+            for phone, _ in messages
+        ]
+
+    with patch.object(TwilioSMSProvider, "send_bulk_sms", side_effect=send_bulk_sms) as mock:
+        yield mock
+
+
+def push_user(phone):
+    user = UserFactory()
+    DeviceToken.objects.create(user=user, token=f"token-{user.id}", device_type="android")
+    UserPhoneNumber.objects.create(
+        user=user, phone_number=phone, status=UserPhoneNumber.VerificationStatus.VERIFIED
+    )
+    return user
+
+
+@pytest.mark.django_db
+class TestBatchPushDelivery:
+    def test_one_bulk_send_per_batch(self, service, provider):
+        service.batch_size = 2
+        users = [push_user(f"+7999123450{n}") for n in range(1, 5)]
+
+        result = service.send_to_users(NotificationFactory(), users)
+
+        assert provider.call_count == 2
+        assert [len(call.args[0]) for call in provider.call_args_list] == [2, 2]
+        assert result["devices_sent"] == 4 and result["delivery_logs"] == 4
+
+    def test_logs_written_in_final_state(self, service, provider):
+        delivered = push_user("+79991234561")
+        failed = push_user("+79991234560")
+        no_tokens = UserFactory()
+        notification = NotificationFactory()
+
+        result = service.send_to_users(notification, [delivered, failed, no_tokens])
+
+        assert result["status"] == "partial"
+        logs = {log.user_id: log for log in PushDeliveryLog.objects.filter(notification=notification)}
+        assert set(logs) == {delivered.id, failed.id}
+        assert logs[delivered.id].status == PushDeliveryLog.DeliveryStatus.DELIVERED
+        assert logs[delivered.id].success and logs[delivered.id].fcm_message_id == "SM4561"
+        assert logs[failed.id].status == PushDeliveryLog.DeliveryStatus.FAILED
+        assert logs[failed.id].error_message == "Undeliverable"
+        assert logs[failed.id].retry_at is not None
+
+    def test_query_count_does_not_grow_with_batch(self, service, provider):
+        def query_count(users):
+            with CaptureQueriesContext(connection) as queries:
+                service.send_to_users(NotificationFactory(), users)
+            return len(queries)
+
+        small = [push_user(f"+7999123451{n}") for n in range(1, 3)]
+        large = [push_user(f"+7999123452{n}") for n in range(1, 9)]
+
+        assert query_count(small) == query_count(large)
+
+
+class TestTokenBucket:
+    def test_rejects_over_capacity_and_refills(self):
+        cache.clear()
+        bucket = TokenBucket("test_push_bucket", capacity=10, refill_rate=1)
+
+        with patch("notifications.batch_push_service.time.time", return_value=1000.0):
+            assert bucket.take(8)
+            assert not bucket.take(3)
+            assert bucket.take(2)
+
+        with patch("notifications.batch_push_service.time.time", return_value=1003.0):
+            assert bucket.take(3)
+            assert not bucket.take(1)
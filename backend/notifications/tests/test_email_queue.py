@@ -0,0 +1,93 @@
+"""
+Email queue worker tests
+
+Tests verify that process_email_queue:
+1. Claims pending entries so an overlapping run does not send them again
+2. Sends the batch over a single connection and marks entries sent
+3. Compiles each template once per batch
+4. Cancels entries of users with email disabled and records failures
+"""
+
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.template.loader import get_template
+
+from notifications.email_queue import EmailQueueWorker
+from notifications.email_service import EmailNotificationService
+from notifications.email_tasks import process_email_queue
+from notifications.factories import (
+    NotificationFactory,
+    NotificationQueueFactory,
+    NotificationSettingsFactory,
+)
+from notifications.models import Notification, NotificationQueue
+
+
+@pytest.fixture(autouse=True)
+def email_backend(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+def queued(count, notification_type=Notification.Type.ASSIGNMENT_NEW):
+    return [
+        NotificationQueueFactory(notification=NotificationFactory(type=notification_type))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestProcessEmailQueue:
+    def test_sends_batch_and_marks_entries_sent(self):
+        entries = queued(3)
+
+        with patch("django.core.mail.backends.locmem.EmailBackend.open") as open_connection:
+            result = process_email_queue(batch_size=10)
+
+        assert result["sent"] == 3 and result["failed"] == 0
+        assert open_connection.call_count == 1
+        assert len(mail.outbox) == 3
+        assert result["latency_max"] >= 0 and result["throughput"] > 0
+        for entry in entries:
+            entry.refresh_from_db()
+            assert entry.status == NotificationQueue.Status.SENT and entry.processed_at
+            assert entry.notification.is_sent
+
+    def test_claimed_entries_are_not_sent_twice(self):
+        queued(2)
+        worker = EmailQueueWorker()
+        claimed = worker.claim(10)
+
+        result = process_email_queue(batch_size=10)
+
+        assert len(claimed) == 2
+        assert result["claimed"] == 0 and not mail.outbox
+
+    def test_templates_compiled_once_per_batch(self):
+        queued(4)
+
+        with patch("notifications.email_queue.get_template", wraps=get_template) as loader:
+            process_email_queue(batch_size=10)
+
+        assert loader.call_count == 1
+
+    def test_disabled_users_cancelled_and_failures_recorded(self):
+        disabled = queued(1)[0]
+        NotificationSettingsFactory(
+            user=disabled.notification.recipient, email_notifications=False
+        )
+        failing = queued(1)[0]
+
+        def send_messages(self, messages):
+            return [{"success": False, "latency": 0.01, "error": "SMTP down"} for _ in messages]
+
+        with patch.object(EmailNotificationService, "send_messages", send_messages):
+            result = process_email_queue(batch_size=10)
+
+        assert result["cancelled"] == 1 and result["failed"] == 1
+        disabled.refresh_from_db()
+        failing.refresh_from_db()
+        assert disabled.status == NotificationQueue.Status.CANCELLED
+        assert failing.status == NotificationQueue.Status.RETRY
+        assert (failing.attempts, failing.error_message) == (1, "SMTP down")
@@ -0,0 +1,99 @@
+"""
+Bulk in-app notification tests
+
+Tests verify that create_bulk_notifications:
+1. Respects per-user notification settings
+2. Creates missing settings with defaults
+3. Uses a fixed number of queries regardless of recipient count
+4. Sends one WebSocket event per notification in a single batch
+And that group_send_many counts failed sends without stopping the rest.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import UserFactory
+from notifications.factories import NotificationSettingsFactory
+from notifications.in_app_service import InAppNotificationService
+from notifications.models import Notification, NotificationSettings
+from notifications.notification_service import group_send_many
+
+
+@pytest.fixture
+def channel_layer():
+    layer = AsyncMock()
+    with patch("notifications.in_app_service.get_channel_layer", return_value=layer):
+        yield layer
+
+
+@pytest.mark.django_db
+class TestCreateBulkNotifications:
+    def test_respects_settings_and_creates_missing(self, channel_layer):
+        allowed = UserFactory()
+        blocked = UserFactory()
+        new_user = UserFactory()
+        NotificationSettingsFactory(user=allowed, assignment_notifications=True)
+        NotificationSettingsFactory(user=blocked, assignment_notifications=False)
+
+        ids = InAppNotificationService.create_bulk_notifications(
+            [allowed, blocked, new_user],
+            title="Новое задание",
+            message="Проверьте задания",
+            notification_type=Notification.Type.ASSIGNMENT_NEW,
+        )
+
+        recipients = set(
+            Notification.objects.filter(id__in=ids).values_list("recipient_id", flat=True)
+        )
+        assert recipients == {allowed.id, new_user.id}
+        assert NotificationSettings.objects.filter(user=new_user).exists()
+
+    def test_query_count_does_not_grow_with_recipients(self, channel_layer):
+        def query_count(recipients):
+            with CaptureQueriesContext(connection) as queries:
+                InAppNotificationService.create_bulk_notifications(
+                    recipients, title="Система", message="Сообщение"
+                )
+            return len(queries)
+
+        assert query_count(UserFactory.create_batch(2)) == query_count(UserFactory.create_batch(20))
+
+    def test_websocket_events_sent_per_recipient(self, channel_layer):
+        users = UserFactory.create_batch(3)
+
+        ids = InAppNotificationService.create_bulk_notifications(
+            users, title="Система", message="Сообщение"
+        )
+
+        assert channel_layer.group_send.await_count == 3
+        groups = {call.args[0] for call in channel_layer.group_send.await_args_list}
+        assert groups == {f"notifications_user_{user.id}" for user in users}
+        sent_ids = {call.args[1]["notification"]["id"] for call in channel_layer.group_send.await_args_list}
+        assert sent_ids == set(ids)
+
+    def test_should_send_uses_type_lookup(self):
+        user = UserFactory()
+        NotificationSettingsFactory(user=user, invoice_notifications=False)
+
+        assert not InAppNotificationService._should_send_notification(
+            user, Notification.Type.INVOICE_PAID
+        )
+        assert InAppNotificationService._should_send_notification(user, Notification.Type.SYSTEM)
+
+
+class TestGroupSendMany:
+    def test_failed_sends_are_counted_and_rest_delivered(self):
+        layer = AsyncMock()
+        layer.group_send.side_effect = [None, ConnectionError("redis down"), None]
+        messages = [(f"group_{n}", {"type": "notification", "data": n}) for n in range(3)]
+
+        failed = group_send_many(layer, messages, batch_size=2)
+
+        assert failed == 1
+        assert [call.args for call in layer.group_send.await_args_list] == messages
+
+    def test_without_channel_layer_sends_nothing(self):
+        assert group_send_many(None, [("group", {"type": "notification"})]) == 0
@@ -0,0 +1,132 @@
+"""
+Scheduled notification dispatcher tests
+
+Tests verify that process_scheduled_notifications:
+1. Claims due notifications in chunks and enqueues one task per chunk
+2. Never enqueues a claimed notification again on an overlapping run
+3. Returns claims to pending when enqueueing fails or a claim goes stale
+And that send_scheduled_batch marks claimed rows sent, reports lag and
+skips rows that were re-claimed after its own claim went stale.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from notifications import tasks
+from notifications.factories import NotificationFactory
+from notifications.models import Notification
+from notifications.scheduler import NotificationScheduler
+
+
+@pytest.fixture
+def delay():
+    with patch.object(tasks.send_scheduled_batch_task, "delay") as mock:
+        yield mock
+
+
+def due(count, minutes_ago=1, **kwargs):
+    scheduled_at = timezone.now() - timedelta(minutes=minutes_ago)
+    return [
+        NotificationFactory(scheduled_at=scheduled_at, scheduled_status="pending", **kwargs)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestProcessScheduledNotifications:
+    def test_claims_due_rows_in_chunks(self, delay, monkeypatch):
+        monkeypatch.setattr(tasks, "SCHEDULED_DISPATCH_CHUNK_SIZE", 2)
+        notifications = due(5)
+        NotificationFactory(
+            scheduled_at=timezone.now() + timedelta(hours=1), scheduled_status="pending"
+        )
+
+        result = tasks.process_scheduled_notifications()
+
+        assert result["processed"] == 5 and result["batches"] == 3
+        assert [len(call.args[0]) for call in delay.call_args_list] == [2, 2, 1]
+        enqueued = {id_ for call in delay.call_args_list for id_ in call.args[0]}
+        assert enqueued == {notification.id for notification in notifications}
+        assert Notification.objects.filter(scheduled_status="processing").count() == 5
+
+    def test_overlapping_run_does_not_enqueue_again(self, delay):
+        due(3)
+
+        tasks.process_scheduled_notifications()
+        second = tasks.process_scheduled_notifications()
+
+        assert delay.call_count == 1
+        assert second["processed"] == 0
+
+    def test_enqueue_failure_releases_claims(self, delay):
+        due(2)
+        delay.side_effect = ConnectionError("broker down")
+
+        result = tasks.process_scheduled_notifications()
+
+        assert result["failed"] == 2
+        assert Notification.objects.filter(scheduled_status="pending").count() == 2
+
+    def test_stale_claims_are_released(self, delay):
+        stale = due(1)[0]
+        Notification.objects.filter(id=stale.id).update(
+            scheduled_status="processing",
+            scheduled_claimed_at=timezone.now() - NotificationScheduler.CLAIM_TIMEOUT * 2,
+        )
+
+        result = tasks.process_scheduled_notifications()
+
+        assert result["released"] == 1
+        assert delay.call_args.args[0] == [stale.id]
+
+
+@pytest.mark.django_db
+class TestSendScheduledBatch:
+    @pytest.fixture(autouse=True)
+    def ws(self):
+        with patch.object(NotificationScheduler, "_ws_send_many") as mock:
+            yield mock
+
+    def test_marks_claimed_rows_sent_and_reports_lag(self, ws):
+        due(2, minutes_ago=3)
+        cancelled = due(1, minutes_ago=3)[0]
+        scheduler = NotificationScheduler()
+        claimed, claimed_at = scheduler.claim_due_notifications(10)
+        Notification.objects.filter(id=cancelled.id).update(scheduled_status="cancelled")
+
+        stats = scheduler.send_scheduled_batch(claimed, claimed_at)
+
+        assert stats["sent"] == 2
+        assert stats["lag_max"] >= 180
+        assert len(ws.call_args.args[0]) == 2
+        sent = Notification.objects.filter(scheduled_status="sent")
+        assert sent.count() == 2 and all(n.is_sent and n.sent_at for n in sent)
+        assert Notification.objects.get(id=cancelled.id).scheduled_status == "cancelled"
+
+    def test_stale_batch_skips_reclaimed_rows(self, ws):
+        due(2)
+        scheduler = NotificationScheduler()
+        stale_ids, stale_claimed_at = scheduler.claim_due_notifications(10)
+        Notification.objects.filter(id__in=stale_ids).update(
+            scheduled_claimed_at=stale_claimed_at - NotificationScheduler.CLAIM_TIMEOUT * 2
+        )
+        scheduler.release_stale_claims()
+        fresh_ids, fresh_claimed_at = scheduler.claim_due_notifications(10)
+
+        stale = scheduler.send_scheduled_batch(stale_ids, stale_claimed_at)
+
+        assert stale["sent"] == 0 and not ws.called
+        assert set(fresh_ids) == set(stale_ids)
+        assert scheduler.send_scheduled_batch(fresh_ids, fresh_claimed_at)["sent"] == 2
+        assert Notification.objects.filter(scheduled_status="sent").count() == 2
+
+    def test_task_parses_claim_stamp(self, ws):
+        due(1)
+        ids, claimed_at = NotificationScheduler().claim_due_notifications(10)
+
+        stats = tasks.send_scheduled_batch_task.run(ids, claimed_at.isoformat())
+
+        assert stats["sent"] == 1
@@ -0,0 +1,132 @@
+"""
+Telegram broadcast sender tests
+
+Tests verify that send_broadcast:
+1. Sends to every recipient with a Telegram ID and records statuses
+2. Waits for retry_after and retries after a 429 response
+3. Resumes from unsent recipients only
+4. Stops on cancellation without overwriting the CANCELLED status
+"""
+
+import json
+
+import httpx
+import pytest
+
+from accounts.factories import StudentProfileFactory
+from notifications.factories import BroadcastFactory, BroadcastRecipientFactory
+from notifications.models import Broadcast, BroadcastRecipient
+from notifications.telegram_broadcast_service import TelegramBroadcastService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
+    monkeypatch.setattr(TelegramBroadcastService, "PER_CHAT_INTERVAL", 0)
+    monkeypatch.setattr(TelegramBroadcastService, "GLOBAL_RATE", 1000)
+    return TelegramBroadcastService()
+
+
+@pytest.fixture
+def telegram_api(monkeypatch):
+    """Mock Bot API; handler responses can be queued per chat_id."""
+    requests = []
+    queued = {}
+
+    def handler(request):
+        chat_id = json.loads(request.content)["chat_id"]
+        requests.append(chat_id)
+        if queued.get(chat_id):
+            return queued[chat_id].pop(0)
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 1000 + len(requests)}})
+
+    real_client = httpx.AsyncClient
+
+    def client(**kwargs):
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr("notifications.telegram_broadcast_service.httpx.AsyncClient", client)
+    return requests, queued
+
+
+def recipient(broadcast, telegram_id):
+    profile = StudentProfileFactory(telegram_id=telegram_id)
+    return BroadcastRecipientFactory(broadcast=broadcast, recipient=profile.user)
+
+
+@pytest.mark.django_db
+class TestTelegramBroadcastService:
+    def test_sends_and_records_statuses(self, service, telegram_api):
+        requests, _ = telegram_api
+        broadcast = BroadcastFactory()
+        first = recipient(broadcast, "101")
+        second = recipient(broadcast, "102")
+        missing = recipient(broadcast, None)
+
+        result = service.send_broadcast(broadcast, "Hello")
+
+        assert result["sent"] == 2 and result["failed"] == 1
+        assert sorted(requests) == [101, 102]
+        for record in (first, second):
+            record.refresh_from_db()
+            assert record.telegram_sent and record.telegram_message_id
+        missing.refresh_from_db()
+        assert missing.telegram_error == "Telegram ID not found"
+        broadcast.refresh_from_db()
+        assert (broadcast.sent_count, broadcast.failed_count) == (2, 1)
+
+    def test_retries_after_rate_limit(self, service, telegram_api):
+        requests, queued = telegram_api
+        broadcast = BroadcastFactory()
+        record = recipient(broadcast, "201")
+        queued[201] = [
+            httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 0}})
+        ]
+
+        result = service.send_broadcast(broadcast, "Hello")
+
+        assert result["sent"] == 1
+        assert requests == [201, 201]
+        record.refresh_from_db()
+        assert record.telegram_sent
+
+    def test_resumes_from_unsent_recipients(self, service, telegram_api):
+        requests, _ = telegram_api
+        broadcast = BroadcastFactory()
+        done = recipient(broadcast, "301")
+        recipient(broadcast, "302")
+        BroadcastRecipient.objects.filter(id=done.id).update(
+            telegram_sent=True, telegram_message_id="1"
+        )
+
+        result = service.send_broadcast(broadcast, "Hello")
+
+        assert requests == [302]
+        assert result["sent"] == 1
+        assert result["total_sent"] == 2
+
+    def test_cancelled_broadcast_keeps_status(self, service, telegram_api, monkeypatch):
+        requests, _ = telegram_api
+        monkeypatch.setattr(TelegramBroadcastService, "BATCH_SIZE", 1)
+        broadcast = BroadcastFactory()
+        first = recipient(broadcast, "401")
+        recipient(broadcast, "402")
+
+        original_send_batch = TelegramBroadcastService._send_batch
+
+        def send_then_cancel(self, batch, message):
+            result = original_send_batch(self, batch, message)
+            Broadcast.objects.filter(id=broadcast.id).update(status=Broadcast.Status.CANCELLED)
+            return result
+
+        monkeypatch.setattr(TelegramBroadcastService, "_send_batch", send_then_cancel)
+
+        result = service.send_broadcast(broadcast, "Hello")
+
+        assert result["cancelled"] and result["sent"] == 1
+        assert requests == [401]
+        broadcast.refresh_from_db()
+        assert broadcast.status == Broadcast.Status.CANCELLED
+        assert broadcast.sent_count == 1 and broadcast.sent_at is None
+        first.refresh_from_db()
+        assert first.telegram_sent
@@ -11,9 +11,11 @@ Comprehensive data aggregation service for computing report statistics including
 Features:
 - Django aggregation functions for efficient database queries
 - Statistical calculations (mean, median, standard deviation, percentiles)
+- Score percentiles merged from per-assignment score sketches (no score scan)
 - Time-based grouping and trend analysis
 - Flexible filtering (student, teacher, subject, date range, status)
 - Performance optimization with select_related/prefetch_related
+- Single-pass student metrics engine (two queries for any number of students)
 - Caching of aggregated results (1 hour TTL)
 - Safe handling of null/missing data
 
@@ -35,6 +37,12 @@ Usage:
         date_from='2025-01-01'
     )
 
+    # Get progress metrics for a whole class in two queries
+    class_progress = aggregator.get_class_progress_metrics(
+        student_ids=[123, 124, 125],
+        date_from='2025-01-01'
+    )
+
     # Get weekly aggregation
     weekly = aggregator.aggregate_weekly(
         teacher_id=456,
@@ -46,10 +54,10 @@ import logging
 from datetime import datetime, timedelta, date
 from typing import Any, Dict, List, Optional, Tuple
 from decimal import Decimal
-from statistics import mean, median, stdev
 
+import numpy as np
 from django.db.models import (
-    Avg, Count, Max, Min, Sum, Q, F, Value, Case, When,
+    Avg, Count, Max, Min, Q, F, Value, Case, When,
     IntegerField, DecimalField, CharField, Subquery, OuterRef
 )
 from django.db.models.functions import (
@@ -58,9 +66,336 @@ from django.db.models.functions import (
 from django.core.cache import cache
 from django.utils import timezone
 
+from reports.services.score_sketches import ScoreSketch, ScoreSketchService
+
 logger = logging.getLogger(__name__)
 
 
+PENDING_SUBMISSION_STATUSES = ('submitted', 'in_review')
+
+
+def _day_ordinal(value) -> int:
+    """Local calendar day of a datetime as an ordinal (matches __date lookups)."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.date()
+    return value.toordinal()
+
+
+def _day_window(students: np.ndarray, days: np.ndarray, student_id: int,
+                date_from: date, date_to: date) -> slice:
+    """
+    Rows of one student within [date_from, date_to].
+
+    Arrays are sorted by (student, day), so the window is a contiguous
+    slice found by binary search instead of a full-array mask.
+    """
+    if student_id is None or students.size == 0:
+        return slice(0, 0)
+    lo = int(np.searchsorted(students, student_id, side='left'))
+    hi = int(np.searchsorted(students, student_id, side='right'))
+    student_days = days[lo:hi]
+    start = lo + int(np.searchsorted(student_days, date_from.toordinal(), side='left'))
+    stop = lo + int(np.searchsorted(student_days, date_to.toordinal(), side='right'))
+    return slice(start, stop)
+
+
+class StudentActivityArrays:
+    """
+    Columnar snapshot of material progress and submission rows.
+
+    Rows are stored as parallel NumPy arrays sorted by (student_id, day);
+    missing scores are NaN.
+    """
+
+    def __init__(self, material_rows, submission_rows):
+        """
+        Args:
+            material_rows: (student_id, last_accessed, progress_percentage,
+                is_completed, time_spent) tuples
+            submission_rows: (student_id, submitted_at, score, is_late,
+                status, author_id) tuples
+        """
+        material_rows = list(material_rows)
+        submission_rows = list(submission_rows)
+
+        m_student = np.array([r[0] for r in material_rows], dtype=np.int64)
+        m_day = np.array([_day_ordinal(r[1]) for r in material_rows], dtype=np.int64)
+        order = np.lexsort((m_day, m_student))
+        self.m_student = m_student[order]
+        self.m_day = m_day[order]
+        self.m_progress = np.array(
+            [r[2] or 0 for r in material_rows], dtype=float
+        )[order]
+        self.m_completed = np.array(
+            [bool(r[3]) for r in material_rows], dtype=bool
+        )[order]
+        self.m_time = np.array([r[4] or 0 for r in material_rows], dtype=float)[order]
+
+        s_student = np.array([r[0] for r in submission_rows], dtype=np.int64)
+        s_day = np.array([_day_ordinal(r[1]) for r in submission_rows], dtype=np.int64)
+        order = np.lexsort((s_day, s_student))
+        self.s_student = s_student[order]
+        self.s_day = s_day[order]
+        self.s_score = np.array(
+            [np.nan if r[2] is None else r[2] for r in submission_rows], dtype=float
+        )[order]
+        self.s_late = np.array([bool(r[3]) for r in submission_rows], dtype=bool)[order]
+        self.s_graded = np.array(
+            [r[4] == 'graded' for r in submission_rows], dtype=bool
+        )[order]
+        self.s_pending = np.array(
+            [r[4] in PENDING_SUBMISSION_STATUSES for r in submission_rows], dtype=bool
+        )[order]
+        self.s_author = np.array(
+            [-1 if r[5] is None else r[5] for r in submission_rows], dtype=np.int64
+        )[order]
+
+    def materials(self, student_id: int, date_from: date, date_to: date) -> slice:
+        return _day_window(self.m_student, self.m_day, student_id, date_from, date_to)
+
+    def submissions(self, student_id: int, date_from: date, date_to: date) -> slice:
+        return _day_window(self.s_student, self.s_day, student_id, date_from, date_to)
+
+
+class StudentMetricsEngine:
+    """
+    Computes student progress and learning metrics from one data load.
+
+    Material progress and submissions for all requested students are
+    fetched once for the whole window (including the previous period used
+    for trends), so the number of queries does not depend on the number of
+    students or metrics. Every metric is derived from the columnar arrays.
+
+    Usage:
+        engine = StudentMetricsEngine([1, 2, 3], date_from, date_to).load()
+        engine.progress_metrics(1)
+        engine.learning_metrics(2, teacher_id=10)
+    """
+
+    def __init__(
+        self,
+        student_ids: List[int],
+        date_from: date,
+        date_to: date,
+        include_previous_period: bool = True
+    ):
+        self.student_ids = sorted(set(student_ids))
+        self.date_from = date_from
+        self.date_to = date_to
+
+        period_length = (date_to - date_from).days
+        self.prev_date_to = date_from - timedelta(days=1)
+        self.prev_date_from = self.prev_date_to - timedelta(days=period_length)
+        self.include_previous_period = include_previous_period
+        self.arrays: Optional[StudentActivityArrays] = None
+
+    def load(self) -> 'StudentMetricsEngine':
+        """Fetch activity rows for all students (two queries)."""
+        from materials.models import MaterialProgress
+        from assignments.models import AssignmentSubmission
+
+        if not self.student_ids:
+            self.arrays = StudentActivityArrays([], [])
+            return self
+
+        window_from = self.prev_date_from if self.include_previous_period else self.date_from
+
+        material_rows = MaterialProgress.objects.filter(
+            student_id__in=self.student_ids,
+            last_accessed__date__gte=window_from,
+            last_accessed__date__lte=self.date_to
+        ).values_list(
+            'student_id', 'last_accessed', 'progress_percentage', 'is_completed', 'time_spent'
+        )
+
+        submission_rows = AssignmentSubmission.objects.filter(
+            student_id__in=self.student_ids,
+            submitted_at__date__gte=window_from,
+            submitted_at__date__lte=self.date_to
+        ).values_list(
+            'student_id', 'submitted_at', 'score', 'is_late', 'status', 'assignment__author_id'
+        )
+
+        self.arrays = StudentActivityArrays(material_rows, submission_rows)
+        return self
+
+    # ========== Progress metrics ==========
+
+    def material_metrics(self, student_id: int, date_from: date, date_to: date) -> Dict[str, Any]:
+        """Material completion metrics for the window."""
+        rows = self.arrays.materials(student_id, date_from, date_to)
+        progress = self.arrays.m_progress[rows]
+        completed = self.arrays.m_completed[rows]
+
+        if progress.size == 0:
+            return {
+                'total': 0,
+                'completed': 0,
+                'in_progress': 0,
+                'not_started': 0,
+                'avg_progress': 0.0
+            }
+
+        started = progress[progress > 0]
+
+        return {
+            'total': int(progress.size),
+            'completed': int(completed.sum()),
+            'in_progress': int(((progress > 0) & ~completed).sum()),
+            'not_started': int((progress == 0).sum()),
+            'avg_progress': round(float(started.mean()), 2) if started.size else 0.0
+        }
+
+    def assignment_metrics(self, student_id: int, date_from: date, date_to: date) -> Dict[str, Any]:
+        """Submission and score metrics for the window."""
+        rows = self.arrays.submissions(student_id, date_from, date_to)
+        scores = self.arrays.s_score[rows]
+        scores = scores[~np.isnan(scores)]
+        submitted = int(self.arrays.s_day[rows].size)
+
+        return {
+            'total': submitted,
+            'submitted': submitted,
+            'graded': int(self.arrays.s_graded[rows].sum()),
+            'pending': int(self.arrays.s_pending[rows].sum()),
+            'avg_score': round(float(scores.mean()), 2) if scores.size else 0.0,
+            'late_submissions': int(self.arrays.s_late[rows].sum())
+        }
+
+    def engagement_metrics(self, student_id: int, date_from: date, date_to: date) -> Dict[str, Any]:
+        """Time spent and activity days for the window."""
+        rows = self.arrays.materials(student_id, date_from, date_to)
+        total_time_minutes = float(self.arrays.m_time[rows].sum())
+        activity_days = int(np.unique(self.arrays.m_day[rows]).size)
+        avg_session = (total_time_minutes / activity_days) if activity_days > 0 else 0
+
+        return {
+            'total_time_spent_hours': round(total_time_minutes / 60, 2),
+            'avg_session_duration_minutes': round(avg_session, 2),
+            'activity_days': activity_days
+        }
+
+    @staticmethod
+    def overall_progress(
+        material_metrics: Dict[str, Any],
+        assignment_metrics: Dict[str, Any]
+    ) -> float:
+        """Item-weighted mean of material progress and assignment scores."""
+        total_items = material_metrics['total'] + assignment_metrics['total']
+        if total_items == 0:
+            return 0.0
+
+        material_progress = material_metrics['avg_progress'] * material_metrics['total']
+        assignment_progress = assignment_metrics['avg_score'] * assignment_metrics['total']
+
+        return (material_progress + assignment_progress) / total_items
+
+    def progress_metrics(self, student_id: int) -> Dict[str, Any]:
+        """
+        Full progress metrics for one student.
+
+        Returns:
+            Same structure as ReportDataAggregationService.get_student_progress_metrics
+        """
+        materials = self.material_metrics(student_id, self.date_from, self.date_to)
+        assignments = self.assignment_metrics(student_id, self.date_from, self.date_to)
+        current_progress = self.overall_progress(materials, assignments)
+
+        prev_progress = self.overall_progress(
+            self.material_metrics(student_id, self.prev_date_from, self.prev_date_to),
+            self.assignment_metrics(student_id, self.prev_date_from, self.prev_date_to)
+        )
+        change = current_progress - prev_progress
+
+        return {
+            'student_id': student_id,
+            'overall_progress': round(current_progress, 2),
+            'materials': materials,
+            'assignments': assignments,
+            'engagement': self.engagement_metrics(student_id, self.date_from, self.date_to),
+            'trends': {
+                'previous_period_progress': round(prev_progress, 2),
+                'progress_change': round(change, 2),
+                'is_improving': change > 0
+            },
+            'date_from': self.date_from.isoformat(),
+            'date_to': self.date_to.isoformat()
+        }
+
+    # ========== Learning metrics ==========
+
+    def learning_metrics(self, student_id: int, teacher_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Engagement, performance, participation, consistency and trend.
+
+        Returns:
+            Same structure as ReportDataAggregationService.get_learning_metrics
+        """
+        materials = self.arrays.materials(student_id, self.date_from, self.date_to)
+        submissions = self.arrays.submissions(student_id, self.date_from, self.date_to)
+        period_days = (self.date_to - self.date_from).days + 1
+
+        material_days = self.arrays.m_day[materials]
+        active_days, daily_counts = np.unique(material_days, return_counts=True)
+
+        # Activity frequency: aim for 1+ activity per day
+        total_activities = material_days.size + self.arrays.s_day[submissions].size
+        engagement_score = min((total_activities / period_days) * 20, 100)
+
+        scores = self.arrays.s_score[submissions]
+        if teacher_id:
+            scores = scores[self.arrays.s_author[submissions] == teacher_id]
+        scores = scores[~np.isnan(scores)]
+        performance_score = float(scores.mean()) if scores.size else 0.0
+
+        activity_level = 'high' if engagement_score >= 75 else ('medium' if engagement_score >= 50 else 'low')
+
+        return {
+            'engagement_score': round(engagement_score, 2),
+            'performance_score': round(performance_score, 2),
+            'activity_level': activity_level,
+            'time_spent_hours': round(float(self.arrays.m_time[materials].sum()) / 60, 2),
+            'participation_rate': round(active_days.size / period_days * 100, 2),
+            'consistency_score': round(self._consistency_score(daily_counts), 2),
+            'improvement_trend': self._improvement_trend(student_id)
+        }
+
+    @staticmethod
+    def _consistency_score(daily_counts: np.ndarray) -> float:
+        """Low variance of daily activity counts means high consistency (0-100)."""
+        if daily_counts.size == 0:
+            return 0.0
+        if daily_counts.size == 1:
+            return 50.0
+        return max(0.0, 100 - float(np.var(daily_counts)) * 5)
+
+    def _improvement_trend(self, student_id: int) -> str:
+        """Compare average scores of the first and second half of the window."""
+        mid_date = self.date_from + timedelta(days=(self.date_to - self.date_from).days // 2)
+
+        halves = []
+        for half_from, half_to in (
+            (self.date_from, mid_date - timedelta(days=1)),
+            (mid_date, self.date_to),
+        ):
+            scores = self.arrays.s_score[self.arrays.submissions(student_id, half_from, half_to)]
+            scores = scores[~np.isnan(scores)]
+            halves.append(float(scores.mean()) if scores.size else None)
+
+        first_half, second_half = halves
+        if first_half is None or second_half is None:
+            return 'stable'
+
+        if second_half > first_half * 1.05:
+            return 'improving'
+        elif second_half < first_half * 0.95:
+            return 'declining'
+        else:
+            return 'stable'
+
+
 class ReportDataAggregationService:
     """
     Service for aggregating data across reports and generating statistics.
@@ -200,54 +535,11 @@ class ReportDataAggregationService:
             if cached_result is not None:
                 return cached_result
 
-        # Parse dates
-        if date_to is None:
-            date_to_obj = timezone.now().date()
-        else:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-
-        if date_from is None:
-            date_from_obj = date_to_obj - timedelta(days=30)
-        else:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj, date_to_obj = self._parse_date_range(date_from, date_to)
 
         try:
-            # Material progress metrics
-            from materials.models import MaterialProgress
-            material_metrics = self._aggregate_material_progress(
-                student_id, date_from_obj, date_to_obj
-            )
-
-            # Assignment metrics
-            assignment_metrics = self._aggregate_assignment_metrics(
-                student_id=student_id, date_from=date_from_obj, date_to=date_to_obj
-            )
-
-            # Engagement metrics
-            engagement_metrics = self._aggregate_engagement_metrics(
-                student_id, date_from_obj, date_to_obj
-            )
-
-            # Calculate overall progress
-            overall_progress = self._calculate_overall_progress(
-                material_metrics, assignment_metrics
-            )
-
-            # Calculate trends
-            trends = self._calculate_progress_trends(
-                student_id, date_from_obj, date_to_obj
-            )
-
-            result = {
-                'student_id': student_id,
-                'overall_progress': round(overall_progress, 2),
-                'materials': material_metrics,
-                'assignments': assignment_metrics,
-                'engagement': engagement_metrics,
-                'trends': trends,
-                'date_from': date_from_obj.isoformat(),
-                'date_to': date_to_obj.isoformat()
-            }
+            engine = StudentMetricsEngine([student_id], date_from_obj, date_to_obj).load()
+            result = engine.progress_metrics(student_id)
 
             # Cache result
             self._set_cache(cache_key, result)
@@ -258,57 +550,73 @@ class ReportDataAggregationService:
             self.logger.error(f"Error aggregating student progress: {e}")
             raise
 
-    def _aggregate_material_progress(
+    def get_class_progress_metrics(
         self,
-        student_id: int,
-        date_from: date,
-        date_to: date
-    ) -> Dict[str, Any]:
+        student_ids: List[int],
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        use_cache: bool = True
+    ) -> Dict[int, Dict[str, Any]]:
         """
-        Aggregate material progress data for student.
+        Get progress metrics for many students at once.
+
+        Students missing from the cache are computed together by a single
+        StudentMetricsEngine load, so the query count does not grow with
+        the class size. Results share cache entries with
+        get_student_progress_metrics.
 
         Args:
-            student_id: Student ID
-            date_from: Start date
-            date_to: End date
+            student_ids: Student IDs
+            date_from: Start date (YYYY-MM-DD), default: 30 days ago
+            date_to: End date (YYYY-MM-DD), default: today
+            use_cache: Use cached results if available
 
         Returns:
-            Material progress metrics dict
+            {student_id: <get_student_progress_metrics result>}
         """
-        from materials.models import MaterialProgress
+        cache_keys = {
+            student_id: self._get_cache_key('student_progress_metrics', {
+                'student_id': student_id,
+                'date_from': date_from,
+                'date_to': date_to
+            })
+            for student_id in student_ids
+        }
 
-        # Get all material progress records
-        progress_records = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).values(
-            'material_id', 'progress_percentage', 'is_completed'
-        )
+        results: Dict[int, Dict[str, Any]] = {}
+        if use_cache:
+            try:
+                cached = cache.get_many(list(cache_keys.values()))
+            except Exception as e:
+                self.logger.warning(f"Cache read error: {e}")
+                cached = {}
+            for student_id, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    results[student_id] = cached[cache_key]
 
-        if not progress_records:
-            return {
-                'total': 0,
-                'completed': 0,
-                'in_progress': 0,
-                'not_started': 0,
-                'avg_progress': 0.0
-            }
+        missing = [student_id for student_id in cache_keys if student_id not in results]
+        if not missing:
+            return results
 
-        completed = sum(1 for r in progress_records if r['is_completed'])
-        in_progress = sum(1 for r in progress_records if r['progress_percentage'] > 0 and not r['is_completed'])
-        not_started = sum(1 for r in progress_records if r['progress_percentage'] == 0)
+        date_from_obj, date_to_obj = self._parse_date_range(date_from, date_to)
 
-        progress_values = [r['progress_percentage'] for r in progress_records if r['progress_percentage']]
-        avg_progress = mean(progress_values) if progress_values else 0.0
+        try:
+            engine = StudentMetricsEngine(missing, date_from_obj, date_to_obj).load()
+            computed = {student_id: engine.progress_metrics(student_id) for student_id in missing}
+        except Exception as e:
+            self.logger.error(f"Error aggregating class progress: {e}")
+            raise
 
-        return {
-            'total': len(progress_records),
-            'completed': completed,
-            'in_progress': in_progress,
-            'not_started': not_started,
-            'avg_progress': round(avg_progress, 2)
-        }
+        try:
+            cache.set_many(
+                {cache_keys[student_id]: data for student_id, data in computed.items()},
+                self.CACHE_TTL
+            )
+        except Exception as e:
+            self.logger.warning(f"Cache write error: {e}")
+
+        results.update(computed)
+        return results
 
     # ========================================================================
     # ASSIGNMENT STATISTICS
@@ -432,12 +740,14 @@ class ReportDataAggregationService:
             date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
             query = query.filter(submitted_at__date__lte=date_to_obj)
 
-        # Get submissions
-        submissions = query.select_related('assignment').values(
-            'id', 'score', 'is_late', 'submitted_at', 'assignment_id'
+        # Counts come from one aggregate query, not from loaded rows
+        totals = query.aggregate(
+            total=Count('id'),
+            late=Count('id', filter=Q(is_late=True)),
+            assignments=Count('assignment_id', distinct=True),
         )
 
-        if not submissions:
+        if not totals['total']:
             return {
                 'total_assignments': 0,
                 'total_submissions': 0,
@@ -448,17 +758,27 @@ class ReportDataAggregationService:
                 'submission_trends': []
             }
 
-        # Calculate statistics
-        total_submissions = len(submissions)
-        late_submissions = sum(1 for s in submissions if s.get('is_late'))
-
-        scores = [s['score'] for s in submissions if s.get('score') is not None]
+        total_submissions = totals['total']
+        late_submissions = totals['late']
+
+        if date_from or date_to:
+            # Sketches cover all time; build the window's histogram in the DB
+            sketch = ScoreSketch(dict(
+                query.filter(score__isnull=False)
+                .values('score')
+                .annotate(n=Count('id'))
+                .values_list('score', 'n')
+            ))
+        else:
+            sketch = ScoreSketchService.merged(
+                assignment_ids=[assignment_id] if assignment_id else None,
+                teacher_id=teacher_id
+            )
 
-        score_stats = self._calculate_score_statistics(scores)
-        score_dist = self._calculate_score_distribution(scores)
+        score_stats = self._score_statistics(sketch)
+        score_dist = self._score_distribution(sketch)
 
-        # Get unique assignments
-        unique_assignments = len(set(s['assignment_id'] for s in submissions))
+        unique_assignments = totals['assignments']
 
         # Get all assignments for completion rate
         if teacher_id:
@@ -478,7 +798,7 @@ class ReportDataAggregationService:
             'late_submission_rate': round(late_rate, 2),
             'score_statistics': score_stats,
             'score_distribution': score_dist,
-            'submission_trends': self._calculate_submission_trends(submissions)
+            'submission_trends': self._calculate_submission_trends(query)
         }
 
     # ========================================================================
@@ -555,75 +875,14 @@ class ReportDataAggregationService:
         date_to: Optional[str] = None
     ) -> Dict[str, Any]:
         """Calculate learning metrics from available data."""
-        from materials.models import MaterialProgress
-        from assignments.models import AssignmentSubmission
-
-        # Parse dates
-        if date_to is None:
-            date_to_obj = timezone.now().date()
-        else:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-
-        if date_from is None:
-            date_from_obj = date_to_obj - timedelta(days=30)
-        else:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-
-        # Calculate engagement
-        engagement_score = self._calculate_engagement_score(
-            student_id=student_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
-
-        # Calculate performance
-        performance_score = self._calculate_performance_score(
-            student_id=student_id,
-            teacher_id=teacher_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
-
-        # Determine activity level
-        activity_level = 'high' if engagement_score >= 75 else ('medium' if engagement_score >= 50 else 'low')
+        date_from_obj, date_to_obj = self._parse_date_range(date_from, date_to)
 
-        # Calculate time spent
-        time_spent = self._calculate_time_spent(
-            student_id=student_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
+        student_ids = [student_id] if student_id is not None else []
+        engine = StudentMetricsEngine(
+            student_ids, date_from_obj, date_to_obj, include_previous_period=False
+        ).load()
 
-        # Calculate participation rate
-        participation_rate = self._calculate_participation_rate(
-            student_id=student_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
-
-        # Calculate consistency
-        consistency_score = self._calculate_consistency_score(
-            student_id=student_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
-
-        # Calculate improvement trend
-        improvement_trend = self._calculate_improvement_trend(
-            student_id=student_id,
-            date_from=date_from_obj,
-            date_to=date_to_obj
-        )
-
-        return {
-            'engagement_score': round(engagement_score, 2),
-            'performance_score': round(performance_score, 2),
-            'activity_level': activity_level,
-            'time_spent_hours': round(time_spent, 2),
-            'participation_rate': round(participation_rate, 2),
-            'consistency_score': round(consistency_score, 2),
-            'improvement_trend': improvement_trend
-        }
+        return engine.learning_metrics(student_id, teacher_id=teacher_id)
 
     # ========================================================================
     # TIME-BASED AGGREGATION
@@ -904,184 +1163,47 @@ class ReportDataAggregationService:
     # HELPER METHODS
     # ========================================================================
 
-    def _aggregate_assignment_metrics(
-        self,
-        student_id: int,
-        date_from: date,
-        date_to: date
-    ) -> Dict[str, Any]:
-        """
-        Aggregate assignment metrics for a student.
-
-        Args:
-            student_id: Student ID
-            date_from: Start date
-            date_to: End date
-
-        Returns:
-            Assignment metrics dict
-        """
-        from assignments.models import AssignmentSubmission
-
-        submissions = AssignmentSubmission.objects.filter(
-            student_id=student_id,
-            submitted_at__date__gte=date_from,
-            submitted_at__date__lte=date_to
-        ).values('score', 'is_late', 'status')
-
-        if not submissions:
-            return {
-                'total': 0,
-                'submitted': 0,
-                'graded': 0,
-                'pending': 0,
-                'avg_score': 0.0,
-                'late_submissions': 0
-            }
-
-        submitted = len(submissions)
-        graded = sum(1 for s in submissions if s.get('status') == 'graded')
-        pending = sum(1 for s in submissions if s.get('status') in ('submitted', 'in_review'))
-        late = sum(1 for s in submissions if s.get('is_late'))
-
-        scores = [s['score'] for s in submissions if s.get('score') is not None]
-        avg_score = mean(scores) if scores else 0.0
-
-        return {
-            'total': submitted,
-            'submitted': submitted,
-            'graded': graded,
-            'pending': pending,
-            'avg_score': round(avg_score, 2),
-            'late_submissions': late
-        }
-
-    def _aggregate_engagement_metrics(
-        self,
-        student_id: int,
-        date_from: date,
-        date_to: date
-    ) -> Dict[str, Any]:
-        """
-        Aggregate engagement metrics for a student.
-
-        Args:
-            student_id: Student ID
-            date_from: Start date
-            date_to: End date
-
-        Returns:
-            Engagement metrics dict
-        """
-        from materials.models import MaterialProgress
-        from assignments.models import AssignmentSubmission
-
-        # Get total time spent from material progress
-        material_progress = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).aggregate(
-            total_time=Sum('time_spent')
-        )
-
-        total_time_minutes = material_progress.get('total_time') or 0
-        total_time_hours = total_time_minutes / 60 if total_time_minutes else 0
-
-        # Get activity days
-        activity_days = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).values(
-            'last_accessed__date'
-        ).distinct().count()
-
-        # Calculate avg session duration
-        days_in_period = (date_to - date_from).days + 1
-        avg_session = (total_time_minutes / activity_days) if activity_days > 0 else 0
-
-        return {
-            'total_time_spent_hours': round(total_time_hours, 2),
-            'avg_session_duration_minutes': round(avg_session, 2),
-            'activity_days': activity_days
-        }
-
-    def _calculate_overall_progress(
+    def _parse_date_range(
         self,
-        material_metrics: Dict[str, Any],
-        assignment_metrics: Dict[str, Any]
-    ) -> float:
-        """Calculate overall progress from material and assignment metrics."""
-        if material_metrics['total'] == 0 and assignment_metrics['total'] == 0:
-            return 0.0
-
-        material_progress = (material_metrics['avg_progress'] * material_metrics['total']) if material_metrics['total'] > 0 else 0
-        assignment_progress = (assignment_metrics['avg_score'] / 100 * 100 * assignment_metrics['total']) if assignment_metrics['total'] > 0 else 0
-
-        total_items = material_metrics['total'] + assignment_metrics['total']
-
-        if total_items == 0:
-            return 0.0
-
-        return (material_progress + assignment_progress) / total_items
-
-    def _calculate_progress_trends(
-        self,
-        student_id: int,
-        date_from: date,
-        date_to: date
-    ) -> Dict[str, Any]:
-        """Calculate progress trends."""
-        # Get previous period
-        period_length = (date_to - date_from).days
-        prev_date_to = date_from - timedelta(days=1)
-        prev_date_from = prev_date_to - timedelta(days=period_length)
-
-        # Get metrics for both periods
-        current_progress = self._calculate_overall_progress(
-            self._aggregate_material_progress(student_id, date_from, date_to),
-            self._aggregate_assignment_metrics(student_id, date_from, date_to)
-        )
-
-        prev_progress = self._calculate_overall_progress(
-            self._aggregate_material_progress(student_id, prev_date_from, prev_date_to),
-            self._aggregate_assignment_metrics(student_id, prev_date_from, prev_date_to)
-        )
+        date_from: Optional[str],
+        date_to: Optional[str],
+        default_days: int = 30
+    ) -> Tuple[date, date]:
+        """Parse YYYY-MM-DD bounds; default to the last `default_days` days."""
+        if date_to is None:
+            date_to_obj = timezone.now().date()
+        else:
+            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
 
-        change = current_progress - prev_progress
+        if date_from is None:
+            date_from_obj = date_to_obj - timedelta(days=default_days)
+        else:
+            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
 
-        return {
-            'previous_period_progress': round(prev_progress, 2),
-            'progress_change': round(change, 2),
-            'is_improving': change > 0
-        }
+        return date_from_obj, date_to_obj
 
     def _calculate_score_statistics(self, scores: List[float]) -> Dict[str, Any]:
         """Calculate score statistics."""
-        if not scores:
-            return self._empty_score_statistics()
+        return self._score_statistics(ScoreSketch.from_scores(scores))
 
-        sorted_scores = sorted(scores)
-
-        try:
-            std_dev = stdev(scores) if len(scores) > 1 else 0.0
-        except:
-            std_dev = 0.0
+    def _score_statistics(self, sketch: ScoreSketch) -> Dict[str, Any]:
+        """Calculate score statistics from a (possibly merged) score sketch."""
+        if not sketch.count:
+            return self._empty_score_statistics()
 
         percentiles = {
-            '25th': self._percentile(sorted_scores, 25),
-            '50th': self._percentile(sorted_scores, 50),
-            '75th': self._percentile(sorted_scores, 75),
-            '90th': self._percentile(sorted_scores, 90)
+            '25th': sketch.percentile(25),
+            '50th': sketch.percentile(50),
+            '75th': sketch.percentile(75),
+            '90th': sketch.percentile(90)
         }
 
         return {
-            'average': round(mean(scores), 2),
-            'median': round(median(scores), 2),
-            'min': round(min(scores), 2),
-            'max': round(max(scores), 2),
-            'std_dev': round(std_dev, 2),
+            'average': round(sketch.mean(), 2),
+            'median': round(sketch.median(), 2),
+            'min': round(sketch.min(), 2),
+            'max': round(sketch.max(), 2),
+            'std_dev': round(sketch.std_dev(), 2),
             'percentiles': {k: round(v, 2) for k, v in percentiles.items()}
         }
 
@@ -1098,207 +1220,54 @@ class ReportDataAggregationService:
 
     def _calculate_score_distribution(self, scores: List[float]) -> Dict[str, int]:
         """Calculate score distribution (letter grades)."""
-        if not scores:
-            return self._empty_score_distribution()
+        return self._score_distribution(ScoreSketch.from_scores(scores))
 
-        a = sum(1 for s in scores if s >= 90)
-        b = sum(1 for s in scores if 80 <= s < 90)
-        c = sum(1 for s in scores if 70 <= s < 80)
-        d = sum(1 for s in scores if 60 <= s < 70)
-        f = sum(1 for s in scores if s < 60)
+    def _score_distribution(self, sketch: ScoreSketch) -> Dict[str, int]:
+        """Calculate letter grade distribution from a score sketch."""
+        if not sketch.count:
+            return self._empty_score_distribution()
 
-        return {'a': a, 'b': b, 'c': c, 'd': d, 'f': f}
+        return {
+            'a': sketch.count_between(90),
+            'b': sketch.count_between(80, 90),
+            'c': sketch.count_between(70, 80),
+            'd': sketch.count_between(60, 70),
+            'f': sketch.count_between(float('-inf'), 60),
+        }
 
     def _empty_score_distribution(self) -> Dict[str, int]:
         """Return empty score distribution."""
         return {'a': 0, 'b': 0, 'c': 0, 'd': 0, 'f': 0}
 
-    def _calculate_submission_trends(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Calculate submission trends over time."""
-        from collections import defaultdict
-
-        trends_by_date = defaultdict(lambda: {'count': 0, 'avg_score': 0, 'scores': []})
-
-        for submission in submissions:
-            date = submission['submitted_at'].date() if submission.get('submitted_at') else timezone.now().date()
-            trends_by_date[date]['count'] += 1
-            if submission.get('score'):
-                trends_by_date[date]['scores'].append(submission['score'])
-
-        trends = []
-        for date in sorted(trends_by_date.keys()):
-            data = trends_by_date[date]
-            avg_score = mean(data['scores']) if data['scores'] else 0.0
-
-            trends.append({
-                'date': date.isoformat(),
-                'submission_count': data['count'],
-                'avg_score': round(avg_score, 2)
-            })
-
-        return trends
-
-    def _percentile(self, sorted_list: List[float], percentile: float) -> float:
-        """Calculate percentile from sorted list."""
-        if not sorted_list:
-            return 0.0
-
-        index = (percentile / 100) * len(sorted_list)
-
-        if index == int(index):
-            return sorted_list[int(index) - 1]
-        else:
-            lower = sorted_list[int(index) - 1]
-            upper = sorted_list[int(index)]
-            return lower + (upper - lower) * (index - int(index))
-
-    def _calculate_engagement_score(self, student_id: Optional[int], date_from: date, date_to: date) -> float:
-        """Calculate engagement score (0-100)."""
-        from materials.models import MaterialProgress
-        from assignments.models import AssignmentSubmission
-
-        # Count activities
-        material_updates = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).count()
-
-        submissions = AssignmentSubmission.objects.filter(
-            student_id=student_id,
-            submitted_at__date__gte=date_from,
-            submitted_at__date__lte=date_to
-        ).count()
-
-        total_activities = material_updates + submissions
-        period_days = (date_to - date_from).days + 1
-
-        # Activity frequency: aim for 1+ activity per day
-        engagement = min((total_activities / period_days) * 20, 100)
-
-        return engagement
-
-    def _calculate_performance_score(
-        self,
-        student_id: Optional[int],
-        teacher_id: Optional[int],
-        date_from: date,
-        date_to: date
-    ) -> float:
-        """Calculate performance score based on scores (0-100)."""
-        from assignments.models import AssignmentSubmission
-
-        submissions = AssignmentSubmission.objects.filter(
-            student_id=student_id,
-            submitted_at__date__gte=date_from,
-            submitted_at__date__lte=date_to
-        )
-
-        if teacher_id:
-            submissions = submissions.filter(assignment__author_id=teacher_id)
-
-        scores = list(submissions.values_list('score', flat=True).filter(score__isnull=False))
-
-        if not scores:
-            return 0.0
-
-        return mean(scores)
-
-    def _calculate_time_spent(self, student_id: Optional[int], date_from: date, date_to: date) -> float:
-        """Calculate time spent in hours."""
-        from materials.models import MaterialProgress
-
-        result = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).aggregate(
-            total=Sum('time_spent')
-        )
-
-        minutes = result['total'] or 0
-        return minutes / 60
-
-    def _calculate_participation_rate(self, student_id: Optional[int], date_from: date, date_to: date) -> float:
-        """Calculate participation rate (0-100)."""
-        from materials.models import MaterialProgress
-
-        # Get activity days vs period days
-        activity_days = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).values(
-            'last_accessed__date'
-        ).distinct().count()
-
-        period_days = (date_to - date_from).days + 1
-
-        return (activity_days / period_days * 100) if period_days > 0 else 0.0
-
-    def _calculate_consistency_score(self, student_id: Optional[int], date_from: date, date_to: date) -> float:
-        """Calculate consistency score (0-100)."""
-        from materials.models import MaterialProgress
-
-        # Check if student has regular activity
-        daily_activities = MaterialProgress.objects.filter(
-            student_id=student_id,
-            last_accessed__date__gte=date_from,
-            last_accessed__date__lte=date_to
-        ).values(
-            'last_accessed__date'
-        ).annotate(
-            count=Count('id')
+    def _calculate_submission_trends(self, query) -> List[Dict[str, Any]]:
+        """Calculate daily submission counts and average score in the DB."""
+        rows = (
+            query.annotate(day=TruncDate('submitted_at'))
+            .values('day')
+            .annotate(
+                submission_count=Count('id'),
+                scored=Count('id', filter=Q(score__gt=0)),
+                avg_score=Avg('score', filter=Q(score__gt=0)),
+            )
+            .order_by('day')
         )
 
-        if not daily_activities:
-            return 0.0
-
-        activity_counts = [d['count'] for d in daily_activities]
-
-        # Consistency = low variance in activity counts
-        if len(activity_counts) <= 1:
-            return 50.0
-
-        avg_count = mean(activity_counts)
-        variance = sum((x - avg_count) ** 2 for x in activity_counts) / len(activity_counts)
-
-        # Convert variance to 0-100 score (lower variance = higher consistency)
-        consistency = max(0, 100 - (variance * 5))
-
-        return consistency
-
-    def _calculate_improvement_trend(self, student_id: Optional[int], date_from: date, date_to: date) -> str:
-        """Determine improvement trend (improving/stable/declining)."""
-        from assignments.models import AssignmentSubmission
-
-        period_length = (date_to - date_from).days
-        mid_date = date_from + timedelta(days=period_length // 2)
-
-        # First half scores
-        first_half = AssignmentSubmission.objects.filter(
-            student_id=student_id,
-            submitted_at__date__gte=date_from,
-            submitted_at__date__lt=mid_date
-        ).aggregate(
-            avg=Avg('score')
-        )['avg']
-
-        # Second half scores
-        second_half = AssignmentSubmission.objects.filter(
-            student_id=student_id,
-            submitted_at__date__gte=mid_date,
-            submitted_at__date__lte=date_to
-        ).aggregate(
-            avg=Avg('score')
-        )['avg']
-
-        if first_half is None or second_half is None:
-            return 'stable'
-
-        if second_half > first_half * 1.05:
-            return 'improving'
-        elif second_half < first_half * 0.95:
-            return 'declining'
-        else:
-            return 'stable'
+        today = timezone.now().date()
+        trends_by_date: Dict[date, Dict[str, Any]] = {}
+        for row in rows:
+            # Undated submissions count as today, as before
+            day = row['day'] or today
+            entry = trends_by_date.setdefault(day, {'count': 0, 'weighted': 0.0, 'scored': 0})
+            entry['count'] += row['submission_count']
+            if row['scored']:
+                entry['weighted'] += float(row['avg_score']) * row['scored']
+                entry['scored'] += row['scored']
+
+        return [
+            {
+                'date': day.isoformat(),
+                'submission_count': data['count'],
+                'avg_score': round(data['weighted'] / data['scored'], 2) if data['scored'] else 0.0,
+            }
+            for day, data in sorted(trends_by_date.items())
+        ]
@@ -0,0 +1,223 @@
+"""
+Cross-process invalidation bus for the MultiLevelCache L1.
+
+Every worker process (Daphne, Gunicorn, Celery) keeps its own L1. When a
+process invalidates keys, tags or patterns, it publishes the operation on
+a Redis pub/sub channel; every other process evicts the matching L1
+entries as soon as the message arrives.
+
+Each message carries a sequence number taken from a Redis counter in the
+same Lua script that publishes it, so messages are numbered in publish
+order. A subscriber that sees a gap in the sequence, loses its
+connection, or finds the counter ahead of what it received flushes its
+whole L1 instead of risking stale data.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+# Atomically number and publish a message: seq|payload
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], seq .. '|' .. ARGV[2])
+return seq
+"""
+
+
+class CacheInvalidationBus:
+    """Publishes local L1 invalidations and applies remote ones."""
+
+    CHANNEL = 'reports:cache:l1-invalidate'
+    SEQUENCE_KEY = 'reports:cache:l1-invalidate:seq'
+    RESYNC_INTERVAL = 5         # seconds between sequence counter checks
+    RECONNECT_DELAY = 1         # seconds before resubscribing after an error
+
+    OP_TAGS = 'tags'
+    OP_KEYS = 'keys'
+    OP_PATTERNS = 'patterns'
+    OP_CLEAR = 'clear'
+
+    def __init__(self, cache_obj):
+        """
+        Args:
+            cache_obj: MultiLevelCache whose L1 this bus keeps in sync
+        """
+        self.cache_obj = cache_obj
+        self.origin = uuid.uuid4().hex
+        self._last_seq: Optional[int] = None
+        self._behind_since: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self.stats = {
+            'published': 0,
+            'received': 0,
+            'applied': 0,
+            'gaps': 0,
+            'flushes': 0,
+        }
+
+    @staticmethod
+    def _redis():
+        """Raw redis-py client behind django-redis, or None for other backends."""
+        client = getattr(cache, 'client', None)
+        if client is None or not hasattr(client, 'get_client'):
+            return None
+        return client.get_client(write=True)
+
+    def ensure_started(self) -> bool:
+        """Start the subscriber thread once per process (fork-safe)."""
+        if self._redis() is None:
+            return False
+
+        with self._start_lock:
+            pid = os.getpid()
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return True
+
+            # New process after fork: inherited sequence state is meaningless
+            self._pid = pid
+            self._last_seq = None
+            self._behind_since = None
+            self._thread = threading.Thread(
+                target=self._run, name='reports-cache-bus', daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Cache invalidation bus started (pid={pid})")
+            return True
+
+    def publish(self, op: str, items: Iterable[str] = ()) -> Optional[int]:
+        """
+        Publish an L1 invalidation to other processes.
+
+        Returns:
+            Sequence number of the message, None if the bus is unavailable
+        """
+        redis_client = self._redis()
+        if redis_client is None:
+            return None
+
+        payload = json.dumps({'origin': self.origin, 'op': op, 'items': list(items)})
+        try:
+            seq = redis_client.eval(PUBLISH_SCRIPT, 1, self.SEQUENCE_KEY, self.CHANNEL, payload)
+            self.stats['published'] += 1
+            return int(seq)
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed ({op}): {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bus counters and subscriber state."""
+        return {
+            **self.stats,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'last_seq': self._last_seq,
+        }
+
+    # ========== Subscriber ==========
+
+    def _run(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                redis_client = self._redis()
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+
+                # Anything published while we were not subscribed is lost
+                if self._last_seq is not None:
+                    self._flush('resubscribed')
+                self._last_seq = self._read_sequence(redis_client)
+                self._behind_since = None
+
+                last_check = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._handle(message['data'])
+
+                    if time.monotonic() - last_check >= self.RESYNC_INTERVAL:
+                        self._check_sequence(redis_client)
+                        last_check = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Cache invalidation bus disconnected: {e}")
+                self._flush('disconnected')
+                time.sleep(self.RECONNECT_DELAY)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _read_sequence(self, redis_client) -> int:
+        return int(redis_client.get(self.SEQUENCE_KEY) or 0)
+
+    def _check_sequence(self, redis_client) -> None:
+        """
+        Detect messages lost without a visible gap (e.g. the last ones).
+
+        The counter may be briefly ahead of delivered messages, so flush
+        only if we are still behind the same position on the next check.
+        """
+        current = self._read_sequence(redis_client)
+        if self._last_seq is None or current <= self._last_seq:
+            self._behind_since = None
+            return
+
+        if self._behind_since is not None and self._last_seq <= self._behind_since:
+            self.stats['gaps'] += 1
+            self._flush(f'behind sequence {self._last_seq} < {current}')
+            self._last_seq = current
+            self._behind_since = None
+        else:
+            self._behind_since = self._last_seq
+
+    def _handle(self, data) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        seq_str, payload = data.split('|', 1)
+        seq = int(seq_str)
+        self.stats['received'] += 1
+
+        if self._last_seq is not None and seq > self._last_seq + 1:
+            self.stats['gaps'] += 1
+            self._flush(f'sequence gap {self._last_seq} -> {seq}')
+        if self._last_seq is None or seq > self._last_seq:
+            self._last_seq = seq
+
+        message = json.loads(payload)
+        if message['origin'] == self.origin:
+            return
+
+        self._apply(message['op'], message.get('items', []))
+        self.stats['applied'] += 1
+
+    def _apply(self, op: str, items) -> None:
+        if op == self.OP_TAGS:
+            self.cache_obj._invalidate_memory_tags(items)
+        elif op == self.OP_KEYS:
+            for key in items:
+                self.cache_obj._delete_from_memory(key)
+        elif op == self.OP_PATTERNS:
+            for pattern in items:
+                self.cache_obj._delete_from_memory_pattern(pattern)
+        elif op == self.OP_CLEAR:
+            self.cache_obj._clear_memory()
+        else:
+            logger.warning(f"Unknown cache invalidation op: {op}")
+
+    def _flush(self, reason: str) -> None:
+        self.stats['flushes'] += 1
+        self.cache_obj._clear_memory()
+        logger.info(f"L1 cache flushed by invalidation bus: {reason}")
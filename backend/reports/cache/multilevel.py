@@ -18,10 +18,17 @@ Features:
 import logging
 import hashlib
 import json
-from datetime import datetime, timedelta
+import math
+import re
+import pickle
+import random
+import sys
+import time
+import uuid
+from collections import OrderedDict
 from typing import Any, Dict, Optional, Tuple, List
 from functools import lru_cache
-from threading import RLock
+from threading import Event, Lock, RLock
 
 from django.core.cache import cache, caches
 from django.utils import timezone
@@ -30,6 +37,175 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# L1 BOUNDED MEMORY CACHE
+# ============================================================================
+
+class BoundedMemoryCache:
+    """
+    Per-process LRU cache with a byte budget per key namespace.
+
+    Namespace is the key prefix before the first ':' ('analytics',
+    'dashboard', 'report', ...). Each namespace has its own LRU order and
+    byte budget; when a namespace goes over budget, expired entries are
+    dropped first, then least recently used ones. Entry size is the
+    pickled size of the value (the same representation L2 stores).
+    """
+
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32 MB per namespace
+
+    def __init__(
+        self,
+        default_max_bytes: int = DEFAULT_MAX_BYTES,
+        namespace_max_bytes: Optional[Dict[str, int]] = None,
+    ):
+        self.default_max_bytes = default_max_bytes
+        self.namespace_max_bytes = namespace_max_bytes or {}
+        self._lock = RLock()
+        # namespace -> OrderedDict[key, (value, expires_at, size)]
+        self._namespaces: Dict[str, OrderedDict] = {}
+        self._bytes: Dict[str, int] = {}
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+
+    @staticmethod
+    def namespace_of(key: str) -> str:
+        """Get namespace (prefix before first ':') of a cache key."""
+        return key.split(':', 1)[0]
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """Estimate memory footprint of a value in bytes."""
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(value)
+
+    def max_bytes_for(self, namespace: str) -> int:
+        """Byte budget of a namespace."""
+        return self.namespace_max_bytes.get(namespace, self.default_max_bytes)
+
+    def get(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Get value, refreshing its LRU position. Expired entries are removed."""
+        namespace = self.namespace_of(key)
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if not entries or key not in entries:
+                return None, False
+
+            value, expires_at, size = entries[key]
+            if time.monotonic() > expires_at:
+                self._remove(namespace, key)
+                self._expirations += 1
+                return None, False
+
+            entries.move_to_end(key)
+            return value, True
+
+    def set(self, key: str, value: Any, ttl: int) -> bool:
+        """
+        Store value for ttl seconds.
+
+        Returns:
+            False if the value alone exceeds the namespace budget (not stored)
+        """
+        namespace = self.namespace_of(key)
+        size = self.estimate_size(value)
+        max_bytes = self.max_bytes_for(namespace)
+
+        with self._lock:
+            if key in self._namespaces.get(namespace, ()):
+                self._remove(namespace, key)
+
+            if size > max_bytes:
+                self._rejected += 1
+                return False
+
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes[namespace] = self._bytes.get(namespace, 0) + size
+
+            if self._bytes[namespace] > max_bytes:
+                self._expirations += self._purge_expired_namespace(namespace)
+            while self._bytes[namespace] > max_bytes:
+                oldest_key = next(iter(entries))
+                self._remove(namespace, oldest_key)
+                self._evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if it was present."""
+        namespace = self.namespace_of(key)
+        with self._lock:
+            if key not in self._namespaces.get(namespace, ()):
+                return False
+            self._remove(namespace, key)
+            return True
+
+    def keys(self) -> List[str]:
+        """Snapshot of all stored keys."""
+        with self._lock:
+            return [key for entries in self._namespaces.values() for key in entries]
+
+    def purge_expired(self) -> int:
+        """Remove expired entries in all namespaces. Returns number removed."""
+        with self._lock:
+            removed = sum(
+                self._purge_expired_namespace(namespace)
+                for namespace in list(self._namespaces)
+            )
+            self._expirations += removed
+            return removed
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._namespaces.clear()
+            self._bytes.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._namespaces.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts, byte usage per namespace and eviction counters."""
+        with self._lock:
+            return {
+                'entries': sum(len(entries) for entries in self._namespaces.values()),
+                'bytes': sum(self._bytes.values()),
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'rejected': self._rejected,
+                'namespaces': {
+                    namespace: {
+                        'entries': len(entries),
+                        'bytes': self._bytes.get(namespace, 0),
+                        'max_bytes': self.max_bytes_for(namespace),
+                    }
+                    for namespace, entries in self._namespaces.items()
+                },
+            }
+
+    def _remove(self, namespace: str, key: str) -> None:
+        entries = self._namespaces[namespace]
+        _, _, size = entries.pop(key)
+        self._bytes[namespace] -= size
+        if not entries:
+            del self._namespaces[namespace]
+            del self._bytes[namespace]
+
+    def _purge_expired_namespace(self, namespace: str) -> int:
+        entries = self._namespaces.get(namespace)
+        if not entries:
+            return 0
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at, _) in entries.items() if now > expires_at]
+        for key in expired:
+            self._remove(namespace, key)
+        return len(expired)
+
+
 # ============================================================================
 # MULTI-LEVEL CACHE STRATEGY
 # ============================================================================
@@ -43,6 +219,20 @@ class MultiLevelCache:
     - TTL management per level
     - Cache statistics and monitoring
     - Invalidation strategies
+    - Single-flight compute: one computation per key per process (thread
+      coalescing) and across processes (short lease via cache.add)
+    - Stale-while-revalidate: L2 entries outlive their TTL by STALE_GRACE
+      seconds and are served to waiters while the lease holder recomputes;
+      hot keys are refreshed early with probability growing towards expiry
+      (XFetch, weighted by how long the last computation took)
+    - Tag-based invalidation: every entry is registered under tags
+      (explicit ones plus tags derived from the key, see derive_tags).
+      L2 entries keep a snapshot of their tags' generations; bumping a tag
+      generation invalidates all its entries in O(1). L1 keeps a
+      tag -> keys index and drops the keys directly.
+    - Cross-process L1 invalidation: with REPORTS_CACHE_L1['INVALIDATION_BUS']
+      every L1 invalidation is published to the other worker processes
+      (see reports.cache.bus.CacheInvalidationBus)
     """
 
     # Cache TTLs (in seconds)
@@ -50,22 +240,65 @@ class MultiLevelCache:
     TTL_L2_REDIS = 3600         # 1 hour in Redis
     TTL_L3_VIEWS = 86400 * 7    # 7 days for materialized views
 
+    # Single-flight / stale-while-revalidate settings (in seconds)
+    STALE_GRACE = 300           # how long an expired L2 entry can be served stale
+    LOCK_TTL = 30               # compute lease lifetime
+    LOCK_WAIT_TIMEOUT = 10      # how long waiters wait for the lease holder
+    LOCK_POLL_INTERVAL = 0.1    # L2 poll interval while waiting
+    EARLY_REFRESH_BETA = 1.0    # XFetch beta (>1 refreshes earlier)
+
+    # Tag generations live forever in L2 (None = no expiry)
+    TAG_KEY_PREFIX = 'cachetag:'
+
+    # Key conventions -> tags (see CacheInvalidationTrigger)
+    KEY_TAG_RULES = [
+        (re.compile(r'^analytics:student:(\d+):'), 'student:{0}'),
+        (re.compile(r'^analytics:assignment:(\d+):'), 'assignment:{0}'),
+        (re.compile(r'^analytics:progress:material_(\d+)'), 'material:{0}'),
+        (re.compile(r'^[a-z_]+:user_(\d+):'), 'user:{0}'),
+        (re.compile(r'^report:([a-z_]+):'), 'report_type:{0}'),
+    ]
+
     # Cache level names
     LEVEL_MEMORY = 'memory'
     LEVEL_REDIS = 'redis'
     LEVEL_VIEWS = 'views'
+    LEVEL_STALE = 'stale'
 
     def __init__(self):
-        """Initialize multi-level cache with in-memory L1."""
-        self._memory_cache = {}  # Simple dict for L1
-        self._memory_lock = RLock()  # Thread-safe access
-        self._memory_timestamps = {}  # Track expiration
+        """Initialize multi-level cache with bounded in-memory L1."""
+        l1_config = getattr(settings, 'REPORTS_CACHE_L1', {})
+        self.TTL_L1_MEMORY = l1_config.get('TTL', self.TTL_L1_MEMORY)
+        self._bus = None
+        if l1_config.get('INVALIDATION_BUS'):
+            from .bus import CacheInvalidationBus
+
+            self._bus = CacheInvalidationBus(self)
+        self._memory_cache = BoundedMemoryCache(
+            default_max_bytes=l1_config.get(
+                'DEFAULT_MAX_BYTES', BoundedMemoryCache.DEFAULT_MAX_BYTES
+            ),
+            namespace_max_bytes=l1_config.get('NAMESPACE_MAX_BYTES'),
+        )
+        # tag -> L1 keys registered under it
+        self._tag_index: Dict[str, set] = {}
+        self._tag_lock = Lock()
+        # key -> Event set when the in-process leader finishes computing
+        self._inflight: Dict[str, Event] = {}
+        self._inflight_lock = Lock()
+        self._flight_stats = {
+            'coalesced': 0,
+            'lease_waits': 0,
+            'stale_served': 0,
+            'early_refreshes': 0,
+        }
 
     def get(
         self,
         key: str,
         compute_func: Optional[callable] = None,
-        ttl_config: Optional[Dict[str, int]] = None
+        ttl_config: Optional[Dict[str, int]] = None,
+        tags: Optional[List[str]] = None,
     ) -> Tuple[Any, str]:
         """
         Get value from cache with automatic level fallback.
@@ -74,10 +307,13 @@ class MultiLevelCache:
             key: Cache key
             compute_func: Optional function to compute value if not cached
             ttl_config: Optional TTL config {'l1': 60, 'l2': 3600}
+            tags: Extra invalidation tags for a computed value
+                  (tags derived from the key are always added)
 
         Returns:
             Tuple (value, cache_level) where cache_level is 'memory', 'redis',
-            'views', 'compute', or 'miss'
+            'views', 'compute', 'stale' (expired value served while another
+            worker recomputes), 'error' or 'miss'
         """
         ttl_config = ttl_config or {
             'l1': self.TTL_L1_MEMORY,
@@ -90,26 +326,34 @@ class MultiLevelCache:
             logger.debug(f"Cache L1 HIT: {key}")
             return value, self.LEVEL_MEMORY
 
-        # L2: Check Redis cache
-        value, hit = self._get_from_redis(key)
-        if hit:
+        tags = self.derive_tags(key, tags)
+
+        # L2: Check Redis cache (entries of invalidated tags are dropped)
+        entry = self._get_entry_from_redis(key)
+        if entry is not None and not self._tags_current(entry):
+            entry = None
+        now = time.time()
+        if entry is not None and now < entry['expires_at']:
+            if compute_func and self._should_refresh_early(entry, now):
+                # Only the lease holder refreshes, everyone else keeps serving L2
+                self._flight_stats['early_refreshes'] += 1
+                value, level = self._compute_single_flight(
+                    key, compute_func, ttl_config, tags, stale_entry=entry
+                )
+                if level == 'compute':
+                    return value, level
+
             logger.debug(f"Cache L2 HIT: {key}")
             # Populate L1 from L2
-            self._set_to_memory(key, value, ttl_config['l1'])
-            return value, self.LEVEL_REDIS
+            self._set_to_memory(key, entry['value'], ttl_config['l1'], tags)
+            return entry['value'], self.LEVEL_REDIS
 
         # L3: If compute_func provided, compute and cache
         if compute_func:
             logger.debug(f"Cache COMPUTE: {key}")
-            try:
-                value = compute_func()
-                # Store in both L1 and L2
-                self._set_to_memory(key, value, ttl_config['l1'])
-                self._set_to_redis(key, value, ttl_config['l2'])
-                return value, 'compute'
-            except Exception as e:
-                logger.error(f"Cache compute failed for {key}: {e}")
-                return None, 'error'
+            return self._compute_single_flight(
+                key, compute_func, ttl_config, tags, stale_entry=entry
+            )
 
         logger.debug(f"Cache MISS: {key}")
         return None, 'miss'
@@ -119,7 +363,8 @@ class MultiLevelCache:
         key: str,
         value: Any,
         ttl_l1: int = None,
-        ttl_l2: int = None
+        ttl_l2: int = None,
+        tags: Optional[List[str]] = None,
     ) -> bool:
         """
         Set value in multi-level cache.
@@ -129,6 +374,7 @@ class MultiLevelCache:
             value: Value to cache
             ttl_l1: L1 TTL in seconds (default: 60)
             ttl_l2: L2 TTL in seconds (default: 3600)
+            tags: Extra invalidation tags (tags derived from the key are always added)
 
         Returns:
             True if successful
@@ -136,12 +382,14 @@ class MultiLevelCache:
         ttl_l1 = ttl_l1 or self.TTL_L1_MEMORY
         ttl_l2 = ttl_l2 or self.TTL_L2_REDIS
 
+        tags = self.derive_tags(key, tags)
+
         try:
             # Set in L1
-            self._set_to_memory(key, value, ttl_l1)
+            self._set_to_memory(key, value, ttl_l1, tags)
 
             # Set in L2
-            self._set_to_redis(key, value, ttl_l2)
+            self._set_to_redis(key, value, ttl_l2, tag_versions=self._tag_versions(tags))
 
             logger.debug(f"Cache SET: {key} (L1: {ttl_l1}s, L2: {ttl_l2}s)")
             return True
@@ -163,6 +411,7 @@ class MultiLevelCache:
         try:
             if include_l1:
                 self._delete_from_memory(key)
+                self._publish_invalidation('keys', [key])
             self._delete_from_redis(key)
             logger.info(f"Cache INVALIDATE: {key}")
             return True
@@ -170,6 +419,52 @@ class MultiLevelCache:
             logger.error(f"Cache invalidate failed for {key}: {e}")
             return False
 
+    def invalidate_tags(self, tags: List[str], include_l1: bool = True) -> int:
+        """
+        Invalidate all entries registered under any of the tags.
+
+        L2: bumps each tag generation in one pipelined round trip, entries
+        with an older snapshot are ignored on read and expire on their own.
+        L1: drops keys from the tag index of this process.
+
+        Args:
+            tags: Tags to invalidate (e.g. ['student:5', 'assignment:7'])
+            include_l1: Also clear L1 cache
+
+        Returns:
+            Number of L1 entries dropped
+        """
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return 0
+
+        self._bump_tags(tags)
+
+        count = 0
+        if include_l1:
+            count = self._invalidate_memory_tags(tags)
+            self._publish_invalidation('tags', tags)
+
+        logger.info(f"Cache INVALIDATE TAGS: {tags} ({count} L1 keys)")
+        return count
+
+    @classmethod
+    def derive_tags(cls, key: str, tags: Optional[List[str]] = None) -> List[str]:
+        """
+        Tags of a key: namespace tag, tags from key conventions and explicit tags.
+
+        Example: 'analytics:student:5:summary' ->
+                 ['ns:analytics', 'student:5']
+        """
+        derived = [f'ns:{BoundedMemoryCache.namespace_of(key)}']
+        for regex, template in cls.KEY_TAG_RULES:
+            match = regex.match(key)
+            if match:
+                derived.append(template.format(*match.groups()))
+        if tags:
+            derived.extend(tags)
+        return list(dict.fromkeys(derived))
+
     def invalidate_pattern(
         self,
         pattern: str,
@@ -189,6 +484,7 @@ class MultiLevelCache:
 
         if include_l1:
             count += self._delete_from_memory_pattern(pattern)
+            self._publish_invalidation('patterns', [pattern])
 
         count += self._delete_from_redis_pattern(pattern)
 
@@ -209,9 +505,8 @@ class MultiLevelCache:
         """
         try:
             if include_l1:
-                with self._memory_lock:
-                    self._memory_cache.clear()
-                    self._memory_timestamps.clear()
+                self._clear_memory()
+                self._publish_invalidation('clear')
 
             cache.clear()  # L2 Redis
             logger.info("Cache CLEAR ALL")
@@ -231,8 +526,9 @@ class MultiLevelCache:
             'timestamp': timezone.now().isoformat(),
             'l1_memory': {
                 'size': len(self._memory_cache),
-                'backend': 'in-memory',
+                'backend': 'in-memory-lru',
                 'ttl': self.TTL_L1_MEMORY,
+                **self._memory_cache.get_stats(),
             },
             'l2_redis': {
                 'backend': 'redis',
@@ -244,77 +540,351 @@ class MultiLevelCache:
                 'ttl': self.TTL_L3_VIEWS,
                 'status': 'available',
             },
+            'tags': {
+                'l1_indexed_tags': len(self._tag_index),
+            },
+            'invalidation_bus': (
+                self._bus.get_stats() if self._bus else {'enabled': False}
+            ),
+            'single_flight': {
+                **self._flight_stats,
+                'inflight': len(self._inflight),
+                'stale_grace': self.STALE_GRACE,
+            },
         }
 
+    # ========== Private Methods: Single-Flight Compute ==========
+
+    def _should_refresh_early(self, entry: Dict[str, Any], now: float) -> bool:
+        """XFetch: refresh before expiry with probability rising towards it."""
+        delta = entry.get('delta') or 0
+        if delta <= 0:
+            return False
+        jitter = -math.log(random.random() or 1e-12)
+        return now + delta * self.EARLY_REFRESH_BETA * jitter >= entry['expires_at']
+
+    def _compute_single_flight(
+        self,
+        key: str,
+        compute_func: callable,
+        ttl_config: Dict[str, int],
+        tags: List[str],
+        stale_entry: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Compute value so that only one caller per key does the work.
+
+        Threads of this process wait for the in-process leader; the leader
+        takes a cross-process lease. If the lease is held elsewhere, stale
+        data is served when available, otherwise L2 is polled until the
+        holder publishes the value (or LOCK_WAIT_TIMEOUT passes).
+
+        Returns:
+            Tuple (value, cache_level): 'compute', 'redis', 'memory',
+            'stale' or 'error'
+        """
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = Event()
+
+        if not leader:
+            self._flight_stats['coalesced'] += 1
+            if stale_entry is not None:
+                self._flight_stats['stale_served'] += 1
+                return stale_entry['value'], self.LEVEL_STALE
+            event.wait(self.LOCK_WAIT_TIMEOUT)
+            value, hit = self._get_from_memory(key)
+            if hit:
+                return value, self.LEVEL_MEMORY
+            entry = self._get_entry_from_redis(key)
+            if entry is not None and self._tags_current(entry):
+                return entry['value'], self.LEVEL_REDIS
+            # Leader failed or timed out - compute without coalescing
+            return self._compute_and_store(key, compute_func, ttl_config, tags, stale_entry)
+
+        lock_key = f'lock:{key}'
+        token = uuid.uuid4().hex
+        try:
+            if not self._acquire_lease(lock_key, token):
+                if stale_entry is not None:
+                    self._flight_stats['stale_served'] += 1
+                    return stale_entry['value'], self.LEVEL_STALE
+
+                self._flight_stats['lease_waits'] += 1
+                entry = self._wait_for_lease_holder(key, lock_key)
+                if entry is not None:
+                    self._set_to_memory(key, entry['value'], ttl_config['l1'], tags)
+                    return entry['value'], self.LEVEL_REDIS
+
+                # Holder did not publish in time - take over
+                self._acquire_lease(lock_key, token)
+
+            return self._compute_and_store(key, compute_func, ttl_config, tags, stale_entry)
+        finally:
+            self._release_lease(lock_key, token)
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _compute_and_store(
+        self,
+        key: str,
+        compute_func: callable,
+        ttl_config: Dict[str, int],
+        tags: List[str],
+        stale_entry: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Any, str]:
+        """Run compute_func and store the result in L1 and L2."""
+        # Snapshot before computing: an invalidation racing with the
+        # computation makes the stored value outdated immediately
+        tag_versions = self._tag_versions(tags)
+        started = time.time()
+        try:
+            value = compute_func()
+        except Exception as e:
+            logger.error(f"Cache compute failed for {key}: {e}")
+            if stale_entry is not None:
+                self._flight_stats['stale_served'] += 1
+                return stale_entry['value'], self.LEVEL_STALE
+            return None, 'error'
+
+        delta = time.time() - started
+        # Store in both L1 and L2
+        self._set_to_memory(key, value, ttl_config['l1'], tags)
+        self._set_to_redis(
+            key, value, ttl_config['l2'], delta=delta, tag_versions=tag_versions
+        )
+        return value, 'compute'
+
+    def _acquire_lease(self, lock_key: str, token: str) -> bool:
+        """Take the cross-process compute lease (SET NX with TTL)."""
+        try:
+            return bool(cache.add(lock_key, token, self.LOCK_TTL))
+        except Exception as e:
+            logger.warning(f"Compute lease unavailable for {lock_key}: {e}")
+            # Without L2 there is nothing to coordinate with - compute locally
+            return True
+
+    def _release_lease(self, lock_key: str, token: str) -> None:
+        """Release the lease if this caller still owns it."""
+        try:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Failed to release compute lease {lock_key}: {e}")
+
+    def _wait_for_lease_holder(self, key: str, lock_key: str) -> Optional[Dict[str, Any]]:
+        """Poll L2 until another process publishes a fresh value or the lease ends."""
+        deadline = time.monotonic() + self.LOCK_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(self.LOCK_POLL_INTERVAL)
+            entry = self._get_entry_from_redis(key)
+            if (
+                entry is not None
+                and time.time() < entry['expires_at']
+                and self._tags_current(entry)
+            ):
+                return entry
+            try:
+                if cache.get(lock_key) is None:
+                    entry = self._get_entry_from_redis(key)
+                    return entry if entry and self._tags_current(entry) else None
+            except Exception:
+                return None
+        return None
+
+    # ========== Private Methods: Invalidation Bus ==========
+
+    def start_invalidation_bus(self) -> bool:
+        """Start the bus subscriber for this process (no-op when disabled)."""
+        return self._bus.ensure_started() if self._bus else False
+
+    def _publish_invalidation(self, op: str, items: List[str] = ()) -> None:
+        """Tell other processes to apply the same L1 invalidation."""
+        if self._bus:
+            self._bus.ensure_started()
+            self._bus.publish(op, items)
+
+    # ========== Private Methods: Tags ==========
+
+    def _tag_key(self, tag: str) -> str:
+        return f'{self.TAG_KEY_PREFIX}{tag}'
+
+    def _tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        """
+        Current generations of tags, initializing missing ones.
+
+        New generations start at the current time in ms, so a tag whose
+        counter was lost (eviction, flush) never matches old snapshots.
+        """
+        if not tags:
+            return {}
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            versions = cache.get_many(tag_keys)
+            for tag_key in tag_keys:
+                if tag_key not in versions:
+                    cache.add(tag_key, int(time.time() * 1000), None)
+                    versions[tag_key] = cache.get(tag_key)
+            return versions
+        except Exception as e:
+            logger.warning(f"Tag versions unavailable: {e}")
+            return {}
+
+    def _tags_current(self, entry: Dict[str, Any]) -> bool:
+        """Check that no tag of an L2 entry was invalidated after it was stored."""
+        snapshot = entry.get('tags')
+        if not snapshot:
+            return True
+        try:
+            current = cache.get_many(list(snapshot))
+        except Exception as e:
+            logger.warning(f"Tag check failed: {e}")
+            return False
+        return all(current.get(tag_key) == version for tag_key, version in snapshot.items())
+
+    def _bump_tags(self, tags: List[str]) -> None:
+        """Increment tag generations (single pipeline on Redis)."""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            client = getattr(cache, 'client', None)
+            if client is not None and hasattr(client, 'get_client'):
+                pipe = client.get_client(write=True).pipeline(transaction=False)
+                for tag_key in tag_keys:
+                    pipe.incr(cache.make_key(tag_key))
+                pipe.execute()
+                return
+
+            for tag_key in tag_keys:
+                try:
+                    cache.incr(tag_key)
+                except ValueError:
+                    cache.add(tag_key, int(time.time() * 1000), None)
+        except Exception as e:
+            logger.warning(f"Tag bump failed for {tags}: {e}")
+
+    def _invalidate_memory_tags(self, tags: List[str]) -> int:
+        """Drop L1 keys registered under tags."""
+        with self._tag_lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tag_index.pop(tag, ()))
+        return sum(1 for key in keys if self._memory_cache.delete(key))
+
+    def _index_memory_tags(self, key: str, tags: Optional[List[str]]) -> None:
+        if not tags:
+            return
+        with self._tag_lock:
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+    def _prune_tag_index(self) -> None:
+        """Forget L1 keys that were evicted or expired."""
+        live_keys = set(self._memory_cache.keys())
+        with self._tag_lock:
+            for tag in list(self._tag_index):
+                self._tag_index[tag] &= live_keys
+                if not self._tag_index[tag]:
+                    del self._tag_index[tag]
+
     # ========== Private Methods: L1 In-Memory Cache ==========
 
     def _get_from_memory(self, key: str) -> Tuple[Optional[Any], bool]:
         """Get value from L1 in-memory cache."""
-        with self._memory_lock:
-            if key not in self._memory_cache:
-                return None, False
+        return self._memory_cache.get(key)
 
-            # Check expiration
-            timestamp = self._memory_timestamps.get(key)
-            if timestamp and timezone.now() > timestamp:
-                # Expired, delete it
-                del self._memory_cache[key]
-                del self._memory_timestamps[key]
-                return None, False
-
-            return self._memory_cache[key], True
-
-    def _set_to_memory(self, key: str, value: Any, ttl: int) -> bool:
+    def _set_to_memory(
+        self, key: str, value: Any, ttl: int, tags: Optional[List[str]] = None
+    ) -> bool:
         """Set value in L1 in-memory cache."""
         try:
-            with self._memory_lock:
-                self._memory_cache[key] = value
-                self._memory_timestamps[key] = timezone.now() + timedelta(seconds=ttl)
-            return True
+            stored = self._memory_cache.set(key, value, ttl)
+            if stored:
+                self._index_memory_tags(key, tags)
+            return stored
         except Exception as e:
             logger.warning(f"L1 set failed: {e}")
             return False
 
     def _delete_from_memory(self, key: str) -> bool:
         """Delete value from L1 in-memory cache."""
-        with self._memory_lock:
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-                if key in self._memory_timestamps:
-                    del self._memory_timestamps[key]
-                return True
-        return False
+        return self._memory_cache.delete(key)
 
     def _delete_from_memory_pattern(self, pattern: str) -> int:
         """Delete all values matching pattern from L1."""
+        regex = re.compile(pattern.replace('*', '.*'))
         count = 0
-        with self._memory_lock:
-            # Convert wildcard pattern to regex
-            import re
-            regex = pattern.replace('*', '.*')
-            for key in list(self._memory_cache.keys()):
-                if re.match(regex, key):
-                    del self._memory_cache[key]
-                    if key in self._memory_timestamps:
-                        del self._memory_timestamps[key]
-                    count += 1
+        for key in self._memory_cache.keys():
+            if regex.match(key) and self._memory_cache.delete(key):
+                count += 1
         return count
 
+    def _clear_memory(self) -> None:
+        """Drop all L1 entries and the tag index."""
+        self._memory_cache.clear()
+        with self._tag_lock:
+            self._tag_index.clear()
+
+    def purge_expired_memory(self) -> int:
+        """Remove expired L1 entries. Returns number removed."""
+        removed = self._memory_cache.purge_expired()
+        self._prune_tag_index()
+        return removed
+
     # ========== Private Methods: L2 Redis Cache ==========
 
-    def _get_from_redis(self, key: str) -> Tuple[Optional[Any], bool]:
-        """Get value from L2 Redis cache."""
+    def _get_entry_from_redis(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get L2 entry envelope {'value', 'expires_at', 'delta'}.
+
+        The entry may already be past expires_at (stale, within STALE_GRACE).
+        """
         try:
-            value = cache.get(key)
-            return value, value is not None
+            entry = cache.get(key)
         except Exception as e:
             logger.warning(f"L2 get failed: {e}")
+            return None
+
+        if entry is None:
+            return None
+        if isinstance(entry, dict) and entry.get('__mlc__'):
+            return entry
+        # Value written by an older version or directly via django cache
+        return {'value': entry, 'expires_at': float('inf'), 'delta': 0}
+
+    def _get_from_redis(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Get fresh value from L2 Redis cache."""
+        entry = self._get_entry_from_redis(key)
+        if entry is None or time.time() >= entry['expires_at']:
             return None, False
+        return entry['value'], True
 
-    def _set_to_redis(self, key: str, value: Any, ttl: int) -> bool:
-        """Set value in L2 Redis cache."""
+    def _set_to_redis(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        delta: float = 0,
+        tag_versions: Optional[Dict[str, int]] = None,
+    ) -> bool:
+        """
+        Set value in L2 Redis cache.
+
+        Stored as an envelope with the logical expiry and tag generations;
+        the Redis TTL is longer by STALE_GRACE so the value can still be
+        served stale.
+        """
+        entry = {
+            '__mlc__': 1,
+            'value': value,
+            'expires_at': time.time() + ttl,
+            'delta': delta,
+            'tags': tag_versions or {},
+        }
         try:
-            cache.set(key, value, ttl)
+            cache.set(key, entry, ttl + self.STALE_GRACE)
             return True
         except Exception as e:
             logger.warning(f"L2 set failed: {e}")
@@ -338,9 +908,9 @@ class MultiLevelCache:
             if hasattr(redis_client, 'scan_iter'):
                 # Redis pattern scan
                 keys = list(redis_client.scan_iter(match=pattern, count=100))
-                for key in keys:
-                    cache.delete(key)
-                    count += 1
+                if keys:
+                    cache.delete_many(keys)
+                count = len(keys)
             else:
                 logger.warning(f"Redis client doesn't support pattern scan")
         except Exception as e:
@@ -374,6 +944,7 @@ _multilevel_cache = MultiLevelCache()
 
 def get_multilevel_cache() -> MultiLevelCache:
     """Get global multi-level cache instance."""
+    _multilevel_cache.start_invalidation_bus()
     return _multilevel_cache
 
 
@@ -392,7 +963,8 @@ class CacheInvalidationTrigger:
     - Reports are generated
     """
 
-    # Cache key patterns for different entities
+    # Cache key patterns for different entities (manual invalidation API).
+    # Automatic triggers below use tags instead of pattern scans.
     PATTERNS = {
         'analytics_student': 'analytics:student:*',
         'analytics_assignment': 'analytics:assignment:*',
@@ -413,24 +985,17 @@ class CacheInvalidationTrigger:
             student_id: Optional student ID (if specific student)
 
         Returns:
-            Number of invalidated keys
+            Number of invalidated L1 keys
         """
-        cache_obj = get_multilevel_cache()
-        count = 0
-
-        # Invalidate assignment analytics
-        pattern = f'analytics:assignment:{assignment_id}:*'
-        count += cache_obj.invalidate_pattern(pattern)
+        tags = [f'assignment:{assignment_id}']
 
-        # Invalidate student analytics if provided
+        # Invalidate student analytics and dashboard if provided
         if student_id:
-            pattern = f'analytics:student:{student_id}:*'
-            count += cache_obj.invalidate_pattern(pattern)
+            tags += [f'student:{student_id}', f'user:{student_id}']
 
-            pattern = f'dashboard:user_{student_id}:*'
-            count += cache_obj.invalidate_pattern(pattern)
+        count = get_multilevel_cache().invalidate_tags(tags)
 
-        logger.info(f"Invalidated caches on grade update: {count} keys")
+        logger.info(f"Invalidated caches on grade update: {tags}")
         return count
 
     @staticmethod
@@ -443,21 +1008,17 @@ class CacheInvalidationTrigger:
             student_id: Optional student ID
 
         Returns:
-            Number of invalidated keys
+            Number of invalidated L1 keys
         """
-        cache_obj = get_multilevel_cache()
-        count = 0
-
-        # Invalidate progress analytics
-        pattern = f'analytics:progress:*{material_id}*'
-        count += cache_obj.invalidate_pattern(pattern)
+        tags = [f'material:{material_id}']
 
         # Invalidate student progress
         if student_id:
-            pattern = f'analytics:student:{student_id}:*'
-            count += cache_obj.invalidate_pattern(pattern)
+            tags.append(f'student:{student_id}')
+
+        count = get_multilevel_cache().invalidate_tags(tags)
 
-        logger.info(f"Invalidated caches on material view: {count} keys")
+        logger.info(f"Invalidated caches on material view: {tags}")
         return count
 
     @staticmethod
@@ -467,28 +1028,17 @@ class CacheInvalidationTrigger:
 
         Args:
             user_id: User ID
-            module: Optional module name (analytics, dashboard, etc)
+            module: Optional module name (analytics, dashboard, etc);
+                    '<module>:user_<id>:*' keys carry the user tag already
 
         Returns:
-            Number of invalidated keys
+            Number of invalidated L1 keys
         """
-        cache_obj = get_multilevel_cache()
-        count = 0
-
-        # Invalidate all user-related analytics
-        patterns = [
-            f'analytics:student:{user_id}:*',
-            f'dashboard:user_{user_id}:*',
-            f'report:user_{user_id}:*',
-        ]
+        tags = [f'student:{user_id}', f'user:{user_id}']
 
-        if module:
-            patterns.append(f'{module}:user_{user_id}:*')
+        count = get_multilevel_cache().invalidate_tags(tags)
 
-        for pattern in patterns:
-            count += cache_obj.invalidate_pattern(pattern)
-
-        logger.info(f"Invalidated caches on user progress change: {count} keys")
+        logger.info(f"Invalidated caches on user progress change: {tags}")
         return count
 
     @staticmethod
@@ -500,21 +1050,14 @@ class CacheInvalidationTrigger:
             report_type: Type of report (student_progress, attendance, etc)
 
         Returns:
-            Number of invalidated keys
+            Number of invalidated L1 keys
         """
-        cache_obj = get_multilevel_cache()
-
-        # Invalidate all reports and related analytics
-        patterns = [
-            f'report:{report_type}:*',
-            'analytics:*',
-        ]
+        # Invalidate all reports of the type and related analytics
+        tags = [f'report_type:{report_type}', 'ns:analytics']
 
-        count = 0
-        for pattern in patterns:
-            count += cache_obj.invalidate_pattern(pattern)
+        count = get_multilevel_cache().invalidate_tags(tags)
 
-        logger.info(f"Invalidated caches on report generation: {count} keys")
+        logger.info(f"Invalidated caches on report generation: {tags}")
         return count
 
 
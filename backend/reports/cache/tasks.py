@@ -9,9 +9,8 @@ Tasks:
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from celery import shared_task
-from django.utils import timezone
 from django.core.cache import cache
 
 from .multilevel import (
@@ -163,24 +162,13 @@ def invalidate_stale_cache_entries():
 
         cache_obj = get_multilevel_cache()
 
-        # Invalidate all in-memory cache (L1 only, L2 handles own expiration)
+        # Expire old in-memory entries (L1 only, L2 handles own expiration)
         stats = {
             'timestamp': datetime.now().isoformat(),
-            'l1_cleared': len(cache_obj._memory_cache),
+            'l1_size': len(cache_obj._memory_cache),
+            'l1_expired': cache_obj.purge_expired_memory(),
         }
 
-        # Expire old in-memory entries
-        import time
-        now = timezone.now()
-        expired_count = 0
-
-        for key, timestamp in list(cache_obj._memory_timestamps.items()):
-            if now > timestamp:
-                cache_obj._delete_from_memory(key)
-                expired_count += 1
-
-        stats['l1_expired'] = expired_count
-
         logger.info(f"Stale cache invalidation completed: {stats}")
 
         return {
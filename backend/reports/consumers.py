@@ -8,6 +8,12 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from datetime import datetime
 
+from reports.services.dashboard_metrics import (
+    GLOBAL_SCOPE,
+    DashboardMetricsPublisher,
+    get_dashboard_metrics,
+)
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -25,11 +31,16 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     - assignment_closed: {type: 'assignment_closed', assignment_id: X}
     - metrics: {type: 'metrics', pending: X, ungraded: Y, active: Z, total: W}
     - ping: {type: 'ping'}
+
+    Метрики считает общий DashboardMetricsPublisher (один лидер на scope),
+    consumers только подписываются на группу dashboard_metrics.
     """
 
     async def connect(self):
         """Подключение к WebSocket для дашборда"""
         self.user = self.scope["user"]
+        self.heartbeat_task = None
+        self.metrics_subscribed = False
 
         # Проверяем аутентификацию
         if not self.user.is_authenticated:
@@ -64,11 +75,12 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         await self.send_welcome()
 
         # Запускаем heartbeat
-        asyncio.create_task(self.heartbeat_loop())
+        self.heartbeat_task = asyncio.create_task(self.heartbeat_loop())
 
-        # Запускаем metrics broadcast
+        # Подписываемся на общий публикатор метрик
         if self.is_metrics_broadcaster():
-            asyncio.create_task(self.metrics_broadcast_loop())
+            DashboardMetricsPublisher.subscribe(GLOBAL_SCOPE)
+            self.metrics_subscribed = True
 
     async def disconnect(self, close_code):
         """Отключение от WebSocket"""
@@ -76,9 +88,17 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             f"[DashboardConsumer] User {self.user.id} disconnected from dashboard (code: {close_code})"
         )
 
+        if getattr(self, "heartbeat_task", None) is not None:
+            self.heartbeat_task.cancel()
+
+        if getattr(self, "metrics_subscribed", False):
+            await DashboardMetricsPublisher.unsubscribe(GLOBAL_SCOPE)
+            self.metrics_subscribed = False
+
         # Отключаемся от групп
-        await self.channel_layer.group_discard(self.user_dashboard_group, self.channel_name)
-        await self.channel_layer.group_discard(self.metrics_group, self.channel_name)
+        if hasattr(self, "user_dashboard_group"):
+            await self.channel_layer.group_discard(self.user_dashboard_group, self.channel_name)
+            await self.channel_layer.group_discard(self.metrics_group, self.channel_name)
 
     async def receive(self, text_data):
         """Обработка входящих сообщений от клиента"""
@@ -187,9 +207,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         return self.user.role in ["student", "teacher", "tutor", "parent", "admin"]
 
     def is_metrics_broadcaster(self) -> bool:
-        """Проверяет, должен ли этот consumer отправлять метрики"""
-        # Только администраторы отправляют метрики всем
-        # Но можно изменить на "первый подключившийся teacher"
+        """Проверяет, должен ли этот consumer держать публикатор метрик активным"""
+        # Метрики публикуются, пока подключен хотя бы один администратор;
+        # считает их один лидер на весь кластер
         return self.user.role == "admin"
 
     async def send_welcome(self):
@@ -212,63 +232,14 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def get_initial_metrics(self) -> dict:
         """Получает начальные метрики для пользователя"""
-        from assignments.models import Assignment, AssignmentSubmission
-
-        try:
-            # Получаем задания, назначенные этому пользователю или его студентам
-            if self.user.role == "teacher":
-                # Учитель видит свои задания
-                assignments = Assignment.objects.filter(author=self.user)
-            elif self.user.role == "tutor":
-                # Тьютор видит задания своих студентов
-                try:
-                    students = self.user.tutor_profile.students.all()
-                    assignments = Assignment.objects.filter(assigned_to__in=students)
-                except AttributeError:
-                    logger.warning(
-                        f"[DashboardConsumer] TutorProfile not found for tutor user {self.user.id}",
-                        exc_info=True,
-                    )
-                    assignments = Assignment.objects.none()
-            else:
-                # Админ видит все
-                assignments = Assignment.objects.all()
-
-            # Подсчитываем метрики
-            total_assignments = assignments.count()
-
-            # Подсчитываем незавершенные сдачи
-            pending_submissions = AssignmentSubmission.objects.filter(
-                assignment__in=assignments, submitted_at__isnull=True
-            ).count()
-
-            # Подсчитываем необработанные оценки
-            ungraded_submissions = AssignmentSubmission.objects.filter(
-                assignment__in=assignments, submitted_at__isnull=False, grade__isnull=True
-            ).count()
-
-            # Подсчитываем активных студентов
-            active_students = (
-                AssignmentSubmission.objects.filter(assignment__in=assignments)
-                .values("student_id")
-                .distinct()
-                .count()
-            )
+        if self.user.role not in ("teacher", "tutor"):
+            # Общие метрики уже посчитаны публикатором
+            latest = DashboardMetricsPublisher.latest(GLOBAL_SCOPE)
+            if latest is not None:
+                return latest
 
-            return {
-                "pending_submissions": pending_submissions,
-                "ungraded_submissions": ungraded_submissions,
-                "active_students": active_students,
-                "total_assignments": total_assignments,
-            }
-        except Exception as e:
-            logger.error(f"[DashboardConsumer] Error getting initial metrics: {e}")
-            return {
-                "pending_submissions": 0,
-                "ungraded_submissions": 0,
-                "active_students": 0,
-                "total_assignments": 0,
-            }
+        # Личные метрики - из счетчиков учителя/тьютора
+        return get_dashboard_metrics(self.user)
 
     async def heartbeat_loop(self):
         """Отправляет heartbeat каждые 30 секунд"""
@@ -295,32 +266,12 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 else:
                     missed_pongs = 0
 
-                # Отправляем ping
-                await self.channel_layer.group_send(
-                    self.user_dashboard_group,
-                    {"type": "ping", "timestamp": datetime.now().isoformat()},
+                # Отправляем ping прямо в сокет (без рассылки через channel layer)
+                self.pong_received = False
+                await self.send(
+                    text_data=json.dumps({"type": "ping", "timestamp": datetime.now().isoformat()})
                 )
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             logger.error(f"[DashboardConsumer] Error in heartbeat loop: {e}")
-
-    async def metrics_broadcast_loop(self):
-        """Отправляет метрики каждые 10 секунд (для админов)"""
-        try:
-            while True:
-                await asyncio.sleep(10)
-
-                metrics = await self.get_initial_metrics()
-
-                await self.channel_layer.group_send(
-                    self.metrics_group,
-                    {
-                        "type": "metrics_event",
-                        "pending_submissions": metrics["pending_submissions"],
-                        "ungraded_submissions": metrics["ungraded_submissions"],
-                        "active_students": metrics["active_students"],
-                        "total_assignments": metrics["total_assignments"],
-                        "timestamp": datetime.now().isoformat(),
-                    },
-                )
-        except Exception as e:
-            logger.error(f"[DashboardConsumer] Error in metrics broadcast loop: {e}")
@@ -160,7 +160,7 @@ class CustomReportExecutionSerializer(serializers.ModelSerializer):
         model = CustomReportExecution
         fields = [
             'id', 'executed_by', 'executed_by_name', 'rows_returned',
-            'execution_time_ms', 'result_summary', 'executed_at'
+            'execution_time_ms', 'query_count', 'result_summary', 'executed_at'
         ]
         read_only_fields = fields
 
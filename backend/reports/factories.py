@@ -290,6 +290,7 @@ class CustomReportExecutionFactory(factory.django.DjangoModelFactory):
     )
     rows_returned = 100
     execution_time_ms = 1500
+    query_count = 5
     result_summary = {}
 
 
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0016_add_report_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customreportexecution',
+            name='query_count',
+            field=models.IntegerField(
+                default=0,
+                help_text='Database queries issued while building the report',
+                verbose_name='Query Count',
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _rate_field():
+    return models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('materials', '0039_alter_subjectenrollment_fields_and_constraint'),
+        ('reports', '0017_customreportexecution_query_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WarehouseChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.IntegerField(blank=True, null=True, verbose_name='Student ID')),
+                ('subject_id', models.IntegerField(blank=True, null=True, verbose_name='Subject ID')),
+                ('teacher_id', models.IntegerField(blank=True, null=True, verbose_name='Teacher ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Warehouse Change Log Entry',
+                'verbose_name_plural': 'Warehouse Change Log',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentGradeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submission_count', models.IntegerField(default=0)),
+                ('avg_grade', _rate_field()),
+                ('last_submission_date', models.DateTimeField(blank=True, null=True)),
+                ('first_submission_date', models.DateTimeField(blank=True, null=True)),
+                ('pass_rate', _rate_field()),
+                ('refreshed_at', models.DateTimeField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='materials.subject')),
+            ],
+            options={
+                'verbose_name': 'Student Grade Summary',
+                'verbose_name_plural': 'Student Grade Summaries',
+                'indexes': [models.Index(fields=['subject'], name='reports_sgs_subject_idx')],
+                'unique_together': {('student', 'subject')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassProgressSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_count', models.IntegerField(default=0)),
+                ('avg_grade', _rate_field()),
+                ('total_submissions', models.IntegerField(default=0)),
+                ('pass_rate', _rate_field()),
+                ('recent_submission_rate', _rate_field()),
+                ('refreshed_at', models.DateTimeField()),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='materials.subject')),
+            ],
+            options={
+                'verbose_name': 'Class Progress Summary',
+                'verbose_name_plural': 'Class Progress Summaries',
+                'indexes': [models.Index(fields=['subject'], name='reports_cps_subject_idx')],
+                'unique_together': {('teacher', 'subject')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherWorkloadSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_assignments', models.IntegerField(default=0)),
+                ('pending_reviews', models.IntegerField(default=0)),
+                ('graded_submissions', models.IntegerField(default=0)),
+                ('total_submissions', models.IntegerField(default=0)),
+                ('avg_grade_time_minutes', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('last_graded_time', models.DateTimeField(blank=True, null=True)),
+                ('overdue_percentage', _rate_field()),
+                ('refreshed_at', models.DateTimeField()),
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Teacher Workload Summary',
+                'verbose_name_plural': 'Teacher Workload Summaries',
+                'indexes': [models.Index(fields=['-pending_reviews'], name='reports_tws_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubjectPerformanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject_name', models.CharField(max_length=200)),
+                ('student_count', models.IntegerField(default=0)),
+                ('total_submissions', models.IntegerField(default=0)),
+                ('avg_grade', _rate_field()),
+                ('min_grade', _rate_field()),
+                ('max_grade', _rate_field()),
+                ('excellent_rate', _rate_field()),
+                ('good_rate', _rate_field()),
+                ('below_average_rate', _rate_field()),
+                ('last_submission_date', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField()),
+                ('subject', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='materials.subject')),
+            ],
+            options={
+                'verbose_name': 'Subject Performance Summary',
+                'verbose_name_plural': 'Subject Performance Summaries',
+                'indexes': [models.Index(fields=['-avg_grade'], name='reports_sps_avg_grade_idx')],
+            },
+        ),
+    ]
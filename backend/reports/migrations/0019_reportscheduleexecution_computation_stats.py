@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0018_warehouse_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportscheduleexecution',
+            name='reused_computations',
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text='Recipients served from report data computed for another schedule in the same run',
+                verbose_name='Reused computations',
+            ),
+        ),
+        migrations.AddField(
+            model_name='reportscheduleexecution',
+            name='computation_time_ms',
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text='Time spent computing report data and rendering attachments (reused work excluded)',
+                verbose_name='Computation time (ms)',
+            ),
+        ),
+    ]
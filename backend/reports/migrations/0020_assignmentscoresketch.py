@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0023_add_assignment_indexes'),
+        ('reports', '0019_reportscheduleexecution_computation_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentScoreSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scores', models.JSONField(default=dict, help_text='Score histogram of all scored submissions {score: count}')),
+                ('graded_scores', models.JSONField(default=dict, help_text='Score histogram of graded submissions {score: count}')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_sketch', to='assignments.assignment')),
+            ],
+            options={
+                'verbose_name': 'Assignment Score Sketch',
+                'verbose_name_plural': 'Assignment Score Sketches',
+            },
+        ),
+    ]
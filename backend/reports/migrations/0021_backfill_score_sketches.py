@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def _to_json(counts):
+    return {str(score): count for score, count in sorted(counts.items()) if count > 0}
+
+
+def backfill_score_sketches(apps, schema_editor):
+    """Create score sketches for assignments that do not have one yet."""
+    Assignment = apps.get_model('assignments', 'Assignment')
+    AssignmentSubmission = apps.get_model('assignments', 'AssignmentSubmission')
+    AssignmentScoreSketch = apps.get_model('reports', 'AssignmentScoreSketch')
+
+    assignment_ids = list(
+        Assignment.objects.filter(score_sketch__isnull=True)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+    for start in range(0, len(assignment_ids), BATCH_SIZE):
+        batch = assignment_ids[start:start + BATCH_SIZE]
+        sketches = {assignment_id: (Counter(), Counter()) for assignment_id in batch}
+
+        grouped = (
+            AssignmentSubmission.objects.filter(assignment_id__in=batch, score__isnull=False)
+            .values('assignment_id', 'status', 'score')
+            .annotate(n=Count('id'))
+            .values_list('assignment_id', 'status', 'score', 'n')
+        )
+        for assignment_id, status, score, count in grouped:
+            scores, graded = sketches[assignment_id]
+            bucket = int(round(float(score)))
+            scores[bucket] += count
+            if status == 'graded':
+                graded[bucket] += count
+
+        AssignmentScoreSketch.objects.bulk_create(
+            [
+                AssignmentScoreSketch(
+                    assignment_id=assignment_id,
+                    scores=_to_json(scores),
+                    graded_scores=_to_json(graded),
+                )
+                for assignment_id, (scores, graded) in sketches.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0020_assignmentscoresketch'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_score_sketches, migrations.RunPython.noop),
+    ]
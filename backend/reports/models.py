@@ -1109,6 +1109,17 @@ class ReportScheduleExecution(models.Model):
 
     error_message = models.TextField(blank=True)
 
+    reused_computations = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Reused computations',
+        help_text='Recipients served from report data computed for another schedule in the same run'
+    )
+    computation_time_ms = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Computation time (ms)',
+        help_text='Time spent computing report data and rendering attachments (reused work excluded)'
+    )
+
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
@@ -1138,6 +1149,11 @@ class ReportScheduleExecution(models.Model):
             return 0
         return round((self.successful_sends / self.total_recipients) * 100, 2)
 
+    @property
+    def reused_computation(self):
+        """Whether any delivery reused a computation shared with another schedule."""
+        return self.reused_computations > 0
+
 
 # =====================================================
 # Custom Report Builder Models
@@ -1363,6 +1379,12 @@ class CustomReportExecution(models.Model):
         verbose_name='Execution Time (ms)'
     )
 
+    query_count = models.IntegerField(
+        default=0,
+        verbose_name='Query Count',
+        help_text='Database queries issued while building the report'
+    )
+
     # Result storage
     result_summary = models.JSONField(
         default=dict,
@@ -1809,3 +1831,156 @@ class ReportSharing(models.Model):
             return False
 
         return True
+
+
+class WarehouseChangeLog(models.Model):
+    """
+    Append-only log of keys whose warehouse summaries are out of date.
+
+    Rows are written by grade, submission and enrollment signals and
+    drained by reports.tasks.refresh_warehouse_summaries, which recomputes
+    only the affected summary rows. Plain integer ids are stored so that
+    deleting the source objects still leaves a record to recompute.
+    """
+
+    student_id = models.IntegerField(null=True, blank=True, verbose_name='Student ID')
+    subject_id = models.IntegerField(null=True, blank=True, verbose_name='Subject ID')
+    teacher_id = models.IntegerField(null=True, blank=True, verbose_name='Teacher ID')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Warehouse Change Log Entry'
+        verbose_name_plural = 'Warehouse Change Log'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"student={self.student_id} subject={self.subject_id} teacher={self.teacher_id}"
+
+
+class StudentGradeSummary(models.Model):
+    """
+    Grade statistics per (student, subject).
+
+    Same shape as the student_grade_summary materialized view, maintained
+    incrementally from WarehouseChangeLog.
+    """
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    subject = models.ForeignKey('materials.Subject', on_delete=models.CASCADE, related_name='+')
+    submission_count = models.IntegerField(default=0)
+    avg_grade = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    last_submission_date = models.DateTimeField(null=True, blank=True)
+    first_submission_date = models.DateTimeField(null=True, blank=True)
+    pass_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Student Grade Summary'
+        verbose_name_plural = 'Student Grade Summaries'
+        unique_together = ['student', 'subject']
+        indexes = [
+            models.Index(fields=['subject'], name='reports_sgs_subject_idx'),
+        ]
+
+
+class ClassProgressSummary(models.Model):
+    """
+    Progress statistics per (class, subject).
+
+    A class is a teacher's group of students enrolled in a subject
+    (active SubjectEnrollment rows with the same teacher and subject).
+    """
+
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    subject = models.ForeignKey('materials.Subject', on_delete=models.CASCADE, related_name='+')
+    student_count = models.IntegerField(default=0)
+    avg_grade = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    total_submissions = models.IntegerField(default=0)
+    pass_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    recent_submission_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Class Progress Summary'
+        verbose_name_plural = 'Class Progress Summaries'
+        unique_together = ['teacher', 'subject']
+        indexes = [
+            models.Index(fields=['subject'], name='reports_cps_subject_idx'),
+        ]
+
+
+class TeacherWorkloadSummary(models.Model):
+    """Assignment review workload per teacher (assignment author)."""
+
+    teacher = models.OneToOneField(User, on_delete=models.CASCADE, related_name='+')
+    total_assignments = models.IntegerField(default=0)
+    pending_reviews = models.IntegerField(default=0)
+    graded_submissions = models.IntegerField(default=0)
+    total_submissions = models.IntegerField(default=0)
+    avg_grade_time_minutes = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    last_graded_time = models.DateTimeField(null=True, blank=True)
+    overdue_percentage = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Teacher Workload Summary'
+        verbose_name_plural = 'Teacher Workload Summaries'
+        indexes = [
+            models.Index(fields=['-pending_reviews'], name='reports_tws_pending_idx'),
+        ]
+
+
+class SubjectPerformanceSummary(models.Model):
+    """Grade statistics per subject across all students."""
+
+    subject = models.OneToOneField('materials.Subject', on_delete=models.CASCADE, related_name='+')
+    subject_name = models.CharField(max_length=200)
+    student_count = models.IntegerField(default=0)
+    total_submissions = models.IntegerField(default=0)
+    avg_grade = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    min_grade = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    max_grade = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    excellent_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    good_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    below_average_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    last_submission_date = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Subject Performance Summary'
+        verbose_name_plural = 'Subject Performance Summaries'
+        indexes = [
+            models.Index(fields=['-avg_grade'], name='reports_sps_avg_grade_idx'),
+        ]
+
+
+class AssignmentScoreSketch(models.Model):
+    """
+    Mergeable score histograms for one assignment.
+
+    Scores are whole points, so a histogram of {score: count} is an exact
+    sketch: percentiles, mean and letter distribution of any set of
+    assignments (a class, a teacher) are answered by summing histograms
+    instead of scanning submissions. Maintained incrementally from
+    submission signals by reports.services.score_sketches.
+    """
+
+    assignment = models.OneToOneField(
+        'assignments.Assignment', on_delete=models.CASCADE, related_name='score_sketch'
+    )
+    scores = models.JSONField(
+        default=dict,
+        help_text='Score histogram of all scored submissions {score: count}'
+    )
+    graded_scores = models.JSONField(
+        default=dict,
+        help_text='Score histogram of graded submissions {score: count}'
+    )
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Assignment Score Sketch'
+        verbose_name_plural = 'Assignment Score Sketches'
+
+    def __str__(self):
+        return f"Score sketch for assignment {self.assignment_id}"
@@ -3,10 +3,12 @@ Raw SQL Analytics Queries for Data Warehouse.
 
 Optimized queries for complex analytics operations:
 - Student progress over time
-- Subject performance comparison
-- Teacher workload analysis
 - Attendance vs grades correlation
-- Top/bottom performers
+- Student engagement metrics
+- Class performance trends
+
+Subject comparison, teacher workload and top/bottom performers are read
+from the warehouse summary tables (see reports.services.warehouse_summaries).
 
 All queries designed for:
 - Large datasets (pagination support)
@@ -41,64 +43,6 @@ ORDER BY period ASC
 LIMIT %s OFFSET %s;
 """
 
-# ============================================================================
-# SUBJECT PERFORMANCE COMPARISON
-# ============================================================================
-# Compares performance across subjects for an individual student
-# Returns: subject_id, subject_name, metrics
-
-SUBJECT_PERFORMANCE_COMPARISON = """
-SELECT
-    m.subject_id,
-    s.name as subject_name,
-    COUNT(DISTINCT sr.id)::INTEGER as submission_count,
-    ROUND(AVG(CAST(sr.score AS DECIMAL)), 2)::DECIMAL as avg_grade,
-    MIN(CAST(sr.score AS DECIMAL))::DECIMAL as min_grade,
-    MAX(CAST(sr.score AS DECIMAL))::DECIMAL as max_grade,
-    ROUND(STDDEV(CAST(sr.score AS DECIMAL)), 2)::DECIMAL as grade_variance,
-    ROUND(CAST(COUNT(CASE WHEN sr.score >= 70 THEN 1 END) AS DECIMAL) * 100 /
-        NULLIF(COUNT(*), 0), 2)::DECIMAL as pass_rate,
-    MAX(sr.created_at)::TIMESTAMP as last_submission,
-    ROUND(AVG(EXTRACT(EPOCH FROM (sr.created_at - sr.created_at))::DECIMAL), 2) as avg_submission_interval_seconds
-FROM materials_materialsubmission sr
-JOIN materials_material m ON sr.material_id = m.id
-JOIN materials_subject s ON m.subject_id = s.id
-WHERE sr.student_id = %s
-    AND sr.score IS NOT NULL
-GROUP BY m.subject_id, s.name
-ORDER BY avg_grade DESC
-LIMIT %s OFFSET %s;
-"""
-
-# ============================================================================
-# TEACHER WORKLOAD ANALYSIS
-# ============================================================================
-# Analyzes teacher review/grading workload
-# Returns: teacher_id, assignment metrics, review speed, pending items
-
-TEACHER_WORKLOAD_ANALYSIS = """
-SELECT
-    ae.teacher_id,
-    COUNT(DISTINCT ae.id)::INTEGER as total_assignments,
-    COUNT(DISTINCT assub.id)::INTEGER as total_submissions,
-    COUNT(DISTINCT CASE WHEN assub.status = 'pending' THEN assub.id END)::INTEGER as pending_reviews,
-    COUNT(DISTINCT CASE WHEN assub.status = 'graded' THEN assub.id END)::INTEGER as graded_submissions,
-    ROUND(AVG(EXTRACT(EPOCH FROM (assub.graded_at - assub.created_at))/3600)::DECIMAL, 2)::DECIMAL as avg_grade_time_hours,
-    MIN(EXTRACT(EPOCH FROM (assub.graded_at - assub.created_at))/3600)::DECIMAL as min_grade_time_hours,
-    MAX(EXTRACT(EPOCH FROM (assub.graded_at - assub.created_at))/3600)::DECIMAL as max_grade_time_hours,
-    ROUND(CAST(COUNT(CASE WHEN assub.created_at < CURRENT_TIMESTAMP - INTERVAL '7 days'
-        AND assub.status = 'pending' THEN assub.id END) AS DECIMAL) * 100 /
-        NULLIF(COUNT(CASE WHEN assub.status = 'pending' THEN assub.id END), 0), 2)::DECIMAL as overdue_percentage,
-    MAX(assub.graded_at)::TIMESTAMP as last_graded_time
-FROM assignments_assignment ae
-LEFT JOIN assignments_assignmentsubmission assub ON ae.id = assub.assignment_id
-WHERE ae.created_by_id = %s
-    AND ae.created_at >= %s
-    AND ae.created_at <= %s
-GROUP BY ae.teacher_id
-ORDER BY pending_reviews DESC;
-"""
-
 # ============================================================================
 # ATTENDANCE VS GRADES CORRELATION
 # ============================================================================
@@ -132,75 +76,13 @@ GROUP BY ROUND(CAST(att.attendance_days AS DECIMAL) / NULLIF(att.total_days, 0)
 ORDER BY attendance_rate_bucket DESC;
 """
 
-# ============================================================================
-# TOP PERFORMERS BY SUBJECT
-# ============================================================================
-# Identifies top students in each subject
-# Pagination: LIMIT 10 (default), OFFSET for more results
-
-TOP_PERFORMERS = """
-SELECT
-    m.subject_id,
-    s.name as subject_name,
-    sr.student_id,
-    au.first_name,
-    au.last_name,
-    COUNT(DISTINCT sr.id)::INTEGER as submission_count,
-    ROUND(AVG(CAST(sr.score AS DECIMAL)), 2)::DECIMAL as avg_grade,
-    MAX(CAST(sr.score AS DECIMAL))::DECIMAL as max_grade,
-    MIN(sr.created_at)::TIMESTAMP as first_submission,
-    MAX(sr.created_at)::TIMESTAMP as last_submission
-FROM materials_materialsubmission sr
-JOIN materials_material m ON sr.material_id = m.id
-JOIN materials_subject s ON m.subject_id = s.id
-JOIN accounts_user au ON sr.student_id = au.id
-WHERE sr.score IS NOT NULL
-    AND sr.created_at >= %s
-GROUP BY m.subject_id, s.name, sr.student_id, au.first_name, au.last_name
-HAVING COUNT(DISTINCT sr.id) >= %s  -- Minimum submissions filter
-ORDER BY m.subject_id, avg_grade DESC
-LIMIT %s OFFSET %s;
-"""
-
-# ============================================================================
-# BOTTOM PERFORMERS BY SUBJECT
-# ============================================================================
-# Identifies students needing help in each subject
-# Pagination: LIMIT 10 (default), OFFSET for more results
-
-BOTTOM_PERFORMERS = """
-SELECT
-    m.subject_id,
-    s.name as subject_name,
-    sr.student_id,
-    au.first_name,
-    au.last_name,
-    COUNT(DISTINCT sr.id)::INTEGER as submission_count,
-    ROUND(AVG(CAST(sr.score AS DECIMAL)), 2)::DECIMAL as avg_grade,
-    MAX(CAST(sr.score AS DECIMAL))::DECIMAL as max_grade,
-    MIN(sr.created_at)::TIMESTAMP as first_submission,
-    MAX(sr.created_at)::TIMESTAMP as last_submission,
-    ROUND(CAST(COUNT(CASE WHEN sr.score < 70 THEN 1 END) AS DECIMAL) * 100 /
-        NULLIF(COUNT(*), 0), 2)::DECIMAL as fail_rate
-FROM materials_materialsubmission sr
-JOIN materials_material m ON sr.material_id = m.id
-JOIN materials_subject s ON m.subject_id = s.id
-JOIN accounts_user au ON sr.student_id = au.id
-WHERE sr.score IS NOT NULL
-    AND sr.created_at >= %s
-GROUP BY m.subject_id, s.name, sr.student_id, au.first_name, au.last_name
-HAVING COUNT(DISTINCT sr.id) >= %s  -- Minimum submissions filter
-ORDER BY m.subject_id, avg_grade ASC
-LIMIT %s OFFSET %s;
-"""
-
 # ============================================================================
 # STUDENT ENGAGEMENT METRICS
 # ============================================================================
 # Measures student activity and engagement patterns
 # Returns: student metrics, submission frequency, participation indicators
 
-STUDENT_ENGAGEMENT_METRICS = """
+STUDENT_ENGAGEMENT_METRICS_SELECT = """
 SELECT
     sr.student_id,
     au.first_name,
@@ -217,17 +99,23 @@ JOIN accounts_user au ON sr.student_id = au.id
 WHERE sr.created_at >= %s
     AND sr.created_at <= %s
 GROUP BY sr.student_id, au.first_name, au.last_name
+"""
+
+STUDENT_ENGAGEMENT_METRICS = STUDENT_ENGAGEMENT_METRICS_SELECT + """
 ORDER BY engagement_percentage DESC
 LIMIT %s OFFSET %s;
 """
 
+# Keyset order: (engagement_percentage, student_id) descending
+STUDENT_ENGAGEMENT_METRICS_KEYSET = ('engagement_percentage', 'student_id')
+
 # ============================================================================
 # CLASS PERFORMANCE TRENDS
 # ============================================================================
 # Tracks class performance over time periods
 # Useful for identifying class-level issues and improvements
 
-CLASS_PERFORMANCE_TRENDS = """
+CLASS_PERFORMANCE_TRENDS_SELECT = """
 SELECT
     se.class_id,
     DATE_TRUNC('{granularity}', sr.created_at)::DATE as period,
@@ -247,5 +135,11 @@ WHERE se.is_active = true
     AND sr.created_at >= %s
     AND sr.created_at <= %s
 GROUP BY se.class_id, DATE_TRUNC('{granularity}', sr.created_at)
+"""
+
+CLASS_PERFORMANCE_TRENDS = CLASS_PERFORMANCE_TRENDS_SELECT + """
 ORDER BY se.class_id, period ASC;
 """
+
+# Keyset order: (class_id, period) ascending
+CLASS_PERFORMANCE_TRENDS_KEYSET = ('class_id', 'period')
@@ -2,7 +2,8 @@
 Materialized Views for Data Warehouse.
 
 Optimized SQL definitions for common analytics aggregations.
-These views are refreshed daily via Celery tasks.
+The same aggregations are maintained incrementally as summary tables by
+reports.services.warehouse_summaries; these views are refreshed on demand.
 
 Views:
   - student_grade_summary: per-student grade statistics
@@ -663,7 +663,8 @@ class ReportScheduleExecutionSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'schedule', 'schedule_name', 'status',
             'total_recipients', 'successful_sends', 'failed_sends',
-            'error_message', 'started_at', 'completed_at',
+            'error_message', 'reused_computations', 'computation_time_ms',
+            'started_at', 'completed_at',
             'duration_seconds', 'success_rate_percent'
         )
         read_only_fields = ('id', 'started_at', 'completed_at')
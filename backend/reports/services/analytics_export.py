@@ -12,7 +12,8 @@ Provides advanced export functionality for analytics data with:
 - Cell formatting and styling
 
 Features:
-- Stream large datasets without loading entirely into memory
+- Stream querysets and generators without loading them into memory
+  (CSV chunks go straight to the response, Excel uses write-only mode)
 - Custom column selection and filtering
 - Unicode-safe CSV export (UTF-8 with BOM for Excel compatibility)
 - Multiple date/number format options
@@ -22,37 +23,42 @@ Features:
 - Multi-sheet workbooks
 """
 
-import csv
-import io
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from decimal import Decimal
 
 from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.contrib.auth import get_user_model
 from django.db.models import QuerySet, Q
-from django.http import StreamingHttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 
 from celery import shared_task
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import LineChart, BarChart, PieChart, Reference
 
 from reports.models import AnalyticsData, StudentReport, TeacherWeeklyReport, TutorWeeklyReport
+from reports.services.streaming_export import (
+    EXPORT_CHUNK_SIZE,
+    column_widths,
+    iter_export_rows,
+    sample_rows,
+    stream_csv,
+    xlsx_file_response,
+)
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 # Export cache configuration
 EXPORT_CACHE_TTL = 24 * 60 * 60  # 24 hours
-EXPORT_CHUNK_SIZE = 500  # Rows per chunk for streaming
 MAX_ROWS_FOR_EXCEL = 1000000  # openpyxl limit
-MAX_ROWS_FOR_CSV = 5000000  # CSV streaming limit
 
 
 class AnalyticsExportService:
@@ -145,24 +151,22 @@ class AnalyticsExportService:
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
 
-        # Prepare data for export
+        # Prepare data for export (lazy, rows are produced while streaming)
         data = cls._prepare_analytics_data(queryset, date_format)
 
-        # Filter columns if specified
-        if columns:
-            data = cls.filter_by_columns(data, columns)
-
         # Export based on format
         if format.lower() == 'excel':
             return cls.export_to_excel(
                 data,
                 report_name=f"student_analytics_{student_id}",
-                sheet_name="Analytics"
+                sheet_name="Analytics",
+                columns=columns
             )
         else:
             return cls.export_to_csv(
                 data,
-                report_name=f"student_analytics_{student_id}"
+                report_name=f"student_analytics_{student_id}",
+                columns=columns
             )
 
     @classmethod
@@ -341,83 +345,47 @@ class AnalyticsExportService:
     @classmethod
     def export_to_csv(
         cls,
-        data: List[Dict[str, Any]],
+        data: Iterable[Dict[str, Any]],
         report_name: str = "analytics_export",
         encoding: str = "utf-8-sig",
         include_headers: bool = True,
-        delimiter: str = ','
+        delimiter: str = ',',
+        columns: Optional[List[str]] = None
     ) -> StreamingHttpResponse:
         """
         Export data to CSV format with streaming support.
 
         Args:
-            data: List of dictionaries to export
+            data: List, generator or QuerySet of row dicts
             report_name: Name for the exported file
             encoding: Character encoding (utf-8-sig for Excel)
             include_headers: Include header row
             delimiter: CSV delimiter (comma or semicolon)
+            columns: Columns to export (default: keys of the first row)
 
         Returns:
             StreamingHttpResponse with CSV data
 
-        Raises:
-            ValueError: If dataset exceeds MAX_ROWS_FOR_CSV
-
         Features:
-            - Streams large datasets
-            - Unicode-safe (UTF-8 with BOM)
+            - Querysets are read with .iterator(), rows are never materialized
+            - Encoded chunks go straight to the response (no row limit)
+            - Unicode-safe (UTF-8 with a single BOM)
             - Handles special characters
             - Configurable delimiter
         """
-        if len(data) > MAX_ROWS_FOR_CSV:
-            raise ValueError(
-                f"Dataset too large ({len(data)} rows). "
-                f"Maximum {MAX_ROWS_FOR_CSV} rows allowed."
-            )
-
-        if not data:
-            data = [{}]
-
-        fieldnames = list(data[0].keys()) if data else []
-
-        def generate():
-            """Generator for streaming CSV with proper encoding."""
-            output = io.StringIO()
-            writer = csv.DictWriter(
-                output,
-                fieldnames=fieldnames,
-                delimiter=delimiter,
-                extrasaction='ignore'
-            )
-
-            if include_headers:
-                writer.writeheader()
-                yield output.getvalue()
-                output.truncate(0)
-                output.seek(0)
-
-            # Stream rows in chunks
-            for i, row in enumerate(data):
-                writer.writerow(row)
-
-                # Yield every EXPORT_CHUNK_SIZE rows to avoid memory buildup
-                if (i + 1) % EXPORT_CHUNK_SIZE == 0:
-                    chunk = output.getvalue()
-                    if chunk:
-                        yield chunk
-                        output.truncate(0)
-                        output.seek(0)
-
-            # Yield remaining content
-            final_content = output.getvalue()
-            if final_content:
-                yield final_content
+        fieldnames, rows = iter_export_rows(data, columns)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{report_name}_{timestamp}.csv"
 
         return StreamingHttpResponse(
-            generate(),
+            stream_csv(
+                fieldnames,
+                rows,
+                encoding=encoding,
+                include_headers=include_headers,
+                delimiter=delimiter
+            ),
             content_type=f"text/csv; charset={encoding}",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
@@ -425,120 +393,68 @@ class AnalyticsExportService:
     @classmethod
     def export_to_excel(
         cls,
-        data: List[Dict[str, Any]],
+        data: Iterable[Dict[str, Any]],
         report_name: str = "analytics_export",
         sheet_name: str = "Analytics",
         freeze_panes: bool = True,
         add_charts: bool = False,
-        style: bool = True
-    ) -> StreamingHttpResponse:
+        style: bool = True,
+        columns: Optional[List[str]] = None
+    ) -> FileResponse:
         """
         Export data to Excel format with advanced formatting.
 
         Args:
-            data: List of dictionaries to export
+            data: List, generator or QuerySet of row dicts
             report_name: Name for the exported file
             sheet_name: Name for the worksheet
             freeze_panes: Freeze header row
             add_charts: Add sample charts (if numeric data)
             style: Apply formatting and styling
+            columns: Columns to export (default: keys of the first row)
 
         Returns:
-            StreamingHttpResponse with Excel data
+            FileResponse with Excel data
 
         Raises:
             ValueError: If dataset exceeds MAX_ROWS_FOR_EXCEL
 
         Features:
             - Bold headers with color
-            - Auto-fit column widths
+            - Column widths fitted to the first rows
             - Text wrapping
             - Frozen header row
             - Number formatting (decimals for scores)
             - Date formatting
             - Optional charts
-            - Memory efficient (streaming)
+            - Memory efficient (write-only workbook in a temporary file)
         """
-        if len(data) > MAX_ROWS_FOR_EXCEL:
-            raise ValueError(
-                f"Dataset too large ({len(data)} rows). "
-                f"Maximum {MAX_ROWS_FOR_EXCEL} rows allowed."
-            )
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = sheet_name[:31]  # Excel sheet name limit is 31 chars
-
-        if not data:
-            return cls._return_excel_file(wb, report_name)
-
-        fieldnames = list(data[0].keys())
-
-        # Define header styling
-        if style:
-            header_fill = PatternFill(
-                start_color="2F75B5", end_color="2F75B5", fill_type="solid"
-            )
-            header_font = Font(bold=True, color="FFFFFF", size=11)
-            header_alignment = Alignment(
-                horizontal="center", vertical="center", wrap_text=True
-            )
-        else:
-            header_fill = None
-            header_font = None
-            header_alignment = Alignment(horizontal="left", vertical="center")
-
-        # Write headers
-        for col_idx, fieldname in enumerate(fieldnames, start=1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.value = fieldname
-
-            if style:
-                cell.fill = header_fill
-                cell.font = header_font
-
-            cell.alignment = header_alignment
-
-        # Write data rows
-        for row_idx, row_data in enumerate(data, start=2):
-            for col_idx, fieldname in enumerate(fieldnames, start=1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                value = row_data.get(fieldname, "")
-
-                if style:
-                    # Apply formatting based on data type
-                    cls._apply_cell_formatting(cell, value, fieldname)
-
-                cell.value = value
-
-        # Adjust column widths and freeze panes
-        cls._adjust_columns_and_freeze(ws, fieldnames, freeze_panes, len(data))
-
-        # Add charts if requested and data is suitable
-        if add_charts and style and len(data) > 0:
-            cls._add_sample_charts(ws, fieldnames, len(data))
-
+        wb = Workbook(write_only=True)
+        cls._write_sheet(
+            wb, sheet_name, data, columns,
+            freeze_panes=freeze_panes, add_charts=add_charts, style=style
+        )
         return cls._return_excel_file(wb, report_name)
 
     @classmethod
     def export_multi_sheet_excel(
         cls,
-        sheets: Dict[str, List[Dict[str, Any]]],
+        sheets: Dict[str, Iterable[Dict[str, Any]]],
         report_name: str,
         freeze_panes: bool = True,
         style: bool = True
-    ) -> StreamingHttpResponse:
+    ) -> FileResponse:
         """
         Export multiple datasets to a single Excel workbook with multiple sheets.
 
         Args:
-            sheets: Dictionary of {sheet_name: data_list}
+            sheets: Dictionary of {sheet_name: rows (list, generator or QuerySet)}
             report_name: Name for the exported file
             freeze_panes: Freeze header row in each sheet
             style: Apply formatting
 
         Returns:
-            StreamingHttpResponse with Excel file
+            FileResponse with Excel file
 
         Example:
             >>> sheets = {
@@ -551,44 +467,13 @@ class AnalyticsExportService:
             ...     report_name='comprehensive_analytics'
             ... )
         """
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove default sheet
+        wb = Workbook(write_only=True)
 
         for sheet_name, data in sheets.items():
-            if not data:
-                continue
-
-            ws = wb.create_sheet(sheet_name[:31])  # Excel limit
-            fieldnames = list(data[0].keys())
-
-            # Write headers
-            for col_idx, fieldname in enumerate(fieldnames, start=1):
-                cell = ws.cell(row=1, column=col_idx)
-                cell.value = fieldname
-
-                if style:
-                    cell.fill = PatternFill(
-                        start_color="2F75B5", end_color="2F75B5", fill_type="solid"
-                    )
-                    cell.font = Font(bold=True, color="FFFFFF", size=11)
-
-                cell.alignment = Alignment(
-                    horizontal="center", vertical="center", wrap_text=True
-                )
-
-            # Write data rows
-            for row_idx, row_data in enumerate(data, start=2):
-                for col_idx, fieldname in enumerate(fieldnames, start=1):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    value = row_data.get(fieldname, "")
-
-                    if style:
-                        cls._apply_cell_formatting(cell, value, fieldname)
-
-                    cell.value = value
-
-            # Adjust columns
-            cls._adjust_columns_and_freeze(ws, fieldnames, freeze_panes, len(data))
+            cls._write_sheet(
+                wb, sheet_name, data, None,
+                freeze_panes=freeze_panes, style=style, skip_empty=True
+            )
 
         return cls._return_excel_file(wb, report_name)
 
@@ -675,13 +560,12 @@ class AnalyticsExportService:
     def _prepare_analytics_data(
         queryset: QuerySet,
         date_format: str = 'iso'
-    ) -> List[Dict[str, Any]]:
-        """Prepare analytics data for export."""
+    ) -> Iterator[Dict[str, Any]]:
+        """Prepare analytics data for export (lazily, chunk by chunk)."""
         date_fmt = AnalyticsExportService.DATE_FORMATS.get(date_format, '%Y-%m-%d')
-        data = []
 
-        for item in queryset.select_related('student'):
-            data.append({
+        for item in queryset.select_related('student').iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield {
                 'student_name': item.student.get_full_name(),
                 'student_email': item.student.email,
                 'metric_type': item.get_metric_type_display(),
@@ -691,52 +575,42 @@ class AnalyticsExportService:
                 'period_start': item.period_start.strftime(date_fmt),
                 'period_end': item.period_end.strftime(date_fmt),
                 'created_at': item.created_at.strftime(date_fmt),
-            })
-
-        return data
+            }
 
     @staticmethod
     def _prepare_class_analytics(
         queryset: QuerySet,
         date_format: str = 'iso'
-    ) -> List[Dict[str, Any]]:
-        """Prepare aggregated class analytics data."""
-        date_fmt = AnalyticsExportService.DATE_FORMATS.get(date_format, '%Y-%m-%d')
-
-        # Group by student and calculate aggregates
+    ) -> Iterator[Dict[str, Any]]:
+        """Prepare aggregated class analytics data (grouped in the database)."""
         from django.db.models import Avg, Count, Max, Min
 
-        aggregated = {}
-        for item in queryset:
-            student_id = item.student_id
-            if student_id not in aggregated:
-                aggregated[student_id] = {
-                    'student_name': item.student.get_full_name(),
-                    'student_email': item.student.email,
-                    'metrics': {}
-                }
-
-            metric_key = item.metric_type
-            if metric_key not in aggregated[student_id]['metrics']:
-                aggregated[student_id]['metrics'][metric_key] = []
-
-            aggregated[student_id]['metrics'][metric_key].append(float(item.value))
-
-        # Flatten to rows
-        data = []
-        for student_id, info in aggregated.items():
-            for metric_type, values in info['metrics'].items():
-                data.append({
-                    'student': info['student_name'],
-                    'email': info['student_email'],
-                    'metric_type': metric_type,
-                    'average': round(sum(values) / len(values), 2),
-                    'min': min(values),
-                    'max': max(values),
-                    'count': len(values),
-                })
+        aggregated = (
+            queryset
+            .values(
+                'student_id', 'student__first_name', 'student__last_name',
+                'student__email', 'metric_type'
+            )
+            .annotate(
+                average=Avg('value'),
+                min_value=Min('value'),
+                max_value=Max('value'),
+                count=Count('id'),
+            )
+            .order_by('student_id', 'metric_type')
+        )
 
-        return data
+        for row in aggregated.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            full_name = f"{row['student__first_name']} {row['student__last_name']}".strip()
+            yield {
+                'student': full_name,
+                'email': row['student__email'],
+                'metric_type': row['metric_type'],
+                'average': round(float(row['average']), 2),
+                'min': float(row['min_value']),
+                'max': float(row['max_value']),
+                'count': row['count'],
+            }
 
     @staticmethod
     def _prepare_report_data(report: Any) -> List[Dict[str, Any]]:
@@ -760,12 +634,11 @@ class AnalyticsExportService:
         queryset: QuerySet,
         columns: List[str],
         date_format: str = 'iso'
-    ) -> List[Dict[str, Any]]:
-        """Prepare queryset data for export."""
-        data = []
+    ) -> Iterator[Dict[str, Any]]:
+        """Prepare queryset data for export (lazily, chunk by chunk)."""
         date_fmt = AnalyticsExportService.DATE_FORMATS.get(date_format, '%Y-%m-%d')
 
-        for item in queryset.values(*columns):
+        for item in queryset.values(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE):
             row = {}
             for col in columns:
                 value = item.get(col, '')
@@ -778,9 +651,7 @@ class AnalyticsExportService:
 
                 row[col] = value
 
-            data.append(row)
-
-        return data
+            yield row
 
     @staticmethod
     def _get_report_by_type(report_id: int, report_type: str) -> Optional[Any]:
@@ -814,36 +685,89 @@ class AnalyticsExportService:
         else:
             cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
 
-    @staticmethod
-    def _adjust_columns_and_freeze(
-        ws: Any,
-        fieldnames: List[str],
-        freeze_panes: bool,
-        row_count: int
+    @classmethod
+    def _write_sheet(
+        cls,
+        wb: Workbook,
+        sheet_name: str,
+        data: Iterable[Dict[str, Any]],
+        columns: Optional[List[str]],
+        freeze_panes: bool = True,
+        add_charts: bool = False,
+        style: bool = True,
+        skip_empty: bool = False
     ) -> None:
-        """Adjust column widths and set freeze panes."""
-        for col_idx, fieldname in enumerate(fieldnames, start=1):
-            column_letter = get_column_letter(col_idx)
-            max_length = len(str(fieldname))
-
-            # Sample first 100 rows to calculate width
-            for row in ws.iter_rows(
-                min_col=col_idx, max_col=col_idx, min_row=2, max_row=min(102, row_count + 1)
-            ):
-                for cell in row:
-                    try:
-                        max_length = max(max_length, len(str(cell.value or '')))
-                    except (TypeError, AttributeError):
-                        pass
-
-            # Set width (min 8, max 50)
-            adjusted_width = max(8, min(max_length + 2, 50))
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Freeze header row
-        if freeze_panes and row_count > 0:
+        """
+        Append one sheet to a write-only workbook, row by row.
+
+        Write-only sheets need widths and frozen panes before the first row,
+        so both are derived from a sample of the leading rows.
+
+        Raises:
+            ValueError: If the sheet exceeds MAX_ROWS_FOR_EXCEL
+        """
+        fieldnames, rows = iter_export_rows(data, columns)
+        if skip_empty and not fieldnames:
+            return
+
+        ws = wb.create_sheet(sheet_name[:31])  # Excel sheet name limit is 31 chars
+        if not fieldnames:
+            return
+
+        sample, rows = sample_rows(rows)
+        for col_idx, width in enumerate(column_widths(fieldnames, sample), start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        if freeze_panes and sample:
             ws.freeze_panes = "A2"
 
+        # Header styling
+        if style:
+            header_fill = PatternFill(
+                start_color="2F75B5", end_color="2F75B5", fill_type="solid"
+            )
+            header_font = Font(bold=True, color="FFFFFF", size=11)
+            header_alignment = Alignment(
+                horizontal="center", vertical="center", wrap_text=True
+            )
+        else:
+            header_alignment = Alignment(horizontal="left", vertical="center")
+
+        header = []
+        for fieldname in fieldnames:
+            cell = WriteOnlyCell(ws, value=fieldname)
+            if style:
+                cell.fill = header_fill
+                cell.font = header_font
+            cell.alignment = header_alignment
+            header.append(cell)
+        ws.append(header)
+
+        row_count = 0
+        for row_data in rows:
+            row_count += 1
+            if row_count > MAX_ROWS_FOR_EXCEL:
+                raise ValueError(
+                    f"Dataset too large (over {MAX_ROWS_FOR_EXCEL} rows). "
+                    f"Maximum {MAX_ROWS_FOR_EXCEL} rows allowed."
+                )
+
+            if not style:
+                ws.append([row_data.get(fieldname, "") for fieldname in fieldnames])
+                continue
+
+            cells = []
+            for fieldname in fieldnames:
+                value = row_data.get(fieldname, "")
+                cell = WriteOnlyCell(ws, value=value)
+                # Apply formatting based on data type
+                cls._apply_cell_formatting(cell, value, fieldname)
+                cells.append(cell)
+            ws.append(cells)
+
+        # Add charts if requested and data is suitable
+        if add_charts and style and row_count > 0:
+            cls._add_sample_charts(ws, fieldnames, row_count)
+
     @staticmethod
     def _add_sample_charts(ws: Any, fieldnames: List[str], row_count: int) -> None:
         """Add sample charts to worksheet if numeric data present."""
@@ -871,20 +795,10 @@ class AnalyticsExportService:
             logger.debug(f"Could not add chart: {e}")
 
     @staticmethod
-    def _return_excel_file(wb: Any, report_name: str) -> StreamingHttpResponse:
-        """Return Excel workbook as streaming response."""
+    def _return_excel_file(wb: Any, report_name: str) -> FileResponse:
+        """Return Excel workbook as a file response (via a temporary file)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{report_name}_{timestamp}.xlsx"
-
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        return StreamingHttpResponse(
-            iter([output.getvalue()]),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
+        return xlsx_file_response(wb, report_name, timestamp)
 
 
 # ============================================================================
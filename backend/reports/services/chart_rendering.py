@@ -0,0 +1,186 @@
+"""
+Matplotlib rendering for report charts.
+
+Kept free of Django imports so it can run inside the chart render
+process pool. Every function works from a plain, JSON-serializable chart
+spec and draws on its own Figure (no pyplot global state), so renders are
+safe to run concurrently and produce the same bytes for the same spec.
+"""
+
+import io
+from typing import Any, Callable, Dict
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Predefined sizes (width, height)
+SIZES = {
+    'small': (6, 4),
+    'medium': (10, 6),
+    'large': (14, 8),
+}
+
+# Color schemes for light/dark themes
+THEMES = {
+    'light': {
+        'background': '#ffffff',
+        'text': '#000000',
+        'grid': '#e0e0e0',
+        'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'],
+    },
+    'dark': {
+        'background': '#1a1a1a',
+        'text': '#ffffff',
+        'grid': '#333333',
+        'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'],
+    },
+}
+
+# Output formats and their savefig options
+FORMATS = {
+    'png': {'format': 'png', 'dpi': 100, 'bbox_inches': 'tight'},
+    'svg': {'format': 'svg', 'bbox_inches': 'tight', 'metadata': {'Date': None}},
+}
+
+
+def apply_theme(fig: Figure, ax: Any, theme: str = 'light') -> None:
+    """Apply theme styling to figure and axes."""
+    theme_config = THEMES.get(theme, THEMES['light'])
+
+    fig.patch.set_facecolor(theme_config['background'])
+    ax.patch.set_facecolor(theme_config['background'])
+    ax.spines['bottom'].set_color(theme_config['text'])
+    ax.spines['left'].set_color(theme_config['text'])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    ax.tick_params(colors=theme_config['text'])
+    ax.xaxis.label.set_color(theme_config['text'])
+    ax.yaxis.label.set_color(theme_config['text'])
+    ax.title.set_color(theme_config['text'])
+
+    ax.grid(True, alpha=0.3, color=theme_config['grid'], linestyle='--')
+
+
+def _draw_bar(ax: Any, spec: Dict[str, Any], theme_config: Dict[str, Any]) -> None:
+    labels = spec['labels']
+    colors = spec.get('colors') or theme_config['colors'][:len(labels)]
+
+    bars = ax.bar(labels, spec['data'], color=colors, alpha=0.7, edgecolor='black', linewidth=1.2)
+
+    ax.set_xlabel(spec['xlabel'], fontsize=12, fontweight='bold')
+    ax.set_ylabel(spec['ylabel'], fontsize=12, fontweight='bold')
+    ax.set_title(spec['title'], fontsize=14, fontweight='bold', pad=20)
+
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        if height >= 0:
+            ax.text(bar.get_x() + bar.get_width() / 2., height,
+                    f'{height:.2f}',
+                    ha='center', va='bottom', fontsize=10)
+
+
+def _draw_line(ax: Any, spec: Dict[str, Any], theme_config: Dict[str, Any]) -> None:
+    labels = spec['labels']
+    x_pos = np.arange(len(labels))
+
+    # Plot multiple lines
+    for i, (series_name, values) in enumerate(spec['data'].items()):
+        color = theme_config['colors'][i % len(theme_config['colors'])]
+        ax.plot(x_pos, values, marker='o', label=series_name, linewidth=2,
+                color=color, markersize=8, alpha=0.8)
+
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    ax.set_xlabel(spec['xlabel'], fontsize=12, fontweight='bold')
+    ax.set_ylabel(spec['ylabel'], fontsize=12, fontweight='bold')
+    ax.set_title(spec['title'], fontsize=14, fontweight='bold', pad=20)
+    ax.legend(loc='best', framealpha=0.9)
+
+
+def _draw_pie(ax: Any, spec: Dict[str, Any], theme_config: Dict[str, Any]) -> None:
+    labels = spec['labels']
+
+    wedges, texts, autotexts = ax.pie(
+        spec['data'],
+        labels=labels,
+        autopct='%1.1f%%',
+        colors=theme_config['colors'][:len(labels)],
+        startangle=90,
+        textprops={'color': theme_config['text'], 'fontsize': 10}
+    )
+
+    # Format percentage text
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(10)
+
+    ax.set_title(spec['title'], fontsize=14, fontweight='bold', pad=20,
+                 color=theme_config['text'])
+
+
+def _draw_histogram(ax: Any, spec: Dict[str, Any], theme_config: Dict[str, Any]) -> None:
+    ax.hist(spec['data'], bins=spec['bins'], color=theme_config['colors'][0],
+            alpha=0.7, edgecolor='black', linewidth=1.2)
+
+    ax.set_xlabel(spec['xlabel'], fontsize=12, fontweight='bold')
+    ax.set_ylabel(spec['ylabel'], fontsize=12, fontweight='bold')
+    ax.set_title(spec['title'], fontsize=14, fontweight='bold', pad=20)
+
+
+def _draw_box_plot(ax: Any, spec: Dict[str, Any], theme_config: Dict[str, Any]) -> None:
+    labels = list(spec['data'].keys())
+    values = list(spec['data'].values())
+
+    bp = ax.boxplot(values, labels=labels, patch_artist=True,
+                    medianprops=dict(color='red', linewidth=2))
+
+    # Color boxes
+    for patch, color in zip(bp['boxes'], theme_config['colors'][:len(labels)]):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.7)
+
+    ax.set_ylabel(spec['ylabel'], fontsize=12, fontweight='bold')
+    ax.set_title(spec['title'], fontsize=14, fontweight='bold', pad=20)
+
+
+DRAWERS: Dict[str, Callable[[Any, Dict[str, Any], Dict[str, Any]], None]] = {
+    'bar': _draw_bar,
+    'line': _draw_line,
+    'pie': _draw_pie,
+    'histogram': _draw_histogram,
+    'box_plot': _draw_box_plot,
+}
+
+
+def render_chart(spec: Dict[str, Any], fmt: str) -> bytes:
+    """
+    Render a chart spec to a single output format.
+
+    Args:
+        spec: Chart spec ('chart_type', 'size', 'theme', 'title' and data)
+        fmt: 'png' or 'svg'
+
+    Returns:
+        Encoded image bytes
+    """
+    fig = Figure(figsize=SIZES.get(spec['size'], SIZES['medium']))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    theme = spec['theme']
+    DRAWERS[spec['chart_type']](ax, spec, THEMES.get(theme, THEMES['light']))
+
+    apply_theme(fig, ax, theme)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **FORMATS[fmt])
+    return buffer.getvalue()
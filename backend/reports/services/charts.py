@@ -5,61 +5,87 @@ Supports multiple chart types (bar, line, pie, histogram, box plot)
 with various output formats (PNG, SVG, JSON).
 
 Features:
-- Base64 encoded image output for embedding in emails/PDFs
+- Content-addressed charts: the id is a hash of data, labels, size and theme
+- Rendered once per format, lazily, and stored as files served by URL
+- Optional inline base64/SVG output for embedding in emails/PDFs
 - Configurable sizes and themes
 - Accessibility features (alt text, color contrast)
-- Response caching (5 minutes)
-- Async generation for large datasets (Celery)
+- Rendering in a process pool (CHART_RENDER_WORKERS, 0 renders in-process)
 """
 
 import base64
-import io
 import json
 import logging
-from typing import Any, Dict, List, Optional
-
-import matplotlib.pyplot as plt
-import numpy as np
-from django.core.cache import cache
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from matplotlib.figure import Figure
 
+from reports.services import chart_rendering
+
 logger = logging.getLogger(__name__)
 
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared chart render pool, created on first use (None when disabled)."""
+    global _render_pool
+
+    workers = getattr(settings, 'CHART_RENDER_WORKERS', 2)
+    if workers <= 0:
+        return None
+
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: workers must not inherit DB connections or threads
+            _render_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _render_pool
+
+
+def _reset_render_pool() -> None:
+    global _render_pool
+
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False)
+        _render_pool = None
+
 
 class ChartGenerationService:
     """Service for generating various types of charts for reports."""
 
     # Predefined sizes (width, height)
-    SIZES = {
-        'small': (6, 4),
-        'medium': (10, 6),
-        'large': (14, 8),
-    }
+    SIZES = chart_rendering.SIZES
 
     # Color schemes for light/dark themes
-    THEMES = {
-        'light': {
-            'background': '#ffffff',
-            'text': '#000000',
-            'grid': '#e0e0e0',
-            'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'],
-        },
-        'dark': {
-            'background': '#1a1a1a',
-            'text': '#ffffff',
-            'grid': '#333333',
-            'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'],
-        },
+    THEMES = chart_rendering.THEMES
+
+    # Supported output formats and their content types
+    FORMATS = {
+        'png': 'image/png',
+        'svg': 'image/svg+xml',
     }
 
-    @staticmethod
-    def _get_cache_key(chart_type: str, data_hash: str) -> str:
-        """Generate cache key for chart data."""
-        return f"chart_{chart_type}_{data_hash}"
+    # Storage prefix for rendered charts and their specs
+    STORAGE_DIR = 'charts'
+
+    # Seconds to wait for a render worker
+    RENDER_TIMEOUT = 60
 
     @staticmethod
     def _hash_data(data: Dict[str, Any]) -> str:
-        """Create hash of chart data for caching."""
+        """Create hash of chart data (the chart id)."""
         import hashlib
         data_str = json.dumps(data, sort_keys=True, default=str)
         return hashlib.md5(data_str.encode()).hexdigest()
@@ -67,21 +93,7 @@ class ChartGenerationService:
     @staticmethod
     def _apply_theme(fig: Figure, ax: Any, theme: str = 'light') -> None:
         """Apply theme styling to figure and axes."""
-        theme_config = ChartGenerationService.THEMES.get(theme, ChartGenerationService.THEMES['light'])
-
-        fig.patch.set_facecolor(theme_config['background'])
-        ax.patch.set_facecolor(theme_config['background'])
-        ax.spines['bottom'].set_color(theme_config['text'])
-        ax.spines['left'].set_color(theme_config['text'])
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-
-        ax.tick_params(colors=theme_config['text'])
-        ax.xaxis.label.set_color(theme_config['text'])
-        ax.yaxis.label.set_color(theme_config['text'])
-        ax.title.set_color(theme_config['text'])
-
-        ax.grid(True, alpha=0.3, color=theme_config['grid'], linestyle='--')
+        chart_rendering.apply_theme(fig, ax, theme)
 
     @classmethod
     def generate_bar_chart(
@@ -94,6 +106,8 @@ class ChartGenerationService:
         size: str = 'medium',
         theme: str = 'light',
         colors: Optional[List[str]] = None,
+        format: str = 'png',
+        inline: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a bar chart.
@@ -107,9 +121,11 @@ class ChartGenerationService:
             size: Chart size ('small', 'medium', 'large')
             theme: Color theme ('light', 'dark')
             colors: Custom color list
+            format: Output format ('png', 'svg')
+            inline: Also return the image itself (base64 PNG or SVG markup)
 
         Returns:
-            Dictionary with 'png_base64', 'svg', and 'json' formats
+            Dictionary with 'chart_id', 'url', 'json' (see _chart_result)
         """
         if len(labels) != len(data):
             raise ValueError("Labels and data must have the same length")
@@ -117,43 +133,18 @@ class ChartGenerationService:
         if not labels or not data:
             raise ValueError("Labels and data cannot be empty")
 
-        # Check cache
-        cache_key = cls._get_cache_key('bar', cls._hash_data({'labels': labels, 'data': data}))
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-
-        fig_size = cls.SIZES.get(size, cls.SIZES['medium'])
-        fig, ax = plt.subplots(figsize=fig_size)
-
-        # Use theme colors if not provided
-        if colors is None:
-            colors = cls.THEMES[theme]['colors'][:len(labels)]
-
-        bars = ax.bar(labels, data, color=colors, alpha=0.7, edgecolor='black', linewidth=1.2)
-
-        ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
-        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            if height >= 0:
-                ax.text(bar.get_x() + bar.get_width() / 2., height,
-                        f'{height:.2f}',
-                        ha='center', va='bottom', fontsize=10)
-
-        cls._apply_theme(fig, ax, theme)
-        plt.tight_layout()
-
-        result = cls._export_chart(fig, title)
-
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
-
-        plt.close(fig)
-        return result
+        spec = {
+            'chart_type': 'bar',
+            'labels': [str(label) for label in labels],
+            'data': [float(value) for value in data],
+            'title': title,
+            'xlabel': xlabel,
+            'ylabel': ylabel,
+            'size': size,
+            'theme': theme,
+            'colors': colors,
+        }
+        return cls._chart_result(spec, format, inline)
 
     @classmethod
     def generate_line_chart(
@@ -165,6 +156,8 @@ class ChartGenerationService:
         ylabel: str = "Values",
         size: str = 'medium',
         theme: str = 'light',
+        format: str = 'png',
+        inline: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a line chart (supports multiple lines).
@@ -177,9 +170,11 @@ class ChartGenerationService:
             ylabel: Y-axis label
             size: Chart size
             theme: Color theme
+            format: Output format ('png', 'svg')
+            inline: Also return the image itself
 
         Returns:
-            Dictionary with chart formats
+            Dictionary with chart id, URL and metadata
         """
         if not labels or not data:
             raise ValueError("Labels and data cannot be empty")
@@ -188,41 +183,20 @@ class ChartGenerationService:
             if len(series_data) != len(labels):
                 raise ValueError("All data series must match labels length")
 
-        # Check cache
-        cache_key = cls._get_cache_key('line', cls._hash_data({'labels': labels, 'data': data}))
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-
-        fig_size = cls.SIZES.get(size, cls.SIZES['medium'])
-        fig, ax = plt.subplots(figsize=fig_size)
-
-        theme_config = cls.THEMES.get(theme, cls.THEMES['light'])
-        x_pos = np.arange(len(labels))
-
-        # Plot multiple lines
-        for i, (series_name, values) in enumerate(data.items()):
-            color = theme_config['colors'][i % len(theme_config['colors'])]
-            ax.plot(x_pos, values, marker='o', label=series_name, linewidth=2,
-                   color=color, markersize=8, alpha=0.8)
-
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(labels, rotation=45, ha='right')
-        ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
-        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        ax.legend(loc='best', framealpha=0.9)
-
-        cls._apply_theme(fig, ax, theme)
-        plt.tight_layout()
-
-        result = cls._export_chart(fig, title)
-
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
-
-        plt.close(fig)
-        return result
+        spec = {
+            'chart_type': 'line',
+            'labels': [str(label) for label in labels],
+            'data': {
+                str(name): [float(value) for value in values]
+                for name, values in data.items()
+            },
+            'title': title,
+            'xlabel': xlabel,
+            'ylabel': ylabel,
+            'size': size,
+            'theme': theme,
+        }
+        return cls._chart_result(spec, format, inline)
 
     @classmethod
     def generate_pie_chart(
@@ -232,6 +206,8 @@ class ChartGenerationService:
         title: str = "Pie Chart",
         size: str = 'medium',
         theme: str = 'light',
+        format: str = 'png',
+        inline: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a pie chart.
@@ -242,9 +218,11 @@ class ChartGenerationService:
             title: Chart title
             size: Chart size
             theme: Color theme
+            format: Output format ('png', 'svg')
+            inline: Also return the image itself
 
         Returns:
-            Dictionary with chart formats
+            Dictionary with chart id, URL and metadata
         """
         if len(labels) != len(data):
             raise ValueError("Labels and data must have the same length")
@@ -252,45 +230,15 @@ class ChartGenerationService:
         if not labels or not data or sum(data) <= 0:
             raise ValueError("Valid labels and positive data required")
 
-        # Check cache
-        cache_key = cls._get_cache_key('pie', cls._hash_data({'labels': labels, 'data': data}))
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-
-        fig_size = cls.SIZES.get(size, cls.SIZES['medium'])
-        fig, ax = plt.subplots(figsize=fig_size)
-
-        theme_config = cls.THEMES.get(theme, cls.THEMES['light'])
-
-        wedges, texts, autotexts = ax.pie(
-            data,
-            labels=labels,
-            autopct='%1.1f%%',
-            colors=theme_config['colors'][:len(labels)],
-            startangle=90,
-            textprops={'color': theme_config['text'], 'fontsize': 10}
-        )
-
-        # Format percentage text
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(10)
-
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20,
-                    color=theme_config['text'])
-
-        cls._apply_theme(fig, ax, theme)
-        plt.tight_layout()
-
-        result = cls._export_chart(fig, title)
-
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
-
-        plt.close(fig)
-        return result
+        spec = {
+            'chart_type': 'pie',
+            'labels': [str(label) for label in labels],
+            'data': [float(value) for value in data],
+            'title': title,
+            'size': size,
+            'theme': theme,
+        }
+        return cls._chart_result(spec, format, inline)
 
     @classmethod
     def generate_histogram(
@@ -302,6 +250,8 @@ class ChartGenerationService:
         bins: int = 10,
         size: str = 'medium',
         theme: str = 'light',
+        format: str = 'png',
+        inline: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a histogram.
@@ -314,41 +264,26 @@ class ChartGenerationService:
             bins: Number of bins
             size: Chart size
             theme: Color theme
+            format: Output format ('png', 'svg')
+            inline: Also return the image itself
 
         Returns:
-            Dictionary with chart formats
+            Dictionary with chart id, URL and metadata
         """
         if not data or len(data) == 0:
             raise ValueError("Data cannot be empty")
 
-        # Check cache
-        cache_key = cls._get_cache_key('histogram', cls._hash_data({'data': data, 'bins': bins}))
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-
-        fig_size = cls.SIZES.get(size, cls.SIZES['medium'])
-        fig, ax = plt.subplots(figsize=fig_size)
-
-        theme_config = cls.THEMES.get(theme, cls.THEMES['light'])
-        color = theme_config['colors'][0]
-
-        ax.hist(data, bins=bins, color=color, alpha=0.7, edgecolor='black', linewidth=1.2)
-
-        ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
-        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-
-        cls._apply_theme(fig, ax, theme)
-        plt.tight_layout()
-
-        result = cls._export_chart(fig, title)
-
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
-
-        plt.close(fig)
-        return result
+        spec = {
+            'chart_type': 'histogram',
+            'data': [float(value) for value in data],
+            'bins': bins,
+            'title': title,
+            'xlabel': xlabel,
+            'ylabel': ylabel,
+            'size': size,
+            'theme': theme,
+        }
+        return cls._chart_result(spec, format, inline)
 
     @classmethod
     def generate_box_plot(
@@ -358,6 +293,8 @@ class ChartGenerationService:
         ylabel: str = "Values",
         size: str = 'medium',
         theme: str = 'light',
+        format: str = 'png',
+        inline: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a box plot showing quartile distribution.
@@ -368,87 +305,159 @@ class ChartGenerationService:
             ylabel: Y-axis label
             size: Chart size
             theme: Color theme
+            format: Output format ('png', 'svg')
+            inline: Also return the image itself
 
         Returns:
-            Dictionary with chart formats
+            Dictionary with chart id, URL and metadata
         """
         if not data or len(data) == 0:
             raise ValueError("Data cannot be empty")
 
-        # Check cache
-        cache_key = cls._get_cache_key('boxplot', cls._hash_data({'data': {k: len(v) for k, v in data.items()}}))
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
+        spec = {
+            'chart_type': 'box_plot',
+            'data': {
+                str(name): [float(value) for value in values]
+                for name, values in data.items()
+            },
+            'title': title,
+            'ylabel': ylabel,
+            'size': size,
+            'theme': theme,
+        }
+        return cls._chart_result(spec, format, inline)
 
-        fig_size = cls.SIZES.get(size, cls.SIZES['medium'])
-        fig, ax = plt.subplots(figsize=fig_size)
+    @classmethod
+    def get_chart(cls, chart_id: str, format: str = 'png', inline: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a previously generated chart in any format.
 
-        theme_config = cls.THEMES.get(theme, cls.THEMES['light'])
+        Formats not requested at generation time are rendered now from the
+        stored spec.
+
+        Returns:
+            Chart dictionary, or None if the chart id is unknown
+        """
+        spec_path = cls._storage_path(chart_id, 'json')
+        if not default_storage.exists(spec_path):
+            return None
 
-        labels = list(data.keys())
-        values = list(data.values())
+        with default_storage.open(spec_path, 'rb') as spec_file:
+            spec = json.loads(spec_file.read())
 
-        bp = ax.boxplot(values, labels=labels, patch_artist=True,
-                       medianprops=dict(color='red', linewidth=2))
+        return cls._chart_result(spec, format, inline)
 
-        # Color boxes
-        for patch, color in zip(bp['boxes'], theme_config['colors'][:len(labels)]):
-            patch.set_facecolor(color)
-            patch.set_alpha(0.7)
+    # ========================================================================
+    # RENDER PIPELINE
+    # ========================================================================
 
-        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    @classmethod
+    def _storage_path(cls, chart_id: str, extension: str) -> str:
+        return f"{cls.STORAGE_DIR}/{chart_id[:2]}/{chart_id}.{extension}"
 
-        cls._apply_theme(fig, ax, theme)
-        plt.tight_layout()
+    @classmethod
+    def _chart_result(cls, spec: Dict[str, Any], format: str, inline: bool) -> Dict[str, Any]:
+        """
+        Build the chart response, rendering only if this format is not stored yet.
 
-        result = cls._export_chart(fig, title)
+        Returns:
+            {
+                'chart_id': str,
+                'format': str,
+                'url': str,
+                'content_type': str,
+                'json': dict,
+                'title': str,
+                'alt_text': str,
+                'png_base64' or 'svg': inline image (only when inline=True)
+            }
+        """
+        if format not in cls.FORMATS:
+            raise ValueError(
+                f"Invalid format: {format}. Valid formats: {', '.join(cls.FORMATS)}"
+            )
+
+        chart_id = cls._hash_data(spec)
+        path, content = cls._ensure_rendered(chart_id, spec, format, load=inline)
+        title = spec['title']
+
+        result = {
+            'chart_id': chart_id,
+            'format': format,
+            'url': default_storage.url(path),
+            'content_type': cls.FORMATS[format],
+            'json': {
+                'title': title,
+                'type': 'chart',
+                'chart_type': spec['chart_type'],
+                'formats': list(cls.FORMATS),
+            },
+            'title': title,
+            'alt_text': f'{title} - Chart visualization',
+        }
 
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
+        if inline:
+            if format == 'png':
+                result['png_base64'] = (
+                    f"data:image/png;base64,{base64.b64encode(content).decode('utf-8')}"
+                )
+            else:
+                result['svg'] = content.decode('utf-8')
 
-        plt.close(fig)
         return result
 
-    @staticmethod
-    def _export_chart(fig: Figure, title: str) -> Dict[str, Any]:
+    @classmethod
+    def _ensure_rendered(
+        cls,
+        chart_id: str,
+        spec: Dict[str, Any],
+        format: str,
+        load: bool = False
+    ) -> Tuple[str, Optional[bytes]]:
         """
-        Export chart to multiple formats.
+        Return the storage path of a rendered chart, rendering it if missing.
 
         Args:
-            fig: Matplotlib figure
-            title: Chart title (for accessibility)
+            load: Also return the image bytes
 
         Returns:
-            Dictionary with 'png_base64', 'svg', and 'json' keys
+            (storage path, image bytes or None)
         """
-        # PNG base64
-        png_buffer = io.BytesIO()
-        fig.savefig(png_buffer, format='png', dpi=100, bbox_inches='tight')
-        png_buffer.seek(0)
-        png_base64 = base64.b64encode(png_buffer.read()).decode('utf-8')
-
-        # SVG
-        svg_buffer = io.BytesIO()
-        fig.savefig(svg_buffer, format='svg', bbox_inches='tight')
-        svg_buffer.seek(0)
-        svg_data = svg_buffer.getvalue().decode('utf-8')
-
-        # JSON representation
-        json_data = {
-            'title': title,
-            'type': 'chart',
-            'formats': ['png_base64', 'svg'],
-        }
+        path = cls._storage_path(chart_id, format)
 
-        return {
-            'png_base64': f'data:image/png;base64,{png_base64}',
-            'svg': svg_data,
-            'json': json_data,
-            'title': title,
-            'alt_text': f'{title} - Chart visualization',
-        }
+        if default_storage.exists(path):
+            if not load:
+                return path, None
+            with default_storage.open(path, 'rb') as image_file:
+                return path, image_file.read()
+
+        content = cls._render(spec, format)
+
+        spec_path = cls._storage_path(chart_id, 'json')
+        if not default_storage.exists(spec_path):
+            default_storage.save(spec_path, ContentFile(json.dumps(spec, sort_keys=True).encode()))
+
+        # A concurrent render may have stored the same chart meanwhile
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(content))
+
+        return path, content
+
+    @classmethod
+    def _render(cls, spec: Dict[str, Any], format: str) -> bytes:
+        """Render one format, in the process pool when it is enabled."""
+        pool = _get_render_pool()
+        if pool is None:
+            return chart_rendering.render_chart(spec, format)
+
+        try:
+            return pool.submit(chart_rendering.render_chart, spec, format).result(
+                timeout=cls.RENDER_TIMEOUT
+            )
+        except BrokenProcessPool:
+            logger.warning("Chart render pool broken, rendering in-process")
+            _reset_render_pool()
+            return chart_rendering.render_chart(spec, format)
 
     @staticmethod
     def validate_chart_request(chart_type: str, data: Dict[str, Any]) -> tuple[bool, Optional[str]]:
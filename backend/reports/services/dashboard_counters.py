@@ -0,0 +1,341 @@
+"""
+Счетчики метрик дашборда в Redis (кэш 'dashboard').
+
+Метрики хранятся по scope: global, teacher:<id> (автор задания) и
+tutor:<id> (тьютор студента). Хуки сдачи/оценки (DashboardEventService)
+меняют их инкрементально по переходу состояния сдачи, поэтому подключение
+к дашборду стоит несколько GET вместо агрегатов по AssignmentSubmission.
+Периодический reconcile() пересчитывает все scope одним набором
+запросов и исправляет дрейф (пропущенные сигналы, массовые операции,
+total_assignments тьютора, который меняется через assigned_to).
+
+Ключи живут в поколении (dashboard_counters:g<N>:...). reconcile() пишет
+пересчет в новое поколение и переключает на него указатель, поэтому
+scope и счетчики студентов, которых нет в пересчете, перестают читаться
+сразу, а старое поколение удаляется целиком.
+
+Определения:
+- pending_submissions: сдачи в статусе SUBMITTED (ждут проверки)
+- ungraded_submissions: сдачи без балла
+- active_students: студенты хотя бы с одной сдачей
+- total_assignments: задания scope
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import caches
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+METRICS = ("pending_submissions", "ungraded_submissions", "active_students", "total_assignments")
+
+# Поле группировки сдач/заданий для каждого вида scope
+SUBMISSION_SCOPE_FIELDS = {
+    "teacher": "assignment__author_id",
+    "tutor": "student__student_profile__tutor_id",
+}
+ASSIGNMENT_SCOPE_FIELDS = {
+    "teacher": "author_id",
+    "tutor": "assigned_to__student_profile__tutor_id",
+}
+
+# Состояние сдачи для подсчета переходов: (pending, ungraded) или None
+SubmissionState = Optional[Tuple[bool, bool]]
+
+
+def submission_state(status: str, score) -> Tuple[bool, bool]:
+    from assignments.models import AssignmentSubmission
+
+    return status == AssignmentSubmission.Status.SUBMITTED, score is None
+
+
+def scope_for_user(user) -> str:
+    """Scope метрик дашборда пользователя."""
+    if user is not None and user.role in ("teacher", "tutor"):
+        return f"{user.role}:{user.id}"
+    return GLOBAL_SCOPE
+
+
+class DashboardCounters:
+    """Инкрементальные счетчики метрик дашборда."""
+
+    CACHE_ALIAS = "dashboard"
+
+    # Текущее поколение ключей и счетчик для выдачи следующего
+    GENERATION_KEY = "dashboard_counters:generation"
+    NEXT_GENERATION_KEY = "dashboard_counters:next_generation"
+
+    # Размер пачки set_many при пересчете
+    BATCH_SIZE = 500
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls.CACHE_ALIAS]
+
+    @classmethod
+    def _generation(cls) -> int:
+        return cls._cache().get(cls.GENERATION_KEY, 0)
+
+    @staticmethod
+    def metric_key(generation: int, scope: str, metric: str) -> str:
+        return f"dashboard_counters:g{generation}:{scope}:{metric}"
+
+    @staticmethod
+    def student_key(generation: int, scope: str, student_id: int) -> str:
+        return f"dashboard_counters:g{generation}:{scope}:student:{student_id}"
+
+    # Чтение
+
+    @classmethod
+    def get(cls, scope: str) -> Optional[dict]:
+        """Метрики scope из счетчиков; None, если scope еще не засеян."""
+        try:
+            generation = cls._generation()
+            keys = {cls.metric_key(generation, scope, metric): metric for metric in METRICS}
+            values = cls._cache().get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"[DashboardCounters] Read failed for {scope}: {e}")
+            return None
+
+        if len(values) != len(keys):
+            return None
+        return {keys[key]: max(0, int(value)) for key, value in values.items()}
+
+    @classmethod
+    def get_or_seed(cls, scope: str) -> dict:
+        """Метрики scope; при первом обращении считает и засевает счетчики."""
+        metrics = cls.get(scope)
+        if metrics is not None:
+            return metrics
+
+        computed = compute_scopes(*parse_scope(scope))
+        metrics, student_counts = computed.get(scope, (empty_metrics(), {}))
+        cls._store({scope: (metrics, student_counts)}, cls._generation())
+        return metrics
+
+    # Инкрементальные обновления
+
+    @classmethod
+    def apply_submission_change(
+        cls,
+        author_id: int,
+        student_id: int,
+        before: SubmissionState,
+        after: SubmissionState,
+    ) -> None:
+        """
+        Применяет переход состояния сдачи ко всем ее scope.
+
+        Args:
+            author_id: автор задания (scope teacher)
+            student_id: студент (его тьютор - scope tutor)
+            before: состояние до изменения (None - сдачи не было)
+            after: состояние после (None - сдача удалена)
+        """
+        if before == after:
+            return
+
+        deltas = {}
+        for index, metric in enumerate(("pending_submissions", "ungraded_submissions")):
+            delta = int(bool(after and after[index])) - int(bool(before and before[index]))
+            if delta:
+                deltas[metric] = delta
+
+        # Сдача появилась или исчезла: меняется число сдач студента
+        student_delta = (after is not None) - (before is not None)
+
+        for scope in cls.submission_scopes(author_id, student_id):
+            cls._apply(scope, deltas, student_id, student_delta)
+
+    @classmethod
+    def apply_assignment_change(cls, author_id: int, delta: int) -> None:
+        """Создание (+1) или удаление (-1) задания."""
+        for scope in (GLOBAL_SCOPE, f"teacher:{author_id}"):
+            cls._apply(scope, {"total_assignments": delta})
+
+    @staticmethod
+    def submission_scopes(author_id: int, student_id: int) -> List[str]:
+        from accounts.models import StudentProfile
+
+        scopes = [GLOBAL_SCOPE, f"teacher:{author_id}"]
+        tutor_id = (
+            StudentProfile.objects.filter(user_id=student_id)
+            .values_list("tutor_id", flat=True)
+            .first()
+        )
+        if tutor_id:
+            scopes.append(f"tutor:{tutor_id}")
+        return scopes
+
+    @classmethod
+    def _apply(cls, scope: str, deltas: Dict[str, int], student_id: Optional[int] = None,
+               student_delta: int = 0) -> None:
+        cache = cls._cache()
+        try:
+            generation = cls._generation()
+            # Незасеянный scope не трогаем: его посчитает get_or_seed()
+            if cache.get(cls.metric_key(generation, scope, "active_students")) is None:
+                return
+
+            if student_delta:
+                student_key = cls.student_key(generation, scope, student_id)
+                cache.add(student_key, 0, None)
+                submissions = cache.incr(student_key, student_delta)
+                if student_delta > 0 and submissions == 1:
+                    deltas = {**deltas, "active_students": 1}
+                elif student_delta < 0 and submissions <= 0:
+                    cache.delete(student_key)
+                    deltas = {**deltas, "active_students": -1}
+
+            for metric, delta in deltas.items():
+                cache.incr(cls.metric_key(generation, scope, metric), delta)
+        except ValueError:
+            # Ключ истек между проверкой и incr - дрейф исправит reconcile()
+            logger.debug(f"[DashboardCounters] Counter missing for {scope}")
+        except Exception as e:
+            logger.warning(f"[DashboardCounters] Update failed for {scope}: {e}")
+
+    # Пересчет
+
+    @classmethod
+    def reconcile(cls) -> Dict[str, int]:
+        """
+        Пересчитывает все scope в новое поколение и переключается на него.
+
+        Scope и студенты, пропавшие из пересчета, остаются в старом
+        поколении и удаляются вместе с ним. Инкременты, пришедшие между
+        записью поколения и переключением, теряются до следующего пересчета.
+        """
+        cache = cls._cache()
+        previous = cls._generation()
+        cache.add(cls.NEXT_GENERATION_KEY, previous, None)
+        generation = cache.incr(cls.NEXT_GENERATION_KEY)
+
+        stored = {}
+        for kind in (None, "teacher", "tutor"):
+            computed = compute_scopes(kind)
+            cls._store(computed, generation)
+            stored[kind or GLOBAL_SCOPE] = len(computed)
+
+        cache.set(cls.GENERATION_KEY, generation, None)
+        cls._drop_generation(previous)
+
+        logger.info(f"[DashboardCounters] Reconciled scopes: {stored} (generation {generation})")
+        return stored
+
+    @classmethod
+    def _drop_generation(cls, generation: int) -> None:
+        cache = cls._cache()
+        # Без delete_pattern (locmem) старые ключи просто не читаются
+        # и вытесняются по лимиту кэша
+        if hasattr(cache, "delete_pattern"):
+            try:
+                cache.delete_pattern(f"dashboard_counters:g{generation}:*")
+            except Exception as e:
+                logger.warning(f"[DashboardCounters] Failed to drop generation {generation}: {e}")
+
+    @classmethod
+    def _store(cls, computed: Dict[str, Tuple[dict, Dict[int, int]]], generation: int) -> None:
+        values = {}
+        for scope, (metrics, student_counts) in computed.items():
+            for metric in METRICS:
+                values[cls.metric_key(generation, scope, metric)] = metrics[metric]
+            for student_id, submissions in student_counts.items():
+                values[cls.student_key(generation, scope, student_id)] = submissions
+
+        items = list(values.items())
+        cache = cls._cache()
+        for start in range(0, len(items), cls.BATCH_SIZE):
+            cache.set_many(dict(items[start:start + cls.BATCH_SIZE]), None)
+
+
+def empty_metrics() -> dict:
+    return {metric: 0 for metric in METRICS}
+
+
+def parse_scope(scope: str) -> Tuple[Optional[str], Optional[int]]:
+    if scope == GLOBAL_SCOPE:
+        return None, None
+    kind, scope_id = scope.split(":", 1)
+    return kind, int(scope_id)
+
+
+def compute_scopes(kind: Optional[str] = None, scope_id: Optional[int] = None
+                   ) -> Dict[str, Tuple[dict, Dict[int, int]]]:
+    """
+    Считает метрики и число сдач на студента для scope одного вида.
+
+    Запросы групповые: для всех учителей (или тьюторов) сразу, либо
+    для одного scope_id.
+
+    Args:
+        kind: None (global), 'teacher' или 'tutor'
+        scope_id: ограничить одним учителем/тьютором
+
+    Returns:
+        {scope: (metrics, {student_id: submissions})}
+    """
+    from assignments.models import Assignment, AssignmentSubmission
+
+    submissions = AssignmentSubmission.objects.all()
+    assignments = Assignment.objects.all()
+    aggregates = {
+        "pending_submissions": Count("id", filter=Q(status=AssignmentSubmission.Status.SUBMITTED)),
+        "ungraded_submissions": Count("id", filter=Q(score__isnull=True)),
+        "active_students": Count("student_id", distinct=True),
+    }
+
+    if kind is None:
+        metrics = {**empty_metrics(), **submissions.aggregate(**aggregates)}
+        metrics["total_assignments"] = assignments.count()
+        student_counts = dict(
+            submissions.values("student_id").annotate(n=Count("id")).values_list("student_id", "n")
+        )
+        return {GLOBAL_SCOPE: (metrics, student_counts)}
+
+    submission_field = SUBMISSION_SCOPE_FIELDS[kind]
+    assignment_field = ASSIGNMENT_SCOPE_FIELDS[kind]
+    if scope_id is not None:
+        submissions = submissions.filter(**{submission_field: scope_id})
+        assignments = assignments.filter(**{assignment_field: scope_id})
+
+    result: Dict[str, Tuple[dict, Dict[int, int]]] = {}
+
+    def entry(owner_id) -> Tuple[dict, Dict[int, int]]:
+        scope = f"{kind}:{owner_id}"
+        if scope not in result:
+            result[scope] = (empty_metrics(), {})
+        return result[scope]
+
+    for row in submissions.values(submission_field).annotate(**aggregates):
+        owner_id = row.pop(submission_field)
+        if owner_id is not None:
+            entry(owner_id)[0].update(row)
+
+    totals = (
+        assignments.values(assignment_field)
+        .annotate(total=Count("id", distinct=True))
+        .values_list(assignment_field, "total")
+    )
+    for owner_id, total in totals:
+        if owner_id is not None:
+            entry(owner_id)[0]["total_assignments"] = total
+
+    per_student = (
+        submissions.values(submission_field, "student_id")
+        .annotate(n=Count("id"))
+        .values_list(submission_field, "student_id", "n")
+    )
+    for owner_id, student_id, count in per_student:
+        if owner_id is not None:
+            entry(owner_id)[1][student_id] = count
+
+    if scope_id is not None:
+        entry(scope_id)
+
+    return result
+
@@ -0,0 +1,223 @@
+"""
+Общий публикатор метрик дашборда.
+
+Вместо цикла опроса в каждом сокете метрики scope считает один лидер:
+- лидер выбирается через лизинг в общем кэше (cache.add с TTL),
+  поэтому на весь кластер работает один расчет на scope;
+- метрики читаются из инкрементальных счетчиков (dashboard_counters),
+  публикация раз в INTERVAL секунд или раньше, если DashboardEventService
+  пометил метрики устаревшими (сдача работы, оценка);
+- результат рассылается в группу каналов и сохраняется в кэше,
+  consumers только подписываются и читают последнее значение.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+
+from reports.services.dashboard_counters import (
+    GLOBAL_SCOPE,
+    DashboardCounters,
+    compute_scopes,
+    empty_metrics,
+    parse_scope,
+    scope_for_user,
+)
+
+logger = logging.getLogger(__name__)
+
+EMPTY_METRICS = empty_metrics()
+
+
+def compute_dashboard_metrics(user=None) -> dict:
+    """
+    Считает метрики дашборда по БД (без счетчиков).
+
+    Args:
+        user: учитель/тьютор для личных метрик; None - по всем заданиям
+
+    Returns:
+        dict с pending/ungraded/active/total
+    """
+    scope = scope_for_user(user)
+    try:
+        metrics, _ = compute_scopes(*parse_scope(scope)).get(scope, (empty_metrics(), {}))
+        return metrics
+    except Exception as e:
+        logger.error(f"[DashboardMetrics] Error computing metrics: {e}")
+        return empty_metrics()
+
+
+def get_dashboard_metrics(user=None) -> dict:
+    """
+    Метрики дашборда из счетчиков (несколько GET в Redis).
+
+    Незасеянный scope считается по БД один раз и засевается.
+    """
+    try:
+        return DashboardCounters.get_or_seed(scope_for_user(user))
+    except Exception as e:
+        logger.error(f"[DashboardMetrics] Error reading metrics: {e}")
+        return empty_metrics()
+
+
+class DashboardMetricsPublisher:
+    """
+    Лидер-публикатор метрик для одного scope.
+
+    В каждом процессе на scope один экземпляр: subscribe()/unsubscribe()
+    считают локальных подписчиков, цикл работает, пока они есть. Считает
+    и публикует только процесс, удерживающий лизинг.
+    """
+
+    # Плановый интервал публикации (секунды)
+    INTERVAL = 10
+
+    # Как часто цикл проверяет флаг "метрики устарели"
+    TICK = 1
+
+    # Время жизни лизинга лидера (продлевается каждый тик)
+    LEASE_TTL = 30
+
+    # Время хранения последних опубликованных метрик
+    LATEST_TTL = 60
+
+    GROUPS = {GLOBAL_SCOPE: "dashboard_metrics"}
+
+    _publishers: Dict[str, "DashboardMetricsPublisher"] = {}
+
+    def __init__(self, scope: str = GLOBAL_SCOPE):
+        self.scope = scope
+        self.group = self.GROUPS.get(scope, f"dashboard_metrics_{scope}")
+        self.token = uuid.uuid4().hex
+        self.subscribers = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # Ключи кэша
+
+    @staticmethod
+    def lease_key(scope: str) -> str:
+        return f"dashboard_metrics:{scope}:leader"
+
+    @staticmethod
+    def dirty_key(scope: str) -> str:
+        return f"dashboard_metrics:{scope}:dirty"
+
+    @staticmethod
+    def latest_key(scope: str) -> str:
+        return f"dashboard_metrics:{scope}:latest"
+
+    # API для consumers
+
+    @classmethod
+    def for_scope(cls, scope: str = GLOBAL_SCOPE) -> "DashboardMetricsPublisher":
+        publisher = cls._publishers.get(scope)
+        if publisher is None:
+            publisher = cls._publishers[scope] = cls(scope)
+        return publisher
+
+    @classmethod
+    def subscribe(cls, scope: str = GLOBAL_SCOPE) -> "DashboardMetricsPublisher":
+        """Регистрирует подписчика; первый подписчик в процессе запускает цикл."""
+        publisher = cls.for_scope(scope)
+        publisher.subscribers += 1
+        if publisher._task is None or publisher._task.done():
+            publisher._task = asyncio.create_task(publisher.run())
+        return publisher
+
+    @classmethod
+    async def unsubscribe(cls, scope: str = GLOBAL_SCOPE) -> None:
+        """Снимает подписчика; без подписчиков цикл останавливается и отдает лизинг."""
+        publisher = cls._publishers.get(scope)
+        if publisher is None:
+            return
+
+        publisher.subscribers = max(0, publisher.subscribers - 1)
+        if publisher.subscribers == 0 and publisher._task is not None:
+            publisher._task.cancel()
+            publisher._task = None
+            await sync_to_async(publisher.release_lease)()
+
+    @classmethod
+    def latest(cls, scope: str = GLOBAL_SCOPE) -> Optional[dict]:
+        """Последние опубликованные метрики (без запросов к БД)."""
+        return cache.get(cls.latest_key(scope))
+
+    # API для DashboardEventService
+
+    @classmethod
+    def mark_dirty(cls, scope: str = GLOBAL_SCOPE) -> None:
+        """Просит лидера пересчитать метрики на ближайшем тике."""
+        try:
+            cache.set(cls.dirty_key(scope), 1, cls.LEASE_TTL)
+        except Exception as e:
+            logger.warning(f"[DashboardMetrics] Failed to mark {scope} metrics dirty: {e}")
+
+    # Лидерство
+
+    def acquire_lease(self) -> bool:
+        """Захватывает или продлевает лизинг лидера."""
+        key = self.lease_key(self.scope)
+        try:
+            if cache.add(key, self.token, self.LEASE_TTL):
+                return True
+            if cache.get(key) == self.token:
+                cache.touch(key, self.LEASE_TTL)
+                return True
+            return False
+        except Exception as e:
+            logger.warning(f"[DashboardMetrics] Leader lease unavailable for {self.scope}: {e}")
+            return False
+
+    def release_lease(self) -> None:
+        key = self.lease_key(self.scope)
+        try:
+            if cache.get(key) == self.token:
+                cache.delete(key)
+        except Exception as e:
+            logger.warning(f"[DashboardMetrics] Failed to release lease for {self.scope}: {e}")
+
+    def consume_dirty(self) -> bool:
+        try:
+            return bool(cache.delete(self.dirty_key(self.scope)))
+        except Exception:
+            return False
+
+    # Цикл публикации
+
+    async def publish(self) -> dict:
+        """Читает метрики из счетчиков и рассылает их в группу."""
+        metrics = await database_sync_to_async(DashboardCounters.get_or_seed)(self.scope)
+        event = {
+            "type": "metrics_event",
+            **metrics,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+        await sync_to_async(cache.set)(self.latest_key(self.scope), metrics, self.LATEST_TTL)
+        await get_channel_layer().group_send(self.group, event)
+        return metrics
+
+    async def run(self) -> None:
+        """Цикл: раз в TICK проверяет лидерство и публикует по интервалу или флагу."""
+        last_published = 0.0
+        while True:
+            try:
+                if await sync_to_async(self.acquire_lease)():
+                    dirty = await sync_to_async(self.consume_dirty)()
+                    if dirty or time.monotonic() - last_published >= self.INTERVAL:
+                        await self.publish()
+                        last_published = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[DashboardMetrics] Error in publisher loop for {self.scope}: {e}")
+            await asyncio.sleep(self.TICK)
@@ -11,7 +11,7 @@ Features:
 
 import io
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
@@ -21,7 +21,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from reports.models import StudentReport, TutorWeeklyReport, TeacherWeeklyReport
-from reports.services.export import ReportExportService
+from openpyxl import Workbook
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -174,17 +174,134 @@ class EmailReportService:
         Returns:
             Excel file as bytes
         """
-        import csv as csv_module
         if not data:
             return b""
 
+        fieldnames = list(data[0].keys())
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Report")
+        worksheet.append(fieldnames)
+        for row in data:
+            worksheet.append([row.get(fieldname, "") for fieldname in fieldnames])
+
         output = io.BytesIO()
-        workbook = ReportExportService.create_workbook(data)
         workbook.save(output)
-        output.seek(0)
 
         return output.getvalue()
 
+    @staticmethod
+    def build_attachment(
+        data: List[Dict[str, Any]],
+        export_format: str,
+        report_type: str,
+    ) -> Tuple[str, bytes, str]:
+        """
+        Render report data into an email attachment.
+
+        Args:
+            data: List of report dictionaries
+            export_format: Export format (csv, xlsx; anything else falls back to CSV)
+            report_type: Type of report (used in the filename)
+
+        Returns:
+            (filename, content, mimetype)
+        """
+        filename = f"report_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        if export_format == 'xlsx':
+            return (
+                filename + ".xlsx",
+                EmailReportService.export_to_excel(data),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
+        # Default to CSV
+        return filename + ".csv", EmailReportService.export_to_csv(data), "text/csv"
+
+    @staticmethod
+    def build_scheduled_report_data(report_type: str, recipient: Any) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Collect the data a scheduled report sends to one recipient.
+
+        The data depends only on the report type and the recipient
+        (their role and id), so it can be shared between schedules.
+
+        Args:
+            report_type: ReportSchedule.report_type value
+            recipient: User receiving the report
+
+        Returns:
+            (email subject, list of report dictionaries)
+        """
+        report_data = []
+        subject = None
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        if report_type == 'student_report':
+            # For student reports, get reports for this recipient (if teacher)
+            if recipient.role == 'teacher':
+                student_reports = StudentReport.objects.filter(
+                    teacher_id=recipient.id,
+                    status='sent'
+                ).select_related('student').order_by('-created_at')[:10]
+
+                for report in student_reports:
+                    report_data.append({
+                        'id': report.id,
+                        'student': report.student.get_full_name(),
+                        'title': report.title,
+                        'type': report.get_report_type_display(),
+                        'period': f"{report.period_start} to {report.period_end}",
+                        'grade': report.overall_grade,
+                        'progress': report.progress_percentage,
+                    })
+
+                subject = f"Weekly Student Reports - {today}"
+
+        elif report_type == 'tutor_weekly_report':
+            # For tutor reports, get reports for this tutor or parent
+            if recipient.role in ('tutor', 'parent'):
+                role_filter = {'tutor_id': recipient.id} if recipient.role == 'tutor' else {'parent_id': recipient.id}
+                reports = TutorWeeklyReport.objects.filter(
+                    status='sent', **role_filter
+                ).select_related('student').order_by('-week_start')[:5]
+
+                for report in reports:
+                    report_data.append({
+                        'id': report.id,
+                        'student': report.student.get_full_name(),
+                        'week': f"{report.week_start} to {report.week_end}",
+                        'progress': report.progress_percentage,
+                        'summary': report.summary[:100],
+                    })
+
+                if recipient.role == 'tutor':
+                    subject = f"Tutor Weekly Reports - {today}"
+                else:
+                    subject = f"Student Weekly Reports - {today}"
+
+        elif report_type == 'teacher_weekly_report':
+            # For teacher reports, get reports for this tutor
+            if recipient.role == 'tutor':
+                reports = TeacherWeeklyReport.objects.filter(
+                    tutor_id=recipient.id,
+                    status='sent'
+                ).select_related('student', 'subject').order_by('-week_start')[:5]
+
+                for report in reports:
+                    report_data.append({
+                        'id': report.id,
+                        'student': report.student.get_full_name(),
+                        'subject': report.subject.name if report.subject else 'N/A',
+                        'week': f"{report.week_start} to {report.week_end}",
+                        'average_score': float(report.average_score) if report.average_score else 0,
+                        'summary': report.summary[:100],
+                    })
+
+                subject = f"Teacher Weekly Reports - {today}"
+
+        return subject, report_data
+
     @staticmethod
     def send_report_email(
         recipient_email: str,
@@ -194,6 +311,7 @@ class EmailReportService:
         export_format: str = 'csv',
         report_type: str = 'general',
         unsubscribe_token: Optional[str] = None,
+        attachment: Optional[Tuple[str, bytes, str]] = None,
     ) -> bool:
         """
         Send report via email with attachment.
@@ -206,6 +324,8 @@ class EmailReportService:
             export_format: Export format (csv, xlsx, pdf)
             report_type: Type of report
             unsubscribe_token: Token for unsubscribe link
+            attachment: Pre-rendered (filename, content, mimetype) shared
+                between recipients; rendered from report_data if omitted
 
         Returns:
             True if email sent successfully, False otherwise
@@ -217,17 +337,9 @@ class EmailReportService:
                 return False
 
             # Prepare attachment
-            attachment_filename = f"report_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-            if export_format == 'xlsx':
-                attachment_content = EmailReportService.export_to_excel(report_data)
-                attachment_filename += ".xlsx"
-                content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            else:
-                # Default to CSV
-                attachment_content = EmailReportService.export_to_csv(report_data)
-                attachment_filename += ".csv"
-                content_type = "text/csv"
+            if attachment is None:
+                attachment = EmailReportService.build_attachment(report_data, export_format, report_type)
+            attachment_filename, attachment_content, content_type = attachment
 
             # Create HTML email body
             html_body = EmailReportService.render_email_template(
@@ -6,23 +6,30 @@ with streaming support for large exports, custom column selection,
 date range filtering, and multiple encoding options.
 
 Features:
-- CSV export with streaming support and custom encoding
-- Excel export with advanced formatting (bold headers, frozen panes, number formatting)
+- CSV export streamed from lists, generators or querysets with custom encoding
+- Excel export in write-only mode with advanced formatting (bold headers,
+  frozen panes, number formatting)
 - Custom column filtering
-- Large dataset validation (max 100,000 rows)
 - Date/number formatting for Excel
 - Multiple character encodings support
 """
-import csv
-import io
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from django.http import StreamingHttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 
+from reports.services.streaming_export import (
+    column_widths,
+    iter_export_rows,
+    sample_rows,
+    stream_csv,
+    xlsx_file_response,
+)
+
 
 class ReportExportService:
     """Service for exporting reports to various formats.
@@ -34,9 +41,12 @@ class ReportExportService:
     - Multiple encoding options
     """
 
-    # Maximum rows for streaming before timeout
+    # Maximum rows for in-memory (list) datasets
     MAX_ROWS_BEFORE_TIMEOUT = 100000
 
+    # Excel sheet limit (1,048,576 rows including the header)
+    MAX_ROWS_FOR_EXCEL = 1048575
+
     # Default columns for each report type
     DEFAULT_COLUMNS = {
         'report': [
@@ -198,97 +208,69 @@ class ReportExportService:
 
     @staticmethod
     def export_to_csv(
-        data: List[Dict[str, Any]],
+        data: Iterable[Dict[str, Any]],
         report_name: str = "report",
         encoding: str = "utf-8-sig",
-        include_headers: bool = True
+        include_headers: bool = True,
+        columns: Optional[List[str]] = None
     ) -> StreamingHttpResponse:
         """
         Export data to CSV format with streaming response.
 
         Args:
-            data: List of dictionaries containing report data.
+            data: List, generator or QuerySet of report rows.
             report_name: Name for the exported file (without extension).
             encoding: Character encoding for CSV (default: utf-8-sig for Excel compatibility).
             include_headers: Whether to include header row.
+            columns: Columns to export (default: keys of the first row).
 
         Returns:
             StreamingHttpResponse with CSV data.
 
-        Raises:
-            ValueError: If dataset exceeds MAX_ROWS_BEFORE_TIMEOUT.
-
         Features:
-            - Streaming response for large datasets
-            - UTF-8 with BOM for Excel compatibility (default)
+            - Querysets are read with .iterator(), no row limit
+            - Encoded chunks go straight to the response
+            - UTF-8 with a single BOM for Excel compatibility (default)
             - Proper CSV escaping for special characters
             - Configurable headers and encoding
         """
-        if not ReportExportService.validate_dataset_size(data):
-            raise ValueError(
-                f"Dataset too large. Maximum {ReportExportService.MAX_ROWS_BEFORE_TIMEOUT} rows allowed."
-            )
-
-        if not data:
-            # Return empty CSV with headers
-            data = [{}]
-
-        # Get fieldnames from first item
-        fieldnames = list(data[0].keys()) if data else []
-
-        def generate():
-            """Generator for streaming CSV data with proper encoding."""
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-
-            # Write header if requested
-            if include_headers:
-                writer.writeheader()
-                yield output.getvalue()
-                output.truncate(0)
-                output.seek(0)
-
-            # Write rows
-            for row in data:
-                writer.writerow(row)
-                chunk = output.getvalue()
-                if chunk:
-                    yield chunk
-                    output.truncate(0)
-                    output.seek(0)
+        fieldnames, rows = iter_export_rows(data, columns)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{report_name}_{timestamp}.csv"
 
         return StreamingHttpResponse(
-            generate(),
+            stream_csv(fieldnames, rows, encoding=encoding, include_headers=include_headers),
             content_type="text/csv; charset=" + encoding,
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
 
     @staticmethod
     def export_to_excel(
-        data: List[Dict[str, Any]],
+        data: Iterable[Dict[str, Any]],
         report_name: str = "report",
-        freeze_panes: bool = True
-    ) -> StreamingHttpResponse:
+        freeze_panes: bool = True,
+        columns: Optional[List[str]] = None
+    ) -> FileResponse:
         """
         Export data to Excel format with advanced formatting.
 
         Args:
-            data: List of dictionaries containing report data.
+            data: List, generator or QuerySet of report rows.
             report_name: Name for the exported file (without extension).
             freeze_panes: Whether to freeze header row.
+            columns: Columns to export (default: keys of the first row).
 
         Returns:
-            StreamingHttpResponse with Excel data.
+            FileResponse with Excel data.
 
         Raises:
-            ValueError: If dataset exceeds MAX_ROWS_BEFORE_TIMEOUT.
+            ValueError: If dataset exceeds MAX_ROWS_FOR_EXCEL.
 
         Features:
+            - Write-only workbook saved to a temporary file (flat memory)
             - Bold headers with blue background
-            - Auto-fit column widths (max 50 chars)
+            - Column widths fitted to the first rows (max 50 chars)
             - Text wrapping for content
             - Frozen header row (configurable)
             - Number formatting:
@@ -296,20 +278,19 @@ class ReportExportService:
               - Regular numbers: integer format
               - Dates: YYYY-MM-DD format
         """
-        if not ReportExportService.validate_dataset_size(data):
-            raise ValueError(
-                f"Dataset too large. Maximum {ReportExportService.MAX_ROWS_BEFORE_TIMEOUT} rows allowed."
-            )
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Report")
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Report"
-
-        if not data:
+        fieldnames, rows = iter_export_rows(data, columns)
+        if not fieldnames:
             return ReportExportService._return_excel_file(wb, report_name)
 
-        # Get fieldnames from first item
-        fieldnames = list(data[0].keys())
+        # Write-only sheets need widths and panes before the first row
+        sample, rows = sample_rows(rows)
+        for col_idx, width in enumerate(column_widths(fieldnames, sample, min_width=0), start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        if freeze_panes and sample:
+            ws.freeze_panes = "A2"
 
         # Style header row
         header_fill = PatternFill(
@@ -318,18 +299,26 @@ class ReportExportService:
         header_font = Font(bold=True, color="FFFFFF", size=11)
 
         # Write headers
-        for col_idx, fieldname in enumerate(fieldnames, start=1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.value = fieldname
+        header = []
+        for fieldname in fieldnames:
+            cell = WriteOnlyCell(ws, value=fieldname)
             cell.fill = header_fill
             cell.font = header_font
             cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            header.append(cell)
+        ws.append(header)
 
         # Write data rows with proper formatting
-        for row_idx, row_data in enumerate(data, start=2):
-            for col_idx, fieldname in enumerate(fieldnames, start=1):
-                cell = ws.cell(row=row_idx, column=col_idx)
+        for row_count, row_data in enumerate(rows, start=1):
+            if row_count > ReportExportService.MAX_ROWS_FOR_EXCEL:
+                raise ValueError(
+                    f"Dataset too large. Maximum {ReportExportService.MAX_ROWS_FOR_EXCEL} rows allowed."
+                )
+
+            cells = []
+            for fieldname in fieldnames:
                 value = row_data.get(fieldname, "")
+                cell = WriteOnlyCell(ws, value=value)
 
                 # Apply formatting based on value type
                 if isinstance(value, (int, float)):
@@ -350,51 +339,22 @@ class ReportExportService:
                     # Text alignment
                     cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
 
-                cell.value = value
-
-        # Adjust column widths
-        for col_idx, fieldname in enumerate(fieldnames, start=1):
-            column_letter = get_column_letter(col_idx)
-            # Calculate width based on header and content
-            max_length = len(str(fieldname))
-            for row in ws.iter_rows(min_col=col_idx, max_col=col_idx, min_row=2):
-                for cell in row:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except (TypeError, AttributeError):
-                        pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Freeze panes (freeze header row)
-        if freeze_panes and len(data) > 0:
-            ws.freeze_panes = "A2"
+                cells.append(cell)
+            ws.append(cells)
 
         return ReportExportService._return_excel_file(wb, report_name)
 
     @staticmethod
-    def _return_excel_file(wb: Workbook, report_name: str) -> StreamingHttpResponse:
+    def _return_excel_file(wb: Workbook, report_name: str) -> FileResponse:
         """
-        Return Excel workbook as streaming response.
+        Return Excel workbook as a file response.
 
         Args:
-            wb: Workbook instance.
+            wb: Write-only Workbook instance.
             report_name: Name for the exported file (without extension).
 
         Returns:
-            StreamingHttpResponse with Excel data.
+            FileResponse streaming a temporary .xlsx file.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{report_name}_{timestamp}.xlsx"
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        return StreamingHttpResponse(
-            iter([output.getvalue()]),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
+        return xlsx_file_response(wb, report_name, timestamp)
@@ -10,6 +10,9 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 
+from reports.services.dashboard_counters import DashboardCounters, submission_state
+from reports.services.dashboard_metrics import DashboardMetricsPublisher
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,9 @@ class DashboardEventService:
                 }
             )
 
+            # Метрики пересчитает лидер-публикатор на ближайшем тике
+            DashboardMetricsPublisher.mark_dirty()
+
             logger.info(f'[DashboardEventService] Broadcast submission event: assignment={assignment.id}, student={student.id}')
         except Exception as e:
             logger.error(f'[DashboardEventService] Error broadcasting submission event: {e}')
@@ -106,10 +112,69 @@ class DashboardEventService:
                 }
             )
 
+            DashboardMetricsPublisher.mark_dirty()
+
             logger.info(f'[DashboardEventService] Broadcast grade event: assignment={assignment.id}, student={student.id}, grade={grade}')
         except Exception as e:
             logger.error(f'[DashboardEventService] Error broadcasting grade event: {e}')
 
+    @staticmethod
+    def record_submission_change(submission, previous, created):
+        """
+        Обновляет счетчики дашборда после сохранения сдачи.
+
+        Args:
+            submission: AssignmentSubmission объект
+            previous: (status, score) до сохранения или None
+            created: сдача только что создана
+        """
+        try:
+            before = None if created or previous is None else submission_state(*previous)
+            after = submission_state(submission.status, submission.score)
+            if before == after:
+                return
+
+            DashboardCounters.apply_submission_change(
+                submission.assignment.author_id, submission.student_id, before, after
+            )
+            DashboardMetricsPublisher.mark_dirty()
+        except Exception as e:
+            logger.error(f'[DashboardEventService] Error updating counters for submission {submission.id}: {e}')
+
+    @staticmethod
+    def record_submission_deleted(submission):
+        """
+        Убирает удаленную сдачу из счетчиков дашборда.
+
+        Args:
+            submission: AssignmentSubmission объект
+        """
+        try:
+            DashboardCounters.apply_submission_change(
+                submission.assignment.author_id,
+                submission.student_id,
+                submission_state(submission.status, submission.score),
+                None,
+            )
+            DashboardMetricsPublisher.mark_dirty()
+        except Exception as e:
+            logger.error(f'[DashboardEventService] Error updating counters for deleted submission {submission.id}: {e}')
+
+    @staticmethod
+    def record_assignment_change(assignment, delta):
+        """
+        Обновляет число заданий на дашборде.
+
+        Args:
+            assignment: Assignment объект
+            delta: +1 при создании, -1 при удалении
+        """
+        try:
+            DashboardCounters.apply_assignment_change(assignment.author_id, delta)
+            DashboardMetricsPublisher.mark_dirty()
+        except Exception as e:
+            logger.error(f'[DashboardEventService] Error updating counters for assignment {assignment.id}: {e}')
+
     @staticmethod
     def broadcast_assignment_created(assignment):
         """
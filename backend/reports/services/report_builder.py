@@ -11,7 +11,11 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, date
 from decimal import Decimal
 
-from django.db.models import Q, Avg, Count, Sum, Case, When, Value, CharField, F
+from django.db import connection
+from django.db.models import (
+    Q, Avg, Count, Max, Sum, Case, When, Value, CharField, F,
+    IntegerField, FloatField, DateTimeField, OuterRef, Subquery
+)
 from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -30,6 +34,25 @@ class ReportBuilderException(Exception):
     pass
 
 
+class QueryCounter:
+    """
+    Counts database queries issued on a connection.
+
+    Usage:
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            ...
+        counter.count
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
 class ReportBuilder:
     """
     Builds custom reports based on user-defined configurations.
@@ -125,6 +148,9 @@ class ReportBuilder:
         },
     }
 
+    # Builds above this many queries are logged as a likely N+1 regression
+    QUERY_COUNT_WARNING_THRESHOLD = 20
+
     def __init__(self, report: CustomReport):
         """
         Initialize report builder.
@@ -134,7 +160,8 @@ class ReportBuilder:
         """
         self.report = report
         self.config = report.config
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
+        self.query_counter = QueryCounter()
 
     def build(self) -> Dict[str, Any]:
         """
@@ -149,7 +176,8 @@ class ReportBuilder:
             filters = self.config.get('filters', {})
 
             # Fetch data
-            data = self._fetch_data(fields, filters)
+            with connection.execute_wrapper(self.query_counter):
+                data = self._fetch_data(fields, filters)
 
             # Apply sorting if specified
             if 'sort_by' in self.config:
@@ -165,7 +193,13 @@ class ReportBuilder:
             if 'chart_type' in self.config:
                 chart_data = self._generate_chart_data(data, self.config['chart_type'])
 
-            execution_time = int((time.time() - self.start_time) * 1000)
+            execution_time = int((time.perf_counter() - self.start_time) * 1000)
+            query_count = self.query_counter.count
+            if query_count > self.QUERY_COUNT_WARNING_THRESHOLD:
+                logger.warning(
+                    f"Report {self.report.pk} issued {query_count} queries "
+                    f"for {len(data)} rows"
+                )
 
             result = {
                 'report_name': self.report.name,
@@ -175,12 +209,13 @@ class ReportBuilder:
                 'data': data,
                 'row_count': len(data),
                 'execution_time_ms': execution_time,
+                'query_count': query_count,
                 'chart': chart_data,
                 'generated_at': timezone.now().isoformat(),
             }
 
             # Record execution
-            self._record_execution(len(data), execution_time, result)
+            self._record_execution(len(data), execution_time, query_count, result)
 
             return result
 
@@ -268,9 +303,15 @@ class ReportBuilder:
                 submissions__submitted_at__lte=date_end
             )
 
+        # All requested metrics are computed by correlated subqueries
+        annotations = self._student_annotations(fields, filters)
+        students = students.distinct().only(
+            'id', 'first_name', 'last_name', 'email'
+        ).annotate(**annotations)
+
         # Build result rows
         rows = []
-        for student in students.distinct():
+        for student in students:
             row = {}
 
             for field in fields:
@@ -279,15 +320,17 @@ class ReportBuilder:
                 elif field == 'student_email':
                     row[field] = student.email
                 elif field == 'grade':
-                    row[field] = self._calculate_student_grade(student, filters)
+                    row[field] = float(student.report_grade) if student.report_grade else 0.0
                 elif field == 'submission_count':
-                    row[field] = self._count_submissions(student, filters)
+                    row[field] = student.report_submission_count
                 elif field == 'progress':
-                    row[field] = self._calculate_progress(student, filters)
+                    total = student.report_progress_total
+                    row[field] = (student.report_progress_completed / total * 100) if total > 0 else 0.0
                 elif field == 'attendance':
                     row[field] = self._calculate_attendance(student, filters)
                 elif field == 'last_submission_date':
-                    row[field] = self._get_last_submission_date(student, filters)
+                    last = student.report_last_submission
+                    row[field] = last.isoformat() if last else None
 
             rows.append(row)
 
@@ -322,6 +365,13 @@ class ReportBuilder:
         if date_end:
             assignments = assignments.filter(created_at__lte=date_end)
 
+        # Aggregates over the single submissions join, one GROUP BY query
+        assignments = assignments.annotate(**self._assignment_annotations(fields, filters))
+
+        total_students = 0
+        if 'submission_rate' in fields or 'completion_rate' in fields:
+            total_students = User.objects.filter(role='student').count()
+
         # Build result rows
         rows = []
         for assignment in assignments:
@@ -333,15 +383,15 @@ class ReportBuilder:
                 elif field == 'due_date':
                     row[field] = assignment.due_date.isoformat() if assignment.due_date else None
                 elif field == 'avg_score':
-                    row[field] = self._calculate_avg_score(assignment, filters)
+                    row[field] = float(assignment.report_avg_score) if assignment.report_avg_score else 0.0
                 elif field == 'submission_rate':
-                    row[field] = self._calculate_submission_rate(assignment, filters)
+                    row[field] = self._rate(assignment.report_submitted_students, total_students)
                 elif field == 'completion_rate':
-                    row[field] = self._calculate_completion_rate(assignment, filters)
+                    row[field] = self._rate(assignment.report_graded_students, total_students)
                 elif field == 'late_submissions':
-                    row[field] = self._count_late_submissions(assignment, filters)
+                    row[field] = assignment.report_late_submissions
                 elif field == 'total_submissions':
-                    row[field] = self._count_total_submissions(assignment, filters)
+                    row[field] = assignment.report_total_submissions
 
             rows.append(row)
 
@@ -576,115 +626,121 @@ class ReportBuilder:
         }
 
     # Helper methods for calculations
-    def _calculate_student_grade(self, student: User, filters: Dict[str, Any]) -> float:
-        """Calculate overall student grade."""
-        submissions = AssignmentSubmission.objects.filter(student=student)
+    @staticmethod
+    def _aggregate_subquery(queryset, group_field: str, aggregate, output_field) -> Subquery:
+        """Correlated subquery returning one aggregate per outer row."""
+        return Subquery(
+            queryset.order_by().values(group_field).annotate(
+                value=aggregate
+            ).values('value')[:1],
+            output_field=output_field
+        )
+
+    def _student_submissions(self, filters: Dict[str, Any], date_field: str):
+        """Submissions of the outer student row, filtered by subject and date range."""
+        submissions = AssignmentSubmission.objects.filter(student=OuterRef('pk'))
 
         if 'subject_id' in filters:
             submissions = submissions.filter(assignment__subject_id=filters['subject_id'])
 
         date_start, date_end = self._parse_date_range(filters.get('date_range'))
         if date_start:
-            submissions = submissions.filter(graded_at__gte=date_start)
+            submissions = submissions.filter(**{f'{date_field}__gte': date_start})
         if date_end:
-            submissions = submissions.filter(graded_at__lte=date_end)
+            submissions = submissions.filter(**{f'{date_field}__lte': date_end})
 
-        avg = submissions.filter(score__isnull=False).aggregate(Avg('score'))['score__avg']
-        return float(avg) if avg else 0.0
+        return submissions
 
-    def _count_submissions(self, student: User, filters: Dict[str, Any]) -> int:
-        """Count student submissions."""
-        submissions = AssignmentSubmission.objects.filter(
-            student=student,
-            submitted_at__isnull=False
-        )
+    def _student_annotations(self, fields: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Compile requested student metrics into queryset annotations."""
+        annotations = {}
 
-        if 'subject_id' in filters:
-            submissions = submissions.filter(assignment__subject_id=filters['subject_id'])
+        if 'grade' in fields:
+            annotations['report_grade'] = self._aggregate_subquery(
+                self._student_submissions(filters, 'graded_at').filter(score__isnull=False),
+                'student', Avg('score'), FloatField()
+            )
 
-        date_start, date_end = self._parse_date_range(filters.get('date_range'))
-        if date_start:
-            submissions = submissions.filter(submitted_at__gte=date_start)
-        if date_end:
-            submissions = submissions.filter(submitted_at__lte=date_end)
+        if 'submission_count' in fields:
+            annotations['report_submission_count'] = Coalesce(
+                self._aggregate_subquery(
+                    self._student_submissions(filters, 'submitted_at').filter(
+                        submitted_at__isnull=False
+                    ),
+                    'student', Count('id'), IntegerField()
+                ),
+                0
+            )
 
-        return submissions.count()
+        if 'progress' in fields:
+            progress = MaterialProgress.objects.filter(student=OuterRef('pk'))
+            if 'subject_id' in filters:
+                progress = progress.filter(material__subject_id=filters['subject_id'])
 
-    def _calculate_progress(self, student: User, filters: Dict[str, Any]) -> float:
-        """Calculate student progress percentage."""
-        progress_data = MaterialProgress.objects.filter(student=student)
+            annotations['report_progress_total'] = Coalesce(
+                self._aggregate_subquery(progress, 'student', Count('id'), IntegerField()),
+                0
+            )
+            annotations['report_progress_completed'] = Coalesce(
+                self._aggregate_subquery(
+                    progress.filter(is_completed=True), 'student', Count('id'), IntegerField()
+                ),
+                0
+            )
 
-        if 'subject_id' in filters:
-            progress_data = progress_data.filter(material__subject_id=filters['subject_id'])
+        if 'last_submission_date' in fields:
+            annotations['report_last_submission'] = self._aggregate_subquery(
+                AssignmentSubmission.objects.filter(
+                    student=OuterRef('pk'),
+                    submitted_at__isnull=False
+                ),
+                'student', Max('submitted_at'), DateTimeField()
+            )
 
-        completed = progress_data.filter(is_completed=True).count()
-        total = progress_data.count()
+        return annotations
 
-        return (completed / total * 100) if total > 0 else 0.0
+    def _assignment_annotations(self, fields: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Compile requested assignment metrics into conditional aggregates."""
+        annotations = {}
+        submitted = Q(submissions__submitted_at__isnull=False)
 
-    def _calculate_attendance(self, student: User, filters: Dict[str, Any]) -> float:
-        """Calculate attendance percentage."""
-        # This is a placeholder - actual attendance tracking would depend on your system
-        return 0.0
+        if 'avg_score' in fields:
+            scored = Q(submissions__score__isnull=False)
+            if 'student_id' in filters:
+                scored &= Q(submissions__student_id=filters['student_id'])
+            annotations['report_avg_score'] = Avg('submissions__score', filter=scored)
+
+        if 'submission_rate' in fields:
+            annotations['report_submitted_students'] = Count(
+                'submissions__student', filter=submitted, distinct=True
+            )
 
-    def _get_last_submission_date(self, student: User, filters: Dict[str, Any]) -> Optional[str]:
-        """Get date of last submission."""
-        submission = AssignmentSubmission.objects.filter(
-            student=student,
-            submitted_at__isnull=False
-        ).order_by('-submitted_at').first()
+        if 'completion_rate' in fields:
+            annotations['report_graded_students'] = Count(
+                'submissions__student',
+                filter=Q(submissions__graded_at__isnull=False),
+                distinct=True
+            )
 
-        return submission.submitted_at.isoformat() if submission else None
+        if 'late_submissions' in fields:
+            annotations['report_late_submissions'] = Count(
+                'submissions', filter=Q(submissions__submitted_at__gt=F('due_date'))
+            )
 
-    def _calculate_avg_score(self, assignment: Assignment, filters: Dict[str, Any]) -> float:
-        """Calculate average score for assignment."""
-        submissions = AssignmentSubmission.objects.filter(
-            assignment=assignment,
-            score__isnull=False
-        )
+        if 'total_submissions' in fields:
+            annotations['report_total_submissions'] = Count('submissions', filter=submitted)
 
-        if 'student_id' in filters:
-            submissions = submissions.filter(student_id=filters['student_id'])
+        return annotations
 
-        avg = submissions.aggregate(Avg('score'))['score__avg']
-        return float(avg) if avg else 0.0
-
-    def _calculate_submission_rate(self, assignment: Assignment, filters: Dict[str, Any]) -> float:
-        """Calculate submission rate percentage."""
-        total_students = User.objects.filter(role='student').count()
-        submitted = AssignmentSubmission.objects.filter(
-            assignment=assignment,
-            submitted_at__isnull=False
-        ).values('student').distinct().count()
-
-        return (submitted / total_students * 100) if total_students > 0 else 0.0
-
-    def _calculate_completion_rate(self, assignment: Assignment, filters: Dict[str, Any]) -> float:
-        """Calculate completion rate percentage."""
-        total_students = User.objects.filter(role='student').count()
-        completed = AssignmentSubmission.objects.filter(
-            assignment=assignment,
-            graded_at__isnull=False
-        ).values('student').distinct().count()
-
-        return (completed / total_students * 100) if total_students > 0 else 0.0
-
-    def _count_late_submissions(self, assignment: Assignment, filters: Dict[str, Any]) -> int:
-        """Count late submissions."""
-        if not assignment.due_date:
-            return 0
-
-        return AssignmentSubmission.objects.filter(
-            assignment=assignment,
-            submitted_at__gt=assignment.due_date
-        ).count()
-
-    def _count_total_submissions(self, assignment: Assignment, filters: Dict[str, Any]) -> int:
-        """Count total submissions."""
-        return AssignmentSubmission.objects.filter(
-            assignment=assignment,
-            submitted_at__isnull=False
-        ).count()
+    @staticmethod
+    def _rate(part: int, total: int) -> float:
+        """Percentage of part in total, 0 for an empty total."""
+        return (part / total * 100) if total > 0 else 0.0
+
+    def _calculate_attendance(self, student: User, filters: Dict[str, Any]) -> float:
+        """Calculate attendance percentage."""
+        # This is a placeholder - actual attendance tracking would depend on your system
+        return 0.0
 
     def _parse_date_range(self, date_range: Optional[Dict[str, str]]) -> Tuple[Optional[datetime], Optional[datetime]]:
         """Parse date range from config."""
@@ -704,7 +760,13 @@ class ReportBuilder:
 
         return start, end
 
-    def _record_execution(self, row_count: int, execution_time: int, result_summary: Dict[str, Any]):
+    def _record_execution(
+        self,
+        row_count: int,
+        execution_time: int,
+        query_count: int,
+        result_summary: Dict[str, Any]
+    ):
         """Record report execution for audit trail."""
         try:
             CustomReportExecution.objects.create(
@@ -712,6 +774,7 @@ class ReportBuilder:
                 executed_by=self.report.created_by,
                 rows_returned=row_count,
                 execution_time_ms=execution_time,
+                query_count=query_count,
                 result_summary={
                     'field_count': len(self.config.get('fields', [])),
                     'has_chart': 'chart_type' in self.config,
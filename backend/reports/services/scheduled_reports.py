@@ -0,0 +1,190 @@
+"""
+Fan-out delivery for scheduled email reports.
+
+Due schedules are grouped by computation key (report type, scope, period).
+Report data for a key is computed once and each export format is rendered
+once; the same attachment is then sent to every schedule recipient that
+shares the key. Scheduled report data is scoped to the recipient (their own
+student/tutor/teacher reports), so schedules share work whenever they send
+the same report type to the same person on the same day.
+
+Usage:
+    fanout = ScheduledReportFanout()
+    for schedule in due_schedules:
+        execution = fanout.execute(schedule)
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.utils import timezone
+
+from reports.models import ReportSchedule, ReportScheduleExecution, ReportScheduleRecipient
+from reports.services.email_report import EmailReportService
+
+logger = logging.getLogger(__name__)
+
+ComputationKey = Tuple[str, str, int, date]
+
+
+@dataclass
+class ReportComputation:
+    """Report data computed once for a computation key."""
+
+    key: ComputationKey
+    subject: Optional[str]
+    report_data: List[Dict[str, Any]]
+    computation_time_ms: int
+    attachments: Dict[str, Tuple[str, bytes, str]] = field(default_factory=dict)
+
+
+class ScheduledReportFanout:
+    """Executes due schedules, sharing computations and renders between them."""
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or timezone.now()
+        self._computations: Dict[ComputationKey, ReportComputation] = {}
+        self.stats = {'computed': 0, 'reused': 0, 'rendered': 0, 'sent': 0, 'failed': 0}
+
+    def computation_key(self, report_type: str, recipient: Any) -> ComputationKey:
+        """Report type, scope (recipient role and id) and period (day)."""
+        return (report_type, recipient.role, recipient.id, self.now.date())
+
+    def get_computation(self, report_type: str, recipient: Any) -> Tuple[ReportComputation, bool]:
+        """
+        Get report data for a recipient, computing it on first use.
+
+        Returns:
+            (computation, reused)
+        """
+        key = self.computation_key(report_type, recipient)
+        computation = self._computations.get(key)
+        if computation is not None:
+            self.stats['reused'] += 1
+            return computation, True
+
+        start_time = time.time()
+        subject, report_data = EmailReportService.build_scheduled_report_data(report_type, recipient)
+        computation = ReportComputation(
+            key=key,
+            subject=subject,
+            report_data=report_data,
+            computation_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+        self._computations[key] = computation
+        self.stats['computed'] += 1
+        return computation, False
+
+    def get_attachment(
+        self,
+        computation: ReportComputation,
+        export_format: str
+    ) -> Tuple[Tuple[str, bytes, str], int]:
+        """
+        Get the attachment for a computation, rendering each format once.
+
+        Returns:
+            (attachment, render time in ms; 0 when already rendered)
+        """
+        attachment = computation.attachments.get(export_format)
+        if attachment is not None:
+            return attachment, 0
+
+        start_time = time.time()
+        attachment = EmailReportService.build_attachment(
+            computation.report_data, export_format, computation.key[0]
+        )
+        computation.attachments[export_format] = attachment
+
+        self.stats['rendered'] += 1
+        return attachment, int((time.time() - start_time) * 1000)
+
+    def execute(self, schedule: ReportSchedule) -> ReportScheduleExecution:
+        """
+        Deliver one schedule to its subscribed recipients.
+
+        Returns:
+            The ReportScheduleExecution recording counts, reuse and timing
+
+        Raises:
+            Any error from building, rendering or sending, after recording
+            the execution as FAILED with the error message
+        """
+        execution = ReportScheduleExecution.objects.create(schedule=schedule)
+
+        try:
+            self._deliver(schedule, execution)
+        except Exception as e:
+            execution.status = ReportScheduleExecution.ExecutionStatus.FAILED
+            execution.error_message = str(e)
+            execution.completed_at = timezone.now()
+            execution.save()
+            raise
+
+        logger.info(
+            f"Schedule {schedule.id} executed: {execution.successful_sends} sent, "
+            f"{execution.failed_sends} failed, {execution.reused_computations} reused computations"
+        )
+        return execution
+
+    def _deliver(self, schedule: ReportSchedule, execution: ReportScheduleExecution) -> None:
+        """Send the schedule to each recipient and record the outcome on execution."""
+        entries = list(
+            ReportScheduleRecipient.objects.filter(
+                schedule=schedule,
+                is_subscribed=True
+            ).select_related('recipient')
+        )
+        execution.total_recipients = len(entries)
+
+        if not entries:
+            logger.warning(f"Schedule {schedule.id} has no active recipients")
+
+        default_subject = f"Report: {schedule.name or 'Scheduled Report'}"
+
+        for entry in entries:
+            recipient = entry.recipient
+            computation, reused = self.get_computation(schedule.report_type, recipient)
+            if reused:
+                execution.reused_computations += 1
+            else:
+                execution.computation_time_ms += computation.computation_time_ms
+
+            if not computation.report_data:
+                logger.info(f"No reports to send to {recipient.email} for schedule {schedule.id}")
+                continue
+
+            attachment, render_ms = self.get_attachment(computation, schedule.export_format)
+            execution.computation_time_ms += render_ms
+
+            success = EmailReportService.send_report_email(
+                recipient_email=recipient.email,
+                recipient_name=recipient.get_full_name(),
+                subject=computation.subject or default_subject,
+                report_data=computation.report_data,
+                export_format=schedule.export_format,
+                report_type=schedule.report_type,
+                unsubscribe_token=entry.unsubscribe_token,
+                attachment=attachment,
+            )
+
+            if success:
+                execution.successful_sends += 1
+                self.stats['sent'] += 1
+            else:
+                execution.failed_sends += 1
+                self.stats['failed'] += 1
+
+        if execution.failed_sends and execution.successful_sends:
+            execution.status = ReportScheduleExecution.ExecutionStatus.PARTIAL
+        elif execution.failed_sends:
+            execution.status = ReportScheduleExecution.ExecutionStatus.FAILED
+        else:
+            execution.status = ReportScheduleExecution.ExecutionStatus.COMPLETED
+
+        execution.completed_at = timezone.now()
+        execution.save()
@@ -0,0 +1,301 @@
+"""
+Mergeable score sketches for assignment analytics.
+
+Every assignment keeps an AssignmentScoreSketch: histograms of submission
+scores with one-point buckets. Scores are whole points, so the histogram
+is exact and small (at most max_score + 1 buckets), and two histograms
+merge by adding counts. Percentiles, mean, standard deviation and letter
+distribution of a class or teacher are then answered from the merged
+histograms of their assignments instead of sorting every score row.
+
+Sketches are updated from submission signals (apply_submission_change),
+backfilled for existing assignments by migration 0021, and rebuilt
+nightly as a fallback for drift (bulk updates, raw SQL).
+
+Usage:
+    from reports.services.score_sketches import ScoreSketchService
+
+    sketch = ScoreSketchService.merged(teacher_id=5)
+    sketch.percentile(90)
+    ScoreSketchService.merged(assignment_ids=[1, 2], graded=True).statistics()
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from reports.models import AssignmentScoreSketch
+
+logger = logging.getLogger(__name__)
+
+# (status, score) of a submission, None when it does not exist
+SubmissionState = Optional[Tuple[str, Any]]
+
+
+class ScoreSketch:
+    """Histogram of whole-point scores: {score: count}."""
+
+    def __init__(self, counts: Optional[Dict[Any, int]] = None):
+        self.counts: Counter = Counter()
+        for score, count in (counts or {}).items():
+            self.add(score, count)
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[float]) -> 'ScoreSketch':
+        sketch = cls()
+        for score in scores:
+            sketch.add(score)
+        return sketch
+
+    def to_json(self) -> Dict[str, int]:
+        return {str(score): count for score, count in sorted(self.counts.items())}
+
+    def add(self, score, count: int = 1) -> None:
+        """Add (or with a negative count remove) occurrences of a score."""
+        bucket = int(round(float(score)))
+        self.counts[bucket] += int(count)
+        if self.counts[bucket] <= 0:
+            del self.counts[bucket]
+
+    def merge(self, other: 'ScoreSketch') -> 'ScoreSketch':
+        for score, count in other.counts.items():
+            self.add(score, count)
+        return self
+
+    # ========== Statistics ==========
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def total(self) -> int:
+        return sum(score * count for score, count in self.counts.items())
+
+    def mean(self) -> Optional[float]:
+        count = self.count
+        return self.total / count if count else None
+
+    def std_dev(self) -> float:
+        """Sample standard deviation (0.0 for fewer than two scores)."""
+        count = self.count
+        if count < 2:
+            return 0.0
+        mean = self.total / count
+        squares = sum(count_ * (score - mean) ** 2 for score, count_ in self.counts.items())
+        return (squares / (count - 1)) ** 0.5
+
+    def min(self) -> Optional[int]:
+        return min(self.counts) if self.counts else None
+
+    def max(self) -> Optional[int]:
+        return max(self.counts) if self.counts else None
+
+    def mode(self) -> Optional[int]:
+        """Most frequent score (the lowest one on ties)."""
+        if not self.counts:
+            return None
+        return max(sorted(self.counts), key=lambda score: self.counts[score])
+
+    def value_at(self, rank: int) -> Optional[int]:
+        """Score at a 0-based position of the sorted scores."""
+        seen = 0
+        for score in sorted(self.counts):
+            seen += self.counts[score]
+            if rank < seen:
+                return score
+        return None
+
+    def median(self) -> Optional[float]:
+        count = self.count
+        if not count:
+            return None
+        if count % 2:
+            return self.value_at(count // 2)
+        return (self.value_at(count // 2 - 1) + self.value_at(count // 2)) / 2
+
+    def percentile(self, percentile: float) -> float:
+        """Percentile with linear interpolation between neighbouring ranks."""
+        count = self.count
+        if not count:
+            return 0.0
+
+        index = (percentile / 100) * count
+        lower_rank = max(int(index) - 1, 0)
+
+        if index == int(index):
+            return float(self.value_at(lower_rank))
+
+        lower = self.value_at(lower_rank)
+        upper = self.value_at(min(int(index), count - 1))
+        return lower + (upper - lower) * (index - int(index))
+
+    def count_between(self, low: float, high: Optional[float] = None) -> int:
+        """Number of scores with low <= score < high."""
+        return sum(
+            count for score, count in self.counts.items()
+            if score >= low and (high is None or score < high)
+        )
+
+
+class ScoreSketchService:
+    """Maintains and merges per-assignment score sketches."""
+
+    # ========== Incremental updates ==========
+
+    @classmethod
+    def apply_submission_change(
+        cls,
+        assignment_id: int,
+        before: SubmissionState,
+        after: SubmissionState
+    ) -> None:
+        """
+        Move a submission between histogram buckets.
+
+        Args:
+            assignment_id: Assignment of the submission
+            before: (status, score) before the change, None if it was created
+            after: (status, score) after the change, None if it was deleted
+        """
+        from assignments.models import AssignmentSubmission
+
+        def buckets(state: SubmissionState) -> Tuple[Any, Any]:
+            if state is None or state[1] is None:
+                return None, None
+            status, score = state
+            return score, score if status == AssignmentSubmission.Status.GRADED else None
+
+        old_score, old_graded = buckets(before)
+        new_score, new_graded = buckets(after)
+        if (old_score, old_graded) == (new_score, new_graded):
+            return
+
+        try:
+            with transaction.atomic():
+                row = (
+                    AssignmentScoreSketch.objects.select_for_update()
+                    .filter(assignment_id=assignment_id)
+                    .first()
+                )
+                if row is None:
+                    # First sketch for this assignment: the build already
+                    # sees the saved submission. Deletions never build, the
+                    # assignment itself may be going away.
+                    if after is not None:
+                        cls.build([assignment_id])
+                    return
+
+                scores = ScoreSketch(row.scores)
+                graded = ScoreSketch(row.graded_scores)
+                for sketch, old, new in ((scores, old_score, new_score), (graded, old_graded, new_graded)):
+                    if old is not None:
+                        sketch.add(old, -1)
+                    if new is not None:
+                        sketch.add(new)
+
+                row.scores = scores.to_json()
+                row.graded_scores = graded.to_json()
+                row.save(update_fields=['scores', 'graded_scores', 'refreshed_at'])
+        except Exception as e:
+            logger.error(f"Error updating score sketch for assignment {assignment_id}: {e}")
+
+    # ========== Build ==========
+
+    @staticmethod
+    def build(assignment_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute sketches from submissions with one grouped query.
+
+        Args:
+            assignment_ids: Assignments to rebuild, None for all of them
+
+        Returns:
+            Number of sketches written
+        """
+        from assignments.models import Assignment, AssignmentSubmission
+
+        assignments = Assignment.objects.all()
+        submissions = AssignmentSubmission.objects.filter(score__isnull=False)
+        if assignment_ids is not None:
+            assignment_ids = set(assignment_ids)
+            assignments = assignments.filter(id__in=assignment_ids)
+            submissions = submissions.filter(assignment_id__in=assignment_ids)
+
+        sketches: Dict[int, Tuple[ScoreSketch, ScoreSketch]] = {
+            assignment_id: (ScoreSketch(), ScoreSketch())
+            for assignment_id in assignments.values_list('id', flat=True)
+        }
+
+        grouped = (
+            submissions.values('assignment_id', 'status', 'score')
+            .annotate(n=Count('id'))
+            .values_list('assignment_id', 'status', 'score', 'n')
+        )
+        for assignment_id, status, score, count in grouped:
+            if assignment_id not in sketches:
+                continue
+            scores, graded = sketches[assignment_id]
+            scores.add(score, count)
+            if status == AssignmentSubmission.Status.GRADED:
+                graded.add(score, count)
+
+        AssignmentScoreSketch.objects.bulk_create(
+            [
+                AssignmentScoreSketch(
+                    assignment_id=assignment_id,
+                    scores=scores.to_json(),
+                    graded_scores=graded.to_json(),
+                )
+                for assignment_id, (scores, graded) in sketches.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['assignment'],
+            update_fields=['scores', 'graded_scores', 'refreshed_at'],
+            batch_size=1000,
+        )
+        return len(sketches)
+
+    @classmethod
+    def rebuild(cls) -> Dict[str, int]:
+        """Recompute every sketch (nightly fallback for drift)."""
+        stats = {'score_sketches': cls.build()}
+        logger.info(f"Score sketches rebuilt: {stats}")
+        return stats
+
+    # ========== Reads ==========
+
+    @staticmethod
+    def merged(
+        assignment_ids: Optional[Iterable[int]] = None,
+        teacher_id: Optional[int] = None,
+        graded: bool = False
+    ) -> ScoreSketch:
+        """
+        Merge the sketches of a set of assignments with one query.
+
+        Assignments without a sketch row (no scored submission since the
+        backfill) contribute nothing; the nightly rebuild fills any gaps.
+
+        Args:
+            assignment_ids: Restrict to these assignments
+            teacher_id: Restrict to assignments authored by this teacher
+            graded: Use graded submissions only instead of all scored ones
+
+        Returns:
+            Merged ScoreSketch (empty if there are no scores)
+        """
+        rows = AssignmentScoreSketch.objects.all()
+        if assignment_ids is not None:
+            rows = rows.filter(assignment_id__in=list(assignment_ids))
+        if teacher_id is not None:
+            rows = rows.filter(assignment__author_id=teacher_id)
+
+        field = 'graded_scores' if graded else 'scores'
+        sketch = ScoreSketch()
+        for counts in rows.values_list(field, flat=True):
+            sketch.merge(ScoreSketch(counts))
+        return sketch
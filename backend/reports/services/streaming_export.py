@@ -0,0 +1,155 @@
+"""
+Streaming building blocks for CSV and Excel exports.
+
+Export services accept lists, generators or querysets. Querysets are
+read with .iterator(chunk_size=...), CSV is encoded chunk by chunk
+straight into the response, and Excel workbooks are written in openpyxl
+write-only mode to a temporary file, so memory stays flat whatever the
+number of rows.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db.models import QuerySet
+from django.db.models.query import ModelIterable
+from django.http import FileResponse
+
+# Rows fetched per database round trip and written per CSV chunk
+EXPORT_CHUNK_SIZE = 500
+
+# Rows sampled to size Excel columns (must be known before writing rows)
+COLUMN_WIDTH_SAMPLE_SIZE = 100
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_export_rows(
+    data: Iterable[Dict[str, Any]],
+    columns: Optional[List[str]] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    Normalize export input into (fieldnames, row iterator).
+
+    Args:
+        data: List, generator, or QuerySet (model or .values() rows)
+        columns: Columns to keep; defaults to the keys of the first row
+        chunk_size: Rows per database round trip for querysets
+
+    Returns:
+        Fieldnames and a lazy iterator over row dicts
+    """
+    if isinstance(data, QuerySet):
+        if data._iterable_class is ModelIterable:
+            data = data.values(*(columns or []))
+        rows = data.iterator(chunk_size=chunk_size)
+    else:
+        rows = iter(data)
+
+    first = next(rows, None)
+    if first is None:
+        return list(columns or []), iter(())
+
+    fieldnames = list(columns) if columns else list(first.keys())
+    rows = itertools.chain([first], rows)
+
+    if columns:
+        rows = ({col: row.get(col, '') for col in columns} for row in rows)
+
+    return fieldnames, rows
+
+
+def stream_csv(
+    fieldnames: List[str],
+    rows: Iterable[Dict[str, Any]],
+    encoding: str = "utf-8-sig",
+    include_headers: bool = True,
+    delimiter: str = ',',
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode rows as CSV, yielding one bytes chunk per chunk_size rows.
+
+    An incremental encoder is used so a BOM (utf-8-sig) is written once
+    at the start of the file rather than at the start of every chunk.
+    """
+    encoder = codecs.getincrementalencoder(encoding)()
+    output = io.StringIO()
+    writer = csv.DictWriter(
+        output,
+        fieldnames=fieldnames,
+        delimiter=delimiter,
+        extrasaction='ignore'
+    )
+
+    def flush() -> bytes:
+        chunk = encoder.encode(output.getvalue())
+        output.seek(0)
+        output.truncate(0)
+        return chunk
+
+    if include_headers:
+        writer.writeheader()
+        yield flush()
+
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % chunk_size == 0:
+            yield flush()
+
+    final_chunk = flush() + encoder.encode('', final=True)
+    if final_chunk:
+        yield final_chunk
+
+
+def sample_rows(
+    rows: Iterator[Dict[str, Any]],
+    size: int = COLUMN_WIDTH_SAMPLE_SIZE
+) -> Tuple[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+    """
+    Peek the first `size` rows without losing them.
+
+    Returns:
+        The sampled rows and an iterator over all rows
+    """
+    sample = list(itertools.islice(rows, size))
+    return sample, itertools.chain(sample, rows)
+
+
+def column_widths(
+    fieldnames: List[str],
+    sample: List[Dict[str, Any]],
+    min_width: int = 8,
+    max_width: int = 50
+) -> List[int]:
+    """Column widths fitted to header and sampled values."""
+    widths = []
+    for fieldname in fieldnames:
+        max_length = len(str(fieldname))
+        for row in sample:
+            max_length = max(max_length, len(str(row.get(fieldname) or '')))
+        widths.append(max(min_width, min(max_length + 2, max_width)))
+    return widths
+
+
+def xlsx_file_response(workbook: Any, report_name: str, timestamp: str) -> FileResponse:
+    """
+    Save a write-only workbook to a temporary file and stream it back.
+
+    The temporary file is removed when the response closes it.
+    """
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    workbook.save(output)
+    output.seek(0)
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"{report_name}_{timestamp}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
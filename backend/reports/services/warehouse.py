@@ -2,8 +2,10 @@
 Data Warehouse Service for Large-Scale Analytics.
 
 Features:
-- Materialized views for common aggregations
-- Optimized raw SQL queries with pagination
+- Per-student, class, teacher and subject aggregates read from the
+  incrementally maintained summary tables (reports.services.warehouse_summaries)
+- Optimized raw SQL queries with offset or keyset pagination
+- Streaming of large results through server-side cursors
 - Read replica routing (if available)
 - Query result caching (1 hour)
 - Query timeout handling (30 seconds)
@@ -19,17 +21,28 @@ Usage:
         granularity='week',
         days_back=30
     )
+
+    # Keyset pagination: pass next_cursor back as `after`
+    page = warehouse.get_student_engagement_metrics(limit=100)
+    next_page = warehouse.get_student_engagement_metrics(limit=100, after=page['next_cursor'])
+
+    # Stream a large pull without materializing it
+    for batch in warehouse.stream_query(sql, params, columnar=True):
+        ...
 """
 
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from django.db import connection, connections
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
 from django.db.utils import DatabaseError, OperationalError
 from django.core.cache import cache
 from django.conf import settings
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +65,9 @@ class DataWarehouseService:
     # Result cache TTL (1 hour)
     CACHE_TTL = 3600
 
+    # Summary tables are refreshed every 5 minutes; cache no longer than that
+    SUMMARY_CACHE_TTL = 300
+
     # Max result set size (10,000 rows)
     MAX_RESULT_SIZE = 10000
 
@@ -59,6 +75,9 @@ class DataWarehouseService:
     DEFAULT_LIMIT = 100
     MAX_LIMIT = 10000
 
+    # Rows pulled per round trip from cursors
+    FETCH_BATCH_SIZE = 2000
+
     def __init__(self, use_replica: bool = True):
         """
         Initialize warehouse service.
@@ -105,6 +124,23 @@ class DataWarehouseService:
         params_hash = hashlib.md5(params_str.encode()).hexdigest()[:8]
         return f"warehouse_{query_name}_{params_hash}"
 
+    def _summary_query(self, queryset, cache_key: str) -> List[Dict[str, Any]]:
+        """
+        Read rows from a warehouse summary table (cached for SUMMARY_CACHE_TTL).
+
+        Args:
+            queryset: .values() queryset over a summary model
+            cache_key: Cache key for the result
+
+        Returns:
+            List of result rows as dicts
+        """
+        results = cache.get(cache_key)
+        if results is None:
+            results = list(queryset)
+            cache.set(cache_key, results, self.SUMMARY_CACHE_TTL)
+        return results
+
     def _execute_query(
         self,
         sql: str,
@@ -155,12 +191,13 @@ class DataWarehouseService:
                 # Execute main query
                 cursor.execute(sql, params)
 
-                # Fetch results
+                # Fetch results in batches
                 columns = [col[0] for col in cursor.description or []]
-                results = [
-                    dict(zip(columns, row))
-                    for row in cursor.fetchall()
-                ]
+                while True:
+                    rows = cursor.fetchmany(self.FETCH_BATCH_SIZE)
+                    if not rows:
+                        break
+                    results.extend(dict(zip(columns, row)) for row in rows)
 
         except DatabaseError as e:
             # Handle query-specific errors
@@ -184,19 +221,145 @@ class DataWarehouseService:
                     f"Slow query ({execution_time:.2f}s): {sql[:100]}..."
                 )
 
-        # Cache results
-        if use_cache and cache_key and results:
-            cache.set(cache_key, results, self.CACHE_TTL)
-            logger.debug(f"Cached results for {cache_key} ({len(results)} rows)")
-
-        # Warn if result set too large
-        if len(results) >= self.MAX_RESULT_SIZE:
+        # Warn if result set too large; such results are never cached
+        if len(results) > self.MAX_RESULT_SIZE:
             logger.warning(
-                f"Large result set ({len(results)} rows), consider pagination"
+                f"Large result set ({len(results)} rows), use keyset pagination "
+                f"or stream_query"
             )
+        elif use_cache and cache_key and results:
+            cache.set(cache_key, results, self.CACHE_TTL)
+            logger.debug(f"Cached results for {cache_key} ({len(results)} rows)")
 
         return results
 
+    def stream_query(
+        self,
+        sql: str,
+        params: Sequence = (),
+        batch_size: Optional[int] = None,
+        columnar: bool = False,
+        timeout: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream query results through a server-side cursor.
+
+        On PostgreSQL the query runs on a named cursor and rows are pulled
+        with fetchmany(), so memory is bounded by one batch whatever the
+        result size. Streamed results are never cached.
+
+        Args:
+            sql: SQL query string
+            params: Query parameters
+            batch_size: Rows per round trip (default: FETCH_BATCH_SIZE)
+            columnar: Yield column batches {column: [values]} instead of rows
+            timeout: Query timeout in seconds (default: 30)
+
+        Yields:
+            Row dicts, or one column batch per fetched chunk
+
+        Raises:
+            DatabaseError: On query execution error
+            TimeoutError: If query exceeds timeout
+        """
+        batch_size = batch_size or self.FETCH_BATCH_SIZE
+        timeout = timeout or self.QUERY_TIMEOUT
+
+        start_time = time.time()
+        row_count = 0
+        db_connection = connections[self.db_alias]
+
+        try:
+            if 'postgresql' in db_connection.settings_dict.get('ENGINE', ''):
+                with db_connection.cursor() as cursor:
+                    cursor.execute(f"SET statement_timeout = {timeout * 1000};")
+
+            # Named (server-side) cursor on PostgreSQL, regular cursor elsewhere
+            with db_connection.chunked_cursor() as cursor:
+                cursor.execute(sql, params)
+
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    # Named cursors only describe columns after the first fetch
+                    if columns is None:
+                        columns = [col[0] for col in cursor.description or []]
+
+                    row_count += len(rows)
+                    if columnar:
+                        yield {
+                            column: list(values)
+                            for column, values in zip(columns, zip(*rows))
+                        }
+                    else:
+                        for row in rows:
+                            yield dict(zip(columns, row))
+
+        except DatabaseError as e:
+            if 'statement timeout' in str(e).lower():
+                logger.error(f"Query timeout ({timeout}s): {sql[:100]}...")
+                raise TimeoutError(f"Query exceeded {timeout}s timeout")
+
+            logger.error(f"Database error streaming query: {e}")
+            raise
+
+        finally:
+            execution_time = time.time() - start_time
+            if execution_time > 1.0:
+                logger.warning(
+                    f"Slow streamed query ({execution_time:.2f}s, {row_count} rows): {sql[:100]}..."
+                )
+
+    def _keyset_page(
+        self,
+        query_name: str,
+        select_sql: str,
+        params: Sequence,
+        keyset: Sequence[str],
+        after: Optional[Sequence[Any]],
+        limit: int,
+        descending: bool,
+        cache_params: Tuple
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+        """
+        Fetch one keyset page of an unordered SELECT.
+
+        The page starts strictly after the `after` values of the keyset
+        columns, so deep pages cost the same as the first one.
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page
+        """
+        limit = min(limit, self.MAX_LIMIT)
+        direction = 'DESC' if descending else 'ASC'
+        columns = ', '.join(f'page.{column}' for column in keyset)
+
+        sql = f"SELECT * FROM ({select_sql}) page"
+        page_params = list(params)
+        if after is not None:
+            if len(after) != len(keyset):
+                raise ValueError(f"Cursor must have {len(keyset)} values: {', '.join(keyset)}")
+            placeholders = ', '.join(['%s'] * len(keyset))
+            sql += f" WHERE ({columns}) {'<' if descending else '>'} ({placeholders})"
+            page_params.extend(after)
+        sql += " ORDER BY " + ', '.join(f'page.{column} {direction}' for column in keyset)
+        sql += " LIMIT %s"
+        page_params.append(limit)
+
+        cache_key = self._get_cache_key(
+            query_name, cache_params + (limit, tuple(after) if after is not None else None)
+        )
+        results = self._execute_query(sql, tuple(page_params), use_cache=True, cache_key=cache_key)
+
+        next_cursor = None
+        if len(results) == limit:
+            next_cursor = [results[-1][column] for column in keyset]
+
+        return results, next_cursor
+
     # ========================================================================
     # STUDENT ANALYTICS QUERIES
     # ========================================================================
@@ -262,6 +425,8 @@ class DataWarehouseService:
         """
         Compare student performance across subjects.
 
+        Read from StudentGradeSummary (graded material submissions).
+
         Args:
             student_id: Student ID
             limit: Maximum results
@@ -274,7 +439,7 @@ class DataWarehouseService:
                 'execution_time_ms': float
             }
         """
-        from reports.queries.analytics import SUBJECT_PERFORMANCE_COMPARISON
+        from reports.models import StudentGradeSummary
 
         limit = min(limit, self.MAX_LIMIT)
         params = (student_id, limit, offset)
@@ -282,9 +447,17 @@ class DataWarehouseService:
         cache_key = self._get_cache_key('subject_performance', params)
 
         start_time = time.time()
-        results = self._execute_query(
-            SUBJECT_PERFORMANCE_COMPARISON, params,
-            use_cache=True, cache_key=cache_key
+        results = self._summary_query(
+            StudentGradeSummary.objects.using(self.db_alias)
+            .filter(student_id=student_id)
+            .order_by(F('avg_grade').desc(nulls_last=True), 'subject_id')
+            .values(
+                'subject_id', 'submission_count', 'avg_grade', 'pass_rate', 'refreshed_at',
+                subject_name=F('subject__name'),
+                first_submission=F('first_submission_date'),
+                last_submission=F('last_submission_date'),
+            )[offset:offset + limit],
+            cache_key,
         )
         execution_time = (time.time() - start_time) * 1000
 
@@ -299,46 +472,96 @@ class DataWarehouseService:
         self,
         days_back: int = 30,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Sequence[Any]] = None
     ) -> Dict[str, Any]:
         """
         Get engagement metrics for all students.
 
+        Pages are keyset-paginated on (engagement_percentage, student_id);
+        pass the returned next_cursor as `after` to get the next page.
+        A non-zero offset is still supported for old clients.
+
         Args:
             days_back: Look back this many days
             limit: Maximum results
-            offset: Result offset
+            offset: Result offset (ignored when `after` is given)
+            after: Cursor from the previous page
 
         Returns:
             {
                 'students': [...],
                 'total_count': int,
+                'next_cursor': list or None,
                 'execution_time_ms': float
             }
         """
-        from reports.queries.analytics import STUDENT_ENGAGEMENT_METRICS
+        from reports.queries.analytics import (
+            STUDENT_ENGAGEMENT_METRICS,
+            STUDENT_ENGAGEMENT_METRICS_KEYSET,
+            STUDENT_ENGAGEMENT_METRICS_SELECT,
+        )
 
         limit = min(limit, self.MAX_LIMIT)
         start_date = datetime.now() - timedelta(days=days_back)
         end_date = datetime.now()
         days_in_period = days_back
 
-        sql = STUDENT_ENGAGEMENT_METRICS.format(days_in_period=days_in_period)
-        params = (start_date, end_date, limit, offset)
-
-        cache_key = self._get_cache_key('student_engagement', params)
-
         start_time = time.time()
-        results = self._execute_query(sql, params, use_cache=True, cache_key=cache_key)
+        if offset and after is None:
+            sql = STUDENT_ENGAGEMENT_METRICS.format(days_in_period=days_in_period)
+            params = (start_date, end_date, limit, offset)
+            cache_key = self._get_cache_key('student_engagement', (days_back, limit, offset))
+            results = self._execute_query(sql, params, use_cache=True, cache_key=cache_key)
+            next_cursor = None
+        else:
+            results, next_cursor = self._keyset_page(
+                'student_engagement',
+                STUDENT_ENGAGEMENT_METRICS_SELECT.format(days_in_period=days_in_period),
+                (start_date, end_date),
+                keyset=STUDENT_ENGAGEMENT_METRICS_KEYSET,
+                after=after,
+                limit=limit,
+                descending=True,
+                cache_params=(days_back,),
+            )
         execution_time = (time.time() - start_time) * 1000
 
         return {
             'students': results,
             'total_count': len(results),
             'days_back': days_back,
+            'limit': limit,
+            'offset': offset,
+            'next_cursor': next_cursor,
             'execution_time_ms': round(execution_time, 2)
         }
 
+    def stream_student_engagement_metrics(
+        self,
+        days_back: int = 30,
+        batch_size: Optional[int] = None,
+        columnar: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream engagement metrics for all students (exports, bulk jobs).
+
+        Yields:
+            Rows (or column batches) in keyset order
+        """
+        from reports.queries.analytics import (
+            STUDENT_ENGAGEMENT_METRICS_KEYSET,
+            STUDENT_ENGAGEMENT_METRICS_SELECT,
+        )
+
+        sql = STUDENT_ENGAGEMENT_METRICS_SELECT.format(days_in_period=days_back)
+        sql += " ORDER BY " + ', '.join(f'{column} DESC' for column in STUDENT_ENGAGEMENT_METRICS_KEYSET)
+        start_date = datetime.now() - timedelta(days=days_back)
+
+        return self.stream_query(
+            sql, (start_date, datetime.now()), batch_size=batch_size, columnar=columnar
+        )
+
     # ========================================================================
     # TEACHER ANALYTICS QUERIES
     # ========================================================================
@@ -351,9 +574,13 @@ class DataWarehouseService:
         """
         Analyze teacher review/grading workload.
 
+        Read from TeacherWorkloadSummary, which covers all assignments the
+        teacher authored; days_back is accepted for existing callers and
+        does not narrow the totals.
+
         Args:
             teacher_id: Teacher ID
-            days_back: Look back this many days
+            days_back: Kept for compatibility (not applied)
 
         Returns:
             {
@@ -365,18 +592,20 @@ class DataWarehouseService:
                 ...
             }
         """
-        from reports.queries.analytics import TEACHER_WORKLOAD_ANALYSIS
-
-        start_date = datetime.now() - timedelta(days=days_back)
-        end_date = datetime.now()
-        params = (teacher_id, start_date, end_date)
+        from reports.models import TeacherWorkloadSummary
 
-        cache_key = self._get_cache_key('teacher_workload', params)
+        cache_key = self._get_cache_key('teacher_workload', (teacher_id,))
 
         start_time = time.time()
-        results = self._execute_query(
-            TEACHER_WORKLOAD_ANALYSIS, params,
-            use_cache=True, cache_key=cache_key
+        results = self._summary_query(
+            TeacherWorkloadSummary.objects.using(self.db_alias)
+            .filter(teacher_id=teacher_id)
+            .values(
+                'teacher_id', 'total_assignments', 'total_submissions', 'pending_reviews',
+                'graded_submissions', 'avg_grade_time_minutes', 'overdue_percentage',
+                'last_graded_time', 'refreshed_at',
+            ),
+            cache_key,
         )
         execution_time = (time.time() - start_time) * 1000
 
@@ -405,6 +634,9 @@ class DataWarehouseService:
         """
         Get top performers by subject.
 
+        Read from StudentGradeSummary; days_back keeps students whose last
+        graded submission falls inside the window.
+
         Args:
             min_submissions: Minimum submissions to include
             days_back: Look back this many days
@@ -418,18 +650,16 @@ class DataWarehouseService:
                 'execution_time_ms': float
             }
         """
-        from reports.queries.analytics import TOP_PERFORMERS
-
         limit = min(limit, self.MAX_LIMIT)
-        start_date = datetime.now() - timedelta(days=days_back)
-        params = (start_date, min_submissions, limit, offset)
+        params = (min_submissions, days_back, limit, offset)
 
         cache_key = self._get_cache_key('top_performers', params)
 
         start_time = time.time()
-        results = self._execute_query(
-            TOP_PERFORMERS, params,
-            use_cache=True, cache_key=cache_key
+        results = self._summary_query(
+            self._performers_queryset(min_submissions, days_back)
+            .order_by('subject_id', F('avg_grade').desc(), 'student_id')[offset:offset + limit],
+            cache_key,
         )
         execution_time = (time.time() - start_time) * 1000
 
@@ -449,6 +679,9 @@ class DataWarehouseService:
         """
         Get bottom performers by subject (need help).
 
+        Read from StudentGradeSummary; days_back keeps students whose last
+        graded submission falls inside the window.
+
         Args:
             min_submissions: Minimum submissions to include
             days_back: Look back this many days
@@ -462,18 +695,20 @@ class DataWarehouseService:
                 'execution_time_ms': float
             }
         """
-        from reports.queries.analytics import BOTTOM_PERFORMERS
-
         limit = min(limit, self.MAX_LIMIT)
-        start_date = datetime.now() - timedelta(days=days_back)
-        params = (start_date, min_submissions, limit, offset)
+        params = (min_submissions, days_back, limit, offset)
 
         cache_key = self._get_cache_key('bottom_performers', params)
 
         start_time = time.time()
-        results = self._execute_query(
-            BOTTOM_PERFORMERS, params,
-            use_cache=True, cache_key=cache_key
+        results = self._summary_query(
+            self._performers_queryset(min_submissions, days_back)
+            .annotate(fail_rate=ExpressionWrapper(
+                Value(Decimal(100)) - F('pass_rate'),
+                output_field=DecimalField(max_digits=6, decimal_places=2),
+            ))
+            .order_by('subject_id', 'avg_grade', 'student_id')[offset:offset + limit],
+            cache_key,
         )
         execution_time = (time.time() - start_time) * 1000
 
@@ -483,6 +718,68 @@ class DataWarehouseService:
             'execution_time_ms': round(execution_time, 2)
         }
 
+    def _performers_queryset(self, min_submissions: int, days_back: int):
+        """(student, subject) summary rows for top/bottom performer lists."""
+        from reports.models import StudentGradeSummary
+
+        return (
+            StudentGradeSummary.objects.using(self.db_alias)
+            .filter(
+                submission_count__gte=min_submissions,
+                avg_grade__isnull=False,
+                last_submission_date__gte=timezone.now() - timedelta(days=days_back),
+            )
+            .values(
+                'subject_id', 'student_id', 'submission_count', 'avg_grade', 'pass_rate',
+                subject_name=F('subject__name'),
+                first_name=F('student__first_name'),
+                last_name=F('student__last_name'),
+                first_submission=F('first_submission_date'),
+                last_submission=F('last_submission_date'),
+            )
+        )
+
+    def get_subject_performance_overview(
+        self,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Grade statistics per subject across all students.
+
+        Read from SubjectPerformanceSummary, best average grade first.
+
+        Returns:
+            {
+                'subjects': [...],
+                'total_count': int,
+                'execution_time_ms': float
+            }
+        """
+        from reports.models import SubjectPerformanceSummary
+
+        limit = min(limit, self.MAX_LIMIT)
+        cache_key = self._get_cache_key('subject_overview', (limit, offset))
+
+        start_time = time.time()
+        results = self._summary_query(
+            SubjectPerformanceSummary.objects.using(self.db_alias)
+            .order_by(F('avg_grade').desc(nulls_last=True), 'subject_id')
+            .values(
+                'subject_id', 'subject_name', 'student_count', 'total_submissions',
+                'avg_grade', 'min_grade', 'max_grade', 'excellent_rate', 'good_rate',
+                'below_average_rate', 'last_submission_date', 'refreshed_at',
+            )[offset:offset + limit],
+            cache_key,
+        )
+        execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'subjects': results,
+            'total_count': len(results),
+            'execution_time_ms': round(execution_time, 2)
+        }
+
     # ========================================================================
     # ATTENDANCE & CORRELATION QUERIES
     # ========================================================================
@@ -529,37 +826,100 @@ class DataWarehouseService:
     # CLASS ANALYTICS QUERIES
     # ========================================================================
 
+    def get_class_progress(
+        self,
+        teacher_id: Optional[int] = None,
+        subject_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Current progress of classes (a teacher's students in a subject).
+
+        Read from ClassProgressSummary.
+
+        Args:
+            teacher_id: Only classes of this teacher
+            subject_id: Only classes of this subject
+
+        Returns:
+            {
+                'classes': [...],
+                'total_count': int,
+                'execution_time_ms': float
+            }
+        """
+        from reports.models import ClassProgressSummary
+
+        queryset = ClassProgressSummary.objects.using(self.db_alias)
+        if teacher_id is not None:
+            queryset = queryset.filter(teacher_id=teacher_id)
+        if subject_id is not None:
+            queryset = queryset.filter(subject_id=subject_id)
+
+        cache_key = self._get_cache_key('class_progress', (teacher_id, subject_id))
+
+        start_time = time.time()
+        results = self._summary_query(
+            queryset.order_by('teacher_id', 'subject_id').values(
+                'teacher_id', 'subject_id', 'student_count', 'avg_grade',
+                'total_submissions', 'pass_rate', 'recent_submission_rate', 'refreshed_at',
+                subject_name=F('subject__name'),
+            )[:self.MAX_LIMIT],
+            cache_key,
+        )
+        execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'classes': results,
+            'total_count': len(results),
+            'execution_time_ms': round(execution_time, 2)
+        }
+
     def get_class_performance_trends(
         self,
         granularity: str = 'week',
-        days_back: int = 90
+        days_back: int = 90,
+        limit: int = MAX_LIMIT,
+        after: Optional[Sequence[Any]] = None
     ) -> Dict[str, Any]:
         """
         Get class-level performance trends over time.
 
+        Keyset-paginated on (class_id, period); pass the returned
+        next_cursor as `after` to get the next page.
+
         Args:
             granularity: 'day', 'week', or 'month'
             days_back: Look back this many days
+            limit: Maximum results
+            after: Cursor from the previous page
 
         Returns:
             {
                 'trends': [...],
                 'total_count': int,
+                'next_cursor': list or None,
                 'execution_time_ms': float
             }
         """
-        from reports.queries.analytics import CLASS_PERFORMANCE_TRENDS
+        from reports.queries.analytics import (
+            CLASS_PERFORMANCE_TRENDS_KEYSET,
+            CLASS_PERFORMANCE_TRENDS_SELECT,
+        )
 
         start_date = datetime.now() - timedelta(days=days_back)
         end_date = datetime.now()
 
-        sql = CLASS_PERFORMANCE_TRENDS.format(granularity=granularity)
-        params = (start_date, end_date)
-
-        cache_key = self._get_cache_key('class_trends', (granularity, days_back))
-
         start_time = time.time()
-        results = self._execute_query(sql, params, use_cache=True, cache_key=cache_key)
+        results, next_cursor = self._keyset_page(
+            'class_trends',
+            CLASS_PERFORMANCE_TRENDS_SELECT.format(granularity=granularity),
+            (start_date, end_date),
+            keyset=CLASS_PERFORMANCE_TRENDS_KEYSET,
+            after=after,
+            limit=limit,
+            descending=False,
+            cache_params=(granularity, days_back),
+        )
         execution_time = (time.time() - start_time) * 1000
 
         return {
@@ -567,9 +927,37 @@ class DataWarehouseService:
             'total_count': len(results),
             'granularity': granularity,
             'days_back': days_back,
+            'limit': min(limit, self.MAX_LIMIT),
+            'next_cursor': next_cursor,
             'execution_time_ms': round(execution_time, 2)
         }
 
+    def stream_class_performance_trends(
+        self,
+        granularity: str = 'week',
+        days_back: int = 90,
+        batch_size: Optional[int] = None,
+        columnar: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream class performance trends (exports, bulk jobs).
+
+        Yields:
+            Rows (or column batches) ordered by (class_id, period)
+        """
+        from reports.queries.analytics import (
+            CLASS_PERFORMANCE_TRENDS_KEYSET,
+            CLASS_PERFORMANCE_TRENDS_SELECT,
+        )
+
+        sql = CLASS_PERFORMANCE_TRENDS_SELECT.format(granularity=granularity)
+        sql += " ORDER BY " + ', '.join(CLASS_PERFORMANCE_TRENDS_KEYSET)
+        start_date = datetime.now() - timedelta(days=days_back)
+
+        return self.stream_query(
+            sql, (start_date, datetime.now()), batch_size=batch_size, columnar=columnar
+        )
+
     # ========================================================================
     # CACHE MANAGEMENT
         # ========================================================================
@@ -622,7 +1010,8 @@ class DataWarehouseService:
                 # Warm top/bottom performers cache
                 self.get_top_performers(limit=20)
                 self.get_bottom_performers(limit=20)
-                queries_executed += 2
+                self.get_subject_performance_overview()
+                queries_executed += 3
 
             logger.info(f"Warmed {queries_executed} cache entries")
 
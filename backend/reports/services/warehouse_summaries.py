@@ -0,0 +1,434 @@
+"""
+Incremental warehouse summary layer.
+
+Summary tables with the same shape as the materialized views in
+reports/queries/materialized_views.py, kept fresh by recomputing only the
+keys recorded in WarehouseChangeLog:
+
+- StudentGradeSummary        (student, subject)
+- ClassProgressSummary       (teacher, subject)
+- TeacherWorkloadSummary     (teacher)
+- SubjectPerformanceSummary  (subject)
+
+Signals append (student, subject) and teacher keys to the change log; the
+class and subject keys are derived from them during the refresh.
+refresh_dirty() is cheap enough to run every few minutes, rebuild()
+recomputes every row and is kept as a nightly fallback.
+
+Usage:
+    from reports.services.warehouse_summaries import WarehouseSummaryService
+
+    WarehouseSummaryService.mark_dirty(student_id=5, subject_id=2)
+    WarehouseSummaryService.refresh_dirty()
+    WarehouseSummaryService.rebuild()
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.utils import timezone
+
+from reports.models import (
+    ClassProgressSummary,
+    StudentGradeSummary,
+    SubjectPerformanceSummary,
+    TeacherWorkloadSummary,
+    WarehouseChangeLog,
+)
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, ...]
+
+
+def _rate(part: int, total: int) -> Optional[Decimal]:
+    """Percentage rounded to 2 places, None for an empty total (NULLIF semantics)."""
+    if not total:
+        return None
+    return _decimal(part * 100 / total)
+
+
+def _decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(str(round(float(value), 2)))
+
+
+class WarehouseSummaryService:
+    """Maintains warehouse summary tables from the change log."""
+
+    # Grades are on a 1-5 scale (MaterialFeedback.grade)
+    PASS_GRADE = 4
+    EXCELLENT_GRADE = 5
+
+    RECENT_DAYS = 7
+    OVERDUE_DAYS = 7
+
+    # Change log rows processed per refresh run
+    BATCH_SIZE = 5000
+
+    # ========== Change log ==========
+
+    @staticmethod
+    def mark_dirty(
+        student_id: Optional[int] = None,
+        subject_id: Optional[int] = None,
+        teacher_id: Optional[int] = None
+    ) -> None:
+        """Record a key whose summaries must be recomputed."""
+        if student_id is None and subject_id is None and teacher_id is None:
+            return
+        WarehouseChangeLog.objects.create(
+            student_id=student_id, subject_id=subject_id, teacher_id=teacher_id
+        )
+
+    @classmethod
+    def refresh_dirty(cls, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Recompute summary rows for keys in the change log.
+
+        Processes up to batch_size log entries (oldest first) and deletes
+        them in the same transaction, so a failed run leaves them for the
+        next one. Concurrent runs skip each other's locked entries.
+
+        Returns:
+            Number of processed log entries and recomputed keys per table
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+
+        with transaction.atomic():
+            entries = list(
+                WarehouseChangeLog.objects.select_for_update(skip_locked=True)
+                .order_by('id')
+                .values_list('id', 'student_id', 'subject_id', 'teacher_id')[:batch_size]
+            )
+            if not entries:
+                return {'entries': 0}
+
+            student_subjects: Set[Key] = set()
+            subjects: Set[int] = set()
+            teachers: Set[int] = set()
+            class_keys: Set[Key] = set()
+
+            # (student, subject[, teacher]) - material grades or enrollments;
+            # teacher alone - assignment workload of that teacher
+            for _, student_id, subject_id, teacher_id in entries:
+                if subject_id is None:
+                    if teacher_id is not None:
+                        teachers.add(teacher_id)
+                    continue
+                subjects.add(subject_id)
+                if student_id is not None:
+                    student_subjects.add((student_id, subject_id))
+                if teacher_id is not None:
+                    class_keys.add((teacher_id, subject_id))
+
+            class_keys |= cls._classes_of(student_subjects)
+
+            stats = {
+                'entries': len(entries),
+                'student_grades': cls._refresh_student_grades(student_subjects),
+                'class_progress': cls._refresh_class_progress(class_keys),
+                'teacher_workload': cls._refresh_teacher_workload(teachers),
+                'subject_performance': cls._refresh_subject_performance(subjects),
+            }
+
+            WarehouseChangeLog.objects.filter(id__in=[entry[0] for entry in entries]).delete()
+
+        logger.info(f"Warehouse summaries refreshed: {stats}")
+        return stats
+
+    @classmethod
+    def rebuild(cls) -> Dict[str, int]:
+        """
+        Recompute every summary row (fallback for drift or a lost change log).
+
+        Change log entries created before the rebuild started are discarded,
+        since the rebuild already covers them.
+        """
+        with transaction.atomic():
+            last_entry_id = WarehouseChangeLog.objects.aggregate(last=Max('id'))['last']
+
+            stats = {
+                'student_grades': cls._refresh_student_grades(None),
+                'class_progress': cls._refresh_class_progress(None),
+                'teacher_workload': cls._refresh_teacher_workload(None),
+                'subject_performance': cls._refresh_subject_performance(None),
+            }
+
+            if last_entry_id is not None:
+                WarehouseChangeLog.objects.filter(id__lte=last_entry_id).delete()
+
+        logger.info(f"Warehouse summaries rebuilt: {stats}")
+        return stats
+
+    # ========== Recompute ==========
+
+    @staticmethod
+    def _sync(model, key_fields: Tuple[str, ...], computed: Dict[Key, Dict[str, Any]],
+              dirty: Optional[Set[Key]]) -> int:
+        """
+        Upsert computed rows and delete rows of dirty keys that have no data.
+
+        Args:
+            model: Summary model
+            key_fields: Key column attnames, e.g. ('student_id', 'subject_id')
+            computed: {key: column values} for keys that still have data
+            dirty: Keys being recomputed, None for a full rebuild
+        """
+        existing = model.objects.all()
+        if dirty is not None:
+            for position, field in enumerate(key_fields):
+                existing = existing.filter(**{f'{field}__in': {key[position] for key in dirty}})
+
+        stale_ids = [
+            pk for pk, *key in existing.values_list('pk', *key_fields)
+            if tuple(key) not in computed and (dirty is None or tuple(key) in dirty)
+        ]
+        if stale_ids:
+            model.objects.filter(pk__in=stale_ids).delete()
+
+        if computed:
+            now = timezone.now()
+            value_fields = list(next(iter(computed.values())).keys()) + ['refreshed_at']
+            model.objects.bulk_create(
+                [
+                    model(**dict(zip(key_fields, key)), **values, refreshed_at=now)
+                    for key, values in computed.items()
+                ],
+                update_conflicts=True,
+                unique_fields=[model._meta.get_field(field).name for field in key_fields],
+                update_fields=value_fields,
+                batch_size=1000,
+            )
+
+        return len(computed)
+
+    @staticmethod
+    def _classes_of(student_subjects: Set[Key]) -> Set[Key]:
+        """(teacher, subject) classes the given students belong to."""
+        from materials.models import SubjectEnrollment
+
+        if not student_subjects:
+            return set()
+
+        rows = SubjectEnrollment.objects.filter(
+            student_id__in={student for student, _ in student_subjects},
+            subject_id__in={subject for _, subject in student_subjects},
+            teacher_id__isnull=False,
+        ).values_list('student_id', 'subject_id', 'teacher_id')
+
+        return {
+            (teacher_id, subject_id)
+            for student_id, subject_id, teacher_id in rows
+            if (student_id, subject_id) in student_subjects
+        }
+
+    @classmethod
+    def _graded_submissions(cls):
+        """Material submissions with a teacher grade (the view's source rows)."""
+        from materials.models import MaterialSubmission
+
+        return MaterialSubmission.objects.filter(feedback__grade__isnull=False)
+
+    @classmethod
+    def _refresh_student_grades(cls, dirty: Optional[Set[Key]]) -> int:
+        submissions = cls._graded_submissions().filter(student__student_profile__isnull=False)
+        if dirty is not None:
+            if not dirty:
+                return 0
+            submissions = submissions.filter(
+                student_id__in={student for student, _ in dirty},
+                material__subject_id__in={subject for _, subject in dirty},
+            )
+
+        rows = submissions.values('student_id', 'material__subject_id').annotate(
+            submission_count=Count('id', distinct=True),
+            avg_grade=Avg('feedback__grade'),
+            passed=Count('id', filter=Q(feedback__grade__gte=cls.PASS_GRADE)),
+            last_submission_date=Max('submitted_at'),
+            first_submission_date=Min('submitted_at'),
+        ).order_by()
+
+        computed = {}
+        for row in rows:
+            key = (row['student_id'], row['material__subject_id'])
+            if dirty is not None and key not in dirty:
+                continue
+            computed[key] = {
+                'submission_count': row['submission_count'],
+                'avg_grade': _decimal(row['avg_grade']),
+                'last_submission_date': row['last_submission_date'],
+                'first_submission_date': row['first_submission_date'],
+                'pass_rate': _rate(row['passed'], row['submission_count']),
+            }
+
+        return cls._sync(StudentGradeSummary, ('student_id', 'subject_id'), computed, dirty)
+
+    @classmethod
+    def _refresh_class_progress(cls, dirty: Optional[Set[Key]]) -> int:
+        """
+        Class rows are sums of per-(student, subject) aggregates.
+
+        One grouped query over the class members' submissions, joined to
+        enrollments in memory; a student enrolled with several teachers
+        counts towards each of their classes.
+        """
+        from materials.models import MaterialSubmission, SubjectEnrollment
+
+        enrollments = SubjectEnrollment.objects.filter(is_active=True, teacher_id__isnull=False)
+        if dirty is not None:
+            if not dirty:
+                return 0
+            enrollments = enrollments.filter(
+                teacher_id__in={teacher for teacher, _ in dirty},
+                subject_id__in={subject for _, subject in dirty},
+            )
+
+        members: Dict[Key, Set[int]] = {}
+        for student_id, subject_id, teacher_id in enrollments.values_list(
+            'student_id', 'subject_id', 'teacher_id'
+        ):
+            key = (teacher_id, subject_id)
+            if dirty is None or key in dirty:
+                members.setdefault(key, set()).add(student_id)
+
+        per_student: Dict[Key, Dict[str, Any]] = {}
+        if members:
+            recent_since = timezone.now() - timedelta(days=cls.RECENT_DAYS)
+            student_ids = set().union(*members.values())
+            subject_ids = {subject for _, subject in members}
+
+            rows = MaterialSubmission.objects.filter(
+                student_id__in=student_ids,
+                material__subject_id__in=subject_ids,
+            ).values('student_id', 'material__subject_id').annotate(
+                total=Count('id', distinct=True),
+                graded=Count('id', filter=Q(feedback__grade__isnull=False)),
+                grade_sum=Sum('feedback__grade'),
+                passed=Count('id', filter=Q(feedback__grade__gte=cls.PASS_GRADE)),
+                recent=Count('id', filter=Q(submitted_at__gte=recent_since), distinct=True),
+            ).order_by()
+
+            for row in rows:
+                per_student[(row['student_id'], row['material__subject_id'])] = row
+
+        computed = {}
+        for (teacher_id, subject_id), students in members.items():
+            total = graded = grade_sum = passed = recent = 0
+            for student_id in students:
+                row = per_student.get((student_id, subject_id))
+                if row is None:
+                    continue
+                total += row['total']
+                graded += row['graded']
+                grade_sum += row['grade_sum'] or 0
+                passed += row['passed']
+                recent += row['recent']
+
+            computed[(teacher_id, subject_id)] = {
+                'student_count': len(students),
+                'avg_grade': _decimal(grade_sum / graded) if graded else None,
+                'total_submissions': total,
+                'pass_rate': _rate(passed, total),
+                'recent_submission_rate': _rate(recent, total),
+            }
+
+        return cls._sync(ClassProgressSummary, ('teacher_id', 'subject_id'), computed, dirty)
+
+    @classmethod
+    def _refresh_teacher_workload(cls, dirty: Optional[Set[int]]) -> int:
+        from assignments.models import Assignment, AssignmentSubmission
+
+        assignments = Assignment.objects.all()
+        submissions = AssignmentSubmission.objects.all()
+        if dirty is not None:
+            if not dirty:
+                return 0
+            assignments = assignments.filter(author_id__in=dirty)
+            submissions = submissions.filter(assignment__author_id__in=dirty)
+
+        assignment_counts = dict(
+            assignments.values('author_id').annotate(total=Count('id')).order_by()
+            .values_list('author_id', 'total')
+        )
+
+        pending = Q(status=AssignmentSubmission.Status.SUBMITTED)
+        overdue_before = timezone.now() - timedelta(days=cls.OVERDUE_DAYS)
+        submission_rows = {
+            row['assignment__author_id']: row
+            for row in submissions.values('assignment__author_id').annotate(
+                pending_reviews=Count('id', filter=pending),
+                graded_submissions=Count('id', filter=Q(status=AssignmentSubmission.Status.GRADED)),
+                total_submissions=Count('id'),
+                avg_grade_time=Avg(F('graded_at') - F('submitted_at'), filter=Q(graded_at__isnull=False)),
+                last_graded_time=Max('graded_at'),
+                overdue=Count('id', filter=pending & Q(submitted_at__lt=overdue_before)),
+            ).order_by()
+        }
+
+        computed = {}
+        for teacher_id, total_assignments in assignment_counts.items():
+            row = submission_rows.get(teacher_id, {})
+            avg_grade_time = row.get('avg_grade_time')
+            pending_reviews = row.get('pending_reviews', 0)
+
+            computed[(teacher_id,)] = {
+                'total_assignments': total_assignments,
+                'pending_reviews': pending_reviews,
+                'graded_submissions': row.get('graded_submissions', 0),
+                'total_submissions': row.get('total_submissions', 0),
+                'avg_grade_time_minutes': (
+                    _decimal(avg_grade_time.total_seconds() / 60) if avg_grade_time else None
+                ),
+                'last_graded_time': row.get('last_graded_time'),
+                'overdue_percentage': _rate(row.get('overdue', 0), pending_reviews),
+            }
+
+        dirty_keys = {(teacher_id,) for teacher_id in dirty} if dirty is not None else None
+        return cls._sync(TeacherWorkloadSummary, ('teacher_id',), computed, dirty_keys)
+
+    @classmethod
+    def _refresh_subject_performance(cls, dirty: Optional[Set[int]]) -> int:
+        submissions = cls._graded_submissions()
+        if dirty is not None:
+            if not dirty:
+                return 0
+            submissions = submissions.filter(material__subject_id__in=dirty)
+
+        rows = submissions.values('material__subject_id', 'material__subject__name').annotate(
+            student_count=Count('student_id', distinct=True),
+            total_submissions=Count('id', distinct=True),
+            avg_grade=Avg('feedback__grade'),
+            min_grade=Min('feedback__grade'),
+            max_grade=Max('feedback__grade'),
+            excellent=Count('id', filter=Q(feedback__grade__gte=cls.EXCELLENT_GRADE)),
+            good=Count('id', filter=Q(
+                feedback__grade__gte=cls.PASS_GRADE, feedback__grade__lt=cls.EXCELLENT_GRADE
+            )),
+            below=Count('id', filter=Q(feedback__grade__lt=cls.PASS_GRADE)),
+            last_submission_date=Max('submitted_at'),
+        ).order_by()
+
+        computed = {}
+        for row in rows:
+            total = row['total_submissions']
+            computed[(row['material__subject_id'],)] = {
+                'subject_name': row['material__subject__name'],
+                'student_count': row['student_count'],
+                'total_submissions': total,
+                'avg_grade': _decimal(row['avg_grade']),
+                'min_grade': _decimal(row['min_grade']),
+                'max_grade': _decimal(row['max_grade']),
+                'excellent_rate': _rate(row['excellent'], total),
+                'good_rate': _rate(row['good'], total),
+                'below_average_rate': _rate(row['below'], total),
+                'last_submission_date': row['last_submission_date'],
+            }
+
+        dirty_keys = {(subject_id,) for subject_id in dirty} if dirty is not None else None
+        return cls._sync(SubjectPerformanceSummary, ('subject_id',), computed, dirty_keys)
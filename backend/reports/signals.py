@@ -6,10 +6,14 @@
 - Изменение оценок
 - Отправка заданий
 - Изменение прогресса студента
+
+Также записывают изменённые ключи в WarehouseChangeLog для инкрементального
+обновления сводных таблиц хранилища (reports.services.warehouse_summaries).
 """
 
 import logging
-from django.db.models.signals import post_save, post_delete
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -70,7 +74,10 @@ def invalidate_teacher_reports(teacher_id: int, report_type: str = "class_perfor
 @receiver(post_save, sender='assignments.AssignmentAnswer')
 def invalidate_on_grade_change(sender, instance, created, **kwargs):
     """
-    Инвалидирует кэш при изменении оценки задания.
+    Инвалидирует кэш при проверке ответа на вопрос задания.
+
+    Ответ считается оценённым, если он засчитан (is_correct)
+    или за него начислены баллы (points_earned).
 
     Args:
         sender: Model class
@@ -78,18 +85,26 @@ def invalidate_on_grade_change(sender, instance, created, **kwargs):
         created: Boolean indicating if instance was created
         **kwargs: Additional arguments
     """
-    if instance.score is not None:
-        # Инвалидируем отчёты студента
-        invalidate_student_reports(instance.submission.student_id)
+    if not (instance.is_correct or instance.points_earned):
+        return
 
-        # Инвалидируем отчёты учителя (если есть)
-        if instance.graded_by_id:
-            invalidate_teacher_reports(instance.graded_by_id)
+    try:
+        submission = instance.submission
+        author_id = submission.assignment.author_id
+    except ObjectDoesNotExist:
+        return
 
-        logger.debug(
-            f"Cache invalidated: grade changed for submission {instance.submission_id}",
-            extra={"submission_id": instance.submission_id, "score": instance.score},
-        )
+    # Инвалидируем отчёты студента
+    invalidate_student_reports(submission.student_id)
+
+    # Инвалидируем отчёты автора задания
+    if author_id:
+        invalidate_teacher_reports(author_id)
+
+    logger.debug(
+        f"Cache invalidated: answer graded for submission {instance.submission_id}",
+        extra={"submission_id": instance.submission_id, "points": instance.points_earned},
+    )
 
 
 @receiver(post_save, sender='assignments.AssignmentSubmission')
@@ -107,8 +122,8 @@ def invalidate_on_submission_change(sender, instance, created, **kwargs):
     invalidate_student_reports(instance.student_id, "assignment_completion")
 
     # Инвалидируем отчёты учителя
-    if instance.assignment.created_by_id:
-        invalidate_teacher_reports(instance.assignment.created_by_id)
+    if instance.assignment.author_id:
+        invalidate_teacher_reports(instance.assignment.author_id)
 
     logger.debug(
         f"Cache invalidated: submission changed {instance.id}",
@@ -324,3 +339,108 @@ def invalidate_on_teacher_report_save(sender, instance, created, **kwargs):
             f"Failed to invalidate cache for teacher report {instance.id}: {str(e)}",
             extra={"report_id": instance.id, "error": str(e)},
         )
+
+
+# ========== Warehouse summary change log ==========
+
+def mark_warehouse_dirty(**keys):
+    """
+    Записывает ключ в лог изменений сводных таблиц хранилища.
+
+    Ошибка записи не должна ломать сохранение исходных данных:
+    сводки всё равно будут пересчитаны ночным полным rebuild.
+    """
+    try:
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        WarehouseSummaryService.mark_dirty(**keys)
+    except Exception as e:
+        logger.error(
+            f"Failed to record warehouse change {keys}: {str(e)}",
+            extra={"keys": keys, "error": str(e)},
+        )
+
+
+def _material_submission_keys(submission):
+    return {
+        "student_id": submission.student_id,
+        "subject_id": submission.material.subject_id,
+    }
+
+
+@receiver(post_save, sender='materials.MaterialSubmission')
+@receiver(post_delete, sender='materials.MaterialSubmission')
+def track_material_submission_change(sender, instance, **kwargs):
+    """Ответ на материал влияет на сводки (ученик, предмет)."""
+    try:
+        mark_warehouse_dirty(**_material_submission_keys(instance))
+    except ObjectDoesNotExist:
+        pass
+
+
+@receiver(post_save, sender='materials.MaterialFeedback')
+@receiver(post_delete, sender='materials.MaterialFeedback')
+def track_material_grade_change(sender, instance, **kwargs):
+    """Оценка за ответ влияет на сводки (ученик, предмет)."""
+    try:
+        mark_warehouse_dirty(**_material_submission_keys(instance.submission))
+    except ObjectDoesNotExist:
+        # Ответ удалён каскадно - его удаление уже записано
+        pass
+
+
+@receiver(pre_save, sender='materials.SubjectEnrollment')
+def remember_enrollment_keys(sender, instance, **kwargs):
+    """Запоминает сохранённые (ученик, предмет, преподаватель) для post_save."""
+    instance._previous_warehouse_keys = None
+    if instance.pk:
+        instance._previous_warehouse_keys = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("student_id", "subject_id", "teacher_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender='materials.SubjectEnrollment')
+@receiver(post_delete, sender='materials.SubjectEnrollment')
+def track_enrollment_change(sender, instance, **kwargs):
+    """
+    Зачисление меняет состав класса (преподаватель, предмет).
+
+    При смене преподавателя, предмета или ученика старый класс тоже
+    помечается, иначе его строка сводки не пересчитается.
+    """
+    keys = (instance.student_id, instance.subject_id, instance.teacher_id)
+    previous = getattr(instance, "_previous_warehouse_keys", None)
+    instance._previous_warehouse_keys = None
+    if previous and previous != keys:
+        student_id, subject_id, teacher_id = previous
+        mark_warehouse_dirty(
+            student_id=student_id, subject_id=subject_id, teacher_id=teacher_id
+        )
+
+    mark_warehouse_dirty(
+        student_id=instance.student_id,
+        subject_id=instance.subject_id,
+        teacher_id=instance.teacher_id,
+    )
+
+
+@receiver(post_save, sender='assignments.Assignment')
+@receiver(post_delete, sender='assignments.Assignment')
+def track_assignment_change(sender, instance, **kwargs):
+    """Задания учитываются в нагрузке автора."""
+    if instance.author_id:
+        mark_warehouse_dirty(teacher_id=instance.author_id)
+
+
+@receiver(post_save, sender='assignments.AssignmentSubmission')
+@receiver(post_delete, sender='assignments.AssignmentSubmission')
+def track_assignment_submission_change(sender, instance, **kwargs):
+    """Ответы на задания учитываются в нагрузке автора задания."""
+    try:
+        author_id = instance.assignment.author_id
+    except ObjectDoesNotExist:
+        return
+    if author_id:
+        mark_warehouse_dirty(teacher_id=author_id)
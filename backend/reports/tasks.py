@@ -2,7 +2,11 @@
 Celery tasks for data warehouse operations and scheduled report delivery.
 
 Tasks:
-- Refresh materialized views (daily)
+- Refresh materialized views (on demand)
+- Refresh warehouse summary tables from the change log (every few minutes)
+- Rebuild warehouse summary tables (daily fallback)
+- Reconcile realtime dashboard counters (every few minutes)
+- Rebuild assignment score sketches (daily fallback)
 - Warm analytics cache (before peak hours)
 - Generate data warehouse statistics
 - Send scheduled reports via email (daily, weekly, monthly)
@@ -29,8 +33,9 @@ def refresh_materialized_views(self):
     """
     Refresh all data warehouse materialized views.
 
-    Scheduled daily (e.g., 2 AM UTC) to update analytics data.
-    Uses CONCURRENTLY to avoid locks.
+    Run on demand for ad-hoc SQL against the views. DataWarehouseService
+    reads the incrementally maintained summary tables instead (see
+    refresh_warehouse_summaries). Uses CONCURRENTLY to avoid locks.
 
     Retries up to 3 times on failure.
     """
@@ -83,6 +88,107 @@ def refresh_materialized_views(self):
         raise self.retry(exc=e, countdown=retry_in)
 
 
+@shared_task(bind=True, max_retries=3)
+def refresh_warehouse_summaries(self):
+    """
+    Recompute warehouse summary rows for keys in the change log.
+
+    Runs every few minutes; only (student, subject), class, teacher and
+    subject rows touched since the last run are recomputed.
+    """
+    try:
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        stats = WarehouseSummaryService.refresh_dirty()
+
+        return {
+            'task': 'refresh_warehouse_summaries',
+            'status': 'completed',
+            'timestamp': datetime.now().isoformat(),
+            'results': stats
+        }
+
+    except Exception as e:
+        logger.error(f"Error refreshing warehouse summaries: {e}")
+        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+
+
+@shared_task(bind=True, max_retries=3)
+def reconcile_dashboard_counters(self):
+    """
+    Recompute the realtime dashboard counters for every scope.
+
+    Counters are maintained incrementally from submission and assignment
+    signals; this periodic pass overwrites them with database totals to
+    correct drift (missed signals, bulk updates, tutor reassignments).
+    """
+    try:
+        from reports.services.dashboard_counters import DashboardCounters
+
+        scopes = DashboardCounters.reconcile()
+
+        return {
+            'task': 'reconcile_dashboard_counters',
+            'status': 'completed',
+            'timestamp': datetime.now().isoformat(),
+            'scopes': scopes
+        }
+
+    except Exception as e:
+        logger.error(f"Error reconciling dashboard counters: {e}")
+        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+
+
+@shared_task(bind=True, max_retries=3)
+def rebuild_warehouse_summaries(self):
+    """
+    Recompute every warehouse summary row.
+
+    Scheduled daily as a fallback for rows that drifted from the source
+    data (missed signals, bulk updates, raw SQL).
+    """
+    try:
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        stats = WarehouseSummaryService.rebuild()
+
+        return {
+            'task': 'rebuild_warehouse_summaries',
+            'status': 'completed',
+            'timestamp': datetime.now().isoformat(),
+            'results': stats
+        }
+
+    except Exception as e:
+        logger.error(f"Error rebuilding warehouse summaries: {e}")
+        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+
+
+@shared_task(bind=True, max_retries=3)
+def rebuild_score_sketches(self):
+    """
+    Recompute every assignment score sketch.
+
+    Sketches are updated from submission signals; this daily fallback
+    corrects drift from bulk updates and raw SQL.
+    """
+    try:
+        from reports.services.score_sketches import ScoreSketchService
+
+        stats = ScoreSketchService.rebuild()
+
+        return {
+            'task': 'rebuild_score_sketches',
+            'status': 'completed',
+            'timestamp': datetime.now().isoformat(),
+            'results': stats
+        }
+
+    except Exception as e:
+        logger.error(f"Error rebuilding score sketches: {e}")
+        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+
+
 @shared_task(bind=True, max_retries=2)
 def warm_analytics_cache(self):
     """
@@ -256,7 +362,7 @@ def send_scheduled_report(self, schedule_id: int, recipient_id: int) -> dict:
     Returns:
         dict with status and metadata
     """
-    from reports.models import ReportSchedule, ReportScheduleRecipient, StudentReport, TutorWeeklyReport, TeacherWeeklyReport
+    from reports.models import ReportSchedule, ReportScheduleRecipient
     from reports.services.email_report import EmailReportService
 
     try:
@@ -289,85 +395,10 @@ def send_scheduled_report(self, schedule_id: int, recipient_id: int) -> dict:
             }
 
         # Generate report data based on report_type
-        report_data = []
-        subject = f"Report: {schedule.name or 'Scheduled Report'}"
-
-        if schedule.report_type == ReportSchedule.ReportType.STUDENT_REPORT:
-            # For student reports, get reports for this recipient (if teacher)
-            if recipient.role == 'teacher':
-                student_reports = StudentReport.objects.filter(
-                    teacher_id=recipient_id,
-                    status='sent'
-                ).order_by('-created_at')[:10]
-
-                for report in student_reports:
-                    report_data.append({
-                        'id': report.id,
-                        'student': report.student.get_full_name(),
-                        'title': report.title,
-                        'type': report.get_report_type_display(),
-                        'period': f"{report.period_start} to {report.period_end}",
-                        'grade': report.overall_grade,
-                        'progress': report.progress_percentage,
-                    })
-
-                subject = f"Weekly Student Reports - {datetime.now().strftime('%Y-%m-%d')}"
-
-        elif schedule.report_type == ReportSchedule.ReportType.TUTOR_WEEKLY_REPORT:
-            # For tutor reports, get reports for this tutor or parent
-            if recipient.role == 'tutor':
-                reports = TutorWeeklyReport.objects.filter(
-                    tutor_id=recipient_id,
-                    status='sent'
-                ).order_by('-week_start')[:5]
-
-                for report in reports:
-                    report_data.append({
-                        'id': report.id,
-                        'student': report.student.get_full_name(),
-                        'week': f"{report.week_start} to {report.week_end}",
-                        'progress': report.progress_percentage,
-                        'summary': report.summary[:100],
-                    })
-
-                subject = f"Tutor Weekly Reports - {datetime.now().strftime('%Y-%m-%d')}"
-
-            elif recipient.role == 'parent':
-                reports = TutorWeeklyReport.objects.filter(
-                    parent_id=recipient_id,
-                    status='sent'
-                ).order_by('-week_start')[:5]
-
-                for report in reports:
-                    report_data.append({
-                        'id': report.id,
-                        'student': report.student.get_full_name(),
-                        'week': f"{report.week_start} to {report.week_end}",
-                        'progress': report.progress_percentage,
-                        'summary': report.summary[:100],
-                    })
-
-                subject = f"Student Weekly Reports - {datetime.now().strftime('%Y-%m-%d')}"
-
-        elif schedule.report_type == ReportSchedule.ReportType.TEACHER_WEEKLY_REPORT:
-            # For teacher reports, get reports for this tutor
-            if recipient.role == 'tutor':
-                reports = TeacherWeeklyReport.objects.filter(
-                    tutor_id=recipient_id,
-                    status='sent'
-                ).order_by('-week_start')[:5]
-
-                for report in reports:
-                    report_data.append({
-                        'id': report.id,
-                        'student': report.student.get_full_name(),
-                        'subject': report.subject.name if report.subject else 'N/A',
-                        'week': f"{report.week_start} to {report.week_end}",
-                        'average_score': float(report.average_score) if report.average_score else 0,
-                        'summary': report.summary[:100],
-                    })
-
-                subject = f"Teacher Weekly Reports - {datetime.now().strftime('%Y-%m-%d')}"
+        subject, report_data = EmailReportService.build_scheduled_report_data(
+            schedule.report_type, recipient
+        )
+        subject = subject or f"Report: {schedule.name or 'Scheduled Report'}"
 
         if not report_data:
             logger.info(f"No reports to send to {recipient.email} for schedule {schedule_id}")
@@ -427,10 +458,15 @@ def execute_scheduled_reports(self) -> dict:
     Main task to execute all active scheduled reports.
     Called by Celery Beat scheduler at configured intervals.
 
+    Due schedules share report computations and rendered attachments
+    (see ScheduledReportFanout), so a recipient subscribed to several
+    schedules of the same report type is computed for only once.
+
     Returns:
         dict with execution summary
     """
-    from reports.models import ReportSchedule, ReportScheduleExecution
+    from reports.models import ReportSchedule
+    from reports.services.scheduled_reports import ScheduledReportFanout
 
     try:
         now = timezone.now()
@@ -477,63 +513,33 @@ def execute_scheduled_reports(self) -> dict:
             logger.info("No schedules to run at this time")
             return {'success': True, 'schedules_run': 0}
 
-        # Execute all schedules
-        total_sent = 0
+        # Execute all schedules, grouped by report type so shared
+        # computations are adjacent
+        schedules_to_run.sort(key=lambda schedule: (schedule.report_type, schedule.id))
+        fanout = ScheduledReportFanout(now=now)
         total_failed = 0
 
         for schedule in schedules_to_run:
-            execution = ReportScheduleExecution.objects.create(schedule=schedule)
-
             try:
-                # Get active recipients
-                from reports.models import ReportScheduleRecipient
-                recipients = ReportScheduleRecipient.objects.filter(
-                    schedule=schedule,
-                    is_subscribed=True
-                ).values_list('recipient_id', flat=True)
-
-                if not recipients:
-                    logger.warning(f"Schedule {schedule.id} has no active recipients")
-                    execution.status = ReportScheduleExecution.ExecutionStatus.COMPLETED
-                    execution.completed_at = timezone.now()
-                    execution.save()
-                    continue
-
-                execution.total_recipients = len(recipients)
-                execution.save()
-
-                # Send report to each recipient
-                for recipient_id in recipients:
-                    result = send_scheduled_report.delay(schedule.id, recipient_id)
-                    # Track results
-                    total_sent += 1
+                fanout.execute(schedule)
 
                 # Update schedule timing
                 schedule.last_sent = now
                 schedule.next_scheduled = _calculate_next_scheduled_time(schedule)
                 schedule.save(update_fields=['last_sent', 'next_scheduled'])
 
-                # Mark execution as complete
-                execution.status = ReportScheduleExecution.ExecutionStatus.COMPLETED
-                execution.successful_sends = len(recipients)
-                execution.completed_at = timezone.now()
-                execution.save()
-
-                logger.info(f"Schedule {schedule.id} executed successfully")
-
             except Exception as e:
                 logger.error(f"Error executing schedule {schedule.id}: {e}", exc_info=True)
-                execution.status = ReportScheduleExecution.ExecutionStatus.FAILED
-                execution.error_message = str(e)
-                execution.completed_at = timezone.now()
-                execution.save()
                 total_failed += 1
 
         return {
             'success': True,
             'schedules_run': len(schedules_to_run),
-            'total_sent': total_sent,
-            'total_failed': total_failed
+            'total_sent': fanout.stats['sent'],
+            'total_failed': fanout.stats['failed'] + total_failed,
+            'computations': fanout.stats['computed'],
+            'reused_computations': fanout.stats['reused'],
+            'attachments_rendered': fanout.stats['rendered'],
         }
 
     except Exception as e:
@@ -551,6 +557,8 @@ def _calculate_next_scheduled_time(schedule) -> datetime:
     Returns:
         Next scheduled datetime
     """
+    from reports.models import ReportSchedule
+
     now = timezone.now()
     schedule_time = schedule.time
     next_time = datetime.combine(now.date(), schedule_time)
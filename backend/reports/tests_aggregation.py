@@ -0,0 +1,129 @@
+"""
+Tests for the single-pass student metrics engine.
+
+Covers:
+- Material, assignment and engagement metrics from columnar arrays
+- Per-student windows over a shared multi-student load
+- Learning metrics (teacher filter, consistency, improvement trend)
+- Previous-period trends
+"""
+
+from datetime import date, datetime
+
+from reports.aggregation import StudentActivityArrays, StudentMetricsEngine
+
+
+DATE_FROM = date(2025, 3, 1)
+DATE_TO = date(2025, 3, 10)
+
+
+def _engine(material_rows, submission_rows, student_ids=(1, 2)):
+    engine = StudentMetricsEngine(list(student_ids), DATE_FROM, DATE_TO)
+    engine.arrays = StudentActivityArrays(material_rows, submission_rows)
+    return engine
+
+
+MATERIAL_ROWS = [
+    # student_id, last_accessed, progress, is_completed, time_spent (minutes)
+    (1, datetime(2025, 3, 2, 10), 100, True, 30),
+    (1, datetime(2025, 3, 2, 18), 40, False, 20),
+    (1, datetime(2025, 3, 5, 9), 0, False, 10),
+    (1, datetime(2025, 2, 25, 9), 50, False, 5),   # previous period
+    (2, datetime(2025, 3, 3, 9), 80, False, 60),
+]
+
+SUBMISSION_ROWS = [
+    # student_id, submitted_at, score, is_late, status, author_id
+    (1, datetime(2025, 3, 2, 12), 60, False, 'graded', 10),
+    (1, datetime(2025, 3, 8, 12), 90, True, 'graded', 11),
+    (1, datetime(2025, 3, 9, 12), None, False, 'submitted', 10),
+    (1, datetime(2025, 2, 24, 12), 40, False, 'graded', 10),  # previous period
+    (2, datetime(2025, 3, 4, 12), 70, False, 'in_review', 10),
+]
+
+
+class TestStudentMetricsEngine:
+    """Tests for StudentMetricsEngine over preloaded arrays."""
+
+    def test_material_metrics(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        metrics = engine.material_metrics(1, DATE_FROM, DATE_TO)
+
+        assert metrics == {
+            'total': 3,
+            'completed': 1,
+            'in_progress': 1,
+            'not_started': 1,
+            'avg_progress': 70.0,
+        }
+
+    def test_assignment_metrics_ignore_missing_scores(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        metrics = engine.assignment_metrics(1, DATE_FROM, DATE_TO)
+
+        assert metrics['total'] == 3
+        assert metrics['graded'] == 2
+        assert metrics['pending'] == 1
+        assert metrics['late_submissions'] == 1
+        assert metrics['avg_score'] == 75.0
+
+    def test_engagement_metrics(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        metrics = engine.engagement_metrics(1, DATE_FROM, DATE_TO)
+
+        assert metrics['total_time_spent_hours'] == 1.0
+        assert metrics['activity_days'] == 2
+        assert metrics['avg_session_duration_minutes'] == 30.0
+
+    def test_students_do_not_leak_into_each_other(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        materials = engine.material_metrics(2, DATE_FROM, DATE_TO)
+        assignments = engine.assignment_metrics(2, DATE_FROM, DATE_TO)
+
+        assert materials['total'] == 1
+        assert materials['avg_progress'] == 80.0
+        assert assignments['total'] == 1
+        assert assignments['pending'] == 1
+
+    def test_progress_metrics_trends_use_previous_period(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        result = engine.progress_metrics(1)
+
+        # current: (70 * 3 + 75 * 3) / 6; previous: (50 + 40) / 2
+        assert result['overall_progress'] == 72.5
+        assert result['trends']['previous_period_progress'] == 45.0
+        assert result['trends']['is_improving'] is True
+
+    def test_learning_metrics(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        result = engine.learning_metrics(1, teacher_id=10)
+
+        assert result['performance_score'] == 60.0
+        assert result['participation_rate'] == 20.0
+        assert result['improvement_trend'] == 'improving'
+        # daily counts [2, 1] -> variance 0.25
+        assert result['consistency_score'] == 98.75
+
+    def test_unknown_student_gets_empty_metrics(self):
+        engine = _engine(MATERIAL_ROWS, SUBMISSION_ROWS)
+
+        result = engine.progress_metrics(99)
+
+        assert result['overall_progress'] == 0.0
+        assert result['materials']['total'] == 0
+        assert result['assignments']['total'] == 0
+
+    def test_empty_load(self):
+        engine = _engine([], [], student_ids=())
+
+        result = engine.learning_metrics(None)
+
+        assert result['engagement_score'] == 0
+        assert result['consistency_score'] == 0.0
+        assert result['improvement_trend'] == 'stable'
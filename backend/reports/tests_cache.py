@@ -20,6 +20,13 @@ from django.test import TestCase
 from django.utils import timezone
 
 from reports.cache import ReportCacheStrategy
+from reports.cache.multilevel import (
+    BoundedMemoryCache,
+    CacheInvalidationTrigger,
+    MultiLevelCache,
+    get_multilevel_cache,
+)
+from reports.cache.bus import CacheInvalidationBus
 
 
 @pytest.mark.django_db
@@ -449,3 +456,194 @@ class TestReportCachePerformance(TestCase):
 
         # 100 операций должны занять < 100ms
         assert (end_time - start_time) < 0.1
+
+
+class TestBoundedMemoryCache(TestCase):
+    """Тесты L1 кэша с ограничением по памяти."""
+
+    def test_lru_eviction_over_namespace_budget(self):
+        """При превышении бюджета вытесняется давно не использованный ключ."""
+        value = "x" * 1000
+        entry_size = BoundedMemoryCache.estimate_size(value)
+        l1 = BoundedMemoryCache(default_max_bytes=entry_size * 2)
+
+        l1.set("analytics:a", value, ttl=60)
+        l1.set("analytics:b", value, ttl=60)
+        l1.get("analytics:a")
+        l1.set("analytics:c", value, ttl=60)
+
+        assert l1.get("analytics:a")[1] is True
+        assert l1.get("analytics:b")[1] is False
+        assert l1.get("analytics:c")[1] is True
+        assert l1.get_stats()["evictions"] == 1
+
+    def test_namespaces_have_separate_budgets(self):
+        """Бюджет считается отдельно для каждого namespace."""
+        value = "x" * 1000
+        entry_size = BoundedMemoryCache.estimate_size(value)
+        l1 = BoundedMemoryCache(
+            default_max_bytes=entry_size,
+            namespace_max_bytes={"analytics": entry_size * 3},
+        )
+
+        for i in range(3):
+            l1.set(f"analytics:{i}", value, ttl=60)
+            l1.set(f"dashboard:{i}", value, ttl=60)
+
+        stats = l1.get_stats()["namespaces"]
+        assert stats["analytics"]["entries"] == 3
+        assert stats["dashboard"]["entries"] == 1
+
+    def test_oversized_value_is_rejected(self):
+        """Значение больше бюджета не сохраняется в L1."""
+        l1 = BoundedMemoryCache(default_max_bytes=10)
+
+        assert l1.set("report:big", "x" * 1000, ttl=60) is False
+        assert len(l1) == 0
+        assert l1.get_stats()["rejected"] == 1
+
+    def test_purge_expired(self):
+        """Истёкшие записи удаляются без повторного чтения."""
+        l1 = BoundedMemoryCache()
+        l1.set("analytics:old", 1, ttl=-1)
+        l1.set("analytics:new", 2, ttl=60)
+
+        assert l1.purge_expired() == 1
+        assert l1.keys() == ["analytics:new"]
+        assert l1.get_stats()["bytes"] == BoundedMemoryCache.estimate_size(2)
+
+
+class TestMultiLevelCacheSingleFlight(TestCase):
+    """Тесты защиты от cache stampede в MultiLevelCache.get."""
+
+    def setUp(self):
+        cache.clear()
+        self.cache_obj = MultiLevelCache()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        """Параллельные промахи по одному ключу вычисляют значение один раз."""
+        import threading
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"total": 42}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.cache_obj.get("analytics:hot", compute_func=compute)
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(value == {"total": 42} for value, _ in results)
+
+    def test_stale_value_served_while_lease_is_held(self):
+        """Пока другой воркер держит lease, отдаётся устаревшее значение."""
+        self.cache_obj._set_to_redis("analytics:stale", "old", ttl=-1)
+        cache.add("lock:analytics:stale", "other-worker", 30)
+
+        value, level = self.cache_obj.get(
+            "analytics:stale", compute_func=lambda: "new"
+        )
+
+        assert value == "old"
+        assert level == MultiLevelCache.LEVEL_STALE
+
+
+class TestMultiLevelCacheTags(TestCase):
+    """Тесты инвалидации по тегам."""
+
+    def setUp(self):
+        cache.clear()
+        self.cache_obj = get_multilevel_cache()
+        self.cache_obj.clear_all()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_derive_tags_from_key(self):
+        """Теги выводятся из соглашений об именах ключей."""
+        assert MultiLevelCache.derive_tags("analytics:student:5:summary") == [
+            "ns:analytics",
+            "student:5",
+        ]
+        assert "user:7" in MultiLevelCache.derive_tags("dashboard:user_7:main")
+
+    def test_grade_update_invalidates_tagged_entries(self):
+        """Оценка инвалидирует записи студента в L1 и L2, не трогая чужие."""
+        self.cache_obj.set("analytics:student:5:summary", {"avg": 4})
+        self.cache_obj.set("analytics:student:6:summary", {"avg": 5})
+
+        CacheInvalidationTrigger.on_grade_update(assignment_id=1, student_id=5)
+
+        assert self.cache_obj.get("analytics:student:5:summary") == (None, "miss")
+        self.cache_obj._delete_from_memory("analytics:student:6:summary")
+        assert self.cache_obj.get("analytics:student:6:summary") == (
+            {"avg": 5},
+            MultiLevelCache.LEVEL_REDIS,
+        )
+
+    def test_explicit_tags(self):
+        """Явные теги работают для произвольных ключей."""
+        self.cache_obj.get("report:custom:abc", lambda: [1, 2], tags=["class:3"])
+
+        self.cache_obj.invalidate_tags(["class:3"])
+
+        assert self.cache_obj.get("report:custom:abc") == (None, "miss")
+
+
+class TestCacheInvalidationBus(TestCase):
+    """Тесты применения сообщений шины инвалидации L1."""
+
+    def setUp(self):
+        self.cache_obj = MultiLevelCache()
+        self.bus = CacheInvalidationBus(self.cache_obj)
+        self.bus._last_seq = 1
+
+    def _message(self, seq, op, items, origin="other-process"):
+        return f"{seq}|" + json.dumps({"origin": origin, "op": op, "items": items})
+
+    def test_remote_tag_invalidation_evicts_l1(self):
+        """Сообщение другого процесса удаляет записи L1 по тегу."""
+        self.cache_obj._set_to_memory("analytics:student:5:x", 1, 60, ["student:5"])
+        self.cache_obj._set_to_memory("analytics:student:6:x", 2, 60, ["student:6"])
+
+        self.bus._handle(self._message(2, "tags", ["student:5"]))
+
+        assert self.cache_obj._get_from_memory("analytics:student:5:x")[1] is False
+        assert self.cache_obj._get_from_memory("analytics:student:6:x")[1] is True
+        assert self.bus._last_seq == 2
+
+    def test_own_messages_are_not_applied(self):
+        """Собственные сообщения процесса только сдвигают sequence."""
+        self.cache_obj._set_to_memory("analytics:a", 1, 60, ["t"])
+
+        self.bus._handle(self._message(2, "tags", ["t"], origin=self.bus.origin))
+
+        assert self.cache_obj._get_from_memory("analytics:a")[1] is True
+        assert self.bus._last_seq == 2
+
+    def test_sequence_gap_flushes_l1(self):
+        """Пропуск в sequence сбрасывает весь L1."""
+        self.cache_obj._set_to_memory("analytics:a", 1, 60)
+        self.cache_obj._set_to_memory("dashboard:b", 2, 60)
+
+        self.bus._handle(self._message(5, "keys", ["unrelated"]))
+
+        assert len(self.cache_obj._memory_cache) == 0
+        assert self.bus.stats["gaps"] == 1
+        assert self.bus._last_seq == 5
@@ -5,7 +5,7 @@ Covers:
 - Chart generation for all types (bar, line, pie, histogram, box_plot)
 - Base64 PNG output validation
 - JSON endpoint for frontend rendering
-- Caching behavior
+- Content-addressed storage and lazy per-format rendering
 - Error handling (no data, invalid type)
 - Input validation
 """
@@ -13,10 +13,12 @@ Covers:
 import base64
 import json
 from io import BytesIO
+from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.core.files.storage import default_storage
 from PIL import Image
 from rest_framework.test import APIClient
 
@@ -25,6 +27,13 @@ from reports.services.charts import ChartGenerationService
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def chart_storage(settings, tmp_path):
+    """Store charts under a per-test MEDIA_ROOT so stored ids never leak between tests."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    yield tmp_path
+
+
 @pytest.mark.django_db
 class TestChartGenerationService:
     """Tests for ChartGenerationService."""
@@ -40,13 +49,13 @@ class TestChartGenerationService:
             title='Quarterly Performance',
         )
 
-        assert 'png_base64' in result
-        assert 'svg' in result
+        assert 'chart_id' in result
         assert 'json' in result
         assert 'title' in result
         assert 'alt_text' in result
         assert result['title'] == 'Quarterly Performance'
-        assert result['png_base64'].startswith('data:image/png;base64,')
+        assert result['url'].endswith('.png')
+        assert 'png_base64' not in result
 
     def test_bar_chart_with_custom_colors(self):
         """Test bar chart with custom colors."""
@@ -61,7 +70,7 @@ class TestChartGenerationService:
             colors=colors,
         )
 
-        assert result['png_base64'].startswith('data:image/png;base64,')
+        assert result['url'].endswith('.png')
 
     def test_bar_chart_different_sizes(self):
         """Test bar chart with different sizes."""
@@ -75,7 +84,7 @@ class TestChartGenerationService:
                 title=f'Chart {size}',
                 size=size,
             )
-            assert 'png_base64' in result
+            assert result['url'].endswith('.png')
 
     def test_bar_chart_themes(self):
         """Test bar chart with different themes."""
@@ -89,7 +98,7 @@ class TestChartGenerationService:
                 title=f'Chart {theme}',
                 theme=theme,
             )
-            assert 'png_base64' in result
+            assert result['url'].endswith('.png')
 
     def test_bar_chart_invalid_labels_data_mismatch(self):
         """Test bar chart with mismatched labels and data."""
@@ -125,8 +134,7 @@ class TestChartGenerationService:
             title='Progress Over Time',
         )
 
-        assert 'png_base64' in result
-        assert 'svg' in result
+        assert result['url'].endswith('.png')
         assert result['title'] == 'Progress Over Time'
 
     def test_line_chart_multiple_series(self):
@@ -144,7 +152,7 @@ class TestChartGenerationService:
             title='Class Progress',
         )
 
-        assert 'png_base64' in result
+        assert result['url'].endswith('.png')
 
     def test_line_chart_mismatched_data(self):
         """Test line chart with mismatched data length."""
@@ -171,8 +179,7 @@ class TestChartGenerationService:
             title='Grade Distribution',
         )
 
-        assert 'png_base64' in result
-        assert 'svg' in result
+        assert result['url'].endswith('.png')
         assert result['title'] == 'Grade Distribution'
 
     def test_pie_chart_zero_sum(self):
@@ -197,8 +204,7 @@ class TestChartGenerationService:
             bins=5,
         )
 
-        assert 'png_base64' in result
-        assert 'svg' in result
+        assert result['url'].endswith('.png')
 
     def test_histogram_empty_data(self):
         """Test histogram with empty data."""
@@ -218,7 +224,7 @@ class TestChartGenerationService:
                 title=f'Histogram {bins} bins',
                 bins=bins,
             )
-            assert 'png_base64' in result
+            assert result['url'].endswith('.png')
 
     def test_box_plot_generation(self):
         """Test box plot generation."""
@@ -232,8 +238,7 @@ class TestChartGenerationService:
             title='Score Distribution by Class',
         )
 
-        assert 'png_base64' in result
-        assert 'svg' in result
+        assert result['url'].endswith('.png')
 
     def test_box_plot_empty_data(self):
         """Test box plot with empty data."""
@@ -265,7 +270,8 @@ class TestChartGenerationService:
         )
 
         # Results should be identical
-        assert result1['png_base64'] == result2['png_base64']
+        assert result1['chart_id'] == result2['chart_id']
+        assert result1['url'] == result2['url']
 
     def test_cache_invalidation_on_data_change(self):
         """Test that cache invalidates when data changes."""
@@ -286,7 +292,7 @@ class TestChartGenerationService:
         )
 
         # Results should be different
-        assert result1['png_base64'] != result2['png_base64']
+        assert result1['chart_id'] != result2['chart_id']
 
     def test_png_base64_is_valid(self):
         """Test that PNG base64 output is valid."""
@@ -297,6 +303,7 @@ class TestChartGenerationService:
             labels=labels,
             data=data,
             title='Valid PNG',
+            inline=True,
         )
 
         # Extract base64 data
@@ -306,6 +313,46 @@ class TestChartGenerationService:
         decoded = base64.b64decode(png_data)
         assert decoded[:8] == b'\x89PNG\r\n\x1a\n'  # PNG magic number
 
+    def test_theme_changes_chart_id(self):
+        """Charts are addressed by data and theme together."""
+        light = ChartGenerationService.generate_bar_chart(labels=['A'], data=[1], theme='light')
+        dark = ChartGenerationService.generate_bar_chart(labels=['A'], data=[1], theme='dark')
+
+        assert light['chart_id'] != dark['chart_id']
+
+    def test_only_requested_format_is_rendered(self):
+        """SVG is rendered lazily, on first request for that format."""
+        result = ChartGenerationService.generate_bar_chart(
+            labels=['A', 'B'], data=[3, 4], title='Lazy Formats'
+        )
+        svg_path = ChartGenerationService._storage_path(result['chart_id'], 'svg')
+
+        assert not default_storage.exists(svg_path)
+
+        svg = ChartGenerationService.get_chart(result['chart_id'], format='svg', inline=True)
+
+        assert default_storage.exists(svg_path)
+        assert svg['svg'].lstrip().startswith('<?xml')
+        assert svg['chart_id'] == result['chart_id']
+
+    def test_stored_chart_is_not_rendered_again(self):
+        """A chart id already in storage is served without rendering."""
+        ChartGenerationService.generate_bar_chart(labels=['A'], data=[7], title='Rendered Once')
+
+        with patch('reports.services.chart_rendering.render_chart') as render:
+            ChartGenerationService.generate_bar_chart(labels=['A'], data=[7], title='Rendered Once')
+
+        render.assert_not_called()
+
+    def test_get_unknown_chart(self):
+        """Unknown chart ids return None."""
+        assert ChartGenerationService.get_chart('0' * 32) is None
+
+    def test_invalid_format(self):
+        """Unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            ChartGenerationService.generate_bar_chart(labels=['A'], data=[1], format='gif')
+
     def test_validate_chart_request_invalid_type(self):
         """Test validation with invalid chart type."""
         is_valid, error = ChartGenerationService.validate_chart_request(
@@ -0,0 +1,154 @@
+"""
+Tests for the realtime dashboard counters.
+
+Covers:
+- Reads served from counters without database queries
+- Submission create/grade/delete and assignment create/delete applied as deltas
+- Teacher and tutor scopes
+- Reconcile overwrites drifted counters and drops stale scopes/students
+"""
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import StudentProfileFactory, TeacherFactory, TutorFactory
+from assignments.factories import AssignmentFactory, AssignmentSubmissionFactory
+from assignments.models import Assignment, AssignmentSubmission
+from reports.services.dashboard_counters import (
+    GLOBAL_SCOPE,
+    DashboardCounters,
+    compute_scopes,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_counters():
+    caches["dashboard"].clear()
+    yield
+    caches["dashboard"].clear()
+
+
+@pytest.fixture
+def setup():
+    teacher = TeacherFactory()
+    tutor = TutorFactory()
+    profile = StudentProfileFactory(tutor=tutor)
+    assignment = AssignmentFactory(author=teacher)
+    return teacher, tutor, profile.user, assignment
+
+
+def seed_all(teacher, tutor):
+    scopes = (GLOBAL_SCOPE, f"teacher:{teacher.id}", f"tutor:{tutor.id}")
+    for scope in scopes:
+        DashboardCounters.get_or_seed(scope)
+    return scopes
+
+
+def assert_counters_match_database(scopes):
+    for scope in scopes:
+        kind, scope_id = (None, None) if scope == GLOBAL_SCOPE else scope.split(":")
+        expected, _ = compute_scopes(kind, scope_id and int(scope_id))[scope]
+        assert DashboardCounters.get(scope) == expected, scope
+
+
+@pytest.mark.django_db
+class TestDashboardCounters:
+    def test_seeded_scope_is_read_without_queries(self, setup):
+        teacher, tutor, student, assignment = setup
+        seed_all(teacher, tutor)
+
+        with CaptureQueriesContext(connection) as queries:
+            metrics = DashboardCounters.get_or_seed(f"teacher:{teacher.id}")
+
+        assert len(queries) == 0
+        assert metrics["total_assignments"] == 1
+
+    def test_submission_lifecycle_updates_all_scopes(self, setup):
+        teacher, tutor, student, assignment = setup
+        scopes = seed_all(teacher, tutor)
+
+        submission = AssignmentSubmissionFactory(
+            assignment=assignment, student=student, score=None
+        )
+        metrics = DashboardCounters.get(f"tutor:{tutor.id}")
+        assert metrics["pending_submissions"] == 1
+        assert metrics["ungraded_submissions"] == 1
+        assert metrics["active_students"] == 1
+        assert_counters_match_database(scopes)
+
+        submission.status = AssignmentSubmission.Status.GRADED
+        submission.score = 90
+        submission.save()
+        metrics = DashboardCounters.get(f"teacher:{teacher.id}")
+        assert metrics["pending_submissions"] == 0
+        assert metrics["ungraded_submissions"] == 0
+        assert_counters_match_database(scopes)
+
+        submission.delete()
+        assert DashboardCounters.get(GLOBAL_SCOPE)["active_students"] == 0
+        assert_counters_match_database(scopes)
+
+    def test_active_students_counted_once_per_student(self, setup):
+        teacher, tutor, student, assignment = setup
+        scopes = seed_all(teacher, tutor)
+
+        first = AssignmentSubmissionFactory(assignment=assignment, student=student)
+        AssignmentSubmissionFactory(assignment=AssignmentFactory(author=teacher), student=student)
+        assert DashboardCounters.get(f"teacher:{teacher.id}")["active_students"] == 1
+
+        first.delete()
+        assert DashboardCounters.get(f"teacher:{teacher.id}")["active_students"] == 1
+        assert_counters_match_database(scopes)
+
+    def test_assignment_create_and_delete(self, setup):
+        teacher, tutor, student, assignment = setup
+        seed_all(teacher, tutor)
+
+        AssignmentFactory(author=teacher)
+        assert DashboardCounters.get(f"teacher:{teacher.id}")["total_assignments"] == 2
+
+        assignment.delete()
+        assert DashboardCounters.get(GLOBAL_SCOPE)["total_assignments"] == 1
+
+    def test_unseeded_scope_is_not_touched(self, setup):
+        teacher, tutor, student, assignment = setup
+
+        AssignmentSubmissionFactory(assignment=assignment, student=student)
+
+        assert DashboardCounters.get(f"teacher:{teacher.id}") is None
+        assert DashboardCounters.get_or_seed(f"teacher:{teacher.id}")["active_students"] == 1
+
+    def test_reconcile_overwrites_drift(self, setup):
+        teacher, tutor, student, assignment = setup
+        scopes = seed_all(teacher, tutor)
+        AssignmentSubmissionFactory(assignment=assignment, student=student)
+
+        # Bulk updates bypass signals
+        AssignmentSubmission.objects.update(status=AssignmentSubmission.Status.GRADED)
+        other_teacher = TeacherFactory()
+        AssignmentFactory(author=other_teacher)
+
+        result = DashboardCounters.reconcile()
+
+        assert result[GLOBAL_SCOPE] == 1
+        assert DashboardCounters.get(f"teacher:{other_teacher.id}")["total_assignments"] == 1
+        assert_counters_match_database(scopes)
+
+    def test_reconcile_drops_stale_scopes_and_student_counts(self, setup):
+        teacher, tutor, student, assignment = setup
+        seed_all(teacher, tutor)
+        AssignmentSubmissionFactory(assignment=assignment, student=student)
+
+        # Reassigned in bulk: the teacher scope disappears from the recount
+        Assignment.objects.filter(id=assignment.id).update(author=TeacherFactory())
+        DashboardCounters.reconcile()
+
+        scope = f"teacher:{teacher.id}"
+        assert DashboardCounters.get(scope) is None
+        assert DashboardCounters.get_or_seed(scope)["active_students"] == 0
+
+        AssignmentSubmissionFactory(assignment=AssignmentFactory(author=teacher), student=student)
+        assert DashboardCounters.get(scope)["active_students"] == 1
+        assert_counters_match_database([scope])
@@ -0,0 +1,80 @@
+"""
+Tests for the shared dashboard metrics publisher.
+
+Covers:
+- Metrics computed with a fixed number of queries
+- Single leader per scope
+- Event-driven refresh flag
+- Publish stores the latest metrics and sends one group message
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reports.services.dashboard_metrics import (
+    EMPTY_METRICS,
+    DashboardMetricsPublisher,
+    compute_dashboard_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches["dashboard"].clear()
+    yield
+    cache.clear()
+    caches["dashboard"].clear()
+
+
+@pytest.mark.django_db
+def test_compute_metrics_uses_fixed_queries():
+    with CaptureQueriesContext(connection) as queries:
+        metrics = compute_dashboard_metrics()
+
+    assert metrics == EMPTY_METRICS
+    # Submission aggregate, assignment count, per-student submission counts
+    assert len(queries) == 3
+
+
+def test_only_one_leader_per_scope():
+    first = DashboardMetricsPublisher("test_scope")
+    second = DashboardMetricsPublisher("test_scope")
+
+    assert first.acquire_lease() is True
+    assert second.acquire_lease() is False
+    # The leader keeps renewing its own lease
+    assert first.acquire_lease() is True
+
+    first.release_lease()
+    assert second.acquire_lease() is True
+
+
+def test_mark_dirty_is_consumed_once():
+    publisher = DashboardMetricsPublisher("test_scope")
+
+    DashboardMetricsPublisher.mark_dirty("test_scope")
+
+    assert publisher.consume_dirty() is True
+    assert publisher.consume_dirty() is False
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_publish_stores_latest_and_sends_once():
+    publisher = DashboardMetricsPublisher()
+    channel_layer = AsyncMock()
+
+    with patch("reports.services.dashboard_metrics.get_channel_layer", return_value=channel_layer):
+        metrics = await publisher.publish()
+
+    assert metrics == EMPTY_METRICS
+    assert DashboardMetricsPublisher.latest() == EMPTY_METRICS
+    channel_layer.group_send.assert_awaited_once()
+    group, event = channel_layer.group_send.await_args.args
+    assert group == "dashboard_metrics"
+    assert event["type"] == "metrics_event"
@@ -0,0 +1,114 @@
+"""
+Tests for streaming CSV/Excel exports.
+
+Covers:
+- CSV streamed from generators and querysets
+- Single BOM for utf-8-sig across chunks
+- Write-only Excel export read back from the streamed file
+"""
+
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from openpyxl import load_workbook
+
+from reports.services.analytics_export import AnalyticsExportService
+from reports.services.export import ReportExportService
+from reports.services.streaming_export import iter_export_rows, stream_csv
+
+User = get_user_model()
+
+
+def _content(response):
+    return b"".join(response.streaming_content)
+
+
+class TestStreamCsv:
+    """CSV encoding helpers."""
+
+    def test_bom_written_once_across_chunks(self):
+        rows = ({"id": i, "name": "Имя"} for i in range(5))
+
+        chunks = list(stream_csv(["id", "name"], rows, chunk_size=2))
+
+        content = b"".join(chunks)
+        assert len(chunks) > 2
+        assert content.count(b"\xef\xbb\xbf") == 1
+        assert content.decode("utf-8-sig").splitlines()[1] == "0,Имя"
+
+    def test_generator_is_consumed_lazily(self):
+        consumed = []
+
+        def rows():
+            for i in range(3):
+                consumed.append(i)
+                yield {"id": i}
+
+        fieldnames, iterator = iter_export_rows(rows())
+
+        assert fieldnames == ["id"]
+        assert consumed == [0]
+        assert [row["id"] for row in iterator] == [0, 1, 2]
+
+    def test_empty_input_keeps_requested_columns(self):
+        fieldnames, iterator = iter_export_rows([], columns=["id", "name"])
+
+        assert fieldnames == ["id", "name"]
+        assert list(iterator) == []
+
+
+@pytest.mark.django_db
+class TestQuerysetExports:
+    """Exports fed directly from querysets."""
+
+    def _create_users(self, count):
+        for i in range(count):
+            User.objects.create_user(
+                username=f"export_user_{i}",
+                email=f"export_user_{i}@test.com",
+                role="student",
+            )
+
+    def test_analytics_csv_from_queryset(self):
+        self._create_users(3)
+        queryset = User.objects.filter(username__startswith="export_user_").order_by("id")
+
+        response = AnalyticsExportService.export_to_csv(
+            queryset, report_name="users", columns=["username", "email"]
+        )
+
+        lines = _content(response).decode("utf-8-sig").splitlines()
+        assert lines[0] == "username,email"
+        assert lines[1:] == [f"export_user_{i},export_user_{i}@test.com" for i in range(3)]
+
+    def test_report_csv_has_no_row_cap(self):
+        limit = ReportExportService.MAX_ROWS_BEFORE_TIMEOUT
+        rows = ({"id": i} for i in range(limit + 1))
+
+        response = ReportExportService.export_to_csv(rows, encoding="utf-8")
+
+        assert _content(response).count(b"\n") == limit + 2
+
+    def test_analytics_excel_from_queryset(self):
+        self._create_users(3)
+        queryset = User.objects.filter(username__startswith="export_user_").order_by("id")
+
+        response = AnalyticsExportService.export_to_excel(
+            queryset, report_name="users", sheet_name="Users", columns=["username", "email"]
+        )
+
+        assert 'filename="users_' in response["Content-Disposition"]
+        ws = load_workbook(io.BytesIO(_content(response)))["Users"]
+        values = [[cell.value for cell in row] for row in ws.iter_rows()]
+        assert values[0] == ["username", "email"]
+        assert [row[0] for row in values[1:]] == [f"export_user_{i}" for i in range(3)]
+
+    def test_report_excel_from_generator(self):
+        rows = ({"id": i, "average_score": i / 2} for i in range(4))
+
+        response = ReportExportService.export_to_excel(rows, report_name="scores")
+
+        ws = load_workbook(io.BytesIO(_content(response)))["Report"]
+        assert ws.max_row == 5
+        assert ws.freeze_panes == "A2"
@@ -0,0 +1,74 @@
+"""
+Tests for the custom ReportBuilder.
+
+Covers:
+- Student metrics compiled into one annotated queryset
+- Query count independent of the number of rows
+- Query count recorded on CustomReportExecution
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from reports.factories import CustomReportFactory
+from reports.models import CustomReportExecution
+from reports.services.report_builder import ReportBuilder
+
+User = get_user_model()
+
+
+def _create_students(count, offset=0):
+    return [
+        User.objects.create_user(
+            username=f"builder_student_{offset + i}",
+            email=f"builder_student_{offset + i}@test.com",
+            first_name="Student",
+            last_name=str(offset + i),
+            role="student",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestReportBuilderQueries:
+    """Query behaviour of ReportBuilder fetchers."""
+
+    FIELDS = ["student_name", "student_email", "grade", "submission_count", "progress", "last_submission_date"]
+
+    def _build(self):
+        report = CustomReportFactory(config={"fields": self.FIELDS, "filters": {}})
+        return report, ReportBuilder(report).build()
+
+    def test_student_rows_contain_requested_fields(self):
+        _create_students(2)
+
+        _, result = self._build()
+
+        assert result["row_count"] == 2
+        row = result["data"][0]
+        assert set(row) == set(self.FIELDS)
+        assert row["grade"] == 0.0
+        assert row["submission_count"] == 0
+        assert row["progress"] == 0.0
+        assert row["last_submission_date"] is None
+
+    def test_query_count_does_not_grow_with_rows(self):
+        _create_students(2)
+        _, small = self._build()
+
+        _create_students(20, offset=100)
+        _, large = self._build()
+
+        assert large["row_count"] == 22
+        assert large["query_count"] == small["query_count"]
+
+    def test_execution_records_query_count(self):
+        _create_students(3)
+
+        report, result = self._build()
+
+        execution = CustomReportExecution.objects.get(report=report)
+        assert execution.query_count == result["query_count"]
+        assert execution.query_count > 0
+        assert execution.rows_returned == 3
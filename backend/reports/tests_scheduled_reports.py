@@ -0,0 +1,113 @@
+"""
+Tests for scheduled report fan-out.
+
+Covers:
+- Report data computed once per (report type, recipient, day)
+- Each export format rendered once and shared between schedules
+- Reuse and timing recorded on ReportScheduleExecution
+- Errors recorded as FAILED executions
+"""
+
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from reports.factories import (
+    ReportScheduleFactory,
+    ReportScheduleRecipientFactory,
+    StudentReportFactory,
+)
+from reports.models import ReportSchedule, ReportScheduleExecution, StudentReport
+from reports.services.scheduled_reports import ScheduledReportFanout
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestScheduledReportFanout:
+    """Shared computation across schedules."""
+
+    @pytest.fixture
+    def teacher(self):
+        teacher = User.objects.create_user(
+            username="fanout_teacher", email="fanout_teacher@test.com", role="teacher"
+        )
+        student = User.objects.create_user(
+            username="fanout_student", email="fanout_student@test.com", role="student"
+        )
+        StudentReportFactory(teacher=teacher, student=student, status=StudentReport.Status.SENT)
+        return teacher
+
+    def _schedule(self, recipient, export_format=ReportSchedule.ExportFormat.CSV):
+        schedule = ReportScheduleFactory(
+            report_template=None,
+            report_type=ReportSchedule.ReportType.STUDENT_REPORT,
+            export_format=export_format,
+        )
+        ReportScheduleRecipientFactory(schedule=schedule, recipient=recipient)
+        return schedule
+
+    @patch("reports.services.email_report.EmailReportService.send_report_email", return_value=True)
+    def test_same_recipient_computed_once(self, send_email, teacher):
+        first = self._schedule(teacher)
+        second = self._schedule(teacher)
+        fanout = ScheduledReportFanout()
+
+        with patch(
+            "reports.services.email_report.EmailReportService.build_scheduled_report_data",
+            return_value=("Subject", [{"id": 1, "title": "Report"}]),
+        ) as build_data:
+            first_execution = fanout.execute(first)
+            second_execution = fanout.execute(second)
+
+        assert build_data.call_count == 1
+        assert first_execution.reused_computations == 0
+        assert second_execution.reused_computations == 1
+        assert second_execution.reused_computation is True
+        assert send_email.call_count == 2
+        assert fanout.stats["rendered"] == 1
+
+        # Both recipients got the very same rendered attachment
+        attachments = [call.kwargs["attachment"] for call in send_email.call_args_list]
+        assert attachments[0] is attachments[1]
+
+    @patch("reports.services.email_report.EmailReportService.send_report_email", return_value=True)
+    def test_each_format_rendered_once(self, send_email, teacher):
+        fanout = ScheduledReportFanout()
+        for export_format in (
+            ReportSchedule.ExportFormat.CSV,
+            ReportSchedule.ExportFormat.XLSX,
+            ReportSchedule.ExportFormat.CSV,
+        ):
+            fanout.execute(self._schedule(teacher, export_format))
+
+        assert fanout.stats == {"computed": 1, "reused": 2, "rendered": 2, "sent": 3, "failed": 0}
+        filenames = [call.kwargs["attachment"][0] for call in send_email.call_args_list]
+        assert filenames[1].endswith(".xlsx")
+        assert filenames[0] == filenames[2]
+
+    @patch("reports.services.email_report.EmailReportService.send_report_email", return_value=False)
+    def test_execution_records_failures(self, send_email, teacher):
+        execution = ScheduledReportFanout().execute(self._schedule(teacher))
+
+        execution.refresh_from_db()
+        assert execution.status == ReportScheduleExecution.ExecutionStatus.FAILED
+        assert execution.total_recipients == 1
+        assert execution.failed_sends == 1
+        assert execution.completed_at is not None
+
+    def test_execution_marked_failed_on_error(self, teacher):
+        schedule = self._schedule(teacher)
+
+        with patch(
+            "reports.services.email_report.EmailReportService.build_scheduled_report_data",
+            side_effect=RuntimeError("report backend down"),
+        ):
+            with pytest.raises(RuntimeError):
+                ScheduledReportFanout().execute(schedule)
+
+        execution = ReportScheduleExecution.objects.get(schedule=schedule)
+        assert execution.status == ReportScheduleExecution.ExecutionStatus.FAILED
+        assert execution.error_message == "report backend down"
+        assert execution.completed_at is not None
@@ -0,0 +1,142 @@
+"""
+Tests for assignment score sketches.
+
+Covers:
+- Sketch statistics match the list-based calculations
+- Sketches merge by adding counts
+- Grading, re-scoring and deleting submissions update the stored sketch
+- Teacher-level statistics answered from sketches without scanning scores
+"""
+
+from statistics import mean, median, stdev
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import StudentFactory, TeacherFactory
+from assignments.factories import AssignmentFactory, AssignmentSubmissionFactory
+from assignments.models import AssignmentSubmission
+from reports.models import AssignmentScoreSketch
+from reports.services.score_sketches import ScoreSketch, ScoreSketchService
+
+
+class TestScoreSketch:
+    SCORES = [55, 72, 72, 81, 90, 95, 100, 64]
+
+    def test_statistics_match_sorted_list(self):
+        sketch = ScoreSketch.from_scores(self.SCORES)
+
+        assert sketch.count == len(self.SCORES)
+        assert sketch.mean() == pytest.approx(mean(self.SCORES))
+        assert sketch.median() == pytest.approx(median(self.SCORES))
+        assert sketch.std_dev() == pytest.approx(stdev(self.SCORES))
+        assert (sketch.min(), sketch.max(), sketch.mode()) == (55, 100, 72)
+
+    def test_percentile_interpolates_between_ranks(self):
+        sketch = ScoreSketch.from_scores(self.SCORES)
+
+        # 8 scores: 25th -> rank 2 exactly, 90th -> between ranks 7 and 8
+        assert sketch.percentile(25) == 64
+        assert sketch.percentile(90) == pytest.approx(95 + (100 - 95) * 0.2)
+        assert ScoreSketch.from_scores([70]).percentile(25) == 70
+
+    def test_merge_equals_sketch_of_union(self):
+        left = ScoreSketch.from_scores(self.SCORES[:3])
+        right = ScoreSketch.from_scores(self.SCORES[3:])
+
+        assert left.merge(right).counts == ScoreSketch.from_scores(self.SCORES).counts
+
+    def test_json_round_trip_drops_empty_buckets(self):
+        sketch = ScoreSketch.from_scores([80, 80, 90])
+        sketch.add(90, -1)
+
+        assert sketch.to_json() == {"80": 2}
+        assert ScoreSketch(sketch.to_json()).counts == sketch.counts
+
+
+@pytest.mark.django_db
+class TestScoreSketchService:
+    @pytest.fixture
+    def assignment(self):
+        return AssignmentFactory(author=TeacherFactory())
+
+    def sketch_of(self, assignment):
+        row = AssignmentScoreSketch.objects.get(assignment=assignment)
+        return ScoreSketch(row.scores), ScoreSketch(row.graded_scores)
+
+    def test_signals_keep_sketch_in_step(self, assignment):
+        submission = AssignmentSubmissionFactory(assignment=assignment, score=70)
+        AssignmentSubmissionFactory(assignment=assignment, score=None)
+
+        scores, graded = self.sketch_of(assignment)
+        assert scores.counts == {70: 1}
+        assert graded.count == 0
+
+        submission.status = AssignmentSubmission.Status.GRADED
+        submission.score = 85
+        submission.save()
+        scores, graded = self.sketch_of(assignment)
+        assert scores.counts == {85: 1}
+        assert graded.counts == {85: 1}
+
+        submission.delete()
+        scores, graded = self.sketch_of(assignment)
+        assert scores.count == 0 and graded.count == 0
+
+    def test_merged_skips_missing_rows_until_rebuild(self, assignment):
+        AssignmentSubmissionFactory(assignment=assignment, score=60)
+        AssignmentSubmissionFactory(assignment=assignment, score=90)
+        AssignmentScoreSketch.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            sketch = ScoreSketchService.merged(assignment_ids=[assignment.id])
+
+        assert sketch.count == 0 and len(queries) == 1
+        assert not AssignmentScoreSketch.objects.exists()
+        assert ScoreSketchService.rebuild() == {"score_sketches": 1}
+        assert ScoreSketchService.merged(assignment_ids=[assignment.id]).counts == {60: 1, 90: 1}
+
+    def test_teacher_sketch_merges_assignments_without_scanning(self):
+        teacher = TeacherFactory()
+        scores = [50, 65, 80, 80, 95]
+        for score in scores:
+            AssignmentSubmissionFactory(
+                assignment=AssignmentFactory(author=teacher),
+                student=StudentFactory(),
+                score=score,
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            sketch = ScoreSketchService.merged(teacher_id=teacher.id)
+
+        assert sketch.counts == ScoreSketch.from_scores(scores).counts
+        assert len(queries) == 1
+        assert not any("assignments_assignmentsubmission" in q["sql"] for q in queries)
+
+    def test_assignment_statistics_count_in_db_and_score_from_sketch(self):
+        from reports.aggregation import ReportDataAggregationService
+
+        teacher = TeacherFactory()
+        assignment = AssignmentFactory(author=teacher)
+        for score, is_late in [(60, False), (80, True), (100, False)]:
+            AssignmentSubmissionFactory(
+                assignment=assignment, student=StudentFactory(), score=score, is_late=is_late
+            )
+        ScoreSketchService.build([assignment.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = ReportDataAggregationService().get_assignment_statistics(
+                teacher_id=teacher.id, use_cache=False
+            )
+
+        assert stats["total_submissions"] == 3
+        assert stats["late_submission_rate"] == pytest.approx(33.33)
+        assert stats["score_statistics"]["average"] == pytest.approx(80)
+        assert sum(day["submission_count"] for day in stats["submission_trends"]) == 3
+        submission_selects = [
+            q["sql"] for q in queries
+            if "assignments_assignmentsubmission" in q["sql"] and "GROUP BY" not in q["sql"].upper()
+            and "COUNT(" not in q["sql"].upper()
+        ]
+        assert not submission_selects
@@ -0,0 +1,50 @@
+"""
+Tests for report cache invalidation signals.
+
+Covers:
+- Saving assignment answers with the reports app ready
+- Graded answers invalidate student and assignment author caches
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from accounts.factories import StudentFactory, TeacherFactory
+from assignments.factories import (
+    AssignmentAnswerFactory,
+    AssignmentFactory,
+    AssignmentQuestionFactory,
+    AssignmentSubmissionFactory,
+)
+
+
+@pytest.mark.django_db
+class TestAssignmentAnswerSignals:
+    @pytest.fixture
+    def submission(self):
+        assignment = AssignmentFactory(author=TeacherFactory())
+        return AssignmentSubmissionFactory(assignment=assignment, student=StudentFactory())
+
+    def answer(self, submission, **kwargs):
+        return AssignmentAnswerFactory(
+            submission=submission,
+            question=AssignmentQuestionFactory(assignment=submission.assignment),
+            **kwargs,
+        )
+
+    def test_graded_answer_invalidates_student_and_author(self, submission):
+        with patch("reports.signals.invalidate_student_reports") as student, \
+                patch("reports.signals.invalidate_teacher_reports") as teacher:
+            self.answer(submission, is_correct=True, points_earned=5)
+
+        student.assert_called_once_with(submission.student_id)
+        teacher.assert_called_once_with(submission.assignment.author_id)
+
+    def test_ungraded_answer_saves_without_invalidation(self, submission):
+        with patch("reports.signals.invalidate_student_reports") as student:
+            answer = self.answer(submission, is_correct=False, points_earned=0)
+            answer.answer_text = "changed"
+            answer.save()
+
+        student.assert_not_called()
@@ -5,7 +5,8 @@ Tests:
 - Query result accuracy (sample data)
 - Performance (queries < 5 seconds)
 - Timeout handling
-- Pagination
+- Pagination (offset and keyset)
+- Server-side cursor streaming
 - Result caching
 - Read replica routing
 - Materialized views
@@ -363,3 +364,222 @@ class TestDataWarehouseService(TestCase):
         assert 'trends' in result
         assert 'execution_time_ms' in result
         assert isinstance(result, dict)
+
+    # ========================================================================
+    # STREAMING & KEYSET PAGINATION TESTS
+    # ========================================================================
+
+    def _create_users(self, count):
+        return [
+            User.objects.create_user(
+                username=f'stream_user_{i}',
+                email=f'stream_user_{i}@test.com',
+                role='student',
+            )
+            for i in range(count)
+        ]
+
+    def test_stream_query_yields_all_rows(self):
+        """Streaming returns every row across several fetch batches."""
+        users = self._create_users(5)
+
+        rows = list(self.warehouse.stream_query(
+            "SELECT id, username FROM accounts_user ORDER BY id;",
+            batch_size=2
+        ))
+
+        assert [row['id'] for row in rows] == sorted(user.id for user in users)
+        assert set(rows[0]) == {'id', 'username'}
+
+    def test_stream_query_columnar_batches(self):
+        """Columnar streaming yields one {column: values} batch per fetch."""
+        self._create_users(5)
+
+        batches = list(self.warehouse.stream_query(
+            "SELECT id, username FROM accounts_user ORDER BY id;",
+            batch_size=2,
+            columnar=True
+        ))
+
+        assert [len(batch['id']) for batch in batches] == [2, 2, 1]
+        assert all(set(batch) == {'id', 'username'} for batch in batches)
+
+    def test_stream_query_is_not_cached(self):
+        """Streamed results never touch the cache."""
+        self._create_users(1)
+
+        with patch('reports.services.warehouse.cache') as mock_cache:
+            list(self.warehouse.stream_query("SELECT id FROM accounts_user;"))
+
+        mock_cache.set.assert_not_called()
+
+    def test_keyset_page_walks_all_rows(self):
+        """Following next_cursor visits every row exactly once."""
+        users = self._create_users(5)
+        select_sql = "SELECT id AS user_id, username FROM accounts_user"
+
+        seen, after = [], None
+        while True:
+            rows, after = self.warehouse._keyset_page(
+                'test_keyset', select_sql, (), keyset=('user_id',),
+                after=after, limit=2, descending=True, cache_params=()
+            )
+            seen.extend(row['user_id'] for row in rows)
+            if after is None:
+                break
+
+        assert seen == sorted((user.id for user in users), reverse=True)
+
+    def test_keyset_page_rejects_malformed_cursor(self):
+        """Cursor must carry one value per keyset column."""
+        with pytest.raises(ValueError):
+            self.warehouse._keyset_page(
+                'test_keyset', "SELECT id AS user_id FROM accounts_user", (),
+                keyset=('user_id', 'username'), after=[1], limit=2,
+                descending=False, cache_params=()
+            )
+
+
+@pytest.mark.django_db
+class TestWarehouseSummaryService(TestCase):
+    """Tests for incremental warehouse summary tables."""
+
+    def setUp(self):
+        from accounts.models import StudentProfile
+        from materials.models import Material, MaterialSubmission, Subject, SubjectEnrollment
+
+        self.teacher = User.objects.create_user(
+            username="summary_teacher", email="summary_teacher@test.com",
+            password="testpass123", role="teacher",
+        )
+        self.student = User.objects.create_user(
+            username="summary_student", email="summary_student@test.com",
+            password="testpass123", role="student",
+        )
+        StudentProfile.objects.get_or_create(user=self.student)
+
+        self.subject = Subject.objects.create(name="Math", description="Mathematics")
+        SubjectEnrollment.objects.create(
+            student=self.student, subject=self.subject, teacher=self.teacher
+        )
+        material = Material.objects.create(
+            title="Fractions", description="", content="", subject=self.subject, author=self.teacher,
+        )
+        self.submissions = [
+            MaterialSubmission.objects.create(
+                material=material, student=self.student, submission_text=f"answer {i}"
+            )
+            for i in range(2)
+        ]
+
+    def _grade(self, submission, grade):
+        from materials.models import MaterialFeedback
+
+        return MaterialFeedback.objects.create(
+            submission=submission, teacher=self.teacher, feedback_text="ok", grade=grade
+        )
+
+    def test_signals_append_change_log(self):
+        from reports.models import WarehouseChangeLog
+
+        assert WarehouseChangeLog.objects.filter(
+            student_id=self.student.id, subject_id=self.subject.id
+        ).exists()
+
+    def test_refresh_recomputes_dirty_rows_and_drains_log(self):
+        from reports.models import (
+            ClassProgressSummary, StudentGradeSummary, SubjectPerformanceSummary, WarehouseChangeLog,
+        )
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        self._grade(self.submissions[0], 5)
+        self._grade(self.submissions[1], 3)
+
+        WarehouseSummaryService.refresh_dirty()
+
+        summary = StudentGradeSummary.objects.get(student=self.student, subject=self.subject)
+        assert summary.submission_count == 2
+        assert float(summary.avg_grade) == 4.0
+        assert float(summary.pass_rate) == 50.0
+
+        class_summary = ClassProgressSummary.objects.get(teacher=self.teacher, subject=self.subject)
+        assert class_summary.student_count == 1
+        assert class_summary.total_submissions == 2
+
+        subject_summary = SubjectPerformanceSummary.objects.get(subject=self.subject)
+        assert float(subject_summary.excellent_rate) == 50.0
+        assert float(subject_summary.below_average_rate) == 50.0
+
+        assert not WarehouseChangeLog.objects.exists()
+
+    def test_removed_grades_delete_summary_row(self):
+        from reports.models import StudentGradeSummary
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        feedback = self._grade(self.submissions[0], 5)
+        WarehouseSummaryService.refresh_dirty()
+        assert StudentGradeSummary.objects.exists()
+
+        feedback.delete()
+        WarehouseSummaryService.refresh_dirty()
+
+        assert not StudentGradeSummary.objects.exists()
+
+    def test_rebuild_matches_incremental_refresh(self):
+        from reports.models import StudentGradeSummary, WarehouseChangeLog
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        self._grade(self.submissions[0], 4)
+        WarehouseSummaryService.refresh_dirty()
+        incremental = StudentGradeSummary.objects.values(
+            'submission_count', 'avg_grade', 'pass_rate'
+        ).get()
+
+        StudentGradeSummary.objects.all().delete()
+        WarehouseSummaryService.rebuild()
+
+        assert StudentGradeSummary.objects.values(
+            'submission_count', 'avg_grade', 'pass_rate'
+        ).get() == incremental
+        assert not WarehouseChangeLog.objects.exists()
+
+    def test_warehouse_readers_use_summary_tables(self):
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        self._grade(self.submissions[0], 5)
+        self._grade(self.submissions[1], 3)
+        WarehouseSummaryService.refresh_dirty()
+        warehouse = DataWarehouseService(use_replica=False)
+
+        [subject] = warehouse.get_subject_performance_comparison(self.student.id)['subjects']
+        assert subject['subject_name'] == "Math" and float(subject['avg_grade']) == 4.0
+
+        [performer] = warehouse.get_bottom_performers(min_submissions=2)['performers']
+        assert performer['student_id'] == self.student.id
+        assert float(performer['fail_rate']) == 50.0
+
+        [class_row] = warehouse.get_class_progress(teacher_id=self.teacher.id)['classes']
+        assert class_row['student_count'] == 1 and class_row['total_submissions'] == 2
+
+        [overview] = warehouse.get_subject_performance_overview()['subjects']
+        assert overview['subject_id'] == self.subject.id
+
+    def test_enrollment_teacher_change_refreshes_old_class(self):
+        from materials.models import SubjectEnrollment
+        from reports.models import ClassProgressSummary
+        from reports.services.warehouse_summaries import WarehouseSummaryService
+
+        WarehouseSummaryService.refresh_dirty()
+        assert ClassProgressSummary.objects.filter(teacher=self.teacher).exists()
+
+        new_teacher = User.objects.create_user(
+            username="summary_teacher2", email="summary_teacher2@test.com",
+            password="testpass123", role="teacher",
+        )
+        enrollment = SubjectEnrollment.objects.get(student=self.student, subject=self.subject)
+        enrollment.teacher = new_teacher
+        enrollment.save()
+        WarehouseSummaryService.refresh_dirty()
+
+        assert not ClassProgressSummary.objects.filter(teacher=self.teacher).exists()
+        assert ClassProgressSummary.objects.filter(teacher=new_teacher).exists()